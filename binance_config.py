@@ -36,6 +36,10 @@ ENABLE_TELEGRAM = True  # Set True to enable notifications
 # ============================================================================
 USE_TESTNET = True  # ALWAYS start with True!
 
+# Extra symbols for the multi-symbol engine, e.g. "BTCUSDT:0.5,ETHUSDT:0.5"
+# (unset = SYMBOL_ALLOCATIONS, BTCUSDT only)
+TRADING_SYMBOLS = os.getenv("TRADING_SYMBOLS")
+
 # Trading pairs
 TRADING_PAIRS = {
     'BTCUSDT': {
@@ -1,30 +1,33 @@
+import asyncio
 import os
 import threading
 import time
 import requests
 from flask import Flask, request
+from src.async_binance_connector import AsyncBinanceClient
 from src.binance_connector import BinanceTradingBot
-from src.live_trading_bot import LiveGridHedgeBot
+from src.multi_symbol_engine import MultiSymbolEngine, parse_allocations
+from src.rate_limiter import RequestScheduler
 from src.telegram_notifier import TelegramNotifier
 from binance_config import (
     USE_TESTNET,
     BINANCE_TESTNET_API_KEY, BINANCE_TESTNET_SECRET,
     BINANCE_API_KEY, BINANCE_SECRET,
-    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, ENABLE_TELEGRAM
+    TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, ENABLE_TELEGRAM, TRADING_SYMBOLS
 )
 from src.configs.strategy_configs import CONFIG_ADAPTIVE
 
 app = Flask(__name__)
 
-# Global bot instance
-bot_instance = None
+# Global engine instance (one bot per symbol)
+engine = None
 bot_thread = None
 is_running = False
 startup_error = None
 
 def run_bot():
-    """Function to run the bot in a separate thread"""
-    global bot_instance, is_running, startup_error
+    """Function to run the multi-symbol engine in a separate thread"""
+    global engine, is_running, startup_error
     
     print("="*50)
     print("STARTING BOT BACKGROUND THREAD")
@@ -45,8 +48,9 @@ def run_bot():
         print(f"❌ {startup_error}")
         return
 
-    # Initialize Binance Connector
-    bot_connector = BinanceTradingBot(api_key, api_secret, testnet=USE_TESTNET)
+    # Initialize Binance Connectors (one shared request-weight budget)
+    scheduler = RequestScheduler()
+    bot_connector = BinanceTradingBot(api_key, api_secret, testnet=USE_TESTNET, scheduler=scheduler)
     if not bot_connector.test_connection():
         startup_error = "Connection to Binance failed! Check API Keys or IP Restrictions."
         print(f"❌ {startup_error}")
@@ -58,16 +62,19 @@ def run_bot():
         telegram = TelegramNotifier(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
         telegram.send_message("🚀 Render Bot Starting...")
 
-    # Initialize Trading Bot
-    symbol = 'BTCUSDT'
-    bot_instance = LiveGridHedgeBot(bot_connector, symbol, CONFIG_ADAPTIVE, telegram)
+    # Initialize Trading Bots (one per symbol, one event loop)
+    client = AsyncBinanceClient(api_key, api_secret, testnet=USE_TESTNET, scheduler=scheduler)
     
     try:
-        if bot_instance.initialize():
-            print("✅ Bot Initialized Successfully")
+        # BTCUSDT only (SYMBOL_ALLOCATIONS) unless TRADING_SYMBOLS opts into more
+        allocations = parse_allocations(TRADING_SYMBOLS) if TRADING_SYMBOLS else None
+        engine = MultiSymbolEngine(bot_connector, client, CONFIG_ADAPTIVE, allocations, telegram)
+        if engine.initialize():
+            print(f"✅ Bots Initialized Successfully: {', '.join(engine.bots)}")
             is_running = True
-            # Run loop
-            bot_instance.start(check_interval=60)
+            # Run loop (combined market stream)
+            asyncio.run(engine.start())
+            is_running = False
         else:
             startup_error = "Bot Initialization Failed (Data download or balance check failed)"
             print(f"❌ {startup_error}")
@@ -79,31 +86,27 @@ def run_bot():
 
 @app.route('/api/data')
 def api_data():
-    """API endpoint for frontend polling"""
-    if bot_instance:
-        chart_data = bot_instance.get_chart_data()
-        price = bot_instance.price_history[-1] if bot_instance.price_history else 0
-        roi = ((bot_instance.equity - bot_instance.start_equity) / bot_instance.start_equity) * 100 if bot_instance.start_equity else 0
+    """API endpoint for frontend polling (all symbols; chart for ?symbol=)"""
+    if engine and engine.bots:
+        summary = engine.summary()
         
-        # Format positions for table
-        positions = []
-        for buy_price, qty in bot_instance.grid_positions.items():
-            pnl = (price - buy_price) * qty
-            pnl_pct = ((price - buy_price) / buy_price) * 100
-            positions.append({
-                'price': buy_price,
-                'qty': qty,
-                'pnl': pnl,
-                'pnl_pct': pnl_pct
-            })
+        # Candles for one symbol only (each chart costs a klines request)
+        symbol = request.args.get('symbol', '').upper()
+        if symbol not in engine.bots:
+            symbol = next(iter(engine.bots))
+        chart_data = engine.bots[symbol].get_chart_data()
+        
+        # Flatten positions for the table
+        positions = [dict(p, symbol=b['symbol']) for b in summary['bots'] for p in b['positions']]
             
         return {
             'status': "RUNNING" if is_running else "STOPPED",
             'mode': 'TESTNET' if USE_TESTNET else 'LIVE',
-            'price': price,
-            'equity': bot_instance.equity,
-            'roi': roi,
+            'equity': summary['equity'],
+            'roi': summary['roi'],
+            'bots': summary['bots'],
             'positions': positions,
+            'requests': summary['requests'],
             'chart': chart_data
         }
     return {}
@@ -140,8 +143,8 @@ def home():
             </div>
             <div class="grid">
                 <div>
-                    <p>Current Price</p>
-                    <div id="price" class="value">Loading...</div>
+                    <p>Symbols</p>
+                    <div id="symbols" class="value">Loading...</div>
                 </div>
                  <div>
                     <p>Total Equity</p>
@@ -155,7 +158,27 @@ def home():
         </div>
 
         <div class="card">
-            <h2>📈 Price Chart (1H)</h2>
+            <h2>🪙 Symbols</h2>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Symbol</th>
+                        <th>Price</th>
+                        <th>Capital</th>
+                        <th>Equity</th>
+                        <th>ROI</th>
+                        <th>Trades</th>
+                        <th>Status</th>
+                    </tr>
+                </thead>
+                <tbody id="bots-table">
+                    <tr><td colspan='7'>Loading...</td></tr>
+                </tbody>
+            </table>
+        </div>
+
+        <div class="card">
+            <h2>📈 <span id="chart-symbol"></span> Price Chart (1H)</h2>
             <div id="chart"></div>
         </div>
 
@@ -164,6 +187,7 @@ def home():
             <table>
                 <thead>
                     <tr>
+                        <th>Symbol</th>
                         <th>Entry Price</th>
                         <th>Quantity</th>
                         <th>PnL ($)</th>
@@ -171,7 +195,7 @@ def home():
                     </tr>
                 </thead>
                 <tbody id="positions-table">
-                    <tr><td colspan='4'>Loading...</td></tr>
+                    <tr><td colspan='5'>Loading...</td></tr>
                 </tbody>
             </table>
         </div>
@@ -189,29 +213,49 @@ def home():
             
             // State
             let gridLines = [];
+            let selectedSymbol = '';
+
+            function selectSymbol(symbol) {{
+                selectedSymbol = symbol;
+                updateData();
+            }}
 
             async function updateData() {{
                 try {{
-                    const res = await fetch('/api/data');
+                    const res = await fetch('/api/data?symbol=' + selectedSymbol);
                     const data = await res.json();
                     
                     if (!data.status) return;
 
                     // Update DOM
-                    document.getElementById('price').innerText = '$' + data.price.toLocaleString(undefined, {{minimumFractionDigits: 2}});
+                    document.getElementById('symbols').innerText = data.bots.filter(b => b.status === 'RUNNING').length + ' / ' + data.bots.length;
                     document.getElementById('equity').innerText = '$' + data.equity.toLocaleString(undefined, {{minimumFractionDigits: 2}});
                     
                     const roiElem = document.getElementById('roi');
                     roiElem.innerText = (data.roi >= 0 ? '+' : '') + data.roi.toFixed(2) + '%';
                     roiElem.style.color = data.roi >= 0 ? 'green' : 'red';
                     
+                    // Update Symbols Table (click a row to chart it)
+                    document.getElementById('bots-table').innerHTML = data.bots.map(b => `
+                        <tr onclick="selectSymbol('${{b.symbol}}')" style="cursor: pointer">
+                            <td><b>${{b.symbol}}</b></td>
+                            <td>$${{b.price.toLocaleString()}}</td>
+                            <td>$${{b.capital.toFixed(2)}}</td>
+                            <td>$${{b.equity.toFixed(2)}}</td>
+                            <td style="color: ${{b.roi >= 0 ? 'green' : 'red'}}">${{(b.roi >= 0 ? '+' : '') + b.roi.toFixed(2)}}%</td>
+                            <td>${{b.trades}}</td>
+                            <td style="color: ${{b.status === 'RUNNING' ? 'green' : 'red'}}">${{b.status}}</td>
+                        </tr>
+                    `).join('');
+
                     // Update Positions Table
                     const tbody = document.getElementById('positions-table');
                     if (data.positions.length === 0) {{
-                        tbody.innerHTML = "<tr><td colspan='4'>No open positions</td></tr>";
+                        tbody.innerHTML = "<tr><td colspan='5'>No open positions</td></tr>";
                     }} else {{
                         tbody.innerHTML = data.positions.map(p => `
                             <tr>
+                                <td>${{p.symbol}}</td>
                                 <td>$${{p.price.toLocaleString()}}</td>
                                 <td>${{p.qty}}</td>
                                 <td style="color: ${{p.pnl >= 0 ? 'green' : 'red'}}">$${{p.pnl.toFixed(2)}}</td>
@@ -222,6 +266,7 @@ def home():
 
                     // Update Chart
                     if (data.chart && data.chart.candles) {{
+                        document.getElementById('chart-symbol').innerText = data.chart.symbol;
                         candleSeries.setData(data.chart.candles);
                         
                         // Clear old grid lines
@@ -309,37 +354,41 @@ def set_webhook():
 
 def handle_status_command(chat_id):
     """Handle /status"""
-    global bot_instance
-    if not bot_instance or not is_running:
+    global engine
+    if not engine or not is_running:
         send_telegram_message(chat_id, "⚠️ Bot is not running.")
         return
         
-    price = bot_instance.price_history[-1] if bot_instance.price_history else 0
-    roi = ((bot_instance.equity - bot_instance.start_equity) / bot_instance.start_equity) * 100
+    summary = engine.summary()
     
     msg = f"📊 <b>Bot Status</b>\n"
-    msg += f"Price: <code>${price:,.2f}</code>\n"
-    msg += f"Equity: <code>${bot_instance.equity:,.2f}</code>\n"
-    msg += f"ROI: <code>{roi:+.2f}%</code>\n"
-    msg += f"Positions: <code>{len(bot_instance.grid_positions)}</code>"
+    msg += f"Equity: <code>${summary['equity']:,.2f}</code>\n"
+    msg += f"ROI: <code>{summary['roi']:+.2f}%</code>\n"
+    for b in summary['bots']:
+        msg += (f"\n<b>{b['symbol']}</b> ({b['status']})\n"
+                f"Price: <code>${b['price']:,.2f}</code> | ROI: <code>{b['roi']:+.2f}%</code> | "
+                f"Positions: <code>{len(b['positions'])}</code>\n")
     send_telegram_message(chat_id, msg)
 
 def handle_orders_command(chat_id):
     """Handle /open_orders"""
-    global bot_instance
-    if not bot_instance:
+    global engine
+    if not engine:
         send_telegram_message(chat_id, "⚠️ Bot is not initialized.")
         return
 
     msg = "📋 <b>Open Positions (Grid)</b>\n\n"
     
-    if not bot_instance.grid_positions:
+    open_bots = [b for b in engine.bots.values() if b.grid_positions]
+    if not open_bots:
         msg += "<i>No open grid positions.</i>"
     else:
-        for price, qty in bot_instance.grid_positions.items():
-            current_price = bot_instance.price_history[-1] if bot_instance.price_history else price
-            pnl_pct = ((current_price - price) / price) * 100
-            msg += f"• Buy: <code>${price:,.2f}</code> | Qty: <code>{qty}</code> | PnL: <code>{pnl_pct:+.2f}%</code>\n"
+        for bot in open_bots:
+            msg += f"<b>{bot.symbol}</b>\n"
+            for price, qty in bot.grid_positions.items():
+                current_price = bot.price_history.last(price)
+                pnl_pct = ((current_price - price) / price) * 100
+                msg += f"• Buy: <code>${price:,.2f}</code> | Qty: <code>{qty}</code> | PnL: <code>{pnl_pct:+.2f}%</code>\n"
             
     send_telegram_message(chat_id, msg)
 
@@ -0,0 +1,204 @@
+"""
+Account-state service: cached balances and exchange symbol filters
+
+Balances come from one ``account`` request for every asset, cached for
+``ttl`` seconds and invalidated by our own fills or a user-data stream
+event, so a cycle that needs the balance several times pays for one
+signed request at most. ``exchangeInfo`` filters (step size, tick size,
+min notional) are loaded once at startup and used for rounding.
+
+Works over the blocking ``BinanceTradingBot`` (``balance``) or the
+``AsyncBinanceClient`` (``balance_async``; concurrent callers share one
+refresh), or both at once so sync and async callers share one snapshot.
+"""
+import asyncio
+import math
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+
+def _decimals(step: float) -> int:
+    """Decimal places of a power-of-ten step (0.00001 -> 5)"""
+    return max(0, -int(math.floor(math.log10(step) + 1e-9))) if step > 0 else 8
+
+
+class SymbolFilters:
+    """LOT_SIZE / PRICE_FILTER / (MIN_)NOTIONAL rules of one symbol"""
+
+    __slots__ = ('symbol', 'base_asset', 'quote_asset', 'step_size', 'min_qty',
+                 'tick_size', 'min_notional', 'qty_decimals', 'price_decimals')
+
+    def __init__(self, symbol: str, base_asset: str, quote_asset: str = 'USDT',
+                 step_size: float = 1e-5, min_qty: float = 0.0, tick_size: float = 0.01,
+                 min_notional: float = 10.0):
+        self.symbol = symbol
+        self.base_asset = base_asset
+        self.quote_asset = quote_asset
+        self.step_size = step_size
+        self.min_qty = min_qty
+        self.tick_size = tick_size
+        self.min_notional = min_notional
+        self.qty_decimals = _decimals(step_size)
+        self.price_decimals = _decimals(tick_size)
+
+    @classmethod
+    def default(cls, symbol: str, quote_asset: str = 'USDT') -> 'SymbolFilters':
+        """Conservative fallback (BTC-like precision, $10 minimum) for bots that never load exchangeInfo"""
+        base = symbol[:-len(quote_asset)] if symbol.endswith(quote_asset) else symbol
+        return cls(symbol, base, quote_asset)
+
+    @classmethod
+    def from_symbol_info(cls, info: Dict) -> 'SymbolFilters':
+        """Parse one ``exchangeInfo['symbols']`` entry"""
+        filters = {f['filterType']: f for f in info.get('filters', [])}
+        lot = filters.get('LOT_SIZE', {})
+        price = filters.get('PRICE_FILTER', {})
+        notional = filters.get('NOTIONAL') or filters.get('MIN_NOTIONAL') or {}
+        return cls(
+            info['symbol'], info['baseAsset'], info['quoteAsset'],
+            step_size=float(lot.get('stepSize', 1e-5)),
+            min_qty=float(lot.get('minQty', 0.0)),
+            tick_size=float(price.get('tickSize', 0.01)),
+            min_notional=float(notional.get('minNotional', 10.0)),
+        )
+
+    def round_qty(self, quantity: float) -> float:
+        """Round down to the lot step (never more than requested/held)"""
+        steps = math.floor(quantity / self.step_size + 1e-9)
+        return round(steps * self.step_size, self.qty_decimals)
+
+    def round_price(self, price: float) -> float:
+        """Nearest valid tick"""
+        return round(round(price / self.tick_size) * self.tick_size, self.price_decimals)
+
+    def is_tradable(self, quantity: float, price: float) -> bool:
+        """Passes the lot-size minimum and the minimum notional"""
+        return quantity >= max(self.min_qty, self.step_size) and quantity * price >= self.min_notional
+
+
+class AccountState:
+    """TTL balance cache + symbol filters over a (sync or async) connector"""
+
+    def __init__(self, connector, ttl: float = 5.0, clock: Callable[[], float] = time.monotonic,
+                 client=None):
+        """
+        Args:
+            connector: ``BinanceTradingBot`` or ``AsyncBinanceClient``
+            ttl: Seconds a fetched balance snapshot stays valid
+            clock: Time source (monotonic seconds)
+            client: ``AsyncBinanceClient`` for the ``*_async`` methods
+                (default: ``connector``)
+        """
+        self.connector = connector
+        self.client = client or connector
+        self.ttl = ttl
+        self.clock = clock
+        self.filters: Dict[str, SymbolFilters] = {}
+
+        self._balances: Dict[str, float] = {}
+        self._fetched_at: Optional[float] = None
+        self._refresh: Optional[asyncio.Future] = None
+
+        self.hits = 0
+        self.fetches = 0
+        self.invalidations = 0
+
+    # ---------------------------------------------------------------- filters
+
+    def _store_filters(self, info: Dict, symbols: Iterable[str]) -> Dict[str, SymbolFilters]:
+        for entry in info.get('symbols', []):
+            self.filters[entry['symbol']] = SymbolFilters.from_symbol_info(entry)
+        missing = [s for s in symbols if s not in self.filters]
+        if missing:
+            # Guessed lot/tick rules would be rejected (or silently mis-sized) on every order
+            raise ValueError(f"No exchange filters for {', '.join(missing)}")
+        return {s: self.filters[s] for s in symbols}
+
+    def load_filters(self, symbols: Iterable[str]) -> Dict[str, SymbolFilters]:
+        """
+        Fetch and cache ``exchangeInfo`` filters (call once at startup)
+
+        Raises:
+            ValueError: A symbol is not in the response (unknown symbol or
+                failed request); the ones that are stay cached
+        """
+        symbols = list(symbols)
+        return self._store_filters(self.connector.get_exchange_info(symbols), symbols)
+
+    async def load_filters_async(self, symbols: Iterable[str]) -> Dict[str, SymbolFilters]:
+        symbols = list(symbols)
+        return self._store_filters(await self.client.get_exchange_info(symbols), symbols)
+
+    def symbol_filters(self, symbol: str) -> SymbolFilters:
+        return self.filters.get(symbol) or SymbolFilters.default(symbol)
+
+    # --------------------------------------------------------------- balances
+
+    def is_fresh(self) -> bool:
+        return self._fetched_at is not None and self.clock() - self._fetched_at < self.ttl
+
+    def _store(self, account: Dict) -> bool:
+        if not account:
+            return False        # failed fetch: keep the old snapshot, stay stale
+        self._balances = {b['asset']: float(b['free']) for b in account.get('balances', [])}
+        self._fetched_at = self.clock()
+        self.fetches += 1
+        return True
+
+    def balances(self) -> Dict[str, float]:
+        """Free balance per asset (one signed request when stale)"""
+        if self.is_fresh():
+            self.hits += 1
+        else:
+            self._store(self.connector.get_account_info())
+        return self._balances
+
+    def balance(self, asset: str = 'USDT') -> float:
+        return self.balances().get(asset, 0.0)
+
+    async def balances_async(self) -> Dict[str, float]:
+        if self.is_fresh():
+            self.hits += 1
+            return self._balances
+        if self._refresh is None:
+            self._refresh = asyncio.ensure_future(self.client.get_account_info())
+            try:
+                self._store(await self._refresh)
+            finally:
+                self._refresh = None
+        else:
+            await asyncio.shield(self._refresh)
+            self.hits += 1
+        return self._balances
+
+    async def balance_async(self, asset: str = 'USDT') -> float:
+        return (await self.balances_async()).get(asset, 0.0)
+
+    # ----------------------------------------------------------- invalidation
+
+    def invalidate(self):
+        """Force the next read to refetch"""
+        self._fetched_at = None
+        self.invalidations += 1
+
+    def on_fill(self, order: Dict):
+        """Our own order changed balances"""
+        if order:
+            self.invalidate()
+
+    def on_user_event(self, event: Dict):
+        """
+        Apply a user-data stream event
+
+        ``outboundAccountPosition`` carries the new balances of the assets it
+        lists, so they are written straight into the cache; other balance or
+        order events only invalidate it.
+        """
+        kind = event.get('e')
+        if kind == 'outboundAccountPosition':
+            for b in event.get('B', []):
+                self._balances[b['a']] = float(b['f'])
+            if self._fetched_at is not None:
+                self._fetched_at = self.clock()
+        elif kind in ('balanceUpdate', 'executionReport'):
+            self.invalidate()
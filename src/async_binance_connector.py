@@ -0,0 +1,337 @@
+"""
+Async Binance REST connector (aiohttp) with a pooled keep-alive session
+
+Same calls as ``BinanceTradingBot``, as coroutines: independent requests
+(price + balance, several orders) can be awaited together with
+``asyncio.gather`` and share warm TCP/TLS connections, so a trading cycle
+costs about one round trip instead of one per call.
+"""
+import asyncio
+import hashlib
+import hmac
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+import aiohttp
+
+from src.rate_limiter import PRIORITY_ORDER, PRIORITY_READ, RequestScheduler, endpoint_weight
+
+
+LIVE_URL = 'https://api.binance.com'
+TESTNET_URL = 'https://testnet.binance.vision'
+
+
+class BinanceAPIError(Exception):
+    """Error response from the exchange (HTTP status + Binance error code)"""
+
+    def __init__(self, status: int, code: int, message: str, headers: Optional[Dict] = None):
+        super().__init__(f"APIError(code={code}): {message}")
+        self.status = status
+        self.code = code
+        self.message = message
+        self.headers = headers or {}
+
+
+# Failures the high-level helpers report and swallow (like the sync connector)
+REQUEST_ERRORS = (BinanceAPIError, aiohttp.ClientError, asyncio.TimeoutError)
+
+
+def _param(value) -> str:
+    """Plain decimal for floats (Binance rejects '1e-05')"""
+    if isinstance(value, float):
+        return f"{value:.8f}".rstrip('0').rstrip('.') or '0'
+    return str(value)
+
+
+class AsyncBinanceClient:
+    """Async spot client; use as ``async with AsyncBinanceClient(...) as client:``"""
+
+    def __init__(self, api_key: str, api_secret: str, testnet: bool = True,
+                 base_url: Optional[str] = None, pool_size: int = 20,
+                 timeout: float = 10.0, recv_window: int = 5000,
+                 scheduler: Optional[RequestScheduler] = None,
+                 time_sync_interval: float = 3600.0):
+        """
+        Args:
+            api_key: Binance API key
+            api_secret: Binance API secret
+            testnet: Use testnet (True) or live (False)
+            base_url: Override the endpoint (e.g. a local ``MockExchange``)
+            pool_size: Max simultaneous connections kept in the pool
+            timeout: Per-request timeout in seconds
+            recv_window: Signed-request validity window in ms
+            scheduler: Weight budget / retry policy (shared between clients to
+                share the budget)
+            time_sync_interval: Seconds between server-clock resyncs
+        """
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.testnet = testnet
+        self.base_url = base_url or (TESTNET_URL if testnet else LIVE_URL)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.recv_window = recv_window
+        self.timestamp_offset = 0
+        self.time_sync_interval = time_sync_interval
+        self.synced_at: Optional[float] = None
+        self.scheduler = scheduler or RequestScheduler()
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    # ------------------------------------------------------------- lifecycle
+
+    async def start(self):
+        """Open the pooled session and sync the clock with the server (idempotent)"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60,
+                                             ttl_dns_cache=300)
+            self.session = aiohttp.ClientSession(
+                base_url=self.base_url, connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'X-MBX-APIKEY': self.api_key})
+            await self.sync_time()
+        return self
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self) -> 'AsyncBinanceClient':
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ------------------------------------------------------------- requests
+
+    def _sign(self, params: Dict) -> str:
+        params = dict(params)
+        params['timestamp'] = int(time.time() * 1000) + self.timestamp_offset
+        params['recvWindow'] = self.recv_window
+        query = urlencode(params)
+        signature = hmac.new(self.api_secret.encode(), query.encode(), hashlib.sha256).hexdigest()
+        return f"{query}&signature={signature}"
+
+    async def request(self, method: str, path: str, params: Optional[Dict] = None,
+                      signed: bool = False):
+        """
+        Send one request on the pooled session, through the scheduler
+        
+        Order placement/cancellation is prioritised over reads; reads are
+        retried on transient failures, orders only when rate-limited.
+        Signed requests resync the clock every ``time_sync_interval`` and
+        once more after a -1021 (timestamp outside recvWindow) rejection.
+
+        Raises:
+            BinanceAPIError: The exchange answered with an error
+        """
+        await self.start()
+        params = {k: _param(v) for k, v in (params or {}).items() if v is not None}
+        if signed and time.monotonic() - (self.synced_at or 0.0) >= self.time_sync_interval:
+            await self.sync_time()
+        try:
+            return await self._scheduled(method, path, params, signed)
+        except BinanceAPIError as e:
+            if not signed or e.code != -1021:
+                raise
+            await self.sync_time()
+            return await self._scheduled(method, path, params, signed)
+
+    async def _scheduled(self, method: str, path: str, params: Dict, signed: bool):
+        is_order = path == '/api/v3/order' and method in ('POST', 'DELETE')
+        return await self.scheduler.call_async(
+            lambda: self._send(method, path, params, signed),
+            weight=endpoint_weight(path, params),
+            priority=PRIORITY_ORDER if is_order else PRIORITY_READ,
+            idempotent=method in ('GET', 'PUT'),
+            transient=(aiohttp.ClientError, asyncio.TimeoutError),
+        )
+
+    async def _send(self, method: str, path: str, params: Dict, signed: bool):
+        # Signed per attempt: a retry needs a fresh timestamp
+        query = self._sign(params) if signed else urlencode(params)
+        url = f"{path}?{query}" if query else path
+        async with self.session.request(method, url) as response:
+            self.scheduler.update_from_headers(response.headers)
+            data = await response.json(content_type=None)
+            if response.status >= 400:
+                if not isinstance(data, dict):
+                    data = {}
+                raise BinanceAPIError(response.status, data.get('code', response.status),
+                                      data.get('msg', response.reason or ''), dict(response.headers))
+            return data
+
+    async def sync_time(self) -> int:
+        """Align signed timestamps with the server clock (keeps the old offset on failure)"""
+        self.synced_at = time.monotonic()
+        try:
+            server = await self._scheduled('GET', '/api/v3/time', {}, False)
+            self.timestamp_offset = server['serverTime'] - int(time.time() * 1000)
+            print(f"⏰ Timestamp offset: {self.timestamp_offset}ms")
+        except REQUEST_ERRORS as e:
+            print(f"⚠️ Clock sync failed, keeping offset {self.timestamp_offset}ms: {e}")
+        return self.timestamp_offset
+
+    # ------------------------------------------------------------ market data
+
+    async def get_price(self, symbol: str) -> float:
+        """Get current price for symbol"""
+        try:
+            ticker = await self.request('GET', '/api/v3/ticker/price', {'symbol': symbol})
+            return float(ticker['price'])
+        except REQUEST_ERRORS as e:
+            print(f"❌ Error getting price for {symbol}: {e}")
+            return 0.0
+
+    async def get_prices(self, symbols: List[str]) -> Dict[str, float]:
+        """Several prices in one request"""
+        try:
+            tickers = await self.request('GET', '/api/v3/ticker/price')
+        except REQUEST_ERRORS as e:
+            print(f"❌ Error getting prices: {e}")
+            return {}
+        wanted = set(symbols)
+        return {t['symbol']: float(t['price']) for t in tickers if t['symbol'] in wanted}
+
+    async def get_klines(self, symbol: str, interval: str = '1h', limit: int = 500,
+                         start_time: Optional[int] = None) -> List[list]:
+        """Raw klines (open time in ms first)"""
+        try:
+            return await self.request('GET', '/api/v3/klines', {
+                'symbol': symbol, 'interval': interval, 'limit': limit, 'startTime': start_time})
+        except REQUEST_ERRORS as e:
+            print(f"❌ Error getting klines: {e}")
+            return []
+
+    async def get_latest_candles(self, symbol: str, interval: str = '1h', limit: int = 100) -> List[Dict]:
+        """Get latest candles for chart"""
+        return [{'time': int(k[0] / 1000), 'open': float(k[1]), 'high': float(k[2]),
+                 'low': float(k[3]), 'close': float(k[4])}
+                for k in await self.get_klines(symbol, interval, limit)]
+
+    async def get_exchange_info(self, symbols: Optional[List[str]] = None) -> Dict:
+        """Exchange rules (symbol filters: lot size, tick size, min notional)"""
+        params = {}
+        if symbols:
+            params['symbols'] = '[' + ','.join(f'"{s}"' for s in symbols) + ']'
+        try:
+            return await self.request('GET', '/api/v3/exchangeInfo', params)
+        except REQUEST_ERRORS as e:
+            print(f"❌ Error getting exchange info: {e}")
+            return {}
+
+    # ---------------------------------------------------------------- account
+
+    async def get_account_info(self) -> Dict:
+        """Get full account information"""
+        try:
+            return await self.request('GET', '/api/v3/account', signed=True)
+        except REQUEST_ERRORS as e:
+            print(f"❌ Error getting account info: {e}")
+            return {}
+
+    async def get_account_balance(self, asset: str = 'USDT') -> float:
+        """Get balance for specific asset"""
+        account = await self.get_account_info()
+        for balance in account.get('balances', []):
+            if balance['asset'] == asset:
+                return float(balance['free'])
+        return 0.0
+
+    async def get_recent_trades(self, symbol: str, limit: int = 50) -> List[Dict]:
+        """Get recent trades for symbol"""
+        try:
+            return await self.request('GET', '/api/v3/myTrades', {'symbol': symbol, 'limit': limit},
+                                      signed=True)
+        except REQUEST_ERRORS as e:
+            print(f"❌ Error getting trades: {e}")
+            return []
+
+    async def create_listen_key(self) -> str:
+        """Start a user-data stream (raises ``BinanceAPIError``)"""
+        return (await self.request('POST', '/api/v3/userDataStream'))['listenKey']
+
+    async def keepalive_listen_key(self, listen_key: str) -> bool:
+        """Extend a user-data stream by 60 minutes"""
+        try:
+            await self.request('PUT', '/api/v3/userDataStream', {'listenKey': listen_key})
+            return True
+        except REQUEST_ERRORS as e:
+            print(f"⚠️ Listen key keepalive failed: {e}")
+            return False
+
+    # ----------------------------------------------------------------- orders
+
+    async def create_order(self, symbol: str, side: str, order_type: str, quantity: float,
+                           price: Optional[float] = None, time_in_force: Optional[str] = None,
+                           client_order_id: Optional[str] = None) -> Dict:
+        """
+        Place an order (raises ``BinanceAPIError`` on rejection)
+
+        Args:
+            symbol: Trading pair
+            side: 'BUY' or 'SELL'
+            order_type: 'MARKET' or 'LIMIT'
+            quantity: Amount to trade
+            price: Limit price (LIMIT only)
+            time_in_force: e.g. 'GTC' (LIMIT only)
+            client_order_id: Idempotency key (``newClientOrderId``)
+        """
+        return await self.request('POST', '/api/v3/order', {
+            'symbol': symbol, 'side': side, 'type': order_type, 'quantity': quantity,
+            'price': price, 'timeInForce': time_in_force, 'newClientOrderId': client_order_id,
+            'newOrderRespType': 'FULL',
+        }, signed=True)
+
+    async def place_market_order(self, symbol: str, side: str, quantity: float) -> Dict:
+        """Place market order"""
+        try:
+            print(f"\n📝 Placing {side} order: {quantity} {symbol}")
+            order = await self.create_order(symbol, side, 'MARKET', quantity)
+            print(f"✅ Order placed: {order['orderId']} ({order['status']}, {order['executedQty']})")
+            return order
+        except REQUEST_ERRORS as e:
+            print(f"❌ Order failed: {e}")
+            return {}
+
+    async def place_limit_order(self, symbol: str, side: str, quantity: float, price: float,
+                                client_order_id: Optional[str] = None) -> Dict:
+        """Place GTC limit order"""
+        try:
+            print(f"\n📝 Placing {side} limit order: {quantity} {symbol} @ {price}")
+            order = await self.create_order(symbol, side, 'LIMIT', quantity, price, 'GTC',
+                                            client_order_id)
+            print(f"✅ Limit order placed: {order['orderId']}")
+            return order
+        except REQUEST_ERRORS as e:
+            print(f"❌ Order failed: {e}")
+            return {}
+
+    async def get_open_orders(self, symbol: Optional[str] = None) -> List[Dict]:
+        """Get all open orders"""
+        try:
+            return await self.request('GET', '/api/v3/openOrders', {'symbol': symbol}, signed=True)
+        except REQUEST_ERRORS as e:
+            print(f"❌ Error getting orders: {e}")
+            return []
+
+    async def cancel_order(self, symbol: str, order_id: int) -> Dict:
+        """Cancel an order; returns the cancel response (with executedQty), {} on failure"""
+        try:
+            result = await self.request('DELETE', '/api/v3/order',
+                                        {'symbol': symbol, 'orderId': order_id}, signed=True)
+            print(f"✅ Order {order_id} cancelled")
+            return result
+        except REQUEST_ERRORS as e:
+            print(f"❌ Cancel failed: {e}")
+            return {}
+
+    async def get_order_status(self, symbol: str, order_id: int) -> Dict:
+        """Check order status"""
+        try:
+            return await self.request('GET', '/api/v3/order', {'symbol': symbol, 'orderId': order_id},
+                                      signed=True)
+        except REQUEST_ERRORS as e:
+            print(f"❌ Error checking order: {e}")
+            return {}
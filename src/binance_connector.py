@@ -2,16 +2,23 @@
 Binance Live Trading Connector
 """
 from binance.client import Client
-from binance.exceptions import BinanceAPIException
+from binance.exceptions import BinanceAPIException, BinanceRequestException
 import pandas as pd
+import requests
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 import time
+from src.rate_limiter import PRIORITY_ORDER, PRIORITY_READ, RequestScheduler, ENDPOINT_WEIGHTS
+
+# Failures worth retrying for reads (the request may not have reached Binance)
+TRANSIENT_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    BinanceRequestException)
 
 class BinanceTradingBot:
     """Live trading bot for Binance"""
     
-    def __init__(self, api_key: str, api_secret: str, testnet: bool = True):
+    def __init__(self, api_key: str, api_secret: str, testnet: bool = True,
+                 scheduler: Optional[RequestScheduler] = None, base_url: Optional[str] = None):
         """
         Initialize Binance client
         
@@ -19,10 +26,18 @@ class BinanceTradingBot:
             api_key: Binance API key
             api_secret: Binance API secret
             testnet: Use testnet (True) or live (False)
+            scheduler: Request-weight budget and retry policy (shareable)
+            base_url: Override the REST endpoint (e.g. a local ``MockExchange``)
         """
         self.testnet = testnet
+        self.scheduler = scheduler or RequestScheduler()
         
-        if testnet:
+        if base_url:
+            self.client = Client(api_key, api_secret, ping=False)
+            self.client.API_URL = f"{base_url.rstrip('/')}/api"
+            self.client.timestamp_offset = self._get_timestamp_offset()
+            print(f"✅ Connected to {base_url}")
+        elif testnet:
             # Testnet client with timestamp sync
             self.client = Client(api_key, api_secret, testnet=True)
             self.client.API_URL = 'https://testnet.binance.vision/api'
@@ -37,10 +52,23 @@ class BinanceTradingBot:
         self.positions = {}
         self.orders = []
     
+    def _call(self, fn: Callable, weight: int = 1, order: bool = False, **kwargs):
+        """
+        Run one python-binance call through the request scheduler
+        
+        Orders go ahead of reads and are only resent after a 429 (a transient
+        failure may have placed them); reads are retried with backoff.
+        """
+        return self.scheduler.call(
+            lambda: fn(**kwargs), weight=weight,
+            priority=PRIORITY_ORDER if order else PRIORITY_READ,
+            idempotent=not order, transient=TRANSIENT_ERRORS,
+            headers=lambda: getattr(getattr(self.client, 'response', None), 'headers', None))
+    
     def _get_timestamp_offset(self) -> int:
         """Calculate timestamp offset between local and server"""
         try:
-            server_time = self.client.get_server_time()
+            server_time = self._call(self.client.get_server_time)
             local_time = int(time.time() * 1000)
             offset = server_time['serverTime'] - local_time
             print(f"⏰ Timestamp offset: {offset}ms")
@@ -51,8 +79,8 @@ class BinanceTradingBot:
     def test_connection(self) -> bool:
         """Test API connection"""
         try:
-            status = self.client.get_system_status()
-            account = self.client.get_account()
+            status = self._call(self.client.get_system_status)
+            account = self._call(self.client.get_account, weight=ENDPOINT_WEIGHTS['/api/v3/account'])
             
             print(f"\n{'='*70}")
             print("BINANCE CONNECTION TEST")
@@ -81,7 +109,7 @@ class BinanceTradingBot:
     def get_price(self, symbol: str) -> float:
         """Get current price for symbol"""
         try:
-            ticker = self.client.get_symbol_ticker(symbol=symbol)
+            ticker = self._call(self.client.get_symbol_ticker, weight=2, symbol=symbol)
             return float(ticker['price'])
         except BinanceAPIException as e:
             print(f"❌ Error getting price for {symbol}: {e}")
@@ -90,14 +118,15 @@ class BinanceTradingBot:
     def get_account_balance(self, asset: str = 'USDT') -> float:
         """Get balance for specific asset"""
         try:
-            balance = self.client.get_asset_balance(asset=asset)
+            balance = self._call(self.client.get_asset_balance, weight=ENDPOINT_WEIGHTS['/api/v3/account'],
+                                 asset=asset)
             return float(balance['free'])
         except BinanceAPIException as e:
             print(f"❌ Error getting balance: {e}")
             return 0.0
     
     def get_historical_data(self, symbol: str, interval: str = '1h', 
-                           days: int = 30) -> pd.DataFrame:
+                           days: int = 30, store=None) -> pd.DataFrame:
         """
         Download historical klines
         
@@ -105,36 +134,22 @@ class BinanceTradingBot:
             symbol: Trading pair (e.g., 'BTCUSDT')
             interval: Kline interval ('1m', '5m', '1h', '1d')
             days: Number of days to download
+            store: Optional ``OHLCStore``; only klines after the last stored
+                   bar are downloaded and the result is read from the store
         """
+        if store is not None:
+            start = pd.Timestamp.now('UTC') - pd.Timedelta(days=days)
+            df = store.load(symbol, interval, start,
+                            fetch=lambda start, end: self._download_klines(symbol, interval, start))
+            print(f"✅ Loaded {len(df)} bars from local store")
+            return df
+        
         try:
             # Calculate start time
             start_time = datetime.now() - timedelta(days=days)
             start_str = start_time.strftime('%Y-%m-%d')
-            
             print(f"Downloading {symbol} {interval} data from {start_str}...")
-            
-            # Get klines
-            klines = self.client.get_historical_klines(
-                symbol, interval, start_str
-            )
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_volume', 'trades', 
-                'taker_buy_base', 'taker_buy_quote', 'ignore'
-            ])
-            
-            # Convert to proper types
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df = df.set_index('timestamp')
-            
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                df[col] = df[col].astype(float)
-            
-            # Keep only needed columns
-            df = df[['open', 'high', 'low', 'close', 'volume']]
-            
+            df = self._download_klines(symbol, interval, start_str)
             print(f"✅ Downloaded {len(df)} bars")
             return df
             
@@ -142,10 +157,37 @@ class BinanceTradingBot:
             print(f"❌ Error downloading data: {e}")
             return pd.DataFrame()
     
+    def _download_klines(self, symbol: str, interval: str, start) -> pd.DataFrame:
+        """Klines from ``start`` (date string or naive UTC Timestamp) as an OHLCV frame"""
+        if isinstance(start, pd.Timestamp):
+            start = str(start.value // 10**6)
+        
+        # Get klines
+        klines = self._call(self.client.get_historical_klines, weight=2,
+                            symbol=symbol, interval=interval, start_str=start)
+        
+        # Convert to DataFrame
+        df = pd.DataFrame(klines, columns=[
+            'timestamp', 'open', 'high', 'low', 'close', 'volume',
+            'close_time', 'quote_volume', 'trades', 
+            'taker_buy_base', 'taker_buy_quote', 'ignore'
+        ])
+        
+        # Convert to proper types
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df = df.set_index('timestamp')
+        
+        for col in ['open', 'high', 'low', 'close', 'volume']:
+            df[col] = df[col].astype(float)
+        
+        # Keep only needed columns
+        return df[['open', 'high', 'low', 'close', 'volume']]
+    
     def get_latest_candles(self, symbol: str, interval: str = '1h', limit: int = 100) -> List[Dict]:
         """Get latest candles for chart"""
         try:
-            klines = self.client.get_klines(symbol=symbol, interval=interval, limit=limit)
+            klines = self._call(self.client.get_klines, weight=2,
+                                symbol=symbol, interval=interval, limit=limit)
             candles = []
             for k in klines:
                 # k[0] is open time in ms
@@ -173,7 +215,8 @@ class BinanceTradingBot:
         try:
             print(f"\n📝 Placing {side} order: {quantity} {symbol}")
             
-            order = self.client.create_order(
+            order = self._call(
+                self.client.create_order, order=True,
                 symbol=symbol,
                 side=side,
                 type='MARKET',
@@ -192,7 +235,8 @@ class BinanceTradingBot:
             return {}
     
     def place_limit_order(self, symbol: str, side: str, 
-                         quantity: float, price: float) -> Dict:
+                         quantity: float, price: float,
+                         client_order_id: Optional[str] = None) -> Dict:
         """
         Place limit order
         
@@ -201,17 +245,21 @@ class BinanceTradingBot:
             side: 'BUY' or 'SELL'
             quantity: Amount to trade
             price: Limit price
+            client_order_id: ``newClientOrderId`` (default: exchange-generated)
         """
         try:
             print(f"\n📝 Placing {side} limit order: {quantity} {symbol} @ {price}")
             
-            order = self.client.create_order(
+            params = {'newClientOrderId': client_order_id} if client_order_id else {}
+            order = self._call(
+                self.client.create_order, order=True,
                 symbol=symbol,
                 side=side,
                 type='LIMIT',
                 timeInForce='GTC',
                 quantity=quantity,
-                price=price
+                price=price,
+                **params
             )
             
             print(f"✅ Limit order placed: {order['orderId']}")
@@ -226,9 +274,9 @@ class BinanceTradingBot:
         """Get all open orders"""
         try:
             if symbol:
-                orders = self.client.get_open_orders(symbol=symbol)
+                orders = self._call(self.client.get_open_orders, weight=6, symbol=symbol)
             else:
-                orders = self.client.get_open_orders()
+                orders = self._call(self.client.get_open_orders, weight=80)
             
             return orders
             
@@ -236,30 +284,38 @@ class BinanceTradingBot:
             print(f"❌ Error getting orders: {e}")
             return []
     
-    def cancel_order(self, symbol: str, order_id: int) -> bool:
-        """Cancel an order"""
+    def cancel_order(self, symbol: str, order_id: int) -> Dict:
+        """Cancel an order; returns the cancel response (with executedQty), {} on failure"""
         try:
-            result = self.client.cancel_order(symbol=symbol, orderId=order_id)
+            result = self._call(self.client.cancel_order, order=True, symbol=symbol, orderId=order_id)
             print(f"✅ Order {order_id} cancelled")
-            return True
+            return result
             
         except BinanceAPIException as e:
             print(f"❌ Cancel failed: {e}")
-            return False
+            return {}
     
     def get_order_status(self, symbol: str, order_id: int) -> Dict:
         """Check order status"""
         try:
-            order = self.client.get_order(symbol=symbol, orderId=order_id)
+            order = self._call(self.client.get_order, weight=4, symbol=symbol, orderId=order_id)
             return order
         except BinanceAPIException as e:
             print(f"❌ Error checking order: {e}")
             return {}
     
+    def get_order_trades(self, symbol: str, order_id: int) -> List[Dict]:
+        """Fills of one order (price, qty, commission, commissionAsset)"""
+        try:
+            return self._call(self.client.get_my_trades, weight=5, symbol=symbol, orderId=order_id)
+        except BinanceAPIException as e:
+            print(f"❌ Error getting order trades: {e}")
+            return []
+    
     def get_recent_trades(self, symbol: str, limit: int = 50) -> List[Dict]:
         """Get recent trades for symbol"""
         try:
-            return self.client.get_my_trades(symbol=symbol, limit=limit)
+            return self._call(self.client.get_my_trades, weight=20, symbol=symbol, limit=limit)
         except BinanceAPIException as e:
             print(f"❌ Error getting trades: {e}")
             return []
@@ -267,7 +323,22 @@ class BinanceTradingBot:
     def get_account_info(self) -> Dict:
         """Get full account information"""
         try:
-            return self.client.get_account()
+            return self._call(self.client.get_account, weight=ENDPOINT_WEIGHTS['/api/v3/account'])
         except BinanceAPIException as e:
             print(f"❌ Error getting account info: {e}")
             return {}
+
+    def get_exchange_info(self, symbols: Optional[List[str]] = None) -> Dict:
+        """Get exchange rules (symbol filters: lot size, tick size, min notional)"""
+        try:
+            if symbols and len(symbols) == 1:
+                info = self._call(self.client.get_symbol_info, weight=20, symbol=symbols[0])
+                return {'symbols': [info] if info else []}
+            info = self._call(self.client.get_exchange_info, weight=20)
+            if symbols:
+                wanted = set(symbols)
+                info = dict(info, symbols=[s for s in info['symbols'] if s['symbol'] in wanted])
+            return info
+        except BinanceAPIException as e:
+            print(f"❌ Error getting exchange info: {e}")
+            return {}
@@ -119,3 +119,12 @@ CONFIGS = {
 
 # Default config
 DEFAULT_CONFIG = CONFIG_ADAPTIVE
+
+# ============================================================================
+# MULTI-SYMBOL ALLOCATION - share of initial_capital per traded pair
+# ============================================================================
+# BTCUSDT only unless more pairs are opted into explicitly: TRADING_SYMBOLS
+# env (e.g. "BTCUSDT:0.5,ETHUSDT:0.3,SOLUSDT:0.2") or config['symbols']
+SYMBOL_ALLOCATIONS = {
+    'BTCUSDT': 1.0,
+}
@@ -1,34 +1,75 @@
 """
 Enhanced backtest engine with Binance fees
 """
+import numpy as np
 import pandas as pd
 from typing import Dict
 from core.strategy import DynamicGridHedgeStrategy
-from core.indicators import ema, atr
+from core.indicator_cache import cached_ema, cached_atr
+from core.recorder import EquityRecorder
 from datetime import datetime, timedelta
 
 
 class BacktestEngine:
     """Backtest with realistic Binance fees"""
     
-    def __init__(self, strategy: DynamicGridHedgeStrategy, data: pd.DataFrame, config: Dict):
+    def __init__(self, strategy: DynamicGridHedgeStrategy, data: pd.DataFrame, config: Dict,
+                 fast: bool = False, record_every: int = 1, verbose: bool = True,
+                 ema_values=None, atr_values=None, recorder_capacity: int = None):
+        """
+        Args:
+            strategy: Strategy instance to drive
+            data: OHLC DataFrame indexed by timestamp
+            config: Strategy/risk config
+            fast: Feed the strategy plain floats from pre-extracted NumPy
+                  arrays instead of walking ``DataFrame.iterrows()``
+            record_every: Keep every Nth bar in the equity curve (the last
+                          processed bar is always kept)
+            verbose: Print progress and stop messages
+            ema_values: Precomputed EMA aligned with ``data`` (e.g. a slice of
+                        the full-series array; computed from ``data`` if None)
+            atr_values: Precomputed ATR aligned with ``data``
+            recorder_capacity: Bars to preallocate equity rows for (default:
+                               all of ``data``; the recorder grows past it)
+        """
         self.strategy = strategy
         self.data = data
         self.config = config
-        self.equity_curve = []
+        self.fast = fast
+        self.verbose = verbose
+        self.ema_values = ema_values
+        self.atr_values = atr_values
+        self.recorder = EquityRecorder(len(data) if recorder_capacity is None else recorder_capacity,
+                                       record_every)
         self.peak_equity = config['initial_capital']
+        self.stopped = False
         
     def run(self) -> Dict:
         """Run backtest"""
-        print(f"\nRunning backtest on {len(self.data)} bars...")
-        print(f"Period: {self.data.index[0]} to {self.data.index[-1]}")
+        if self.verbose:
+            print(f"\nRunning backtest on {len(self.data)} bars...")
+            print(f"Period: {self.data.index[0]} to {self.data.index[-1]}")
         
-        # Calculate indicators
-        ema_values = ema(self.data['close'], self.config['ema_period'])
-        atr_values = atr(self.data['high'], self.data['low'], self.data['close'], 
-                        self.config['atr_period'])
+        # Calculate indicators (memoized across runs on the same data)
+        if self.ema_values is not None:
+            ema_values = pd.Series(np.asarray(self.ema_values), index=self.data.index, copy=False)
+        else:
+            ema_values = cached_ema(self.data['close'], self.config['ema_period'])
+        if self.atr_values is not None:
+            atr_values = pd.Series(np.asarray(self.atr_values), index=self.data.index, copy=False)
+        else:
+            atr_values = cached_atr(self.data['high'], self.data['low'], self.data['close'], 
+                                   self.config['atr_period'])
         
-        # Run backtest
+        if self.fast:
+            idx = self._run_arrays(ema_values, atr_values)
+        else:
+            idx = self._run_rows(ema_values, atr_values)
+        
+        return self._finalize(idx, ema_values)
+    
+    def _run_rows(self, ema_values: pd.Series, atr_values: pd.Series) -> int:
+        """Reference bar loop over ``DataFrame.iterrows()``"""
         for idx, (timestamp, row) in enumerate(self.data.iterrows()):
             ema_val = ema_values.iloc[idx] if idx < len(ema_values) else row['close']
             atr_val = atr_values.iloc[idx] if idx < len(atr_values) else 0
@@ -38,28 +79,8 @@ class BacktestEngine:
             
             # Track equity
             equity = self.strategy.state.equity(row['close'])
-            spot_pnl, futures_pnl = self.strategy.state.unrealized_pnl(row['close'])
-            
-            self.equity_curve.append({
-                'timestamp': timestamp,
-                'price': row['close'],
-                'open': row.get('open', row['close']),
-                'high': row.get('high', row['close']),
-                'low': row.get('low', row['close']),
-                'close': row['close'],
-                'equity': equity,
-                'balance': self.strategy.state.balance,
-                'spot_qty': self.strategy.state.spot_qty,
-                'spot_value': self.strategy.state.spot_qty * row['close'],
-                'spot_pnl': spot_pnl,
-                'futures_short_qty': self.strategy.state.futures_short_qty,
-                'futures_pnl': futures_pnl,
-                'futures_margin': self.strategy.state.futures_margin,
-                'total_fees': self.strategy.state.total_spot_fees + self.strategy.state.total_futures_fees,
-                'funding_paid': self.strategy.state.total_funding_paid,
-                'center_price': self.strategy.state.center_price,
-                'ema': ema_val
-            })
+            if self.recorder.due(idx):
+                self._record(idx, row['close'], ema_val, equity)
             
             # Update peak
             if equity > self.peak_equity:
@@ -68,25 +89,123 @@ class BacktestEngine:
             # Check drawdown
             drawdown = (equity - self.peak_equity) / self.peak_equity
             if drawdown < -self.config['max_drawdown']:
-                print(f"\nMax drawdown reached: {drawdown*100:.2f}%")
+                if self.verbose:
+                    print(f"\nMax drawdown reached: {drawdown*100:.2f}%")
+                self.stopped = True
                 break
             
             # Check margin call
             if equity < self.config['initial_capital'] * self.config['margin_call_threshold']:
-                print(f"\nMargin call threshold reached!")
+                if self.verbose:
+                    print(f"\nMargin call threshold reached!")
+                self.stopped = True
+                break
+        
+        return idx
+    
+    def _run_arrays(self, ema_values: pd.Series, atr_values: pd.Series) -> int:
+        """Fast bar loop over contiguous NumPy columns (same results as ``_run_rows``)"""
+        # Python floats keep the per-bar arithmetic off NumPy scalar boxing
+        closes = self.data['close'].to_numpy(dtype=np.float64).tolist()
+        emas = np.ascontiguousarray(ema_values.to_numpy(dtype=np.float64)).tolist()
+        atrs = np.ascontiguousarray(atr_values.to_numpy(dtype=np.float64)).tolist()
+        timestamps = list(self.data.index)
+        
+        ohlc = None
+        if self.config.get('fill_mode', 'close') == 'ohlc':
+            ohlc = tuple(self.data[c].to_numpy(dtype=np.float64).tolist()
+                         for c in ('open', 'high', 'low'))
+        
+        return self._run_bars(0, closes, emas, atrs, timestamps, ohlc)
+    
+    def _run_bars(self, offset: int, closes: list, emas: list, atrs: list,
+                  timestamps: list, ohlc=None) -> int:
+        """
+        Bar loop over plain lists of one contiguous block of bars
+        
+        Args:
+            offset: Bar position of the first element (for recording)
+            closes, emas, atrs, timestamps: Per-bar values
+            ohlc: (opens, highs, lows) lists for intrabar fills, else None
+        
+        Returns:
+            Position of the last processed bar (``self.stopped`` is set when
+            the drawdown or margin-call stop fired)
+        """
+        strategy = self.strategy
+        state = strategy.state
+        execute_price = strategy.execute_price
+        execute_ohlc = strategy.execute_ohlc
+        if ohlc is not None:
+            opens, highs, lows = ohlc
+        recorder = self.recorder
+        record_every = recorder.record_every
+        max_drawdown = self.config['max_drawdown']
+        margin_floor = self.config['initial_capital'] * self.config['margin_call_threshold']
+        
+        k = 0
+        for k in range(len(closes)):
+            idx = offset + k
+            price = closes[k]
+            ema_val = emas[k]
+            
+            if ohlc is not None:
+                execute_ohlc(opens[k], highs[k], lows[k], price,
+                             ema_val, atrs[k], timestamps[k])
+            else:
+                execute_price(price, ema_val, atrs[k], timestamps[k])
+            
+            equity = state.equity(price)
+            if idx % record_every == 0:
+                self._record(idx, price, ema_val, equity)
+            
+            if equity > self.peak_equity:
+                self.peak_equity = equity
+            
+            drawdown = (equity - self.peak_equity) / self.peak_equity
+            if drawdown < -max_drawdown:
+                if self.verbose:
+                    print(f"\nMax drawdown reached: {drawdown*100:.2f}%")
+                self.stopped = True
+                break
+            
+            if equity < margin_floor:
+                if self.verbose:
+                    print(f"\nMargin call threshold reached!")
+                self.stopped = True
                 break
         
+        return offset + k
+    
+    def _record(self, idx: int, price: float, ema_val: float, equity: float):
+        """Write the current strategy state for bar ``idx`` to the recorder"""
+        state = self.strategy.state
+        spot_pnl, futures_pnl = state.unrealized_pnl(price)
+        self.recorder.record(
+            idx, equity, state.balance, state.spot_qty, spot_pnl,
+            state.futures_short_qty, futures_pnl, state.futures_margin,
+            state.total_spot_fees + state.total_futures_fees,
+            state.total_funding_paid, state.center_price, ema_val
+        )
+    
+    def _finalize(self, idx: int, ema_values: pd.Series) -> Dict:
+        """Build the results dict after the bar loop stopped at ``idx``"""
         # Final results
         final_price = self.data['close'].iloc[idx]
         final_equity = self.strategy.state.equity(final_price)
         final_state = self.strategy.get_state()
         
-        print(f"\nBacktest completed: {len(self.equity_curve)} bars processed")
-        print(f"Total trades: {len(final_state['trades'])}")
+        # Always keep the last processed bar, even when decimating
+        if self.recorder.last_bar != idx:
+            self._record(idx, final_price, ema_values.iloc[idx], final_equity)
+        
+        if self.verbose:
+            print(f"\nBacktest completed: {idx + 1} bars processed")
+            print(f"Total trades: {len(final_state['trades'])}")
         
         return {
-            'equity_curve': pd.DataFrame(self.equity_curve),
-            'trades': pd.DataFrame(final_state['trades']),
+            'equity_curve': self.recorder.to_frame(self.data),
+            'trades': final_state['trades'].to_frame(),
             'final_equity': final_equity,
             'initial_capital': self.config['initial_capital'],
             'final_state': final_state,
@@ -0,0 +1,189 @@
+"""
+Windowed entry/exit charts for long backtests
+
+One chart of a 4000+ bar run shrinks every marker to a dot. This module
+cuts the run into windows (one per week, or one per N trades), renders
+each window's candlestick + marker chart in a worker process, and draws
+an index image: the whole run with every window shaded and numbered.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+
+from core.performance import draw_candlesticks, candles_for_width
+
+
+CHART_DPI = 120
+
+# Trade type -> (panel, price column, scatter style); panel 0 = grid, 1 = hedge
+MARKERS = {
+    'GRID_BUY': (0, 'price', dict(color='lime', marker='^', edgecolors='darkgreen', label='Grid BUY')),
+    'GRID_SELL': (0, 'exit_price', dict(color='red', marker='v', edgecolors='darkred', label='Grid SELL')),
+    'HEDGE_OPEN': (1, 'price', dict(color='orange', marker='s', edgecolors='darkorange', label='Hedge OPEN')),
+    'HEDGE_CLOSE_ALL': (1, 'exit_price', dict(color='cyan', marker='D', edgecolors='darkblue',
+                                              label='Hedge CLOSE')),
+}
+
+
+def make_windows(timestamps: pd.Series, trades: pd.DataFrame, by: str = 'week',
+                 trades_per_window: int = 50) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """
+    Split a run into consecutive [start, end) windows
+
+    Args:
+        timestamps: Bar timestamps of the equity curve
+        trades: Trades DataFrame (used when ``by='trades'``)
+        by: 'week' (Monday-aligned calendar weeks) or 'trades'
+        trades_per_window: Trades per window when ``by='trades'``
+
+    Returns:
+        List of (start, end) timestamps covering every bar
+    """
+    timestamps = pd.Series(pd.DatetimeIndex(timestamps))
+    if timestamps.empty:
+        return []
+    first, last = timestamps.iloc[0], timestamps.iloc[-1]
+    end = last + pd.Timedelta(microseconds=1)
+
+    if by == 'week':
+        weeks = (timestamps - pd.to_timedelta(timestamps.dt.dayofweek, unit='D')).dt.normalize()
+        starts = list(pd.unique(weeks))
+        starts[0] = first
+    elif by == 'trades':
+        if trades_per_window < 1:
+            raise ValueError("trades_per_window must be >= 1")
+        stamps = (pd.DatetimeIndex(trades['timestamp']).sort_values()
+                  if len(trades) else pd.DatetimeIndex([]))
+        starts = [first] + [ts for ts in stamps[trades_per_window::trades_per_window] if ts > first]
+    else:
+        raise ValueError(f"Unknown window mode '{by}' (use 'week' or 'trades')")
+
+    starts = [pd.Timestamp(ts) for ts in starts]
+    bounds = starts + [end]
+    return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if a < b]
+
+
+def _window_task(number: int, window: Tuple, curve: pd.DataFrame, trades: pd.DataFrame,
+                 out_dir: str) -> Dict:
+    """Slice the curve and trades to one window (what a worker receives)"""
+    start, end = window
+    bars = curve[(curve['timestamp'] >= start) & (curve['timestamp'] < end)]
+    if len(trades):
+        trades = trades[(trades['timestamp'] >= start) & (trades['timestamp'] < end)]
+    return {
+        'number': number,
+        'start': start,
+        'end': end,
+        'bars': bars,
+        'trades': trades,
+        'path': os.path.join(out_dir, f"window_{number:03d}.png"),
+    }
+
+
+def render_window(task: Dict) -> Dict:
+    """Draw one window chart (grid panel + hedge panel) and save it"""
+    bars, trades = task['bars'], task['trades']
+    fig, axes = plt.subplots(2, 1, figsize=(16, 10), gridspec_kw={'height_ratios': [3, 1]})
+    titles = ('Grid Trading Entries/Exits', 'Hedge Entries/Exits')
+    counts = {}
+
+    for panel, ax in enumerate(axes):
+        draw_candlesticks(ax, bars['timestamp'], bars['open'], bars['high'], bars['low'],
+                          bars['close'], max_candles=candles_for_width(ax, CHART_DPI))
+        for trade_type, (marker_panel, column, style) in MARKERS.items():
+            if marker_panel != panel or not len(trades):
+                continue
+            hits = trades[trades['type'] == trade_type]
+            counts[trade_type] = len(hits)
+            if len(hits):
+                style = dict(style, label=f"{style['label']} ({len(hits)})")
+                ax.scatter(pd.DatetimeIndex(hits['timestamp']).to_numpy(), hits[column],
+                           s=150, alpha=0.9, zorder=10, linewidth=2, **style)
+        if 'ema' in bars.columns:
+            ax.plot(pd.DatetimeIndex(bars['timestamp']).to_numpy(), bars['ema'], color='purple',
+                    linewidth=1.5, linestyle='--', alpha=0.7, label='EMA')
+        ax.set_title(f"#{task['number']} {titles[panel]}: "
+                     f"{task['start']:%Y-%m-%d %H:%M} - {bars['timestamp'].iloc[-1]:%Y-%m-%d %H:%M}",
+                     fontsize=12, fontweight='bold')
+        ax.set_ylabel('Price ($)')
+        ax.grid(True, alpha=0.3, linestyle='--')
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d %H:%M'))
+        ax.legend(loc='upper left', fontsize=9)
+        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+
+    fig.tight_layout()
+    fig.savefig(task['path'], dpi=CHART_DPI)
+    plt.close(fig)
+    return {'number': task['number'], 'start': task['start'], 'end': task['end'],
+            'bars': len(bars), 'trades': len(trades), 'path': task['path'], **counts}
+
+
+def render_index(curve: pd.DataFrame, windows: List[Dict], path: str) -> str:
+    """Whole-run overview with each window shaded and numbered"""
+    fig, ax = plt.subplots(figsize=(20, 7))
+    draw_candlesticks(ax, curve['timestamp'], curve['open'], curve['high'], curve['low'],
+                      curve['close'], max_candles=candles_for_width(ax, CHART_DPI))
+    top = curve['high'].max()
+    for i, window in enumerate(windows):
+        end = min(window['end'], curve['timestamp'].iloc[-1])
+        ax.axvspan(window['start'], end, color='steelblue' if i % 2 else 'lightgray', alpha=0.15)
+        middle = window['start'] + (end - window['start']) / 2
+        ax.annotate(f"{window['number']}", (middle, top), ha='center', va='bottom', fontsize=8)
+    ax.set_title(f"Window index: {len(windows)} charts", fontsize=14, fontweight='bold')
+    ax.set_ylabel('Price ($)')
+    ax.grid(True, alpha=0.3, linestyle='--')
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+    fig.tight_layout()
+    fig.savefig(path, dpi=CHART_DPI)
+    plt.close(fig)
+    return path
+
+
+def export_window_charts(equity_curve: pd.DataFrame, trades: pd.DataFrame, out_dir: str = 'charts',
+                         by: str = 'week', trades_per_window: int = 50,
+                         workers: Optional[int] = None) -> Dict:
+    """
+    Render one entry/exit chart per window plus an index image
+
+    Args:
+        equity_curve: Backtest equity curve (timestamp, OHLC/price, ema)
+        trades: Backtest trades DataFrame
+        out_dir: Output directory (created if missing)
+        by: 'week' or 'trades' (see ``make_windows``)
+        trades_per_window: Trades per chart when ``by='trades'``
+        workers: Worker processes (default: all cores; 1 renders in-process)
+
+    Returns:
+        {'index': index image path, 'windows': DataFrame with one row per chart}
+    """
+    curve = equity_curve.copy()
+    for name in ('open', 'high', 'low', 'close'):
+        if name not in curve.columns:
+            curve[name] = curve['price']
+    columns = ['timestamp', 'open', 'high', 'low', 'close'] + (['ema'] if 'ema' in curve.columns else [])
+    curve = curve[columns]
+    if len(trades):
+        trades = trades[[c for c in ('timestamp', 'type', 'price', 'exit_price') if c in trades.columns]]
+
+    os.makedirs(out_dir, exist_ok=True)
+    windows = make_windows(curve['timestamp'], trades, by, trades_per_window)
+    tasks = [_window_task(i + 1, window, curve, trades, out_dir) for i, window in enumerate(windows)]
+    tasks = [task for task in tasks if len(task['bars'])]
+
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    print(f"Rendering {len(tasks)} window charts with {workers} workers...")
+    if workers == 1:
+        rendered = [render_window(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = list(pool.map(render_window, tasks))
+
+    index_path = render_index(curve, rendered, os.path.join(out_dir, 'index.png'))
+    print(f"[CHART] {len(rendered)} window charts + index saved to: {out_dir}")
+    return {'index': index_path, 'windows': pd.DataFrame(rendered)}
@@ -0,0 +1,258 @@
+"""
+Binary snapshots of strategy, indicator and engine state
+
+A snapshot is an uncompressed ``.npz``: variable-length open state (open
+entries, bought levels, hedge layers) as typed arrays, plus a JSON
+``__meta__`` entry for scalars and indicator state. The two histories that
+grow with the run go to append-only side files of fixed-size records, the
+equity curve to ``<path>.curve`` and the trade log to ``<path>.trades``.
+Each save appends only the rows added since the previous one and the
+snapshot stores how many rows of each are valid, so a snapshot stays the
+size of the open state however long the run gets. Floats round-trip
+exactly, so a resumed backtest is identical to an uninterrupted one. This
+module only uses duck typing (no ``core`` imports) so the live bot can load
+snapshots too.
+"""
+import json
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+FORMAT_VERSION = 4
+
+STATE_SCALARS = (
+    'balance', 'initial_balance', 'spot_qty', 'next_entry_id',
+    'futures_short_qty', 'futures_entry_price', 'futures_margin',
+    'total_spot_fees', 'total_futures_fees', 'total_funding_paid',
+    'center_price', 'grid_upper_bound', 'grid_lower_bound',
+)
+
+
+def _ts_to_ns(ts) -> Optional[int]:
+    return None if ts is None else int(pd.Timestamp(ts).value)
+
+
+def _ns_to_ts(ns: Optional[int], tz: Optional[str]):
+    if ns is None:
+        return None
+    ts = pd.Timestamp(ns, unit='ns')
+    return ts.tz_localize('UTC').tz_convert(tz) if tz else ts
+
+
+def _tz_of(ts) -> Optional[str]:
+    tz = getattr(ts, 'tzinfo', None)
+    return str(tz) if tz is not None else None
+
+
+def _json_default(value):
+    """NumPy scalars -> Python numbers, anything else -> str"""
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+def _json_config(config: Dict) -> Dict:
+    """Config as it reads back from JSON (tuples -> lists) for comparisons"""
+    return json.loads(json.dumps(config, default=_json_default))
+
+
+def snapshot_strategy(state) -> Dict:
+    """``StrategyState`` -> {'meta', 'arrays'} parts of a snapshot (trades excluded)"""
+    entries = list(state.spot_entries.items())
+
+    meta = {name: getattr(state, name) for name in STATE_SCALARS}
+    meta['last_funding_time'] = _ts_to_ns(state.last_funding_time)
+    meta['tz'] = _tz_of(state.last_funding_time)
+    arrays = {
+        'spot_entry_ids': np.array([k for k, _ in entries], dtype=np.int64),
+        'spot_entry_prices': np.array([v[0] for _, v in entries], dtype=np.float64),
+        'spot_entry_qtys': np.array([v[1] for _, v in entries], dtype=np.float64),
+        'grid_levels_bought': np.array(sorted(state.grid_levels_bought), dtype=np.int64),
+        'hedge_layers': np.array(state.hedge_layers, dtype=np.float64),
+    }
+    return {'meta': meta, 'arrays': arrays}
+
+
+def restore_strategy(state, snapshot: Dict, config: Dict):
+    """Load a snapshot into a fresh ``StrategyState`` (rebuilds the price indexes)"""
+    meta, arrays = snapshot['meta']['strategy'], snapshot['arrays']
+    tz = meta.get('tz')
+    for name in STATE_SCALARS:
+        setattr(state, name, meta[name])
+    state.last_funding_time = _ns_to_ts(meta['last_funding_time'], tz)
+
+    state.spot_entries = {
+        int(k): (float(p), float(q))
+        for k, p, q in zip(arrays['spot_entry_ids'].tolist(), arrays['spot_entry_prices'].tolist(),
+                           arrays['spot_entry_qtys'].tolist())
+    }
+    state.grid_levels_bought = set(arrays['grid_levels_bought'].tolist())
+    state.hedge_layers = arrays['hedge_layers'].tolist()
+
+    # The fresh state's (empty) log type knows its record layout and how to rebuild itself
+    log_type = type(state.trades)
+    meta_trades = snapshot['meta']['trades']
+    records = _read_records(trades_path(snapshot['path']), log_type.RECORD_DTYPE,
+                            meta_trades['rows'], 'trades')
+    state.trades = log_type.from_records(meta_trades, records)
+
+    # Indexes are derived data: rebuild them with the strategy's own formulas
+    if state.center_price:
+        state.grid_index.build(state.center_price, config['grid_step'], config['grid_levels'])
+    take_profit_pct = config.get('grid_take_profit', 0.012)
+    state.take_profit_index.clear()
+    for entry_id, (price, _) in state.spot_entries.items():
+        state.take_profit_index.add(entry_id, price * (1 + take_profit_pct))
+
+
+def curve_path(path: str) -> str:
+    """Equity-curve side file of the snapshot at ``path``"""
+    return f"{path}.curve"
+
+
+def trades_path(path: str) -> str:
+    """Trade-log side file of the snapshot at ``path``"""
+    return f"{path}.trades"
+
+
+def _curve_dtype(recorder) -> np.dtype:
+    return np.dtype([('bar', '<i8')] + [(name, '<f8') for name in recorder.columns])
+
+
+def _curve_records(recorder, start: int) -> np.ndarray:
+    size = len(recorder)
+    block = np.empty(size - start, dtype=_curve_dtype(recorder))
+    block['bar'] = recorder.rows[start:size]
+    for name, column in recorder.columns.items():
+        block[name] = column[start:size]
+    return block
+
+
+def _already_written(path: str, written: int) -> int:
+    """Records of a side file to keep (none if the file is gone)"""
+    return written if os.path.exists(path) else 0
+
+
+def _append_records(path: str, block: np.ndarray, written: int):
+    """Write ``block`` after the first ``written`` records of ``path``"""
+    with open(path, 'r+b' if written else 'wb') as f:
+        # Drop rows a crashed save appended past the last snapshot
+        f.seek(written * block.dtype.itemsize)
+        f.truncate()
+        f.write(block.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _read_records(path: str, dtype: np.dtype, count: int, what: str) -> np.ndarray:
+    records = np.fromfile(path, dtype=dtype, count=count)
+    if len(records) != count:
+        raise ValueError(f"{path} holds {len(records)} {what} rows, the checkpoint needs {count}")
+    return records
+
+
+def save_checkpoint(path: str, engine) -> str:
+    """
+    Write a ``ChunkedBacktestEngine`` (strategy + indicators + engine) snapshot
+
+    The file is written to a temporary name and renamed, so an interrupted
+    save never corrupts the previous checkpoint. New equity rows and trades
+    are appended to the side files first (``engine.curve_rows`` and
+    ``engine.trade_rows`` remember how many each path already holds).
+    """
+    strategy = snapshot_strategy(engine.strategy.state)
+    recorder = engine.recorder
+    size = len(recorder)
+    written = _already_written(curve_path(path), engine.curve_rows.get(path, 0))
+    _append_records(curve_path(path), _curve_records(recorder, written), written)
+
+    log = engine.strategy.state.trades
+    written = _already_written(trades_path(path), engine.trade_rows.get(path, 0))
+    trades = log.to_records(written)
+    _append_records(trades_path(path), trades['records'], written)
+
+    meta = {
+        'format': FORMAT_VERSION,
+        'config': _json_config(engine.config),
+        'strategy': strategy['meta'],
+        'trades': dict(trades['meta'], rows=len(log)),
+        'indicators': {
+            'ema': engine.ema_stream.get_state(),
+            'atr': engine.atr_stream.get_state(),
+        },
+        'engine': {
+            'position': engine.position,
+            'n_bars': len(engine.source),
+            'peak_equity': engine.peak_equity,
+            'stopped': engine.stopped,
+            'last_bar': list(engine.last_bar),
+            'last_time': engine.last_time,
+            'record_every': recorder.record_every,
+            'recorder_rows': size,
+        },
+    }
+
+    arrays = dict(strategy['arrays'])
+    arrays['__meta__'] = np.frombuffer(json.dumps(meta, default=_json_default).encode(), dtype=np.uint8)
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+    engine.curve_rows[path] = size
+    engine.trade_rows[path] = len(log)
+    return path
+
+
+def load_checkpoint(path: str) -> Dict:
+    """
+    Read a snapshot
+
+    Returns:
+        {'meta': dict, 'arrays': {name: ndarray}, 'path': path}
+    """
+    with np.load(path, allow_pickle=False) as npz:
+        arrays = {name: npz[name] for name in npz.files}
+    meta = json.loads(arrays.pop('__meta__').tobytes().decode())
+    if meta.get('format') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint format {meta.get('format')} in {path}")
+    return {'meta': meta, 'arrays': arrays, 'path': path}
+
+
+def restore_engine(engine, snapshot: Dict):
+    """Load a ``save_checkpoint`` snapshot into a freshly built engine"""
+    meta, arrays = snapshot['meta'], snapshot['arrays']
+    saved, current = meta['config'], _json_config(engine.config)
+    changed = sorted(k for k in set(saved) | set(current) if saved.get(k) != current.get(k))
+    if changed:
+        raise ValueError(f"Config differs from the checkpoint: {', '.join(changed)}")
+
+    state = meta['engine']
+    if state['n_bars'] != len(engine.source):
+        raise ValueError(f"Checkpoint was taken on {state['n_bars']} bars, "
+                         f"source has {len(engine.source)}")
+    if state['record_every'] != engine.recorder.record_every:
+        raise ValueError(f"Checkpoint uses record_every={state['record_every']}")
+
+    restore_strategy(engine.strategy.state, snapshot, engine.config)
+    engine.ema_stream.set_state(meta['indicators']['ema'])
+    engine.atr_stream.set_state(meta['indicators']['atr'])
+
+    engine.position = state['position']
+    engine.peak_equity = state['peak_equity']
+    engine.stopped = state['stopped']
+    idx, price, ema_val = state['last_bar']
+    engine.last_bar = (int(idx), price, ema_val)
+    engine.last_time = state['last_time']
+
+    recorder = engine.recorder
+    size = state['recorder_rows']
+    curve = _read_records(curve_path(snapshot['path']), _curve_dtype(recorder), size, 'equity')
+    recorder.reserve(size)
+    recorder.rows[:size] = curve['bar']
+    for name, column in recorder.columns.items():
+        column[:size] = curve[name]
+    recorder.size = size
+    engine.curve_rows = {snapshot['path']: size}
+    engine.trade_rows = {snapshot['path']: len(engine.strategy.state.trades)}
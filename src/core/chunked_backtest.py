@@ -0,0 +1,164 @@
+"""
+Chunked backtest over an OHLCVSource (one chunk of bars resident at a time)
+"""
+from typing import Dict
+
+import numpy as np
+
+from core.strategy import DynamicGridHedgeStrategy
+from core.backtest import BacktestEngine
+from core.datasource import OHLCVSource, to_timestamps
+from core.streaming import StreamingEMA, StreamingATR
+from core.checkpoint import save_checkpoint, load_checkpoint, restore_engine
+
+
+class ChunkedBacktestEngine(BacktestEngine):
+    """
+    ``BacktestEngine`` fed chunk by chunk from an ``OHLCVSource``
+
+    EMA/ATR are computed with the streaming indicators, which continue
+    bit-exactly across chunk boundaries, and the strategy/engine state is
+    simply carried over, so the result equals a single in-memory run.
+    Only one chunk of bars is resident at a time. Two structures still grow
+    with the run and stay in memory: the equity curve (one row of 12 numbers
+    per ``record_every`` bars, allocated chunk by chunk; 5 years of 1m bars at
+    ``record_every=60`` is ~44k rows) and the strategy's ``TradeLog`` (one
+    row per trade, so it scales with trading activity, not with bars).
+    
+    With ``checkpoint_path`` set, the full state is snapshotted at chunk
+    boundaries (every ``checkpoint_every`` bars) and at the end, and
+    ``resume`` continues from the last snapshot. Each snapshot holds the
+    open state only; equity rows and trades are appended to ``<path>.curve``
+    and ``<path>.trades``.
+    """
+    
+    def __init__(self, strategy: DynamicGridHedgeStrategy, source: OHLCVSource, config: Dict,
+                 chunk_size: int = 100_000, record_every: int = 1, verbose: bool = True,
+                 checkpoint_path: str = None, checkpoint_every: int = None):
+        """
+        Args:
+            strategy: Strategy instance to drive
+            source: Bars to stream (``OHLCVFile``, ``FrameSource``, ...)
+            config: Strategy/risk config
+            chunk_size: Bars per chunk
+            record_every: Keep every Nth bar in the equity curve
+            verbose: Print progress and stop messages
+            checkpoint_path: Snapshot file (None = no checkpoints)
+            checkpoint_every: Bars between snapshots (default: every chunk)
+        """
+        # The equity curve grows as chunks arrive instead of being sized for every bar
+        super().__init__(strategy, source, config, fast=True,
+                         record_every=record_every, verbose=verbose,
+                         recorder_capacity=min(len(source), chunk_size))
+        self.source = source
+        self.chunk_size = chunk_size
+        self.intrabar = config.get('fill_mode', 'close') == 'ohlc'
+        self.ema_stream = StreamingEMA(config['ema_period'])
+        self.atr_stream = StreamingATR(config['atr_period'])
+        self.position = 0           # next bar to process
+        self.last_bar = (-1, 0.0, 0.0)  # (bar, close, ema) of the last processed bar
+        self.last_time = None       # its timestamp (int64 ns, UTC)
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every or chunk_size
+        self.checkpoint_position = 0
+        self.curve_rows = {}        # snapshot path -> equity rows already in its side file
+        self.trade_rows = {}        # snapshot path -> trades already in its side file
+    
+    @classmethod
+    def resume(cls, checkpoint_path: str, strategy: DynamicGridHedgeStrategy,
+               source: OHLCVSource, config: Dict, **kwargs) -> 'ChunkedBacktestEngine':
+        """
+        Rebuild an engine from a snapshot; ``run()`` then continues where it stopped
+        
+        ``strategy`` must be fresh and ``config``/``source`` the ones the
+        snapshot was taken with (checked). Checkpointing continues to the
+        same file unless ``checkpoint_path`` is overridden in ``kwargs``.
+        """
+        kwargs.setdefault('checkpoint_path', checkpoint_path)
+        snapshot = load_checkpoint(checkpoint_path)
+        kwargs.setdefault('record_every', snapshot['meta']['engine']['record_every'])
+        engine = cls(strategy, source, config, **kwargs)
+        restore_engine(engine, snapshot)
+        engine.checkpoint_position = engine.position
+        if engine.verbose:
+            print(f"Resumed from {checkpoint_path} at bar {engine.position}/{len(source)}")
+        return engine
+    
+    def save_checkpoint(self, path: str = None) -> str:
+        """Snapshot strategy, indicator and engine state (at a chunk boundary)"""
+        path = save_checkpoint(path or self.checkpoint_path, self)
+        self.checkpoint_position = self.position
+        return path
+    
+    @property
+    def finished(self) -> bool:
+        return self.stopped or self.position >= len(self.source)
+    
+    def run_chunk(self, offset: int, columns: Dict[str, np.ndarray]) -> int:
+        """Feed one block of bars starting at bar ``offset``; returns the last bar processed"""
+        closes = columns['close']
+        emas = self.ema_stream.update_many(closes).tolist()
+        atrs = self.atr_stream.update_many(columns['high'], columns['low'], closes).tolist()
+        closes = closes.tolist()
+        ohlc = None
+        if self.intrabar:
+            ohlc = tuple(columns[c].tolist() for c in ('open', 'high', 'low'))
+        
+        idx = self._run_bars(offset, closes, emas, atrs,
+                             to_timestamps(columns['timestamp']), ohlc)
+        k = idx - offset
+        self.last_bar = (idx, closes[k], emas[k])
+        self.last_time = int(columns['timestamp'][k])
+        self.position = idx + 1
+        return idx
+    
+    def run(self) -> Dict:
+        """Run (or continue) the backtest to the end of the source"""
+        n = len(self.source)
+        if self.verbose:
+            print(f"\nRunning chunked backtest on {n} bars ({self.chunk_size} per chunk)...")
+        
+        try:
+            for offset, columns in self.source.chunks(self.chunk_size, self.position):
+                self.run_chunk(offset, columns)
+                if self.verbose:
+                    print(f"  {self.position}/{n} bars, equity ${self.strategy.state.equity(self.last_bar[1]):,.2f}")
+                if self.stopped:
+                    break
+                if (self.checkpoint_path
+                        and self.position - self.checkpoint_position >= self.checkpoint_every):
+                    self.save_checkpoint()
+        except KeyboardInterrupt:
+            # State may be mid-chunk here; the last snapshot is the consistent one
+            if self.checkpoint_path and self.verbose:
+                print(f"\n⚠️ Interrupted - resume from {self.checkpoint_path} "
+                      f"(bar {self.checkpoint_position})")
+            raise
+        
+        if self.checkpoint_path and self.checkpoint_position != self.position:
+            self.save_checkpoint()
+        return self._finalize_stream()
+    
+    def _finalize_stream(self) -> Dict:
+        """Results dict like ``BacktestEngine.run`` for the bars processed so far"""
+        idx, final_price, final_ema = self.last_bar
+        final_equity = self.strategy.state.equity(final_price)
+        final_state = self.strategy.get_state()
+        
+        if idx >= 0 and self.recorder.last_bar != idx:
+            self._record(idx, final_price, final_ema, final_equity)
+        
+        if self.verbose:
+            print(f"\nBacktest completed: {idx + 1} bars processed")
+            print(f"Total trades: {len(final_state['trades'])}")
+        
+        size = len(self.recorder)
+        bars = self.source.take(self.recorder.rows[:size])
+        return {
+            'equity_curve': self.recorder.to_frame(bars, positions=np.arange(size)),
+            'trades': final_state['trades'].to_frame(),
+            'final_equity': final_equity,
+            'initial_capital': self.config['initial_capital'],
+            'final_state': final_state,
+            'final_price': final_price
+        }
@@ -0,0 +1,166 @@
+"""
+Chunked OHLCV data sources for backtests larger than memory
+
+``OHLCVFile`` memory-maps a flat binary file of fixed-width records
+(int64 timestamp + float64 open/high/low/close/volume), so years of
+minute bars can be streamed to the engine one chunk at a time.
+"""
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+MAGIC = b'NTDOHLCV'
+VERSION = 1
+HEADER_SIZE = 16            # magic (8 bytes) + int64 version
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+RECORD_DTYPE = np.dtype([('timestamp', '<i8')] + [(name, '<f8') for name in FIELDS])
+
+
+class OHLCVSource(ABC):
+    """Common interface: positional, chunked access to OHLCV columns"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of bars"""
+
+    @abstractmethod
+    def read(self, start: int, stop: int) -> Dict[str, np.ndarray]:
+        """
+        Bars ``start:stop`` as contiguous arrays
+
+        Returns:
+            Dict with 'timestamp' (int64 ns, UTC) and float64 OHLCV columns
+        """
+
+    def chunks(self, chunk_size: int, start: int = 0) -> Iterator[Tuple[int, Dict[str, np.ndarray]]]:
+        """Yield (offset, columns) blocks of at most ``chunk_size`` bars from ``start``"""
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        n = len(self)
+        for offset in range(start, n, chunk_size):
+            yield offset, self.read(offset, min(offset + chunk_size, n))
+
+    @abstractmethod
+    def take(self, rows: np.ndarray) -> pd.DataFrame:
+        """OHLCV DataFrame (indexed by timestamp) of the given bar positions"""
+
+
+def _frame(columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+    index = pd.DatetimeIndex(pd.to_datetime(columns['timestamp'], unit='ns'), name='timestamp')
+    return pd.DataFrame({name: columns[name] for name in FIELDS}, index=index, copy=False)
+
+
+def to_timestamps(ns: np.ndarray) -> list:
+    """int64 ns epoch values -> list of ``pd.Timestamp`` (what the strategy expects)"""
+    return list(pd.DatetimeIndex(pd.to_datetime(ns, unit='ns')))
+
+
+class FrameSource(OHLCVSource):
+    """In-memory DataFrame exposed through the chunked interface"""
+
+    def __init__(self, data: pd.DataFrame):
+        """
+        Args:
+            data: OHLC(V) DataFrame indexed by timestamp (tz-naive or UTC)
+        """
+        index = pd.DatetimeIndex(data.index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        self.timestamps = index.as_unit('ns').asi8
+        self.columns = {
+            name: (data[name].to_numpy(dtype=np.float64) if name in data.columns
+                   else np.zeros(len(data)))
+            for name in FIELDS
+        }
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def read(self, start: int, stop: int) -> Dict[str, np.ndarray]:
+        out = {name: values[start:stop] for name, values in self.columns.items()}
+        out['timestamp'] = self.timestamps[start:stop]
+        return out
+
+    def take(self, rows: np.ndarray) -> pd.DataFrame:
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = {name: values[rows] for name, values in self.columns.items()}
+        columns['timestamp'] = self.timestamps[rows]
+        return _frame(columns)
+
+
+class OHLCVFile(OHLCVSource):
+    """Memory-mapped binary OHLCV file (see ``write_ohlcv_file``)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE or header[:8] != MAGIC:
+            raise ValueError(f"{path} is not an OHLCV file")
+        version = int(np.frombuffer(header[8:], dtype='<i8')[0])
+        if version != VERSION:
+            raise ValueError(f"Unsupported OHLCV file version {version} in {path}")
+
+        size = os.path.getsize(path) - HEADER_SIZE
+        self.length = size // RECORD_DTYPE.itemsize
+        # Zero-length memmaps are not allowed; an empty file has no records
+        self.records = (np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE,
+                                  shape=(self.length,))
+                        if self.length else np.empty(0, dtype=RECORD_DTYPE))
+
+    def __len__(self) -> int:
+        return self.length
+
+    def read(self, start: int, stop: int) -> Dict[str, np.ndarray]:
+        block = self.records[start:stop]
+        # Copy each strided field out of the mapping (only this chunk is resident)
+        return {name: np.ascontiguousarray(block[name]) for name in RECORD_DTYPE.names}
+
+    def take(self, rows: np.ndarray) -> pd.DataFrame:
+        block = self.records[np.asarray(rows, dtype=np.int64)]
+        return _frame({name: block[name] for name in RECORD_DTYPE.names})
+
+    @property
+    def start(self) -> pd.Timestamp:
+        return pd.Timestamp(int(self.records[0]['timestamp']), unit='ns')
+
+    @property
+    def end(self) -> pd.Timestamp:
+        return pd.Timestamp(int(self.records[-1]['timestamp']), unit='ns')
+
+
+def write_ohlcv_file(path: str, data: pd.DataFrame, append: bool = False) -> int:
+    """
+    Write (or append) bars to a binary OHLCV file
+
+    Args:
+        path: Output file
+        data: OHLC(V) DataFrame indexed by timestamp (missing volume -> 0)
+        append: Add to an existing file instead of replacing it (bars must
+                come after the ones already stored)
+
+    Returns:
+        Number of records written
+    """
+    source = FrameSource(data)
+    records = np.empty(len(source), dtype=RECORD_DTYPE)
+    for name, values in source.read(0, len(source)).items():
+        records[name] = values
+
+    exists = append and os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE
+    if exists:
+        stored = OHLCVFile(path)
+        if len(stored) and len(records) and records['timestamp'][0] <= stored.records[-1]['timestamp']:
+            raise ValueError("Appended bars must start after the last stored bar")
+        del stored
+
+    with open(path, 'ab' if exists else 'wb') as f:
+        if not exists:
+            f.write(MAGIC)
+            f.write(np.array([VERSION], dtype='<i8').tobytes())
+        records.tofile(f)
+    return len(records)
@@ -0,0 +1,108 @@
+"""
+Sorted grid-level and position indexes for O(log n) grid decisions
+"""
+import math
+from bisect import bisect_left, bisect_right, insort
+from typing import List
+
+
+class GridLevelIndex:
+    """Buy levels below the grid center, sorted by price for bisect lookups"""
+
+    def __init__(self):
+        self.levels = 0
+        self.prices = []        # level i (1-based) buy price at prices[i - 1]
+        self._ascending = []
+
+    def build(self, center_price: float, step: float, levels: int):
+        """Compute level prices exactly as the strategy does (center * (1 - i * step))"""
+        self.levels = levels
+        self.prices = [center_price * (1 - i * step) for i in range(1, levels + 1)]
+        self._ascending = self.prices[::-1]
+
+    def crossed(self, price: float) -> range:
+        """Levels whose buy price is at or above ``price`` (1-based, nearest first)"""
+        count = self.levels - bisect_left(self._ascending, price)
+        return range(1, count + 1)
+
+    def prices_between(self, low: float, high: float) -> List[float]:
+        """Level buy prices within ``[low, high]``, ascending"""
+        return self._ascending[bisect_left(self._ascending, low):bisect_right(self._ascending, high)]
+
+
+class TakeProfitIndex:
+    """Open entries sorted by take-profit trigger price"""
+
+    def __init__(self):
+        self._entries = []      # (trigger, key), ascending
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def add(self, key: int, trigger: float):
+        """Register entry ``key`` that takes profit at ``price >= trigger``"""
+        insort(self._entries, (trigger, key))
+
+    def triggers_between(self, low: float, high: float) -> List[float]:
+        """Trigger prices within ``[low, high]``, ascending"""
+        lo = bisect_left(self._entries, (low, -math.inf))
+        hi = bisect_right(self._entries, (high, math.inf))
+        return [trigger for trigger, _ in self._entries[lo:hi]]
+
+    def pop_hits(self, price: float) -> List[int]:
+        """Remove and return keys of every entry with ``trigger <= price``"""
+        count = bisect_right(self._entries, (price, math.inf))
+        if count == 0:
+            return []
+        hits = [key for _, key in self._entries[:count]]
+        del self._entries[:count]
+        return hits
+
+
+class PositionPriceIndex:
+    """Sorted entry prices of open live-bot positions"""
+
+    def __init__(self, prices=()):
+        self._prices = sorted(prices)
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def __iter__(self):
+        return iter(self._prices)
+
+    def add(self, price: float):
+        i = bisect_left(self._prices, price)
+        if i == len(self._prices) or self._prices[i] != price:
+            self._prices.insert(i, price)
+
+    def discard(self, price: float):
+        i = bisect_left(self._prices, price)
+        if i < len(self._prices) and self._prices[i] == price:
+            del self._prices[i]
+
+    def nearest(self, price: float) -> List[float]:
+        """The (up to two) entry prices adjacent to ``price``"""
+        i = bisect_left(self._prices, price)
+        return self._prices[max(i - 1, 0):i + 1]
+
+    def take_profit_hits(self, price: float, take_profit: float) -> List[float]:
+        """
+        Entry prices with ``(price - entry) / entry >= take_profit``
+
+        The profit ratio only falls as the entry price rises, so for a
+        non-negative ``take_profit`` the hits are a prefix of the sorted
+        prices found by binary search.
+        """
+        lo, hi = 0, len(self._prices)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = self._prices[mid]
+            if (price - entry) / entry >= take_profit:
+                lo = mid + 1
+            else:
+                hi = mid
+        return self._prices[:lo]
@@ -0,0 +1,177 @@
+"""
+Memoizing layer around core.indicators
+
+Indicator arrays are keyed by (fingerprint of the input arrays, indicator
+name, parameters). Entries live in an in-memory LRU and, optionally, in an
+on-disk tier of ``.npy`` files so separate processes and later sessions
+can reuse them.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.indicators import ema, atr
+
+
+def fingerprint(*arrays: np.ndarray) -> str:
+    """Content hash of one or more arrays (dtype and shape included)"""
+    h = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        h.update(f"{array.dtype.str}{array.shape}".encode())
+        h.update(array.view(np.uint8).reshape(-1) if array.size else b'')
+    return h.hexdigest()
+
+
+class IndicatorCache:
+    """LRU cache of indicator arrays with an optional on-disk tier"""
+
+    def __init__(self, max_entries: int = 256, cache_dir: Optional[str] = None):
+        """
+        Args:
+            max_entries: In-memory entries kept before least-recently-used eviction
+            cache_dir: Directory for the on-disk tier (None = memory only)
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        """Drop all in-memory entries (the disk tier is kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters"""
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+        }
+
+    def get_or_compute(self, name: str, params: Tuple, inputs: Tuple[np.ndarray, ...],
+                       func: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Return the cached array for ``(inputs, name, params)`` or compute it
+
+        Args:
+            name: Indicator name (part of the key)
+            params: Indicator parameters (part of the key)
+            inputs: Arrays the indicator is computed from (hashed)
+            func: Called with no arguments on a miss; returns the array
+
+        Returns:
+            Read-only float64 array shared by every caller with the same key
+        """
+        key = (fingerprint(*inputs), name, tuple(params))
+
+        with self._lock:
+            values = self._entries.get(key)
+            if values is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return values
+
+        values = self._load(key)
+        if values is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            values = np.array(func(), dtype=np.float64)
+            values.setflags(write=False)
+            self._save(key, values)
+
+        with self._lock:
+            self._entries[key] = values
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return values
+
+    def ema(self, close: pd.Series, period: int) -> np.ndarray:
+        """Cached ``core.indicators.ema`` values"""
+        return self.get_or_compute(
+            'ema', (period,), (close.to_numpy(dtype=np.float64),),
+            lambda: ema(close, period).to_numpy()
+        )
+
+    def atr(self, high: pd.Series, low: pd.Series, close: pd.Series,
+            period: int = 14) -> np.ndarray:
+        """Cached ``core.indicators.atr`` values"""
+        inputs = tuple(s.to_numpy(dtype=np.float64) for s in (high, low, close))
+        return self.get_or_compute(
+            'atr', (period,), inputs,
+            lambda: atr(high, low, close, period).to_numpy()
+        )
+
+    def _path(self, key: Tuple) -> str:
+        digest, name, params = key
+        tag = '_'.join(str(p) for p in params)
+        return os.path.join(self.cache_dir, f"{name}_{tag}_{digest}.npy")
+
+    def _load(self, key: Tuple) -> Optional[np.ndarray]:
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return np.load(path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable indicator cache file {path}: {e}")
+            return None
+
+    def _save(self, key: Tuple, values: np.ndarray):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'wb') as f:
+                np.save(f, values)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠️ Could not write indicator cache file {path}: {e}")
+
+
+_default_cache = IndicatorCache()
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """Process-wide cache used by the backtest engines"""
+    return _default_cache
+
+
+def configure_indicator_cache(max_entries: int = 256,
+                              cache_dir: Optional[str] = None) -> IndicatorCache:
+    """Replace the process-wide cache (e.g. to enable the disk tier)"""
+    global _default_cache
+    _default_cache = IndicatorCache(max_entries, cache_dir)
+    return _default_cache
+
+
+def cached_ema(close: pd.Series, period: int) -> pd.Series:
+    """``core.indicators.ema`` through the process-wide cache"""
+    return pd.Series(_default_cache.ema(close, period), index=close.index, copy=False)
+
+
+def cached_atr(high: pd.Series, low: pd.Series, close: pd.Series,
+               period: int = 14) -> pd.Series:
+    """``core.indicators.atr`` through the process-wide cache"""
+    return pd.Series(_default_cache.atr(high, low, close, period), index=close.index, copy=False)
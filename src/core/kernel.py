@@ -0,0 +1,462 @@
+"""
+Compiled array kernel for the Grid + Hedge strategy
+
+Runs the same state machine as ``DynamicGridHedgeStrategy.execute`` plus
+the ``BacktestEngine`` stop rules over whole arrays of bars. State lives
+in fixed-size arrays and trades are written to a preallocated event
+buffer. Compiled with Numba when it is installed; otherwise the same
+function runs as plain Python (correct, but slow).
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+from core.strategy import BinanceFees
+from core.indicator_cache import get_indicator_cache
+from core.recorder import EquityRecorder
+from core.trade_log import TradeLog, TradeType, TRADE_FIELDS
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for ``numba.njit``"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# Event type codes written to the kernel's event buffer (the trade log's codes,
+# as plain ints for the compiled code)
+EV_GRID_REBALANCE = int(TradeType.GRID_REBALANCE)
+EV_GRID_BUY = int(TradeType.GRID_BUY)
+EV_GRID_SELL = int(TradeType.GRID_SELL)
+EV_HEDGE_OPEN = int(TradeType.HEDGE_OPEN)
+EV_HEDGE_CLOSE_ALL = int(TradeType.HEDGE_CLOSE_ALL)
+
+EVENT_NAMES = {int(t): t.name for t in TradeType}
+
+# Float payload columns per event (order of ``fields`` in the buffer)
+EVENT_FIELDS = {int(t): tuple(f for f in fields if f != 'note')
+                for t, fields in TRADE_FIELDS.items()}
+
+N_EVENT_FIELDS = 7
+
+# Indices into the scalar state vector returned by the kernel
+S_BALANCE = 0
+S_SPOT_QTY = 1
+S_FUT_QTY = 2
+S_FUT_ENTRY = 3
+S_FUT_MARGIN = 4
+S_SPOT_FEES = 5
+S_FUT_FEES = 6
+S_FUNDING = 7
+S_CENTER = 8
+S_LOWER = 9
+S_UPPER = 10
+N_STATE = 11
+
+
+@njit(cache=True)
+def grid_hedge_kernel(close, ema_arr, atr_arr, ts_ns,
+                      initial_capital, grid_levels, grid_step, take_profit,
+                      risk_per_order, rebalance_threshold,
+                      thresholds, sizes, leverage,
+                      spot_taker, futures_taker, funding_rate, funding_hours,
+                      max_drawdown, margin_floor, record_every,
+                      rec_rows, rec_cols, ev_bar, ev_type, ev_fields,
+                      state, entry_price, entry_qty, layers):
+    """
+    Run the strategy over all bars
+
+    Returns:
+        (last processed bar, recorded rows, events written, open entries,
+         active hedge layers). Events written > ``len(ev_bar)`` means the
+        buffer overflowed and the run must be repeated with a larger one.
+    """
+    n = close.shape[0]
+    ev_cap = ev_bar.shape[0]
+    n_hedge = min(thresholds.shape[0], sizes.shape[0])
+    min_threshold = np.inf
+    for j in range(thresholds.shape[0]):
+        if thresholds[j] < min_threshold:
+            min_threshold = thresholds[j]
+
+    balance = initial_capital
+    spot_qty = 0.0
+    fut_qty = 0.0
+    fut_entry = 0.0
+    fut_margin = 0.0
+    spot_fees = 0.0
+    fut_fees = 0.0
+    funding_paid = 0.0
+    center = 0.0
+    lower = 0.0
+    upper = 0.0
+    has_funding_time = False
+    last_funding_ns = 0
+
+    bought = np.zeros(grid_levels + 1, dtype=np.bool_)
+    n_entries = 0
+    n_layers = 0
+    n_ev = 0
+    n_rec = 0
+    peak_equity = initial_capital
+
+    idx = 0
+    for idx in range(n):
+        price = close[idx]
+        ema_value = ema_arr[idx]
+        atr_value = atr_arr[idx]
+
+        # Initialize grid on first bar
+        if center == 0:
+            center = ema_value
+            lower = ema_value * (1 - grid_step * grid_levels / 2)
+            upper = ema_value * (1 + grid_step * grid_levels / 2)
+
+        # Funding rate
+        if not has_funding_time:
+            has_funding_time = True
+            last_funding_ns = ts_ns[idx]
+        else:
+            hours_elapsed = ((ts_ns[idx] - last_funding_ns) / 1e9) / 3600
+            if hours_elapsed >= funding_hours:
+                if fut_qty > 0:
+                    position_value = fut_qty * price
+                    funding = position_value * funding_rate
+                    balance -= funding
+                    funding_paid += funding
+                    last_funding_ns = ts_ns[idx]
+
+        # Rebalance grid
+        distance = abs(price - center) / center
+        if distance > rebalance_threshold:
+            old_center = center
+            center = ema_value
+            lower = ema_value * (1 - grid_step * grid_levels / 2)
+            upper = ema_value * (1 + grid_step * grid_levels / 2)
+            bought[:] = False
+            if n_ev < ev_cap:
+                ev_bar[n_ev] = idx
+                ev_type[n_ev] = EV_GRID_REBALANCE
+                ev_fields[n_ev, 0] = old_center
+                ev_fields[n_ev, 1] = ema_value
+                ev_fields[n_ev, 2] = spot_qty
+            n_ev += 1
+
+        # Grid buy (first eligible level only)
+        for i in range(1, grid_levels + 1):
+            buy_price = center * (1 - i * grid_step)
+            if not bought[i] and price <= buy_price and balance > 0:
+                risk_cash = balance * risk_per_order
+                qty = risk_cash / price
+                fee = qty * price * spot_taker
+                total_cost = qty * price + fee
+                if total_cost <= balance:
+                    spot_qty += qty
+                    balance -= total_cost
+                    entry_price[n_entries] = price
+                    entry_qty[n_entries] = qty
+                    n_entries += 1
+                    bought[i] = True
+                    spot_fees += fee
+                    if n_ev < ev_cap:
+                        ev_bar[n_ev] = idx
+                        ev_type[n_ev] = EV_GRID_BUY
+                        ev_fields[n_ev, 0] = i
+                        ev_fields[n_ev, 1] = price
+                        ev_fields[n_ev, 2] = qty
+                        ev_fields[n_ev, 3] = qty * price
+                        ev_fields[n_ev, 4] = fee
+                        ev_fields[n_ev, 5] = balance
+                    n_ev += 1
+                    break
+
+        # Grid sell (every entry past take profit, in entry order)
+        kept = 0
+        for k in range(n_entries):
+            e_price = entry_price[k]
+            e_qty = entry_qty[k]
+            if price >= e_price * (1 + take_profit):
+                revenue = e_qty * price
+                fee = revenue * spot_taker
+                net_revenue = revenue - fee
+                profit = net_revenue - (e_qty * e_price)
+                balance += net_revenue
+                spot_qty -= e_qty
+                spot_fees += fee
+                if n_ev < ev_cap:
+                    ev_bar[n_ev] = idx
+                    ev_type[n_ev] = EV_GRID_SELL
+                    ev_fields[n_ev, 0] = e_price
+                    ev_fields[n_ev, 1] = price
+                    ev_fields[n_ev, 2] = e_qty
+                    ev_fields[n_ev, 3] = revenue
+                    ev_fields[n_ev, 4] = fee
+                    ev_fields[n_ev, 5] = profit
+                    ev_fields[n_ev, 6] = balance
+                n_ev += 1
+            else:
+                entry_price[kept] = e_price
+                entry_qty[kept] = e_qty
+                kept += 1
+        n_entries = kept
+
+        # Hedge
+        if not (atr_value == 0 or center == 0):
+            distance_atr = abs(price - center) / atr_value
+            futures_pnl = 0.0
+            if fut_qty > 0:
+                futures_pnl = (fut_entry - price) * fut_qty
+            equity = balance + spot_qty * price + futures_pnl - fut_margin
+
+            for j in range(n_hedge):
+                threshold = thresholds[j]
+                active = False
+                for m in range(n_layers):
+                    if layers[m] == threshold:
+                        active = True
+                        break
+                if distance_atr > threshold and not active:
+                    if price < center:
+                        hedge_value = equity * sizes[j]
+                        qty = (hedge_value * leverage) / price
+                        fee = qty * price * futures_taker
+                        margin_required = (qty * price) / leverage
+                        if margin_required < balance * 0.3:
+                            total_qty = fut_qty + qty
+                            if fut_qty > 0:
+                                fut_entry = (fut_entry * fut_qty + price * qty) / total_qty
+                            else:
+                                fut_entry = price
+                            fut_qty = total_qty
+                            fut_margin += margin_required
+                            balance -= fee
+                            fut_fees += fee
+                            layers[n_layers] = threshold
+                            n_layers += 1
+                            if n_ev < ev_cap:
+                                ev_bar[n_ev] = idx
+                                ev_type[n_ev] = EV_HEDGE_OPEN
+                                ev_fields[n_ev, 0] = threshold
+                                ev_fields[n_ev, 1] = price
+                                ev_fields[n_ev, 2] = qty
+                                ev_fields[n_ev, 3] = leverage
+                                ev_fields[n_ev, 4] = margin_required
+                                ev_fields[n_ev, 5] = fee
+                                ev_fields[n_ev, 6] = distance_atr
+                            n_ev += 1
+
+            if n_layers > 0 and distance_atr < min_threshold - 0.5:
+                if fut_qty > 0:
+                    pnl = (fut_entry - price) * fut_qty
+                    fee = fut_qty * price * futures_taker
+                    net_pnl = pnl - fee
+                    balance += net_pnl + fut_margin - fee
+                    fut_fees += fee
+                    if n_ev < ev_cap:
+                        ev_bar[n_ev] = idx
+                        ev_type[n_ev] = EV_HEDGE_CLOSE_ALL
+                        ev_fields[n_ev, 0] = price
+                        ev_fields[n_ev, 1] = fut_qty
+                        ev_fields[n_ev, 2] = fut_entry
+                        ev_fields[n_ev, 3] = pnl
+                        ev_fields[n_ev, 4] = fee
+                        ev_fields[n_ev, 5] = net_pnl
+                    n_ev += 1
+                    fut_qty = 0.0
+                    fut_entry = 0.0
+                    fut_margin = 0.0
+                    n_layers = 0
+
+        # Equity tracking (same expression order as StrategyState.equity)
+        futures_pnl = 0.0
+        if fut_qty > 0:
+            futures_pnl = (fut_entry - price) * fut_qty
+        equity = balance + spot_qty * price + futures_pnl - fut_margin
+
+        if idx % record_every == 0:
+            spot_pnl = 0.0
+            for k in range(n_entries):
+                spot_pnl += (price - entry_price[k]) * entry_qty[k]
+            rec_rows[n_rec] = idx
+            rec_cols[0, n_rec] = equity
+            rec_cols[1, n_rec] = balance
+            rec_cols[2, n_rec] = spot_qty
+            rec_cols[3, n_rec] = spot_pnl
+            rec_cols[4, n_rec] = fut_qty
+            rec_cols[5, n_rec] = futures_pnl
+            rec_cols[6, n_rec] = fut_margin
+            rec_cols[7, n_rec] = spot_fees + fut_fees
+            rec_cols[8, n_rec] = funding_paid
+            rec_cols[9, n_rec] = center
+            rec_cols[10, n_rec] = ema_value
+            n_rec += 1
+
+        if equity > peak_equity:
+            peak_equity = equity
+
+        drawdown = (equity - peak_equity) / peak_equity
+        if drawdown < -max_drawdown:
+            break
+
+        if equity < margin_floor:
+            break
+
+    state[S_BALANCE] = balance
+    state[S_SPOT_QTY] = spot_qty
+    state[S_FUT_QTY] = fut_qty
+    state[S_FUT_ENTRY] = fut_entry
+    state[S_FUT_MARGIN] = fut_margin
+    state[S_SPOT_FEES] = spot_fees
+    state[S_FUT_FEES] = fut_fees
+    state[S_FUNDING] = funding_paid
+    state[S_CENTER] = center
+    state[S_LOWER] = lower
+    state[S_UPPER] = upper
+    return idx, n_rec, n_ev, n_entries, n_layers
+
+
+def run_kernel_backtest(data: pd.DataFrame, config: Dict, record_every: int = 1,
+                        ema_values: Optional[np.ndarray] = None,
+                        atr_values: Optional[np.ndarray] = None,
+                        verbose: bool = True) -> Dict:
+    """
+    Kernel equivalent of ``BacktestEngine(...).run()``
+
+    Args:
+        data: OHLC DataFrame indexed by timestamp (DatetimeIndex)
+        config: Strategy/risk config
+        record_every: Keep every Nth bar in the equity curve
+        ema_values: Precomputed EMA array (cached computation from ``data`` if None)
+        atr_values: Precomputed ATR array (cached computation from ``data`` if None)
+        verbose: Print progress like ``BacktestEngine``
+
+    Returns:
+        Results dict with the same keys and contents as ``BacktestEngine.run``
+    """
+    fill_mode = config.get('fill_mode', 'close')
+    if fill_mode != 'close':
+        raise ValueError(f"Kernel only supports fill_mode='close' (got {fill_mode!r}); "
+                         f"use BacktestEngine for intrabar fills")
+
+    n = len(data)
+    if verbose:
+        print(f"\nRunning kernel backtest on {n} bars...")
+        print(f"Period: {data.index[0]} to {data.index[-1]}")
+
+    cache = get_indicator_cache()
+    if ema_values is None:
+        ema_values = cache.ema(data['close'], config['ema_period'])
+    if atr_values is None:
+        atr_values = cache.atr(data['high'], data['low'], data['close'], config['atr_period'])
+
+    close = np.ascontiguousarray(data['close'].to_numpy(dtype=np.float64))
+    ema_arr = np.ascontiguousarray(ema_values, dtype=np.float64)
+    atr_arr = np.ascontiguousarray(atr_values, dtype=np.float64)
+    ts_ns = np.ascontiguousarray(pd.DatetimeIndex(data.index).as_unit('ns').asi8)
+    thresholds = np.asarray(config['hedge_atr_threshold'], dtype=np.float64)
+    sizes = np.asarray(config['hedge_sizes'], dtype=np.float64)
+    leverage = config.get('hedge_leverage', 3)
+    fees = BinanceFees
+
+    recorder = EquityRecorder(n, record_every)
+    rec_cols = np.empty((len(EquityRecorder.FIELDS), len(recorder.rows)), dtype=np.float64)
+    entry_price = np.empty(n + 1, dtype=np.float64)
+    entry_qty = np.empty(n + 1, dtype=np.float64)
+    layers = np.empty(max(len(thresholds), 1), dtype=np.float64)
+    state = np.zeros(N_STATE, dtype=np.float64)
+
+    ev_cap = 2 * n + 64
+    while True:
+        ev_bar = np.empty(ev_cap, dtype=np.int64)
+        ev_type = np.empty(ev_cap, dtype=np.int8)
+        ev_fields = np.empty((ev_cap, N_EVENT_FIELDS), dtype=np.float64)
+
+        idx, n_rec, n_ev, n_entries, n_layers = grid_hedge_kernel(
+            close, ema_arr, atr_arr, ts_ns,
+            float(config['initial_capital']), int(config['grid_levels']),
+            float(config['grid_step']), float(config.get('grid_take_profit', 0.012)),
+            float(config['grid_risk_per_order']),
+            float(config.get('rebalance_threshold', 0.05)),
+            thresholds, sizes, float(leverage),
+            fees.SPOT_TAKER, fees.FUTURES_TAKER, fees.FUNDING_RATE_BASE,
+            float(fees.FUNDING_INTERVAL_HOURS),
+            float(config['max_drawdown']),
+            config['initial_capital'] * config['margin_call_threshold'],
+            int(record_every),
+            recorder.rows, rec_cols, ev_bar, ev_type, ev_fields,
+            state, entry_price, entry_qty, layers
+        )
+        if n_ev <= ev_cap:
+            break
+        ev_cap = 2 * n_ev
+
+    for i, name in enumerate(EquityRecorder.FIELDS):
+        recorder.columns[name] = rec_cols[i]
+    recorder.size = n_rec
+
+    timestamps = data.index
+    trades = _events_to_trades(timestamps, ev_bar[:n_ev], ev_type[:n_ev],
+                               ev_fields[:n_ev], leverage)
+
+    final_price = data['close'].iloc[idx]
+    futures_pnl = 0.0
+    if state[S_FUT_QTY] > 0:
+        futures_pnl = (state[S_FUT_ENTRY] - final_price) * state[S_FUT_QTY]
+    final_equity = (state[S_BALANCE] + state[S_SPOT_QTY] * final_price
+                    + futures_pnl - state[S_FUT_MARGIN])
+
+    if recorder.last_bar != idx:
+        spot_pnl = 0.0
+        for k in range(n_entries):
+            spot_pnl += (final_price - entry_price[k]) * entry_qty[k]
+        recorder.record(
+            idx, final_equity, state[S_BALANCE], state[S_SPOT_QTY], spot_pnl,
+            state[S_FUT_QTY], futures_pnl, state[S_FUT_MARGIN],
+            state[S_SPOT_FEES] + state[S_FUT_FEES], state[S_FUNDING],
+            state[S_CENTER], ema_arr[idx]
+        )
+
+    final_state = {
+        'balance': float(state[S_BALANCE]),
+        'spot_qty': float(state[S_SPOT_QTY]),
+        'futures_short_qty': float(state[S_FUT_QTY]),
+        'futures_margin': float(state[S_FUT_MARGIN]),
+        'spot_entries': int(n_entries),
+        'hedge_layers': layers[:n_layers].tolist(),
+        'trades': trades,
+        'total_fees': float(state[S_SPOT_FEES] + state[S_FUT_FEES]),
+        'total_funding': float(state[S_FUNDING]),
+        'center_price': float(state[S_CENTER])
+    }
+
+    if verbose:
+        print(f"\nBacktest completed: {idx + 1} bars processed")
+        print(f"Total trades: {len(trades)}")
+
+    return {
+        'equity_curve': recorder.to_frame(data),
+        'trades': trades.to_frame(),
+        'final_equity': float(final_equity),
+        'initial_capital': config['initial_capital'],
+        'final_state': final_state,
+        'final_price': final_price
+    }
+
+
+def _events_to_trades(timestamps, ev_bar, ev_type, ev_fields, leverage):
+    """Convert the kernel event buffer to the strategy's trade log"""
+    columns = {}
+    for trade_type in TradeType:
+        rows = ev_fields[ev_type == trade_type]
+        columns[trade_type] = {name: rows[:, k] for k, name in enumerate(EVENT_FIELDS[trade_type])}
+    columns[TradeType.GRID_REBALANCE]['note'] = 'Grid rebalanced without closing positions'
+
+    # Leverage comes from the config, so it keeps the config's type
+    ints = ('level', 'leverage') if isinstance(leverage, (int, np.integer)) else ('level',)
+    return TradeLog.from_columns(ev_type, timestamps[ev_bar].as_unit('ns').asi8, columns,
+                                 unit=timestamps.unit, tz=timestamps.tz, ints=ints)
@@ -0,0 +1,102 @@
+"""
+Vectorized equity-curve metrics
+
+Every function takes equity as a 1-D array (one run) or a 2-D array
+(one run per row, equal lengths) and reduces along the last axis, so a
+whole batch of sweep results is scored with a handful of NumPy passes.
+"""
+import numpy as np
+from typing import Dict
+
+
+# The engine records hourly bars
+PERIODS_PER_YEAR = 24 * 365
+
+RISK_KEYS = ('max_drawdown', 'sharpe_ratio', 'sortino_ratio', 'annual_return', 'calmar_ratio',
+             'ulcer_index', 'time_under_water', 'max_underwater_bars')
+
+
+def drawdowns(equity: np.ndarray) -> np.ndarray:
+    """Drawdown from the running peak, in % (<= 0)"""
+    running_max = np.maximum.accumulate(equity, axis=-1)
+    return (equity - running_max) / running_max * 100
+
+
+def returns(equity: np.ndarray) -> np.ndarray:
+    """Bar-to-bar simple returns (one fewer column than ``equity``)"""
+    return equity[..., 1:] / equity[..., :-1] - 1
+
+
+def _ratio(numerator, denominator):
+    """numerator / denominator, 0 where the denominator is not positive"""
+    numerator, denominator = np.broadcast_arrays(np.asarray(numerator, dtype=np.float64),
+                                                 np.asarray(denominator, dtype=np.float64))
+    out = np.zeros(numerator.shape)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out
+
+
+def _scalar(value):
+    return float(value) if np.ndim(value) == 0 else value
+
+
+def equity_metrics(equity: np.ndarray, periods_per_year: float = PERIODS_PER_YEAR) -> Dict:
+    """
+    Risk/return metrics of one or many equity curves
+
+    Args:
+        equity: Equity per bar, shape (n_bars,) or (n_runs, n_bars)
+        periods_per_year: Bars per year, for annualising
+
+    Returns:
+        Dict of floats (1-D input) or arrays (2-D input):
+            max_drawdown (%, <= 0), sharpe_ratio, sortino_ratio,
+            annual_return (%), calmar_ratio, ulcer_index,
+            time_under_water (% of bars below the running peak),
+            max_underwater_bars (longest stretch below a peak)
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    n = equity.shape[-1]
+    dd = drawdowns(equity)
+    max_dd = dd.min(axis=-1)
+
+    r = returns(equity)
+    if n > 2:
+        mean = r.mean(axis=-1)
+        std = r.std(axis=-1, ddof=1)
+        downside = np.sqrt((np.minimum(r, 0.0) ** 2).mean(axis=-1))
+    else:
+        mean = std = downside = np.zeros(equity.shape[:-1])
+    scale = np.sqrt(periods_per_year)
+    sharpe = _ratio(scale * mean, std)
+    sortino = _ratio(scale * mean, downside)
+
+    years = max(n - 1, 1) / periods_per_year
+    growth = _ratio(equity[..., -1], equity[..., 0])
+    annual_return = (np.power(growth, 1 / years, where=growth > 0, out=np.zeros(growth.shape)) - 1) * 100
+    calmar = _ratio(annual_return, -max_dd)
+
+    ulcer = np.sqrt((dd ** 2).mean(axis=-1))
+
+    # Bars since the last peak: distance to the latest index at which dd == 0
+    under = dd < 0
+    bars = np.arange(n)
+    last_peak = np.maximum.accumulate(np.where(under, 0, bars), axis=-1)
+    underwater_bars = (bars - last_peak).max(axis=-1)
+
+    return {
+        'max_drawdown': _scalar(max_dd),
+        'sharpe_ratio': _scalar(sharpe),
+        'sortino_ratio': _scalar(sortino),
+        'annual_return': _scalar(annual_return),
+        'calmar_ratio': _scalar(calmar),
+        'ulcer_index': _scalar(ulcer),
+        'time_under_water': _scalar(under.mean(axis=-1) * 100),
+        'max_underwater_bars': _scalar(underwater_bars),
+    }
+
+
+def exposure(spot_qty: np.ndarray, futures_short_qty: np.ndarray) -> float:
+    """% of bars with an open spot or futures position"""
+    in_market = (np.asarray(spot_qty) > 0) | (np.asarray(futures_short_qty) > 0)
+    return _scalar(in_market.mean(axis=-1) * 100) if in_market.shape[-1] else 0.0
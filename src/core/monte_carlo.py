@@ -0,0 +1,162 @@
+"""
+Parallel Monte Carlo backtests over simulated price paths
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.kernel import NUMBA_AVAILABLE
+from core.sweep import run_config
+from utils.data_loader import generate_price_paths, path_frame
+
+
+PATH_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+# Per-worker (N, T) path arrays, attached once from shared memory by _init_worker
+_WORKER_PATHS = None
+_WORKER_SHM = None
+
+
+class SharedPaths:
+    """``generate_price_paths`` output placed once in a shared-memory block"""
+
+    def __init__(self, paths: Dict):
+        self.shape = paths['close'].shape
+        self.timestamps = pd.DatetimeIndex(paths['timestamp']).as_unit('ns').asi8
+
+        nbytes = 8 * len(PATH_FIELDS) * self.shape[0] * self.shape[1]
+        self.shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 8))
+        values = _view(self.shm.buf, self.shape)
+        for f, name in enumerate(PATH_FIELDS):
+            values[f] = paths[name]
+
+    @property
+    def handle(self) -> Dict:
+        """Picklable description used by workers to attach"""
+        return {'name': self.shm.name, 'shape': self.shape, 'timestamps': self.timestamps}
+
+    def close(self):
+        """Release and unlink the shared block"""
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _view(buf, shape):
+    return np.ndarray((len(PATH_FIELDS),) + tuple(shape), dtype=np.float64, buffer=buf)
+
+
+def attach_paths(handle: Dict):
+    """
+    Attach to a ``SharedPaths`` block
+
+    Returns:
+        (paths dict, SharedMemory) - keep the SharedMemory referenced while
+        the arrays are used
+    """
+    shm = shared_memory.SharedMemory(name=handle['name'])
+    values = _view(shm.buf, handle['shape'])
+    paths = {name: values[f] for f, name in enumerate(PATH_FIELDS)}
+    paths['timestamp'] = pd.DatetimeIndex(pd.to_datetime(handle['timestamps'], unit='ns'),
+                                          name='timestamp')
+    return paths, shm
+
+
+def _init_worker(handle: Dict):
+    """Pool initializer: attach the paths once per worker process"""
+    global _WORKER_PATHS, _WORKER_SHM
+    _WORKER_PATHS, _WORKER_SHM = attach_paths(handle)
+
+
+def _run_path(paths: Dict, i: int, config: Dict, use_kernel: bool) -> Dict:
+    metrics = run_config(path_frame(paths, i), config, use_kernel)
+    metrics['path'] = i
+    return metrics
+
+
+def _run_task(task):
+    i, config, use_kernel = task
+    return _run_path(_WORKER_PATHS, i, config, use_kernel)
+
+
+def run_paths(paths: Dict, config: Dict, workers: Optional[int] = None,
+              use_kernel: bool = NUMBA_AVAILABLE, chunksize: int = 8) -> pd.DataFrame:
+    """
+    Backtest one config on every path of a ``generate_price_paths`` batch
+
+    The (N, T) arrays are copied once into shared memory; workers attach in
+    their initializer, so each task only carries a path number.
+
+    Args:
+        paths: Output of ``generate_price_paths``
+        config: Strategy/risk config
+        workers: Worker processes (default: all cores; 1 runs in-process)
+        use_kernel: Use the compiled kernel instead of ``BacktestEngine``
+        chunksize: Paths sent to a worker per round trip
+
+    Returns:
+        One row of ``calculate_metrics`` per path (plus 'path', 'final_equity', 'bars')
+    """
+    n_paths, hours = paths['close'].shape
+    config = dict(config)
+    config.setdefault('backtest_days', max(hours / 24, 1))
+
+    workers = workers or os.cpu_count() or 1
+    print(f"Monte Carlo: {n_paths} paths x {hours} bars with {workers} workers...")
+
+    if workers == 1:
+        rows = [_run_path(paths, i, config, use_kernel) for i in range(n_paths)]
+    else:
+        with SharedPaths(paths) as shared:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(shared.handle,)) as pool:
+                tasks = [(i, config, use_kernel) for i in range(n_paths)]
+                rows = list(pool.map(_run_task, tasks, chunksize=chunksize))
+
+    return pd.DataFrame(rows).set_index('path')
+
+
+def summarize(results: pd.DataFrame, columns=('roi', 'max_drawdown'),
+              quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)) -> pd.DataFrame:
+    """Distribution of the given metrics: mean, std, min, quantiles, max"""
+    table = results[list(columns)]
+    stats = table.quantile(list(quantiles)).T
+    stats.columns = [f"p{int(q * 100)}" for q in quantiles]
+    stats.insert(0, 'min', table.min())
+    stats.insert(0, 'std', table.std())
+    stats.insert(0, 'mean', table.mean())
+    stats['max'] = table.max()
+    return stats
+
+
+def run_monte_carlo(config: Dict, n_paths: int, start_price: float, end_price: float,
+                    days: float, scenario: str = 'gradual', seed=None,
+                    workers: Optional[int] = None, use_kernel: bool = NUMBA_AVAILABLE,
+                    **path_kwargs) -> Dict:
+    """
+    Generate ``n_paths`` paths for a scenario and backtest them in parallel
+
+    Returns:
+        Dict with 'results' (per-path metrics), 'roi' and 'max_drawdown'
+        (distribution arrays), 'prob_loss' (% of paths with ROI < 0) and
+        'summary' (see ``summarize``)
+    """
+    paths = generate_price_paths(n_paths, start_price, end_price, days, scenario,
+                                 seed=seed, **path_kwargs)
+    results = run_paths(paths, config, workers, use_kernel)
+    return {
+        'results': results,
+        'roi': results['roi'].to_numpy(),
+        'max_drawdown': results['max_drawdown'].to_numpy(),
+        'prob_loss': float((results['roi'] < 0).mean() * 100),
+        'summary': summarize(results),
+    }
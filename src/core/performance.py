@@ -7,13 +7,17 @@ from typing import Dict
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
+from matplotlib.collections import LineCollection, PolyCollection
 import matplotlib.dates as mdates
+from core.trade_log import TradeLog
+from core.metrics import equity_metrics, exposure, RISK_KEYS
 
 
 class PerformanceAnalyzer:
     """Analyze backtest with detailed metrics"""
     
+    CHART_DPI = 150
+    
     def __init__(self, results: Dict, config: Dict):
         self.results = results
         self.config = config
@@ -23,36 +27,64 @@ class PerformanceAnalyzer:
         self.final_equity = results['final_equity']
         self.final_state = results['final_state']
         self.backtest_days = config.get('backtest_days', 30)
+        self._trade_positions = self._index_trades()
+        self._trades_by_type = {}
+        self._metrics = None
+    
+    def _index_trades(self) -> Dict[str, np.ndarray]:
+        """Row positions of each trade type, from one pass over the trades"""
+        log = self.final_state.get('trades')
+        if isinstance(log, TradeLog) and len(log) == len(self.trades):
+            # The log already keeps each type's row positions
+            return {t.name: log.positions(t) for t in log.tables if log.count(t)}
+        if self.trades.empty or 'type' not in self.trades.columns:
+            return {}
+        types = self.trades['type'].astype('category')
+        return dict(self.trades.groupby(types, observed=True, sort=False).indices)
+    
+    def trades_of(self, trade_type: str) -> pd.DataFrame:
+        """Trades of one type (empty frame if none)"""
+        if trade_type not in self._trades_by_type:
+            positions = self._trade_positions.get(trade_type, np.empty(0, dtype=np.int64))
+            self._trades_by_type[trade_type] = self.trades.iloc[positions]
+        return self._trades_by_type[trade_type]
+    
+    def _trade_values(self, trade_type: str, column: str) -> np.ndarray:
+        """One column of one trade type as a float array"""
+        positions = self._trade_positions.get(trade_type)
+        if positions is None:
+            return np.empty(0)
+        return self.trades[column].to_numpy(dtype=np.float64)[positions]
         
     def calculate_metrics(self) -> Dict:
-        """Calculate all performance metrics"""
+        """Calculate all performance metrics (computed once, then cached)"""
+        if self._metrics is None:
+            self._metrics = self._compute_metrics()
+        return dict(self._metrics)
+    
+    def _compute_metrics(self) -> Dict:
         # ROI
         roi = ((self.final_equity - self.initial_capital) / self.initial_capital) * 100
         roi_monthly = (roi / self.backtest_days) * 30
         
-        # Max Drawdown
-        equity_series = self.equity_curve['equity']
-        running_max = equity_series.expanding().max()
-        drawdown_series = (equity_series - running_max) / running_max * 100
-        max_dd = drawdown_series.min()
-        
-        # Sharpe Ratio
-        returns = equity_series.pct_change().dropna()
-        if len(returns) > 0 and returns.std() > 0:
-            sharpe = np.sqrt(24 * 365) * returns.mean() / returns.std()  # Annualized
-        else:
-            sharpe = 0
+        # Drawdown, Sharpe/Sortino/Calmar, ulcer index, time under water
+        equity = self.equity_curve['equity'].to_numpy(dtype=np.float64)
+        risk = equity_metrics(equity) if len(equity) else dict.fromkeys(RISK_KEYS, 0.0)
+        in_market = 0.0
+        if len(equity) and 'spot_qty' in self.equity_curve.columns:
+            in_market = exposure(self.equity_curve['spot_qty'].to_numpy(),
+                                 self.equity_curve['futures_short_qty'].to_numpy())
         
         # Trade stats
-        grid_buys = len(self.trades[self.trades['type'] == 'GRID_BUY'])
-        grid_sells = len(self.trades[self.trades['type'] == 'GRID_SELL'])
+        grid_buys = len(self._trade_positions.get('GRID_BUY', ()))
+        grid_sells = len(self._trade_positions.get('GRID_SELL', ()))
         
         total_grid_profit = 0
         win_trades = 0
         if grid_sells > 0:
-            profit_trades = self.trades[self.trades['type'] == 'GRID_SELL']
-            total_grid_profit = profit_trades['profit'].sum()
-            win_trades = len(profit_trades[profit_trades['profit'] > 0])
+            profits = self._trade_values('GRID_SELL', 'profit')
+            total_grid_profit = profits.sum()
+            win_trades = int(np.count_nonzero(profits > 0))
         
         win_rate = (win_trades / grid_sells * 100) if grid_sells > 0 else 0
         
@@ -61,18 +93,25 @@ class PerformanceAnalyzer:
         total_funding = self.final_state.get('total_funding', 0)
         
         # Hedge stats
-        hedge_opens = len(self.trades[self.trades['type'] == 'HEDGE_OPEN'])
-        hedge_closes = len(self.trades[self.trades['type'] == 'HEDGE_CLOSE_ALL'])
+        hedge_opens = len(self._trade_positions.get('HEDGE_OPEN', ()))
+        hedge_closes = len(self._trade_positions.get('HEDGE_CLOSE_ALL', ()))
         
         hedge_pnl = 0
         if hedge_closes > 0:
-            hedge_pnl = self.trades[self.trades['type'] == 'HEDGE_CLOSE_ALL']['net_pnl'].sum()
+            hedge_pnl = self._trade_values('HEDGE_CLOSE_ALL', 'net_pnl').sum()
         
         return {
             'roi': roi,
             'roi_monthly': roi_monthly,
-            'max_drawdown': max_dd,
-            'sharpe_ratio': sharpe,
+            'max_drawdown': risk['max_drawdown'],
+            'sharpe_ratio': risk['sharpe_ratio'],
+            'sortino_ratio': risk['sortino_ratio'],
+            'calmar_ratio': risk['calmar_ratio'],
+            'annual_return': risk['annual_return'],
+            'ulcer_index': risk['ulcer_index'],
+            'time_under_water': risk['time_under_water'],
+            'max_underwater_bars': risk['max_underwater_bars'],
+            'exposure': in_market,
             'grid_buys': grid_buys,
             'grid_sells': grid_sells,
             'grid_profit': total_grid_profit,
@@ -101,6 +140,12 @@ class PerformanceAnalyzer:
         print(f"   ROI (30 days proj):    {metrics['roi_monthly']:.2f}%")
         print(f"   Max Drawdown:          {metrics['max_drawdown']:.2f}%")
         print(f"   Sharpe Ratio:          {metrics['sharpe_ratio']:.2f}")
+        print(f"   Sortino Ratio:         {metrics['sortino_ratio']:.2f}")
+        print(f"   Calmar Ratio:          {metrics['calmar_ratio']:.2f}")
+        print(f"   Ulcer Index:           {metrics['ulcer_index']:.2f}")
+        print(f"   Time Under Water:      {metrics['time_under_water']:.1f}% "
+              f"(longest {metrics['max_underwater_bars']:.0f} bars)")
+        print(f"   Exposure:              {metrics['exposure']:.1f}% of bars")
         
         # Position Details
         print(f"\n💼 POSITIONS:")
@@ -171,6 +216,19 @@ class PerformanceAnalyzer:
             import traceback
             traceback.print_exc()
     
+    def export_window_charts(self, out_dir: str = 'charts', by: str = 'week',
+                             trades_per_window: int = 50, workers: int = None) -> Dict:
+        """
+        Readable entry/exit charts for long runs: one chart per week (or per
+        ``trades_per_window`` trades), rendered in parallel, plus an index image
+
+        Returns:
+            {'index': path, 'windows': DataFrame of charts} (see ``core.chart_tiles``)
+        """
+        from core.chart_tiles import export_window_charts
+        return export_window_charts(self.equity_curve, self.trades, out_dir, by,
+                                    trades_per_window, workers)
+
     def _plot_performance_charts(self):
         """Plot performance overview charts"""
         fig = plt.figure(figsize=(16, 12))
@@ -241,7 +299,7 @@ class PerformanceAnalyzer:
         ax6.legend()
         ax6.grid(True, alpha=0.3)
         
-        plt.savefig('backtest_results_v2.png', dpi=150, bbox_inches='tight')
+        plt.savefig('backtest_results_v2.png', dpi=self.CHART_DPI, bbox_inches='tight')
         print("[CHART] Performance charts saved to: backtest_results_v2.png")
     
     def _plot_candlestick_with_entries(self):
@@ -262,8 +320,8 @@ class PerformanceAnalyzer:
         self._plot_candlestick(ax1, 'Grid Trading Entries/Exits')
         
         # Add grid buy/sell markers
-        grid_buys = self.trades[self.trades['type'] == 'GRID_BUY'].copy()
-        grid_sells = self.trades[self.trades['type'] == 'GRID_SELL'].copy()
+        grid_buys = self.trades_of('GRID_BUY').copy()
+        grid_sells = self.trades_of('GRID_SELL').copy()
         
         # Use 'price' for BUY, 'exit_price' for SELL
         if not grid_buys.empty:
@@ -289,8 +347,8 @@ class PerformanceAnalyzer:
         self._plot_candlestick(ax2, 'Hedge Entries/Exits')
         
         # Add hedge markers
-        hedge_opens = self.trades[self.trades['type'] == 'HEDGE_OPEN'].copy()
-        hedge_closes = self.trades[self.trades['type'] == 'HEDGE_CLOSE_ALL'].copy()
+        hedge_opens = self.trades_of('HEDGE_OPEN').copy()
+        hedge_closes = self.trades_of('HEDGE_CLOSE_ALL').copy()
         
         if not hedge_opens.empty:
             ax2.scatter(hedge_opens['timestamp'], hedge_opens['price'], 
@@ -313,52 +371,17 @@ class PerformanceAnalyzer:
         ax2.legend(loc='upper left', fontsize=11)
         
         plt.tight_layout()
-        plt.savefig('entry_points_ohlc.png', dpi=150, bbox_inches='tight')
+        plt.savefig('entry_points_ohlc.png', dpi=self.CHART_DPI, bbox_inches='tight')
         print("[CHART] Candlestick with entry points saved to: entry_points_ohlc.png")
     
     def _plot_candlestick(self, ax, title):
         """Helper to plot candlestick chart"""
-        df = self.equity_curve.copy()
-        
-        # Ensure we have OHLC columns
-        if 'open' not in df.columns:
-            df['open'] = df['price']
-            df['high'] = df['price']
-            df['low'] = df['price']
-            df['close'] = df['price']
-        
-        # Plot candlesticks
-        for idx, row in df.iterrows():
-            timestamp = row['timestamp']
-            open_price = row['open']
-            high_price = row['high']
-            low_price = row['low']
-            close_price = row['close']
-            
-            # Determine color
-            color = 'green' if close_price >= open_price else 'red'
-            alpha = 0.6
-            
-            # Draw high-low line
-            ax.plot([timestamp, timestamp], [low_price, high_price], 
-                   color=color, linewidth=1, alpha=alpha)
-            
-            # Draw body rectangle
-            body_height = abs(close_price - open_price)
-            body_bottom = min(open_price, close_price)
-            
-            # Width in time units (adjust based on data frequency)
-            if len(df) > 1:
-                time_diff = (df['timestamp'].iloc[1] - df['timestamp'].iloc[0]).total_seconds() / 3600
-                width = pd.Timedelta(hours=time_diff * 0.6)
-            else:
-                width = pd.Timedelta(hours=0.5)
-            
-            rect = Rectangle((timestamp - width/2, body_bottom), 
-                           width, body_height,
-                           facecolor=color, edgecolor=color, 
-                           alpha=alpha, linewidth=0.5)
-            ax.add_patch(rect)
+        df = self.equity_curve
+        cols = [c if c in df.columns else 'price' for c in ('open', 'high', 'low', 'close')]
+        ohlc = [df[c].to_numpy(dtype=np.float64) for c in cols]
+        
+        draw_candlesticks(ax, df['timestamp'], *ohlc,
+                          max_candles=candles_for_width(ax, self.CHART_DPI))
         
         # Format
         ax.set_title(title, fontsize=14, fontweight='bold', pad=15)
@@ -368,7 +391,77 @@ class PerformanceAnalyzer:
         plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
         
         # Set y-axis limits with padding
-        price_min = df[['open', 'high', 'low', 'close']].min().min()
-        price_max = df[['open', 'high', 'low', 'close']].max().max()
+        price_min = min(values.min() for values in ohlc)
+        price_max = max(values.max() for values in ohlc)
         price_range = price_max - price_min
         ax.set_ylim(price_min - price_range * 0.05, price_max + price_range * 0.05)
+
+
+def candles_for_width(ax, dpi: float) -> int:
+    """Number of pixel columns ``ax`` spans when the figure is saved at ``dpi``"""
+    return max(int(ax.get_window_extent().width * dpi / ax.figure.dpi), 1)
+
+
+def downsample_ohlc(x: np.ndarray, open_: np.ndarray, high: np.ndarray, low: np.ndarray,
+                    close: np.ndarray, max_candles: int):
+    """
+    Merge consecutive bars so at most ``max_candles`` candles remain
+    
+    Each merged candle keeps the first open, last close, highest high and
+    lowest low of its bars, and is placed at its first bar.
+    
+    Returns:
+        (x, open, high, low, close, bars_per_candle)
+    """
+    n = len(x)
+    step = max(-(-n // max_candles), 1)
+    if step == 1:
+        return x, open_, high, low, close, 1
+    starts = np.arange(0, n, step)
+    ends = np.minimum(starts + step, n) - 1
+    return (x[starts], open_[starts], np.maximum.reduceat(high, starts),
+            np.minimum.reduceat(low, starts), close[ends], step)
+
+
+def draw_candlesticks(ax, timestamps, open_, high, low, close,
+                      max_candles: int = None, alpha: float = 0.6):
+    """
+    Draw candles as two collections (wicks + bodies) instead of one artist per bar
+    
+    Args:
+        ax: Matplotlib axes
+        timestamps: Bar times (Series/DatetimeIndex)
+        open_, high, low, close: Price arrays
+        max_candles: Downsample to at most this many candles (e.g. the
+                     axes width in pixels); None draws every bar
+        alpha: Candle opacity
+    """
+    index = pd.DatetimeIndex(timestamps)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    x = mdates.date2num(index.to_numpy())
+    if len(x) == 0:
+        return
+    
+    x, o, h, l, c, step = downsample_ohlc(x, np.asarray(open_), np.asarray(high),
+                                          np.asarray(low), np.asarray(close),
+                                          max_candles or len(x))
+    
+    # Width from the typical bar spacing (first gap can be irregular)
+    spacing = np.median(np.diff(x)) if len(x) > 1 else step / 48.0
+    half = spacing * 0.3
+    
+    up = c >= o
+    colors = np.where(up, 'green', 'red')
+    bottom = np.minimum(o, c)
+    top = np.maximum(o, c)
+    
+    wicks = np.stack([np.column_stack([x, l]), np.column_stack([x, h])], axis=1)
+    bodies = np.stack([np.column_stack([x - half, bottom]), np.column_stack([x - half, top]),
+                       np.column_stack([x + half, top]), np.column_stack([x + half, bottom])], axis=1)
+    
+    ax.add_collection(LineCollection(wicks, colors=colors, linewidths=1, alpha=alpha), autolim=True)
+    ax.add_collection(PolyCollection(bodies, facecolors=colors, edgecolors=colors,
+                                     linewidths=0.5, alpha=alpha), autolim=True)
+    ax.xaxis_date()
+    ax.autoscale_view()
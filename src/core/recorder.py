@@ -0,0 +1,131 @@
+"""
+Columnar equity-curve recorder for the backtest engine
+"""
+import numpy as np
+import pandas as pd
+
+
+class EquityRecorder:
+    """
+    Per-field NumPy columns instead of a list of per-bar dicts
+
+    Columns are preallocated for ``capacity`` bars and double when a run
+    records more rows than that.
+    """
+    
+    # State columns written per recorded bar (order matches the equity curve)
+    FIELDS = (
+        'equity', 'balance', 'spot_qty', 'spot_pnl', 'futures_short_qty',
+        'futures_pnl', 'futures_margin', 'total_fees', 'funding_paid',
+        'center_price', 'ema',
+    )
+    
+    def __init__(self, capacity: int, record_every: int = 1):
+        """
+        Args:
+            capacity: Bars to preallocate rows for (the whole run, or one chunk)
+            record_every: Keep every Nth bar (1 = every bar)
+        """
+        if record_every < 1:
+            raise ValueError("record_every must be >= 1")
+        
+        self.record_every = record_every
+        rows = -(-capacity // record_every) + 1  # +1 for a forced final bar
+        self.rows = np.empty(rows, dtype=np.int64)
+        self.columns = {name: np.empty(rows, dtype=np.float64) for name in self.FIELDS}
+        self.size = 0
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def due(self, bar: int) -> bool:
+        """Whether bar position ``bar`` falls on the decimation grid"""
+        return bar % self.record_every == 0
+    
+    def reserve(self, rows: int):
+        """Make room for at least ``rows`` rows (keeps the recorded ones)"""
+        if rows <= len(self.rows):
+            return
+        size = self.size
+        rows = max(rows, 2 * len(self.rows))
+        grown = np.empty(rows, dtype=np.int64)
+        grown[:size] = self.rows[:size]
+        self.rows = grown
+        for name, column in self.columns.items():
+            grown = np.empty(rows, dtype=np.float64)
+            grown[:size] = column[:size]
+            self.columns[name] = grown
+    
+    @property
+    def last_bar(self) -> int:
+        """Bar position of the most recent row (-1 if empty)"""
+        return int(self.rows[self.size - 1]) if self.size else -1
+    
+    def record(self, bar: int, equity: float, balance: float, spot_qty: float,
+               spot_pnl: float, futures_short_qty: float, futures_pnl: float,
+               futures_margin: float, total_fees: float, funding_paid: float,
+               center_price: float, ema: float):
+        """Write one bar's state"""
+        i = self.size
+        if i == len(self.rows):
+            self.reserve(i + 1)
+        c = self.columns
+        self.rows[i] = bar
+        c['equity'][i] = equity
+        c['balance'][i] = balance
+        c['spot_qty'][i] = spot_qty
+        c['spot_pnl'][i] = spot_pnl
+        c['futures_short_qty'][i] = futures_short_qty
+        c['futures_pnl'][i] = futures_pnl
+        c['futures_margin'][i] = futures_margin
+        c['total_fees'][i] = total_fees
+        c['funding_paid'][i] = funding_paid
+        c['center_price'][i] = center_price
+        c['ema'][i] = ema
+        self.size = i + 1
+    
+    def to_frame(self, data: pd.DataFrame, positions: np.ndarray = None) -> pd.DataFrame:
+        """
+        Build the equity-curve DataFrame
+        
+        State columns are truncated views of the preallocated arrays, so
+        no per-field copy is made. Timestamp and OHLC columns are taken
+        from ``data`` at the recorded bar positions.
+        
+        Args:
+            data: OHLC DataFrame the run was made on (indexed by timestamp)
+            positions: Rows of ``data`` matching the recorded bars (default:
+                       the recorded bar positions themselves; pass
+                       ``arange(len)`` when ``data`` holds only those bars)
+        """
+        rows = self.rows[:self.size] if positions is None else positions
+        c = {name: col[:self.size] for name, col in self.columns.items()}
+        
+        close = data['close'].to_numpy(dtype=np.float64)[rows]
+        ohlc = {}
+        for name in ('open', 'high', 'low'):
+            if name in data.columns:
+                ohlc[name] = data[name].to_numpy(dtype=np.float64)[rows]
+            else:
+                ohlc[name] = close
+        
+        return pd.DataFrame({
+            'timestamp': data.index.take(rows),
+            'price': close,
+            'open': ohlc['open'],
+            'high': ohlc['high'],
+            'low': ohlc['low'],
+            'close': close,
+            'equity': c['equity'],
+            'balance': c['balance'],
+            'spot_qty': c['spot_qty'],
+            'spot_value': c['spot_qty'] * close,
+            'spot_pnl': c['spot_pnl'],
+            'futures_short_qty': c['futures_short_qty'],
+            'futures_pnl': c['futures_pnl'],
+            'futures_margin': c['futures_margin'],
+            'total_fees': c['total_fees'],
+            'funding_paid': c['funding_paid'],
+            'center_price': c['center_price'],
+            'ema': c['ema'],
+        }, copy=False)
@@ -1,10 +1,13 @@
 """
 Optimized Grid + Hedge Strategy with Binance Fees
 """
+import math
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple
 from core.indicators import ema, atr
+from core.grid_index import GridLevelIndex, TakeProfitIndex
+from core.trade_log import TradeLog, TradeType
 
 
 class BinanceFees:
@@ -19,15 +22,32 @@ class BinanceFees:
 
 class StrategyState:
     """Enhanced state with fees and funding tracking"""
+
+    # Fixed attribute set: faster attribute access in the per-bar loop
+    __slots__ = (
+        'balance', 'initial_balance',
+        'spot_qty', 'spot_entries', 'next_entry_id', 'grid_levels_bought',
+        'grid_index', 'take_profit_index',
+        'futures_short_qty', 'futures_entry_price', 'futures_margin', 'hedge_layers',
+        'trades', 'total_spot_fees', 'total_futures_fees', 'total_funding_paid',
+        'last_funding_time',
+        'center_price', 'grid_upper_bound', 'grid_lower_bound',
+    )
+
     def __init__(self, balance: float):
         self.balance = balance
         self.initial_balance = balance
         
         # Spot positions
         self.spot_qty = 0.0
-        self.spot_entries = []  # List of (price, qty)
+        self.spot_entries = {}  # entry id -> (price, qty), in entry order
+        self.next_entry_id = 0
         self.grid_levels_bought = set()
         
+        # Sorted indexes over grid levels and take-profit triggers
+        self.grid_index = GridLevelIndex()
+        self.take_profit_index = TakeProfitIndex()
+        
         # Futures positions
         self.futures_short_qty = 0.0
         self.futures_entry_price = 0.0
@@ -35,7 +55,7 @@ class StrategyState:
         self.hedge_layers = []
         
         # Tracking
-        self.trades = []
+        self.trades = TradeLog()
         self.total_spot_fees = 0.0
         self.total_futures_fees = 0.0
         self.total_funding_paid = 0.0
@@ -60,7 +80,7 @@ class StrategyState:
     def unrealized_pnl(self, price: float) -> Tuple[float, float]:
         """Get spot and futures unrealized PnL separately"""
         spot_pnl = 0.0
-        for entry_price, qty in self.spot_entries:
+        for entry_price, qty in self.spot_entries.values():
             spot_pnl += (price - entry_price) * qty
         
         futures_pnl = 0.0
@@ -86,6 +106,7 @@ class DynamicGridHedgeStrategy:
         self.state.center_price = center_price
         self.state.grid_lower_bound = center_price * (1 - step * levels / 2)
         self.state.grid_upper_bound = center_price * (1 + step * levels / 2)
+        self.state.grid_index.build(center_price, step, levels)
         
     def should_rebalance_grid(self, current_price: float, ema_price: float) -> bool:
         """Check if grid needs rebalancing"""
@@ -102,24 +123,19 @@ class DynamicGridHedgeStrategy:
         # Reset grid levels but keep positions
         self.state.grid_levels_bought.clear()
         
-        self.state.trades.append({
-            'timestamp': timestamp,
-            'type': 'GRID_REBALANCE',
-            'old_center': old_center,
-            'new_center': new_center,
-            'spot_qty': self.state.spot_qty,
-            'note': 'Grid rebalanced without closing positions'
-        })
+        self.state.trades.add(
+            TradeType.GRID_REBALANCE, timestamp,
+            old_center=old_center,
+            new_center=new_center,
+            spot_qty=self.state.spot_qty,
+            note='Grid rebalanced without closing positions'
+        )
     
     def grid_buy_logic(self, price: float, timestamp) -> bool:
-        """Grid buy at levels below center"""
-        step = self.config['grid_step']
-        levels = self.config['grid_levels']
-        
-        for i in range(1, levels + 1):
-            buy_price = self.state.center_price * (1 - i * step)
-            
-            if i not in self.state.grid_levels_bought and price <= buy_price and self.state.balance > 0:
+        """Grid buy at the nearest unfilled level crossed by price"""
+        # Levels 1..k have buy_price >= price (bisect on the level index)
+        for i in self.state.grid_index.crossed(price):
+            if i not in self.state.grid_levels_bought and self.state.balance > 0:
                 risk_cash = self.state.balance * self.config['grid_risk_per_order']
                 qty = risk_cash / price
                 fee = qty * price * self.fees.SPOT_TAKER
@@ -128,55 +144,60 @@ class DynamicGridHedgeStrategy:
                 if total_cost <= self.state.balance:
                     self.state.spot_qty += qty
                     self.state.balance -= total_cost
-                    self.state.spot_entries.append((price, qty))
+                    self.add_spot_entry(price, qty)
                     self.state.grid_levels_bought.add(i)
                     self.state.total_spot_fees += fee
                     
-                    self.state.trades.append({
-                        'timestamp': timestamp,
-                        'type': 'GRID_BUY',
-                        'level': i,
-                        'price': price,
-                        'qty': qty,
-                        'cost': qty * price,
-                        'fee': fee,
-                        'balance': self.state.balance
-                    })
+                    self.state.trades.add(
+                        TradeType.GRID_BUY, timestamp,
+                        level=i,
+                        price=price,
+                        qty=qty,
+                        cost=qty * price,
+                        fee=fee,
+                        balance=self.state.balance
+                    )
                     return True
         return False
     
+    def add_spot_entry(self, price: float, qty: float):
+        """Open a spot entry and index its take-profit trigger"""
+        take_profit_pct = self.config.get('grid_take_profit', 0.012)
+        entry_id = self.state.next_entry_id
+        self.state.next_entry_id += 1
+        self.state.spot_entries[entry_id] = (price, qty)
+        self.state.take_profit_index.add(entry_id, price * (1 + take_profit_pct))
+    
     def grid_sell_logic(self, price: float, timestamp) -> bool:
         """Grid sell with take profit"""
-        take_profit_pct = self.config.get('grid_take_profit', 0.012)
         sold = False
         
-        for entry_price, qty in self.state.spot_entries.copy():
-            if price >= entry_price * (1 + take_profit_pct):
-                revenue = qty * price
-                fee = revenue * self.fees.SPOT_TAKER
-                net_revenue = revenue - fee
-                profit = net_revenue - (qty * entry_price)
-                
-                self.state.balance += net_revenue
-                self.state.spot_qty -= qty
-                self.state.spot_entries.remove((entry_price, qty))
-                self.state.total_spot_fees += fee
-                
-                # Allow rebuy at this level
-                # (grid level will be available again)
-                
-                self.state.trades.append({
-                    'timestamp': timestamp,
-                    'type': 'GRID_SELL',
-                    'entry_price': entry_price,
-                    'exit_price': price,
-                    'qty': qty,
-                    'revenue': revenue,
-                    'fee': fee,
-                    'profit': profit,
-                    'balance': self.state.balance
-                })
-                sold = True
+        # Entries with trigger <= price, sold in entry order
+        for entry_id in sorted(self.state.take_profit_index.pop_hits(price)):
+            entry_price, qty = self.state.spot_entries.pop(entry_id)
+            revenue = qty * price
+            fee = revenue * self.fees.SPOT_TAKER
+            net_revenue = revenue - fee
+            profit = net_revenue - (qty * entry_price)
+            
+            self.state.balance += net_revenue
+            self.state.spot_qty -= qty
+            self.state.total_spot_fees += fee
+            
+            # Allow rebuy at this level
+            # (grid level will be available again)
+            
+            self.state.trades.add(
+                TradeType.GRID_SELL, timestamp,
+                entry_price=entry_price,
+                exit_price=price,
+                qty=qty,
+                revenue=revenue,
+                fee=fee,
+                profit=profit,
+                balance=self.state.balance
+            )
+            sold = True
         
         return sold
     
@@ -218,17 +239,16 @@ class DynamicGridHedgeStrategy:
                         self.state.total_futures_fees += fee
                         self.state.hedge_layers.append(threshold)
                         
-                        self.state.trades.append({
-                            'timestamp': timestamp,
-                            'type': 'HEDGE_OPEN',
-                            'layer': threshold,
-                            'price': price,
-                            'qty': qty,
-                            'leverage': leverage,
-                            'margin': margin_required,
-                            'fee': fee,
-                            'distance_atr': distance_atr
-                        })
+                        self.state.trades.add(
+                            TradeType.HEDGE_OPEN, timestamp,
+                            layer=threshold,
+                            price=price,
+                            qty=qty,
+                            leverage=leverage,
+                            margin=margin_required,
+                            fee=fee,
+                            distance_atr=distance_atr
+                        )
         
         # Close hedge layers when price recovers
         if self.state.hedge_layers and distance_atr < min(thresholds) - 0.5:
@@ -241,16 +261,15 @@ class DynamicGridHedgeStrategy:
                 self.state.balance += net_pnl + self.state.futures_margin - fee
                 self.state.total_futures_fees += fee
                 
-                self.state.trades.append({
-                    'timestamp': timestamp,
-                    'type': 'HEDGE_CLOSE_ALL',
-                    'exit_price': price,
-                    'qty': self.state.futures_short_qty,
-                    'entry_price': self.state.futures_entry_price,
-                    'pnl': pnl,
-                    'fee': fee,
-                    'net_pnl': net_pnl
-                })
+                self.state.trades.add(
+                    TradeType.HEDGE_CLOSE_ALL, timestamp,
+                    exit_price=price,
+                    qty=self.state.futures_short_qty,
+                    entry_price=self.state.futures_entry_price,
+                    pnl=pnl,
+                    fee=fee,
+                    net_pnl=net_pnl
+                )
                 
                 self.state.futures_short_qty = 0.0
                 self.state.futures_entry_price = 0.0
@@ -278,8 +297,14 @@ class DynamicGridHedgeStrategy:
     
     def execute(self, bar: pd.Series, ema_value: float, atr_value: float, timestamp):
         """Execute strategy for one bar"""
-        price = bar['close']
-        
+        if self.config.get('fill_mode', 'close') == 'ohlc':
+            self.execute_ohlc(bar['open'], bar['high'], bar['low'], bar['close'],
+                              ema_value, atr_value, timestamp)
+        else:
+            self.execute_price(bar['close'], ema_value, atr_value, timestamp)
+    
+    def execute_price(self, price: float, ema_value: float, atr_value: float, timestamp):
+        """Execute strategy for one bar given its close as a plain float"""
         # Initialize grid on first bar
         if self.state.center_price == 0:
             self.initialize_grid(ema_value)
@@ -298,6 +323,74 @@ class DynamicGridHedgeStrategy:
         # Execute hedge logic
         self.hedge_logic(price, atr_value, timestamp)
     
+    def execute_ohlc(self, open_price: float, high: float, low: float, close: float,
+                     ema_value: float, atr_value: float, timestamp):
+        """
+        Execute strategy for one bar along its intrabar path
+        
+        The bar is walked O->L->H->C when it closes up (O->H->L->C when it
+        closes down). Grid buys fill at the level prices crossed on the way
+        down, take-profits at their trigger prices on the way up, and hedge
+        layers open/close where the ATR distance crosses its threshold.
+        Funding and the rebalance check happen once, at the open.
+        """
+        # Initialize grid on first bar
+        if self.state.center_price == 0:
+            self.initialize_grid(ema_value)
+        
+        self.apply_funding_rate(timestamp, open_price)
+        
+        if self.should_rebalance_grid(open_price, ema_value):
+            self.rebalance_grid(ema_value, timestamp)
+        
+        if close >= open_price:
+            path = (open_price, low, high, close)
+        else:
+            path = (open_price, high, low, close)
+        
+        self._fill_at(open_price, atr_value, timestamp)
+        for start, end in zip(path, path[1:]):
+            for price in self._path_events(start, end, atr_value):
+                self._fill_at(price, atr_value, timestamp)
+            self._fill_at(end, atr_value, timestamp)
+    
+    def _fill_at(self, price: float, atr_value: float, timestamp):
+        """Run grid and hedge logic with the market at ``price``"""
+        self.grid_buy_logic(price, timestamp)
+        self.grid_sell_logic(price, timestamp)
+        self.hedge_logic(price, atr_value, timestamp)
+    
+    def _path_events(self, start: float, end: float, atr_value: float) -> List[float]:
+        """Trigger prices strictly between ``start`` and ``end``, in path order"""
+        if start == end:
+            return []
+        
+        low, high = min(start, end), max(start, end)
+        falling = bool(end < start)
+        events = []
+        
+        if falling:
+            events.extend(self.state.grid_index.prices_between(low, high))
+        else:
+            events.extend(self.state.take_profit_index.triggers_between(low, high))
+        
+        center = self.state.center_price
+        if atr_value > 0 and center > 0:
+            thresholds = self.config['hedge_atr_threshold']
+            # Hedge layers open strictly beyond center - threshold * ATR
+            if falling:
+                for threshold in thresholds:
+                    events.append(math.nextafter(center - threshold * atr_value, -math.inf))
+            # ...and close strictly inside the (min threshold - 0.5) ATR band
+            band = (min(thresholds) - 0.5) * atr_value
+            if band > 0:
+                upper, lower = center + band, center - band
+                events.append(math.nextafter(upper, -math.inf) if falling else upper)
+                events.append(lower if falling else math.nextafter(lower, math.inf))
+        
+        events = sorted({p for p in events if low < p < high}, reverse=falling)
+        return events
+    
     def get_state(self) -> Dict:
         """Get current state snapshot"""
         return {
@@ -307,7 +400,7 @@ class DynamicGridHedgeStrategy:
             'futures_margin': self.state.futures_margin,
             'spot_entries': len(self.state.spot_entries),
             'hedge_layers': self.state.hedge_layers.copy(),
-            'trades': self.state.trades.copy(),
+            'trades': self.state.trades,  # append-only log, shared (no copy)
             'total_fees': self.state.total_spot_fees + self.state.total_futures_fees,
             'total_funding': self.state.total_funding_paid,
             'center_price': self.state.center_price
@@ -0,0 +1,293 @@
+"""
+Incremental (O(1) per update) indicators for live and chunked data
+
+Each class keeps just enough state to produce the next value and
+reproduces the corresponding batch function in core.indicators,
+including pandas' rolling-mean and ewm arithmetic, so a stream seeded
+from history continues exactly where the batch series ends.
+"""
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+
+NAN = float('nan')
+
+
+def _div(a: float, b: float) -> float:
+    """IEEE division (x/0 -> +-inf, 0/0 -> nan) like pandas"""
+    if b == 0:
+        if a == 0 or a != a:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class RollingMean:
+    """Fixed-window mean with pandas' compensated add/remove arithmetic"""
+
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.count = 0
+        self._reset()
+
+    def _reset(self):
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.neg_ct = 0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same_count = 0
+        self.prev_value = NAN
+
+    def update(self, value: float) -> float:
+        """Add one observation and return the current window mean"""
+        if self.window == 1 or self.count == 0:
+            # pandas re-seeds its sums whenever the window does not overlap
+            self._reset()
+            self.prev_value = value
+        elif len(self.values) == self.window:
+            self._remove(self.values[0])
+
+        self.values.append(value)
+        self.count += 1
+        self._add(value)
+        return self.value
+
+    def _add(self, val: float):
+        if val == val:
+            self.nobs += 1
+            y = val - self.comp_add
+            t = self.sum_x + y
+            self.comp_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct += 1
+            if val == self.prev_value:
+                self.same_count += 1
+            else:
+                self.same_count = 1
+            self.prev_value = val
+
+    def _remove(self, val: float):
+        if val == val:
+            self.nobs -= 1
+            y = -val - self.comp_remove
+            t = self.sum_x + y
+            self.comp_remove = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct -= 1
+
+    def get_state(self) -> Dict:
+        """Plain-data snapshot (see ``set_state``)"""
+        return {
+            'window': self.window,
+            'values': list(self.values),
+            'count': self.count,
+            'nobs': self.nobs,
+            'sum_x': self.sum_x,
+            'neg_ct': self.neg_ct,
+            'comp_add': self.comp_add,
+            'comp_remove': self.comp_remove,
+            'same_count': self.same_count,
+            'prev_value': self.prev_value,
+        }
+
+    def set_state(self, state: Dict):
+        """Restore a ``get_state`` snapshot (continues bit-exactly)"""
+        if state['window'] != self.window:
+            raise ValueError(f"window mismatch: {state['window']} != {self.window}")
+        self.values = deque(state['values'], maxlen=self.window)
+        for name in ('count', 'nobs', 'sum_x', 'neg_ct', 'comp_add', 'comp_remove',
+                     'same_count', 'prev_value'):
+            setattr(self, name, state[name])
+
+    @property
+    def value(self) -> float:
+        """Current mean (NaN until the window is full)"""
+        nobs = self.nobs
+        if nobs >= self.window and nobs > 0:
+            result = self.sum_x / nobs
+            if self.same_count >= nobs:
+                result = self.prev_value
+            elif self.neg_ct == 0 and result < 0:
+                result = 0.0
+            elif self.neg_ct == nobs and result > 0:
+                result = 0.0
+            return result
+        return NAN
+
+
+class StreamingIndicator(ABC):
+    """Common helpers for streaming indicators"""
+
+    @abstractmethod
+    def update(self, value: float) -> float:
+        """Feed one value and return the indicator's new output"""
+
+    def update_many(self, values: Iterable[float]) -> np.ndarray:
+        """Feed a sequence (e.g. the historical download) and return every output"""
+        update = self.update
+        return np.array([update(v) for v in np.asarray(values, dtype=np.float64).tolist()],
+                        dtype=np.float64)
+
+
+class StreamingEMA(StreamingIndicator):
+    """EMA matching ``ema()`` (``ewm(span=period, adjust=False).mean()``)"""
+
+    def __init__(self, period: int):
+        self.period = period
+        com = (period - 1) / 2.0
+        self.alpha = 1.0 / (1.0 + com)
+        self.old_wt_factor = 1.0 - self.alpha
+        self.count = 0
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        """Add one price and return the EMA"""
+        self.count += 1
+        weighted = self.value
+
+        if weighted == weighted:
+            if value == value and weighted != value:
+                old_wt = self.old_wt_factor
+                weighted = old_wt * weighted + self.alpha * value
+                weighted /= (old_wt + self.alpha)
+        elif value == value:
+            weighted = value
+
+        self.value = weighted
+        return weighted
+
+    def get_state(self) -> Dict:
+        return {'period': self.period, 'count': self.count, 'value': self.value}
+
+    def set_state(self, state: Dict):
+        if state['period'] != self.period:
+            raise ValueError(f"EMA period mismatch: {state['period']} != {self.period}")
+        self.count = state['count']
+        self.value = state['value']
+
+
+class StreamingSMA(StreamingIndicator):
+    """SMA matching ``sma()`` (``rolling(period).mean()``)"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.mean = RollingMean(period)
+
+    @property
+    def count(self) -> int:
+        return self.mean.count
+
+    @property
+    def value(self) -> float:
+        return self.mean.value
+
+    def update(self, value: float) -> float:
+        """Add one price and return the SMA"""
+        return self.mean.update(value)
+
+
+class StreamingATR:
+    """ATR matching ``atr()``, updated once per closed candle"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.mean = RollingMean(period)
+        self.prev_close = NAN
+
+    @property
+    def count(self) -> int:
+        return self.mean.count
+
+    @property
+    def value(self) -> float:
+        return self.mean.value
+
+    def update(self, high: float, low: float, close: float) -> float:
+        """Add one candle and return the ATR"""
+        tr = high - low
+        if self.prev_close == self.prev_close:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        return self.mean.update(tr)
+
+    def get_state(self) -> Dict:
+        return {'period': self.period, 'prev_close': self.prev_close,
+                'mean': self.mean.get_state()}
+
+    def set_state(self, state: Dict):
+        if state['period'] != self.period:
+            raise ValueError(f"ATR period mismatch: {state['period']} != {self.period}")
+        self.prev_close = state['prev_close']
+        self.mean.set_state(state['mean'])
+
+    def update_many(self, high: Iterable[float], low: Iterable[float],
+                    close: Iterable[float]) -> np.ndarray:
+        """Feed candle arrays and return every output"""
+        columns = (np.asarray(c, dtype=np.float64).tolist() for c in (high, low, close))
+        update = self.update
+        return np.array([update(h, l, c) for h, l, c in zip(*columns)], dtype=np.float64)
+
+
+class StreamingRSI(StreamingIndicator):
+    """RSI matching ``rsi()`` (simple rolling means of gains and losses)"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.gains = RollingMean(period)
+        self.losses = RollingMean(period)
+        self.prev = NAN
+        self.value = NAN
+
+    @property
+    def count(self) -> int:
+        return self.gains.count
+
+    def update(self, value: float) -> float:
+        """Add one price and return the RSI"""
+        delta = value - self.prev
+        self.prev = value
+
+        # Same zero handling as delta.where(...): a missing delta counts as 0
+        gain = delta if delta > 0 else 0.0
+        loss = -(delta if delta < 0 else 0.0)
+
+        rs = _div(self.gains.update(gain), self.losses.update(loss))
+        self.value = 100 - _div(100, 1 + rs)
+        return self.value
+
+
+class StreamingMACD:
+    """MACD matching ``macd()``: returns (macd line, signal line, histogram)"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+        self.value = (NAN, NAN, NAN)
+
+    @property
+    def count(self) -> int:
+        return self.fast.count
+
+    def update(self, value: float) -> Tuple[float, float, float]:
+        """Add one price and return (macd, signal, histogram)"""
+        macd_line = self.fast.update(value) - self.slow.update(value)
+        signal_line = self.signal.update(macd_line)
+        self.value = (macd_line, signal_line, macd_line - signal_line)
+        return self.value
+
+    def update_many(self, values: Iterable[float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Feed a sequence and return the three output arrays"""
+        rows = [self.update(v) for v in np.asarray(values, dtype=np.float64).tolist()]
+        out = np.array(rows, dtype=np.float64).reshape(-1, 3)
+        return out[:, 0], out[:, 1], out[:, 2]
@@ -0,0 +1,214 @@
+"""
+Parallel parameter sweep over strategy configs
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.strategy import DynamicGridHedgeStrategy
+from core.backtest import BacktestEngine
+from core.performance import PerformanceAnalyzer
+from core.kernel import run_kernel_backtest, NUMBA_AVAILABLE
+
+
+OHLC_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Per-worker OHLC frame, attached once from shared memory by _init_worker
+_WORKER_DATA = None
+_WORKER_SHM = None
+
+
+class SharedOHLC:
+    """OHLC(V) data placed once in a shared-memory block for pool workers"""
+
+    def __init__(self, data: pd.DataFrame):
+        """
+        Args:
+            data: OHLC DataFrame indexed by timestamp
+        """
+        self.columns = tuple(c for c in OHLC_COLUMNS if c in data.columns)
+        self.length = len(data)
+        self.tz = getattr(data.index, 'tz', None)
+
+        nbytes = 8 * self.length * (len(self.columns) + 1)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 8))
+
+        timestamps, values = self._views(self.shm.buf)
+        timestamps[:] = pd.DatetimeIndex(data.index).as_unit('ns').asi8
+        for i, name in enumerate(self.columns):
+            values[i] = data[name].to_numpy(dtype=np.float64)
+
+    @property
+    def handle(self) -> Dict:
+        """Picklable description used by workers to attach"""
+        return {
+            'name': self.shm.name,
+            'columns': self.columns,
+            'length': self.length,
+            'tz': self.tz,
+        }
+
+    def _views(self, buf):
+        return _views(buf, self.length, len(self.columns))
+
+    def close(self):
+        """Release and unlink the shared block"""
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _views(buf, length: int, ncols: int):
+    """Timestamp and column-major value views over a shared buffer"""
+    timestamps = np.ndarray((length,), dtype=np.int64, buffer=buf)
+    values = np.ndarray((ncols, length), dtype=np.float64, buffer=buf, offset=8 * length)
+    return timestamps, values
+
+
+def attach_ohlc(handle: Dict):
+    """
+    Attach to a ``SharedOHLC`` block and wrap it as a DataFrame
+
+    Returns:
+        (DataFrame, SharedMemory) - keep the SharedMemory referenced for as
+        long as the DataFrame is used
+    """
+    shm = shared_memory.SharedMemory(name=handle['name'])
+    timestamps, values = _views(shm.buf, handle['length'], len(handle['columns']))
+
+    index = pd.to_datetime(timestamps, unit='ns')
+    if handle['tz'] is not None:
+        index = index.tz_localize('UTC').tz_convert(handle['tz'])
+    index.name = 'timestamp'
+
+    data = pd.DataFrame({name: values[i] for i, name in enumerate(handle['columns'])},
+                        index=index, copy=False)
+    return data, shm
+
+
+def _init_worker(handle: Dict):
+    """Pool initializer: attach the OHLC once per worker process"""
+    global _WORKER_DATA, _WORKER_SHM
+    _WORKER_DATA, _WORKER_SHM = attach_ohlc(handle)
+
+
+def expand_grid(base_config: Dict, ranges: Dict[str, List]) -> List[Dict]:
+    """
+    Cartesian product of parameter ranges applied on top of a base config
+
+    Args:
+        base_config: Config every run starts from (e.g. CONFIGS['adaptive'])
+        ranges: Parameter name -> list of values, e.g.
+                {'grid_step': [0.012, 0.016], 'hedge_sizes': [[0.05, 0.08, 0.12]]}
+
+    Returns:
+        One config dict per combination
+    """
+    names = list(ranges)
+    configs = []
+    for values in itertools.product(*(ranges[name] for name in names)):
+        config = dict(base_config)
+        config.update(zip(names, values))
+        configs.append(config)
+    return configs
+
+
+def backtest_config(data: pd.DataFrame, config: Dict, use_kernel: bool = NUMBA_AVAILABLE,
+                    ema_values: Optional[np.ndarray] = None,
+                    atr_values: Optional[np.ndarray] = None) -> Dict:
+    """Backtest one config quietly and return the engine results"""
+    if use_kernel and config.get('fill_mode', 'close') == 'close':
+        return run_kernel_backtest(data, config, ema_values=ema_values,
+                                   atr_values=atr_values, verbose=False)
+    strategy = DynamicGridHedgeStrategy(config)
+    return BacktestEngine(strategy, data, config, fast=True, verbose=False,
+                          ema_values=ema_values, atr_values=atr_values).run()
+
+
+def run_config(data: pd.DataFrame, config: Dict, use_kernel: bool = NUMBA_AVAILABLE,
+               ema_values: Optional[np.ndarray] = None,
+               atr_values: Optional[np.ndarray] = None) -> Dict:
+    """Backtest one config quietly and return its metrics"""
+    results = backtest_config(data, config, use_kernel, ema_values, atr_values)
+
+    metrics = PerformanceAnalyzer(results, config).calculate_metrics()
+    metrics['final_equity'] = results['final_equity']
+    metrics['bars'] = len(results['equity_curve'])
+    return metrics
+
+
+def _run_task(task):
+    config, use_kernel = task
+    return run_config(_WORKER_DATA, config, use_kernel)
+
+
+def run_sweep(data: pd.DataFrame, base_config: Dict, ranges: Dict[str, List],
+              workers: Optional[int] = None, metric: str = 'roi',
+              use_kernel: bool = NUMBA_AVAILABLE, chunksize: int = 4) -> pd.DataFrame:
+    """
+    Backtest every combination of ``ranges`` across all cores
+
+    The OHLC is copied once into shared memory; each worker attaches to it
+    in its initializer, so tasks only carry the config dict.
+
+    Args:
+        data: OHLC DataFrame indexed by timestamp
+        base_config: Config the ranges are applied to
+        ranges: Parameter name -> list of values (see ``expand_grid``)
+        workers: Worker processes (default: all cores; 1 runs in-process)
+        metric: ``calculate_metrics`` key to rank by (higher is better)
+        use_kernel: Use the compiled kernel instead of ``BacktestEngine``
+        chunksize: Configs sent to a worker per round trip
+
+    Returns:
+        Ranked table: swept parameters + metrics, best first
+    """
+    configs = expand_grid(base_config, ranges)
+    if 'backtest_days' not in base_config:
+        days = (data.index[-1] - data.index[0]).total_seconds() / 86400
+        for config in configs:
+            config['backtest_days'] = max(days, 1)
+
+    workers = workers or os.cpu_count() or 1
+    print(f"Sweeping {len(configs)} configs on {len(data)} bars with {workers} workers...")
+
+    if workers == 1:
+        metrics = [run_config(data, config, use_kernel) for config in configs]
+    else:
+        with SharedOHLC(data) as shared:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(shared.handle,)) as pool:
+                tasks = [(config, use_kernel) for config in configs]
+                metrics = list(pool.map(_run_task, tasks, chunksize=chunksize))
+
+    return rank_results(configs, metrics, list(ranges), metric)
+
+
+def rank_results(configs: List[Dict], metrics: List[Dict], params: List[str],
+                 metric: str = 'roi') -> pd.DataFrame:
+    """Join swept parameters with their metrics and sort best-first"""
+    rows = []
+    for config, result in zip(configs, metrics):
+        row = {}
+        for name in params:
+            value = config[name]
+            row[name] = tuple(value) if isinstance(value, list) else value
+        row.update(result)
+        rows.append(row)
+
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    table = table.sort_values(metric, ascending=False, kind='stable').reset_index(drop=True)
+    table.insert(0, 'rank', np.arange(1, len(table) + 1))
+    return table
@@ -0,0 +1,372 @@
+"""
+Typed, append-only trade log with per-type columnar storage
+
+Each trade type has its own table of float64 columns (one per field the
+strategy records for that type), so every GRID_SELL profit, say, is one
+contiguous array and per-type counts/columns are O(1) lookups. A global
+order (type code + row in its table + timestamp) keeps the interleaving,
+and ``to_frame()`` rebuilds exactly the DataFrame the old list of dicts
+produced.
+"""
+from enum import IntEnum
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class TradeType(IntEnum):
+    """Trade type codes (shared with the compiled kernel's event codes)"""
+    GRID_REBALANCE = 0
+    GRID_BUY = 1
+    GRID_SELL = 2
+    HEDGE_OPEN = 3
+    HEDGE_CLOSE_ALL = 4
+
+
+# Fields per type, in the order the strategy has always written them
+TRADE_FIELDS = {
+    TradeType.GRID_BUY: ('level', 'price', 'qty', 'cost', 'fee', 'balance'),
+    TradeType.GRID_SELL: ('entry_price', 'exit_price', 'qty', 'revenue', 'fee', 'profit', 'balance'),
+    TradeType.HEDGE_OPEN: ('layer', 'price', 'qty', 'leverage', 'margin', 'fee', 'distance_atr'),
+    TradeType.HEDGE_CLOSE_ALL: ('exit_price', 'qty', 'entry_price', 'pnl', 'fee', 'net_pnl'),
+    TradeType.GRID_REBALANCE: ('old_center', 'new_center', 'spot_qty', 'note'),
+}
+
+# Non-numeric fields (kept as Python lists)
+TEXT_FIELDS = frozenset({'note'})
+
+TYPE_NAMES = {t: t.name for t in TradeType}
+TYPE_CODES = {t.name: t for t in TradeType}
+
+# One fixed-size record per trade for append-only files: type code, timestamp
+# and the type's fields in TRADE_FIELDS order (a text field holds the index of
+# its value among that field's distinct values)
+RECORD_WIDTH = max(len(fields) for fields in TRADE_FIELDS.values())
+RECORD_DTYPE = np.dtype([('type', 'i1'), ('timestamp', '<i8'), ('fields', '<f8', (RECORD_WIDTH,))])
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    """Copy ``array`` into one with at least ``size`` slots (doubling)"""
+    grown = np.empty(max(size, 2 * len(array), 16), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class TypeTable:
+    """Columns of one trade type"""
+
+    __slots__ = ('trade_type', 'fields', 'columns', 'positions', 'ints', 'size')
+
+    def __init__(self, trade_type: TradeType, capacity: int = 16):
+        self.trade_type = trade_type
+        self.fields = TRADE_FIELDS[trade_type]
+        self.columns = {name: [] if name in TEXT_FIELDS else np.empty(capacity, dtype=np.float64)
+                        for name in self.fields}
+        self.positions = np.empty(capacity, dtype=np.int64)     # rows in the global order
+        self.ints = {name: True for name in self.fields if name not in TEXT_FIELDS}
+        self.size = 0
+
+    def add(self, position: int, fields: Dict):
+        i = self.size
+        if i == len(self.positions):
+            self.positions = _grow(self.positions, i + 1)
+            for name, column in self.columns.items():
+                if name not in TEXT_FIELDS:
+                    self.columns[name] = _grow(column, i + 1)
+        self.positions[i] = position
+        ints = self.ints
+        for name, column in self.columns.items():
+            value = fields[name]
+            if name in TEXT_FIELDS:
+                column.append(value)
+            else:
+                column[i] = value
+                if ints[name] and (type(value) is bool or not isinstance(value, (int, np.integer))):
+                    ints[name] = False
+        self.size = i + 1
+
+    def column(self, name: str) -> np.ndarray:
+        """Values of one field (a view; read-only by convention)"""
+        column = self.columns[name]
+        return np.array(column, dtype=object) if name in TEXT_FIELDS else column[:self.size]
+
+    def value(self, name: str, i: int):
+        value = self.columns[name][i]
+        if name in TEXT_FIELDS:
+            return value
+        return int(value) if self.ints[name] else float(value)
+
+
+class TradeLog:
+    """Append-only trade log (replaces the list of trade dicts)"""
+
+    RECORD_DTYPE = RECORD_DTYPE     # layout of ``to_records`` (checkpoint side files)
+
+    def __init__(self, capacity: int = 256):
+        self._types = np.empty(capacity, dtype=np.int8)
+        self._slots = np.empty(capacity, dtype=np.int64)
+        self._timestamps = np.empty(capacity, dtype=np.int64)   # ns since epoch (UTC)
+        self.size = 0
+        self.unit = 'ns'
+        self.tz = None
+        self.tables = {t: TypeTable(t) for t in TradeType}
+        self._first_seen: List[TradeType] = []
+
+    # ---------------------------------------------------------------- writing
+
+    def add(self, trade_type: TradeType, timestamp, **fields):
+        """Record one trade; ``fields`` must be exactly ``TRADE_FIELDS[trade_type]``"""
+        i = self.size
+        if i == len(self._types):
+            self._types = _grow(self._types, i + 1)
+            self._slots = _grow(self._slots, i + 1)
+            self._timestamps = _grow(self._timestamps, i + 1)
+
+        if not isinstance(timestamp, pd.Timestamp):
+            timestamp = pd.Timestamp(timestamp)
+        if i == 0:
+            self.unit = timestamp.unit
+            self.tz = timestamp.tz
+
+        table = self.tables[trade_type]
+        if table.size == 0:
+            self._first_seen.append(trade_type)
+        self._types[i] = trade_type
+        self._slots[i] = table.size
+        self._timestamps[i] = timestamp.value
+        table.add(i, fields)
+        self.size = i + 1
+
+    @classmethod
+    def from_columns(cls, types: np.ndarray, timestamps: np.ndarray,
+                     columns: Dict[TradeType, Dict[str, np.ndarray]],
+                     unit: str = 'ns', tz=None, ints=()) -> 'TradeLog':
+        """
+        Build a log in bulk (e.g. from the compiled kernel's event buffer)
+
+        Args:
+            types: Type code per trade, in order
+            timestamps: int64 ns (UTC) per trade
+            columns: Per type, field -> values for that type's trades in order
+                     (text fields may be a single value repeated for every row)
+            unit, tz: How timestamps are presented (as ``pd.Timestamp`` unit/tz)
+            ints: Fields holding integers
+        """
+        n = len(types)
+        log = cls(max(n, 1))
+        log.size = n
+        log.unit, log.tz = unit, tz
+        log._types[:n] = types
+        log._timestamps[:n] = timestamps
+
+        for code in pd.unique(np.asarray(types)):
+            trade_type = TradeType(int(code))
+            positions = np.flatnonzero(types == code)
+            table = log.tables[trade_type]
+            table.positions = positions.astype(np.int64)
+            table.size = len(positions)
+            log._slots[positions] = np.arange(len(positions))
+            for name in table.fields:
+                values = columns[trade_type][name]
+                if name in TEXT_FIELDS:
+                    table.columns[name] = (list(values) if isinstance(values, (list, np.ndarray))
+                                           else [values] * len(positions))
+                else:
+                    table.columns[name] = np.array(values, dtype=np.float64)
+                    table.ints[name] = name in ints
+            log._first_seen.append(trade_type)
+        log._first_seen.sort(key=lambda t: log.tables[t].positions[0])
+        return log
+
+    # ---------------------------------------------------------------- reading
+
+    def __len__(self) -> int:
+        return self.size
+
+    def count(self, trade_type: TradeType) -> int:
+        """Number of trades of one type (O(1))"""
+        return self.tables[trade_type].size
+
+    def positions(self, trade_type: TradeType) -> np.ndarray:
+        """Global row numbers of one type's trades"""
+        table = self.tables[trade_type]
+        return table.positions[:table.size]
+
+    def column(self, name: str, trade_type: TradeType) -> np.ndarray:
+        """One field of one type's trades (contiguous, no filtering)"""
+        return self.tables[trade_type].column(name)
+
+    def timestamps(self, trade_type: Optional[TradeType] = None) -> pd.DatetimeIndex:
+        stamps = self._timestamps[:self.size]
+        if trade_type is not None:
+            stamps = stamps[self.positions(trade_type)]
+        return self._to_datetime(stamps)
+
+    def _to_datetime(self, ns: np.ndarray) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(ns.astype('datetime64[ns]')).as_unit(self.unit)
+        if self.tz is not None:
+            index = index.tz_localize('UTC').tz_convert(self.tz)
+        return index
+
+    def __getitem__(self, i: int) -> Dict:
+        """Trade ``i`` as the dict the strategy used to store"""
+        if i < 0:
+            i += self.size
+        if not 0 <= i < self.size:
+            raise IndexError("trade index out of range")
+        trade_type = TradeType(int(self._types[i]))
+        table = self.tables[trade_type]
+        slot = int(self._slots[i])
+        trade = {'timestamp': self._to_datetime(self._timestamps[i:i + 1])[0],
+                 'type': trade_type.name}
+        for name in table.fields:
+            trade[name] = table.value(name, slot)
+        return trade
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(self.size):
+            yield self[i]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Trades as a DataFrame, identical to ``pd.DataFrame(list_of_dicts)``
+
+        Columns appear in first-seen order; a field missing from some rows
+        is NaN (so integer fields become float unless every row has them).
+        """
+        n = self.size
+        if n == 0:
+            return pd.DataFrame()
+
+        types = self._types[:n]
+        data = {
+            'timestamp': self._to_datetime(self._timestamps[:n]),
+            'type': np.array([t.name for t in TradeType], dtype=object)[types],
+        }
+        present = [t for t in self._first_seen if self.tables[t].size]
+        for trade_type in present:
+            for name in self.tables[trade_type].fields:
+                if name in data:
+                    continue
+                owners = [t for t in present if name in self.tables[t].fields]
+                if name in TEXT_FIELDS:
+                    values = np.full(n, np.nan, dtype=object)
+                    for t in owners:
+                        values[self.positions(t)] = self.tables[t].column(name)
+                    data[name] = values
+                    continue
+                full = sum(self.tables[t].size for t in owners) == n
+                if full and all(self.tables[t].ints[name] for t in owners):
+                    values = np.empty(n, dtype=np.int64)
+                else:
+                    values = np.full(n, np.nan)
+                for t in owners:
+                    values[self.positions(t)] = self.tables[t].column(name)
+                data[name] = values
+
+        frame = pd.DataFrame(data)
+        for name in ('type',) + tuple(TEXT_FIELDS & set(data)):
+            frame[name] = frame[name].infer_objects()
+        return frame
+
+    # ------------------------------------------------------------ persistence
+
+    def to_arrays(self) -> Dict:
+        """(meta, arrays) for binary snapshots"""
+        n = self.size
+        arrays = {
+            'types': self._types[:n].copy(),
+            'timestamps': self._timestamps[:n].copy(),
+        }
+        ints = []
+        for trade_type, table in self.tables.items():
+            for name in table.fields:
+                values = table.column(name)
+                if name in TEXT_FIELDS:
+                    values = np.array([str(v) for v in values], dtype=str)
+                elif table.ints[name] and table.size:
+                    ints.append(f"{trade_type.name}.{name}")
+                arrays[f"{trade_type.name}.{name}"] = values
+        meta = {'unit': self.unit, 'tz': str(self.tz) if self.tz is not None else None,
+                'ints': ints}
+        return {'meta': meta, 'arrays': arrays}
+
+    def texts(self) -> Dict[str, List[str]]:
+        """
+        Distinct values of each text field ("TYPE.field" -> values), in
+        first-seen order, so indexes into them stay valid as the log grows
+        """
+        return {f"{trade_type.name}.{name}": list(dict.fromkeys(str(v) for v in table.columns[name]))
+                for trade_type, table in self.tables.items()
+                for name in table.fields if name in TEXT_FIELDS}
+
+    def to_records(self, start: int = 0) -> Dict:
+        """
+        Trades ``start:`` as ``RECORD_DTYPE`` rows plus the meta to read them back
+
+        Appending ``to_records(n)['records']`` to the records of the first
+        ``n`` trades gives the records of the whole log.
+        """
+        n = self.size
+        types = self._types[start:n]
+        slots = self._slots[start:n]
+        records = np.zeros(n - start, dtype=RECORD_DTYPE)
+        records['type'] = types
+        records['timestamp'] = self._timestamps[start:n]
+        texts = self.texts()
+        ints = []
+        for trade_type, table in self.tables.items():
+            for name in table.fields:
+                if name not in TEXT_FIELDS and table.ints[name] and table.size:
+                    ints.append(f"{trade_type.name}.{name}")
+            rows = np.flatnonzero(types == trade_type)
+            if not len(rows):
+                continue
+            fields = np.zeros((len(rows), RECORD_WIDTH))
+            for j, name in enumerate(table.fields):
+                if name in TEXT_FIELDS:
+                    index = {text: k for k, text in enumerate(texts[f"{trade_type.name}.{name}"])}
+                    fields[:, j] = [index[str(table.columns[name][s])] for s in slots[rows].tolist()]
+                else:
+                    fields[:, j] = table.columns[name][slots[rows]]
+            records['fields'][rows] = fields
+        meta = {'unit': self.unit, 'tz': str(self.tz) if self.tz is not None else None,
+                'ints': ints, 'texts': texts}
+        return {'meta': meta, 'records': records}
+
+    @classmethod
+    def from_records(cls, meta: Dict, records: np.ndarray) -> 'TradeLog':
+        """Inverse of ``to_records`` (over the records of the whole log)"""
+        types = records['type']
+        columns = {}
+        for trade_type in TradeType:
+            fields = records['fields'][types == trade_type]
+            columns[trade_type] = {}
+            for j, name in enumerate(TRADE_FIELDS[trade_type]):
+                if name in TEXT_FIELDS:
+                    texts = meta['texts'][f"{trade_type.name}.{name}"]
+                    columns[trade_type][name] = [texts[int(k)] for k in fields[:, j].tolist()]
+                else:
+                    columns[trade_type][name] = fields[:, j]
+        log = cls.from_columns(types.astype(np.int8), records['timestamp'].astype(np.int64), columns,
+                               unit=meta['unit'], tz=meta['tz'])
+        for key in meta['ints']:
+            type_name, name = key.split('.')
+            log.tables[TYPE_CODES[type_name]].ints[name] = True
+        return log
+
+    @classmethod
+    def from_arrays(cls, meta: Dict, arrays: Dict[str, np.ndarray]) -> 'TradeLog':
+        """Inverse of ``to_arrays``"""
+        columns = {t: {name: arrays[f"{t.name}.{name}"] for name in TRADE_FIELDS[t]}
+                   for t in TradeType}
+        for t in TradeType:
+            if 'note' in columns[t]:
+                columns[t]['note'] = columns[t]['note'].tolist()
+        log = cls.from_columns(arrays['types'], arrays['timestamps'], columns,
+                               unit=meta['unit'], tz=meta['tz'])
+        for key in meta['ints']:
+            type_name, name = key.split('.')
+            log.tables[TYPE_CODES[type_name]].ints[name] = True
+        return log
@@ -0,0 +1,265 @@
+"""
+Walk-forward optimisation: tune on rolling train windows, trade the next window
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.indicator_cache import get_indicator_cache
+from core.kernel import NUMBA_AVAILABLE
+from core.sweep import SharedOHLC, attach_ohlc, expand_grid, rank_results, run_config, backtest_config
+
+
+# Per-worker OHLC frame and indicator arrays, set up once by _init_worker
+_WORKER_DATA = None
+_WORKER_SHM = None
+_WORKER_INDICATORS = None
+
+
+class FullSeriesIndicators:
+    """
+    EMA/ATR arrays computed once over the whole series and sliced per fold
+
+    Slicing the full-series arrays (instead of recomputing on each window)
+    gives every fold a warmed-up EMA/ATR from its first bar, exactly as the
+    indicators looked at that point in the full history.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        self.data = data
+        self._arrays: Dict[Tuple, np.ndarray] = {}
+
+    def ema(self, period: int) -> np.ndarray:
+        key = ('ema', period)
+        if key not in self._arrays:
+            self._arrays[key] = get_indicator_cache().ema(self.data['close'], period)
+        return self._arrays[key]
+
+    def atr(self, period: int) -> np.ndarray:
+        key = ('atr', period)
+        if key not in self._arrays:
+            self._arrays[key] = get_indicator_cache().atr(self.data['high'], self.data['low'],
+                                                          self.data['close'], period)
+        return self._arrays[key]
+
+    def window(self, config: Dict, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(EMA, ATR) for bars ``start:stop`` with the config's periods"""
+        return (self.ema(config['ema_period'])[start:stop],
+                self.atr(config['atr_period'])[start:stop])
+
+
+def make_folds(index: pd.DatetimeIndex, train_days: float, test_days: float,
+               step_days: Optional[float] = None) -> List[Dict]:
+    """
+    Split a timestamp index into rolling train/test folds
+
+    Args:
+        index: Sorted DatetimeIndex of the OHLC data
+        train_days: Length of each train window
+        test_days: Length of each out-of-sample window (directly after its train window)
+        step_days: Shift between folds (default: ``test_days``, so test windows tile;
+                   at least ``test_days``)
+
+    Returns:
+        List of {'fold', 'train': (start, stop), 'test': (start, stop)} bar positions
+
+    Raises:
+        ValueError: ``step_days < test_days`` (overlapping test windows would
+                    count bars twice in the stitched out-of-sample account)
+    """
+    step_days = step_days or test_days
+    if step_days < test_days:
+        raise ValueError(f"step_days ({step_days}) must be >= test_days ({test_days}): "
+                         f"test windows may not overlap")
+    first, last = index[0], index[-1]
+    train, test, step = (pd.Timedelta(days=d) for d in (train_days, test_days, step_days))
+
+    folds = []
+    start_time = first
+    while start_time + train < last:
+        train_start = index.searchsorted(start_time)
+        test_start = index.searchsorted(start_time + train)
+        test_stop = index.searchsorted(start_time + train + test)
+        if test_stop - test_start > 0 and test_start - train_start > 0:
+            folds.append({
+                'fold': len(folds),
+                'train': (int(train_start), int(test_start)),
+                'test': (int(test_start), int(test_stop)),
+            })
+        start_time += step
+    return folds
+
+
+def _span_days(data: pd.DataFrame, start: int, stop: int) -> float:
+    days = (data.index[stop - 1] - data.index[start]).total_seconds() / 86400
+    return max(days, 1)
+
+
+def _train(data: pd.DataFrame, indicators: FullSeriesIndicators, start: int, stop: int,
+           config: Dict, use_kernel: bool) -> Dict:
+    """Metrics of one config on one train window"""
+    config = dict(config, backtest_days=_span_days(data, start, stop))
+    ema_values, atr_values = indicators.window(config, start, stop)
+    return run_config(data.iloc[start:stop], config, use_kernel, ema_values, atr_values)
+
+
+def _init_worker(handle: Dict):
+    """Pool initializer: attach the OHLC once per worker process"""
+    global _WORKER_DATA, _WORKER_SHM, _WORKER_INDICATORS
+    _WORKER_DATA, _WORKER_SHM = attach_ohlc(handle)
+    _WORKER_INDICATORS = FullSeriesIndicators(_WORKER_DATA)
+
+
+def _run_task(task):
+    start, stop, config, use_kernel = task
+    return _train(_WORKER_DATA, _WORKER_INDICATORS, start, stop, config, use_kernel)
+
+
+def _config_key(config: Dict, params: List[str]) -> Tuple:
+    return tuple(tuple(config[p]) if isinstance(config[p], list) else config[p] for p in params)
+
+
+class WalkForward:
+    """Rolling train/test optimisation with stitched out-of-sample equity"""
+
+    def __init__(self, data: pd.DataFrame, base_config: Dict, ranges: Dict[str, List],
+                 train_days: float, test_days: float, step_days: Optional[float] = None,
+                 metric: str = 'roi', use_kernel: bool = NUMBA_AVAILABLE):
+        """
+        Args:
+            data: OHLC DataFrame indexed by timestamp
+            base_config: Config the ranges are applied to
+            ranges: Parameter name -> list of values (see ``expand_grid``)
+            train_days: Train window length
+            test_days: Out-of-sample window length
+            step_days: Shift between folds (default: ``test_days``; no less)
+            metric: ``calculate_metrics`` key to optimise (higher is better)
+            use_kernel: Use the compiled kernel where possible
+        """
+        self.data = data
+        self.base_config = base_config
+        self.ranges = ranges
+        self.params = list(ranges)
+        self.metric = metric
+        self.use_kernel = use_kernel
+        self.folds = make_folds(data.index, train_days, test_days, step_days)
+        self.indicators = FullSeriesIndicators(data)
+        # (train start, train stop, swept values) -> metrics, reused across runs
+        self._train_cache: Dict[Tuple, Dict] = {}
+
+    def optimise(self, workers: Optional[int] = None, chunksize: int = 4) -> List[pd.DataFrame]:
+        """
+        Backtest every config on every train window (all folds in one pool)
+
+        Returns:
+            One ranked table per fold (see ``rank_results``)
+        """
+        configs = expand_grid(self.base_config, self.ranges)
+        tasks, keys = [], {}
+        for fold in self.folds:
+            start, stop = fold['train']
+            for config in configs:
+                key = (start, stop, _config_key(config, self.params))
+                if key not in self._train_cache and key not in keys:
+                    tasks.append((start, stop, config, self.use_kernel))
+                    keys[key] = None
+
+        workers = workers or os.cpu_count() or 1
+        print(f"Walk-forward: {len(self.folds)} folds x {len(configs)} configs "
+              f"({len(tasks)} train runs, {workers} workers)...")
+
+        if not tasks:
+            metrics = []
+        elif workers == 1:
+            metrics = [_train(self.data, self.indicators, *task) for task in tasks]
+        else:
+            with SharedOHLC(self.data) as shared:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                         initargs=(shared.handle,)) as pool:
+                    metrics = list(pool.map(_run_task, tasks, chunksize=chunksize))
+        self._train_cache.update(zip(keys, metrics))
+
+        tables = []
+        for fold in self.folds:
+            start, stop = fold['train']
+            fold_metrics = [self._train_cache[(start, stop, _config_key(c, self.params))]
+                            for c in configs]
+            tables.append(rank_results(configs, fold_metrics, self.params, self.metric))
+        return tables
+
+    def run(self, workers: Optional[int] = None) -> Dict:
+        """
+        Optimise each train window, trade its best config on the test window
+
+        Each test window starts with the equity the previous one ended with,
+        so the stitched curve is one continuous out-of-sample account.
+
+        Returns:
+            Dict with 'folds' (per-fold summary), 'equity_curve' and 'trades'
+            (stitched, with a 'fold' column), 'train_tables', 'initial_capital',
+            'final_equity'
+        """
+        tables = self.optimise(workers)
+        capital = self.base_config['initial_capital']
+        curves, trades, summary = [], [], []
+
+        for fold, table in zip(self.folds, tables):
+            best = table.iloc[0]
+            config = dict(self.base_config)
+            for name in self.params:
+                value = best[name]
+                config[name] = list(value) if isinstance(value, tuple) else value
+
+            start, stop = fold['test']
+            config['initial_capital'] = capital
+            config['backtest_days'] = _span_days(self.data, start, stop)
+            ema_values, atr_values = self.indicators.window(config, start, stop)
+            results = backtest_config(self.data.iloc[start:stop], config, self.use_kernel,
+                                      ema_values, atr_values)
+
+            curve = results['equity_curve'].copy()
+            curve['fold'] = fold['fold']
+            curves.append(curve)
+            if len(results['trades']):
+                fold_trades = results['trades'].copy()
+                fold_trades['fold'] = fold['fold']
+                trades.append(fold_trades)
+
+            test_roi = (results['final_equity'] - capital) / capital * 100
+            row = {
+                'fold': fold['fold'],
+                'train_start': self.data.index[fold['train'][0]],
+                'test_start': self.data.index[start],
+                'test_end': self.data.index[stop - 1],
+            }
+            row.update({name: best[name] for name in self.params})
+            row[f'train_{self.metric}'] = best[self.metric]
+            row['test_roi'] = test_roi
+            row['start_equity'] = capital
+            row['end_equity'] = results['final_equity']
+            summary.append(row)
+
+            print(f"Fold {fold['fold']}: train {self.metric}={best[self.metric]:.2f} "
+                  f"-> test ROI {test_roi:+.2f}%")
+            capital = results['final_equity']
+
+        return {
+            'folds': pd.DataFrame(summary),
+            'equity_curve': pd.concat(curves, ignore_index=True) if curves else pd.DataFrame(),
+            'trades': pd.concat(trades, ignore_index=True) if trades else pd.DataFrame(),
+            'train_tables': tables,
+            'initial_capital': self.base_config['initial_capital'],
+            'final_equity': capital,
+        }
+
+
+def run_walk_forward(data: pd.DataFrame, base_config: Dict, ranges: Dict[str, List],
+                     train_days: float, test_days: float, step_days: Optional[float] = None,
+                     metric: str = 'roi', workers: Optional[int] = None,
+                     use_kernel: bool = NUMBA_AVAILABLE) -> Dict:
+    """One-shot ``WalkForward(...).run()``"""
+    return WalkForward(data, base_config, ranges, train_days, test_days, step_days,
+                       metric, use_kernel).run(workers)
@@ -0,0 +1,93 @@
+"""
+Resting limit-order grid: desired orders and the diff against the exchange
+
+The grid is kept as GTC LIMIT orders: a BUY at every unfilled level below
+the market and a take-profit SELL for every open lot. Each cycle the
+desired set is compared with ``get_open_orders`` by (side, price), so only
+levels that changed are cancelled or placed; an unchanged grid costs no
+order calls at all. Grid orders carry a ``newClientOrderId`` prefix, and
+only those take part in the diff: other orders on the symbol (e.g. placed
+by hand) are never cancelled.
+"""
+import uuid
+from typing import Dict, Iterable, List, Tuple
+
+OrderKey = Tuple[str, float]
+
+# newClientOrderId prefix of the grid's own orders (ids are at most 36 chars)
+CLIENT_ID_PREFIX = 'ntdgrid-'
+
+
+def grid_client_id() -> str:
+    """Fresh client order id marking an order as placed by the grid"""
+    return f"{CLIENT_ID_PREFIX}{uuid.uuid4().hex[:24]}"
+
+
+def is_grid_order(order: Dict) -> bool:
+    """Whether an open order was placed by the grid (see ``grid_client_id``)"""
+    return str(order.get('clientOrderId', '')).startswith(CLIENT_ID_PREFIX)
+
+
+def grid_level_prices(center: float, step: float, levels: int, decimals: int = 2) -> List[float]:
+    """Buy levels ``center * (1 - i * step)`` for i = 1..levels, rounded to the tick"""
+    return [round(center * (1 - i * step), decimals) for i in range(1, levels + 1)]
+
+
+def desired_orders(level_prices: Iterable[float], lots: Dict[float, float],
+                   take_profit: float, price: float,
+                   decimals: int = 2) -> Dict[OrderKey, Dict]:
+    """
+    Orders the grid should have resting at ``price``
+
+    Args:
+        level_prices: Grid buy levels still free (not held by an open lot)
+        lots: Open lots, entry price -> quantity
+        take_profit: Take-profit fraction above entry
+        price: Current market price (no BUY at or above it)
+        decimals: Price tick precision
+
+    Returns:
+        (side, price) -> {'side', 'price', 'qty', 'entries'}; BUY quantities
+        are None and sized by the caller when the order is placed
+    """
+    desired = {}
+    for level in level_prices:
+        if level >= price:
+            continue
+        desired[('BUY', level)] = {'side': 'BUY', 'price': level, 'qty': None, 'entries': []}
+    for entry, qty in lots.items():
+        target = round(entry * (1 + take_profit), decimals)
+        key = ('SELL', target)
+        if key in desired:      # two lots on one tick: one order for both
+            desired[key]['qty'] += qty
+            desired[key]['entries'].append(entry)
+        else:
+            desired[key] = {'side': 'SELL', 'price': target, 'qty': qty, 'entries': [entry]}
+    return desired
+
+
+def diff_orders(desired: Dict[OrderKey, Dict], open_orders: Iterable[Dict],
+                decimals: int = 2, qty_tolerance: float = 1e-8) -> Tuple[List[Dict], List[Dict], Dict[OrderKey, Dict]]:
+    """
+    Compare the desired grid with the grid's own open orders (filter the
+    exchange's list with ``is_grid_order`` first)
+
+    A BUY is kept whatever its size; a SELL is replaced when its original
+    quantity no longer matches the lots it closes (a partial fill keeps it).
+    Duplicates on one key are cancelled.
+
+    Returns:
+        (orders to cancel, specs to place, key -> kept open order)
+    """
+    to_cancel, kept = [], {}
+    for order in open_orders:
+        key = (order['side'], round(float(order['price']), decimals))
+        spec = desired.get(key)
+        if spec is None or key in kept:
+            to_cancel.append(order)
+        elif spec['side'] == 'SELL' and abs(float(order['origQty']) - spec['qty']) > qty_tolerance:
+            to_cancel.append(order)
+        else:
+            kept[key] = order
+    to_place = [spec for key, spec in desired.items() if key not in kept]
+    return to_cancel, to_place, kept
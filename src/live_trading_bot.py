@@ -2,21 +2,42 @@
 Live Trading Bot for Binance - Grid + Hedge Strategy
 WARNING: This bot places REAL orders on Binance (testnet or live)
 """
+import asyncio
 import time
 from datetime import datetime
-from typing import Dict, List, Optional
-import pandas as pd
+from typing import Dict, List, Optional, Tuple
 from src.binance_connector import BinanceTradingBot
 from src.configs.strategy_configs import CONFIG_ADAPTIVE
-from src.core.indicators import ema, atr
+from src.core.streaming import StreamingEMA
+from src.core.grid_index import PositionPriceIndex
+from src.utils.ring_buffer import PriceRingBuffer
 from src.telegram_notifier import TelegramNotifier
+from src.order_executor import OrderExecutor, fill_summary
+from src.limit_grid import grid_level_prices, desired_orders, diff_orders, grid_client_id, is_grid_order
+from src.account_state import AccountState, SymbolFilters
+from src.rate_limiter import RateLimitExceeded
 
 class LiveGridHedgeBot:
     """Live trading bot implementing Grid + Hedge strategy"""
     
     def __init__(self, bot: BinanceTradingBot, symbol: str, config: Dict,
-                 telegram: Optional[TelegramNotifier] = None):
+                 telegram: Optional[TelegramNotifier] = None, client=None,
+                 account: Optional[AccountState] = None):
+        """
+        Args:
+            bot: Blocking connector (startup, state recovery, ``start``)
+            symbol: Trading pair
+            config: Strategy config
+            telegram: Optional notifier
+            client: Optional ``AsyncBinanceClient`` for ``start_async`` cycles
+            account: Shared balance/filters cache (default: one over ``bot``)
+        """
         self.bot = bot
+        self.client = client
+        if account is None and bot is not None:
+            account = AccountState(bot, ttl=config.get('balance_ttl', 5.0), client=client)
+        self.account = account
+        self.filters = SymbolFilters.default(symbol)
         self.symbol = symbol
         self.config = config
         self.telegram = telegram
@@ -29,31 +50,55 @@ class LiveGridHedgeBot:
         
         # Grid tracking
         self.grid_positions = {}  # price -> quantity
+        self.position_index = PositionPriceIndex()  # sorted grid_positions keys
         self.grid_center = 0.0
         
+        # Resting limit-order grid (order_mode='limit')
+        self.limit_center = 0.0
+        self.resting_orders = {}  # orderId -> {'side', 'price', 'qty', 'entries'}
+        
         # Hedge tracking  
         self.hedge_positions = []
         
-        # Historical data
-        self.price_history = []
-        self.max_history = 200
+        # Historical data (fixed-capacity ring buffer, O(1) append)
+        self.max_history = config.get('max_history', 200)
+        self.price_history = PriceRingBuffer(self.max_history)
+        
+        # Incremental indicators (seeded from the historical download)
+        self.ema_stream = StreamingEMA(config['ema_period'])
         
         # Trading stats
         self.total_trades = 0
         self.total_profit = 0.0
         self.total_fees = 0.0
         
+        # Streaming / async state
+        self.last_candle_time = 0  # open time (ms) of the newest buffered candle
+        self.executor = None
+        if client is not None:
+            self.executor = OrderExecutor(
+                client, symbol,
+                reconcile_interval=config.get('reconcile_interval', 300.0),
+                account=account, capital=config.get('allocated_capital'))
+        
     def initialize(self) -> bool:
         """Initialize bot - download initial data"""
         print(f"\n{'='*70}")
         print(f"INITIALIZING LIVE BOT: {self.symbol}")
         print(f"{'='*70}")
         
-        # Download historical data for indicators
+        # Download historical data for indicators (through the local
+        # OHLC store when configured, so restarts only fetch the tail)
+        store = None
+        if self.config.get('ohlc_store_dir'):
+            from src.utils.ohlc_store import OHLCStore
+            store = OHLCStore(self.config['ohlc_store_dir'])
+        
         df = self.bot.get_historical_data(
             self.symbol, 
             interval='1h', 
-            days=7
+            days=7,
+            store=store
         )
         
         if df.empty:
@@ -61,17 +106,34 @@ class LiveGridHedgeBot:
             return False
         
         # Initialize price history
-        self.price_history = df['close'].tolist()[-self.max_history:]
+        recent = df.iloc[-self.max_history:]
+        self.price_history.clear()
+        self.price_history.extend(recent['close'].to_numpy(),
+                                  timestamps=recent.index.as_unit('ms').asi8)
+        self.last_candle_time = int(recent.index.as_unit('ms').asi8[-1])
         
-        # Calculate initial grid center (EMA50)
-        ema_values = ema(pd.Series(self.price_history), self.config['ema_period'])
-        self.grid_center = ema_values.iloc[-1]
+        # Seed streaming EMA and take initial grid center (EMA50)
+        self.ema_stream = StreamingEMA(self.config['ema_period'])
+        self.ema_stream.update_many(df['close'].to_numpy())
+        self.grid_center = self.ema_stream.value
         
         print(f"✅ Initial data loaded: {len(self.price_history)} bars")
         print(f"Grid center (EMA50): ${self.grid_center:,.2f}")
         
+        # Symbol rules for rounding (step size, tick size, min notional);
+        # already cached when several bots share one account service
+        if self.symbol not in self.account.filters:
+            try:
+                self.account.load_filters([self.symbol])
+            except ValueError as e:
+                print(f"❌ {e} - not trading without its lot/tick rules")
+                return False
+        self.filters = self.account.symbol_filters(self.symbol)
+        if self.executor is not None:
+            self.executor.qty_decimals = self.filters.qty_decimals
+        
         # Get initial balance
-        balance = self.bot.get_account_balance('USDT')
+        balance = self.get_balance('USDT')
         print(f"Available USDT: ${balance:,.2f}")
         
         if balance < 100:
@@ -107,10 +169,11 @@ class LiveGridHedgeBot:
             
             # Populate grid_positions with remaining open buys
             self.grid_positions = {}
+            self.position_index = PositionPriceIndex()
             msg_restored = 0
             for buy in open_buys:
                 if buy['qty_left'] * buy['price'] > 5: # Filter dust
-                    self.grid_positions[buy['price']] = buy['qty_left']
+                    self.open_position(buy['price'], buy['qty_left'])
                     msg_restored += 1
             
             if msg_restored > 0:
@@ -120,7 +183,7 @@ class LiveGridHedgeBot:
                 
             # Double check with actual balance
             base_asset = self.symbol.replace('USDT', '')
-            base_balance = self.bot.get_account_balance(base_asset)
+            base_balance = self.get_balance(base_asset)
             current_price = self.update_price()
             held_value = base_balance * current_price
             
@@ -132,28 +195,96 @@ class LiveGridHedgeBot:
             print(f"❌ State recovery failed: {e}")
             import traceback
             traceback.print_exc()
+        
+        # --- Warm start from a backtest checkpoint (optional) ---
+        # Only coins held on the account and not already restored above
+        # can become checkpoint lots
+        if self.config.get('warm_start_checkpoint'):
+            unclaimed = self.get_balance(self.filters.base_asset) - sum(self.grid_positions.values())
+            self.warm_start(self.config['warm_start_checkpoint'], base_balance=max(0.0, unclaimed))
             
         return True
     
+    def warm_start(self, checkpoint_path: str, base_balance: float) -> bool:
+        """
+        Load open grid entries (and a recent EMA) from a backtest checkpoint
+        
+        Simulated lots are only adopted up to ``base_balance`` coins, so the
+        bot never books positions it does not hold. The checkpoint's EMA
+        replaces the one warmed from fresh klines only when its last bar is
+        at most ``warm_start_max_age`` seconds old (default 2h).
+        
+        Args:
+            checkpoint_path: Snapshot written by ``ChunkedBacktestEngine``
+            base_balance: Free base-asset balance available for the lots
+        """
+        from src.core.checkpoint import load_checkpoint
+        
+        try:
+            snapshot = load_checkpoint(checkpoint_path)
+        except (OSError, ValueError) as e:
+            print(f"❌ Cannot warm-start from {checkpoint_path}: {e}")
+            return False
+        
+        meta, arrays = snapshot['meta'], snapshot['arrays']
+        state = meta['strategy']
+        
+        last_time = meta['engine'].get('last_time')
+        age = time.time() - last_time / 1e9 if last_time is not None else float('inf')
+        ema_state = meta['indicators']['ema']
+        if age > self.config.get('warm_start_max_age', 7200):
+            print(f"ℹ️ Checkpoint is {age / 3600:,.1f}h old - keeping the EMA from recent klines")
+        elif ema_state['period'] == self.config['ema_period']:
+            self.ema_stream.set_state(ema_state)
+            self.grid_center = self.ema_stream.value
+        else:
+            self.grid_center = state['center_price']
+        
+        available = base_balance
+        skipped = 0.0
+        for price, qty in zip(arrays['spot_entry_prices'].tolist(), arrays['spot_entry_qtys'].tolist()):
+            qty_held = qty if qty <= available else self.filters.round_qty(available)
+            skipped += qty - qty_held
+            if qty_held <= 0:
+                continue
+            available -= qty_held
+            self.open_position(price, self.grid_positions.get(price, 0.0) + qty_held)
+        
+        print(f"✅ Warm-started from {checkpoint_path}: {len(self.grid_positions)} grid positions, "
+              f"center ${self.grid_center:,.2f}")
+        if skipped > 0:
+            print(f"⚠️ {skipped:.8f} {self.filters.base_asset} of checkpoint lots not held on the account - not restored")
+        if state['futures_short_qty'] > 0:
+            print(f"⚠️ Checkpoint has an open hedge ({state['futures_short_qty']:.6f}) - not restored")
+        return True
+    
     def update_price(self) -> float:
         """Get current price and update history"""
-        price = self.bot.get_price(self.symbol)
-        
+        return self.record_price(self.bot.get_price(self.symbol))
+    
+    def record_price(self, price: float) -> float:
+        """Add a fetched price to the history and indicators (ignores failed fetches)"""
         if price > 0:
             self.price_history.append(price)
-            if len(self.price_history) > self.max_history:
-                self.price_history.pop(0)
+            self.ema_stream.update(price)
         
         return price
     
+    def record_candle(self, event: Dict) -> bool:
+        """Add a closed stream candle to the history and indicators (once per candle)"""
+        if event['open_time'] <= self.last_candle_time:
+            return False
+        self.last_candle_time = event['open_time']
+        self.price_history.append(event['close'], timestamp=event['open_time'])
+        self.ema_stream.update(event['close'])
+        return True
+    
     def update_indicators(self):
-        """Recalculate indicators"""
-        if len(self.price_history) < self.config['ema_period']:
+        """Refresh indicator-driven state (O(1), streams are updated per price)"""
+        if self.ema_stream.count < self.config['ema_period']:
             return
         
-        prices = pd.Series(self.price_history)
-        ema_values = ema(prices, self.config['ema_period'])
-        self.grid_center = ema_values.iloc[-1]
+        self.grid_center = self.ema_stream.value
     
     def should_buy_grid(self, price: float) -> bool:
         """Check if should place grid buy order"""
@@ -167,39 +298,50 @@ class LiveGridHedgeBot:
         # Check if price is at grid level
         is_at_grid = (distance % grid_step) < (grid_step * 0.1)
         
-        # Check if not already bought at this level
+        # Check if not already bought at this level (only the nearest
+        # open entries on either side can be within half a step)
         already_bought = any(
             abs(p - price) / price < grid_step * 0.5 
-            for p in self.grid_positions.keys()
+            for p in self.position_index.nearest(price)
         )
         
         return is_at_grid and not already_bought
     
     def should_sell_grid(self, price: float) -> List[float]:
-        """Check which grid positions should be closed"""
-        to_close = []
+        """Check which grid positions should be closed (lowest entry first)"""
         take_profit = self.config['grid_take_profit']
-        
-        for buy_price, qty in self.grid_positions.items():
-            profit_pct = (price - buy_price) / buy_price
-            if profit_pct >= take_profit:
-                to_close.append(buy_price)
-        
-        return to_close
+        return self.position_index.take_profit_hits(price, take_profit)
+    
+    def open_position(self, buy_price: float, quantity: float):
+        """Track an open grid position"""
+        self.grid_positions[buy_price] = quantity
+        self.position_index.add(buy_price)
+    
+    def remove_position(self, buy_price: float):
+        """Forget a closed grid position"""
+        del self.grid_positions[buy_price]
+        self.position_index.discard(buy_price)
     
-    def calculate_position_size(self, price: float) -> float:
-        """Calculate position size based on risk"""
-        balance = self.bot.get_account_balance('USDT')
+    def get_balance(self, asset: str = 'USDT') -> float:
+        """Free balance from the account cache (direct fetch without one)"""
+        if self.account is None:
+            return self.bot.get_account_balance(asset)
+        return self.account.balance(asset)
+    
+    def calculate_position_size(self, price: float, balance: Optional[float] = None) -> float:
+        """Calculate position size based on risk (``balance`` skips the USDT lookup)"""
+        if balance is None:
+            balance = self.get_balance('USDT')
         risk_per_order = self.config['grid_risk_per_order']
         
         position_value = balance * risk_per_order
         quantity = position_value / price
         
-        # Round to symbol precision (for BTC: 5 decimals)
-        quantity = round(quantity, 5)
+        # Round down to the symbol's lot step
+        quantity = self.filters.round_qty(quantity)
         
-        # Check minimum notional ($10 for Binance)
-        if quantity * price < 10:
+        # Check lot minimum and minimum notional
+        if not self.filters.is_tradable(quantity, price):
             return 0.0
         
         return quantity
@@ -217,73 +359,107 @@ class LiveGridHedgeBot:
         order = self.bot.place_market_order(self.symbol, 'BUY', quantity)
         
         if order:
-            self.grid_positions[price] = quantity
-            self.total_trades += 1
-            print(f"✅ Grid position opened: ${price:,.2f}")
-            
-            # Calculate executed price
-            executed_price = price
-            if 'cummulativeQuoteQty' in order and 'executedQty' in order:
-                try:
-                    quote_qty = float(order['cummulativeQuoteQty'])
-                    exec_qty = float(order['executedQty'])
-                    if exec_qty > 0:
-                        executed_price = quote_qty / exec_qty
-                except Exception as e:
-                    print(f"⚠️ Failed to calc executed price: {e}")
-
-            # Get current balance
-            current_balance = self.bot.get_account_balance('USDT')
+            executed_price = self._after_buy(price, quantity, order)
+            if self.account is not None:
+                self.account.on_fill(order)
             
             # Send Telegram notification
             if self.telegram:
                 self.telegram.notify_trade(
-                    'BUY', self.symbol, quantity, executed_price, current_balance
+                    'BUY', self.symbol, quantity, executed_price, self.get_balance('USDT')
                 )
     
+    @staticmethod
+    def _executed_price(order: Dict, fallback: float) -> float:
+        """Average fill price of an order response (``fallback`` if unknown)"""
+        if 'cummulativeQuoteQty' in order and 'executedQty' in order:
+            try:
+                quote_qty = float(order['cummulativeQuoteQty'])
+                exec_qty = float(order['executedQty'])
+                if exec_qty > 0:
+                    return quote_qty / exec_qty
+            except Exception as e:
+                print(f"⚠️ Failed to calc executed price: {e}")
+        return fallback
+    
+    def _after_buy(self, price: float, quantity: float, order: Dict) -> float:
+        """Book a filled grid buy; returns the executed price"""
+        self.open_position(price, quantity)
+        self.total_trades += 1
+        print(f"✅ Grid position opened: ${price:,.2f}")
+        return self._executed_price(order, price)
+    
+    def _after_sell(self, buy_price: float, current_price: float, quantity: float,
+                    order: Dict) -> Tuple[float, float]:
+        """Book a filled grid sell; returns (executed price, profit)"""
+        profit = (current_price - buy_price) * quantity
+        self.total_profit += profit
+        self.remove_position(buy_price)
+        self.total_trades += 1
+        print(f"✅ Grid closed: ${profit:+.2f} profit")
+        return self._executed_price(order, current_price), profit
+    
     def close_grid_position(self, buy_price: float, current_price: float):
         """Close a grid position"""
-        if buy_price not in self.grid_positions:
+        self.close_grid_positions([buy_price], current_price)
+    
+    def close_grid_positions(self, buy_prices: List[float], current_price: float):
+        """Close several grid positions with one market sell of their total quantity"""
+        lots = {p: self.grid_positions[p] for p in buy_prices if p in self.grid_positions}
+        if not lots:
             return
         
-        quantity = self.grid_positions[buy_price]
-        profit_pct = ((current_price - buy_price) / buy_price) * 100
-        
-        print(f"\n🔴 GRID SELL: {quantity} {self.symbol} @ ${current_price:,.2f}")
-        print(f"Profit: {profit_pct:+.2f}%")
+        quantity = self.filters.round_qty(sum(lots.values()))
+        print(f"\n🔴 GRID SELL: {quantity} {self.symbol} @ ${current_price:,.2f} ({len(lots)} lots)")
+        for buy_price in lots:
+            print(f"Profit: {((current_price - buy_price) / buy_price) * 100:+.2f}% (entry ${buy_price:,.2f})")
         
         order = self.bot.place_market_order(self.symbol, 'SELL', quantity)
         
         if order:
-            profit = (current_price - buy_price) * quantity
-            self.total_profit += profit
-            del self.grid_positions[buy_price]
-            self.total_trades += 1
-            print(f"✅ Grid closed: ${profit:+.2f} profit")
-            
-            # Calculate executed price
-            executed_price = current_price
-            if 'cummulativeQuoteQty' in order and 'executedQty' in order:
-                try:
-                    quote_qty = float(order['cummulativeQuoteQty'])
-                    exec_qty = float(order['executedQty'])
-                    if exec_qty > 0:
-                        executed_price = quote_qty / exec_qty
-                except Exception as e:
-                    print(f"⚠️ Failed to calc executed price: {e}")
-
-            # Get current balance
-            current_balance = self.bot.get_account_balance('USDT')
+            notices = self._close_lots(lots, current_price, order)
+            if self.account is not None:
+                self.account.on_fill(order)
 
             # Send Telegram notification
             if self.telegram:
-                self.telegram.notify_trade(
-                    'SELL', self.symbol, quantity, executed_price, current_balance, profit
-                )
+                current_balance = self.get_balance('USDT')
+                for side, qty, executed_price, profit in notices:
+                    self.telegram.notify_trade(
+                        side, self.symbol, qty, executed_price, current_balance, profit
+                    )
+    
+    def _close_lots(self, lots: Dict[float, float], current_price: float,
+                    order: Dict) -> List[Tuple]:
+        """
+        Book one aggregated sell across ``lots`` (lowest entry first); a partial
+        fill closes whole lots first and shrinks the next one
+        
+        Returns:
+            Notification tuples ('SELL', quantity, executed price, profit)
+        """
+        executed = float(order.get('executedQty', sum(lots.values())))
+        notices = []
+        for buy_price, qty in lots.items():
+            if executed <= 1e-12:
+                break
+            if qty - executed > 0.5 * self.filters.step_size:
+                # Partial fill: keep the unsold remainder of this lot open
+                self.grid_positions[buy_price] = qty - executed
+                profit = (current_price - buy_price) * executed
+                self.total_profit += profit
+                self.total_trades += 1
+                notices.append(('SELL', executed, self._executed_price(order, current_price), profit))
+                break
+            executed_price, profit = self._after_sell(buy_price, current_price, qty, order)
+            notices.append(('SELL', qty, executed_price, profit))
+            executed -= qty
+        return notices
     
-    def update_equity(self, current_price: float):
-        """Calculate current equity"""
-        balance = self.bot.get_account_balance('USDT')
+    def update_equity(self, current_price: float, balance: Optional[float] = None):
+        """Calculate current equity (``balance`` skips the USDT lookup)"""
+        if balance is None:
+            balance = self.get_balance('USDT')
         
         # Calculate market value of open positions
         position_value = sum(
@@ -338,6 +514,9 @@ class LiveGridHedgeBot:
     
     def run_cycle(self):
         """Execute one trading cycle"""
+        if self.config.get('order_mode') == 'limit':
+            return self.run_limit_cycle()
+        
         # Get current price
         price = self.update_price()
         if price == 0:
@@ -362,12 +541,294 @@ class LiveGridHedgeBot:
         
         # Grid sell logic
         positions_to_close = self.should_sell_grid(price)
-        for buy_price in positions_to_close:
-            self.close_grid_position(buy_price, price)
+        if positions_to_close:
+            self.close_grid_positions(positions_to_close, price)
         
         # Concise status log
         print(f"[{datetime.now().strftime('%H:%M:%S')}] Price: ${price:,.2f} | Eq: ${self.equity:,.2f} | Pos: {len(self.grid_positions)}")
     
+    def run_limit_cycle(self):
+        """
+        One cycle of resting limit-order grid mode (``order_mode='limit'``)
+        
+        The grid lives on the exchange as GTC orders, so fills happen at
+        exchange speed with maker fees. Each cycle books the orders that
+        left the book, then diffs the desired grid against ``get_open_orders``
+        and only cancels/places the levels that changed.
+        """
+        price = self.update_price()
+        if price == 0:
+            print("⚠️ Failed to get price")
+            return
+        
+        self.update_indicators()
+        open_orders, notices = self.sync_limit_fills()
+        
+        balance = self.get_balance('USDT')
+        self.update_equity(price, balance + self.locked_quote())
+        
+        if self.telegram:
+            for side, quantity, executed_price, *profit in notices:
+                self.telegram.notify_trade(side, self.symbol, quantity, executed_price, balance, *profit)
+        
+        if not self.check_risk_limits():
+            print("⛔ Risk limits exceeded - cancelling grid and stopping bot")
+            self.cancel_limit_grid(open_orders)
+            self.is_running = False
+            return
+        
+        self.rebalance_limit_grid(price)
+        self.update_limit_grid(price, balance, open_orders)
+        
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] Price: ${price:,.2f} | Eq: ${self.equity:,.2f} | Pos: {len(self.grid_positions)} | Orders: {len(self.resting_orders)}")
+    
+    def locked_quote(self) -> float:
+        """USDT held by resting grid buys (not in the free balance)"""
+        return sum(o['qty'] * o['price'] for o in self.resting_orders.values() if o['side'] == 'BUY')
+    
+    def sync_limit_fills(self) -> Tuple[List[Dict], List[Tuple]]:
+        """
+        Book resting orders that are no longer open
+        
+        Returns:
+            (open orders on the exchange, notification tuples of the fills)
+        """
+        open_orders = self.bot.get_open_orders(self.symbol)
+        open_ids = {o['orderId'] for o in open_orders}
+        notices = []
+        
+        for order_id in [i for i in self.resting_orders if i not in open_ids]:
+            status = self.bot.get_order_status(self.symbol, order_id)
+            if not status:
+                continue  # lookup failed; retry next cycle
+            notices.extend(self._settle_limit_order(order_id, status) or [])
+        
+        return open_orders, notices
+    
+    def _settle_limit_order(self, order_id: int, order: Dict) -> Optional[List[Tuple]]:
+        """
+        Book a grid order that left the book and stop tracking it
+        
+        Returns:
+            Notification tuples, or None when its fills could not be read
+            (the order stays tracked and is settled on a later cycle)
+        """
+        notices = self._book_limit_fill(self.resting_orders[order_id], order)
+        if notices is None:
+            return None
+        del self.resting_orders[order_id]
+        if self.account is not None and float(order.get('executedQty', 0.0)) > 0:
+            self.account.on_fill(order)
+        return notices
+    
+    def _book_limit_fill(self, spec: Dict, order: Dict) -> Optional[List[Tuple]]:
+        """
+        Apply the executed part of a finished (or cancelled) grid order
+        
+        Fees come from the order's trades (actual commission and asset), so a
+        BNB-paid commission does not shrink the booked lot.
+        
+        Returns:
+            Notification tuples, or None if the order's trades could not be read
+        """
+        executed = float(order.get('executedQty', 0.0))
+        if executed <= 0:
+            return []
+        
+        trades = self.bot.get_order_trades(self.symbol, order['orderId'])
+        if not trades:
+            print(f"⚠️ Fills of order {order['orderId']} not available - retrying next cycle")
+            return None
+        fill = fill_summary(dict(order, side=spec['side'], fills=trades), self.filters.base_asset)
+        commission = fill['commission']
+        self.total_fees += (commission.get(self.filters.quote_asset, 0.0)
+                            + commission.get(self.filters.base_asset, 0.0) * spec['price'])
+        if spec['side'] == 'BUY':
+            # Track what actually arrived (net of any base-asset commission)
+            quantity = self.filters.round_qty(fill['net_qty'])
+            price = spec['price']
+            if price in self.grid_positions:
+                quantity += self.grid_positions[price]
+                self.remove_position(price)
+            return [('BUY', quantity, self._after_buy(price, quantity, order))]
+        
+        lots = {e: self.grid_positions[e] for e in spec['entries'] if e in self.grid_positions}
+        return self._close_lots(lots, spec['price'], order)
+    
+    def rebalance_limit_grid(self, price: float):
+        """
+        Re-center the resting grid on the EMA once price leaves the
+        ``rebalance_threshold`` band (open lots keep their take-profits);
+        moves under half a grid step are ignored so a lagging EMA does not
+        cancel and replace the whole grid every cycle
+        """
+        center = self.grid_center or price
+        if self.limit_center:
+            threshold = self.config.get('rebalance_threshold', 0.05)
+            if abs(price - self.limit_center) / self.limit_center <= threshold:
+                return
+            if abs(center - self.limit_center) / self.limit_center < self.config['grid_step'] / 2:
+                return
+            print(f"🔄 Grid rebalanced: ${self.limit_center:,.2f} -> ${center:,.2f}")
+        self.limit_center = center
+    
+    def update_limit_grid(self, price: float, balance: float, open_orders: List[Dict]):
+        """Cancel/place only the grid orders that differ from the exchange"""
+        step = self.config['grid_step']
+        decimals = self.filters.price_decimals
+        levels = grid_level_prices(self.limit_center, step,
+                                   self.config.get('limit_grid_levels', self.config['grid_levels']),
+                                   decimals)
+        # Like should_buy_grid: no new buy within half a step of an open lot
+        levels = [l for l in levels
+                  if not any(abs(p - l) / l < step * 0.5 for p in self.position_index.nearest(l))]
+        desired = desired_orders(levels, self.grid_positions, self.config['grid_take_profit'],
+                                 price, decimals)
+        for spec in desired.values():
+            if spec['qty'] is not None:
+                spec['qty'] = self.filters.round_qty(spec['qty'])
+        # Only the grid's own orders: anything else on the symbol is left alone
+        own = [o for o in open_orders if is_grid_order(o) or o['orderId'] in self.resting_orders]
+        to_cancel, to_place, kept = diff_orders(desired, own, decimals)
+        
+        for order in to_cancel:
+            # Book from the cancel response: the open-orders snapshot may predate a fill
+            cancelled = self.bot.cancel_order(self.symbol, order['orderId'])
+            if cancelled and order['orderId'] in self.resting_orders:
+                self._settle_limit_order(order['orderId'], cancelled)
+        
+        # Adopt our matching orders from before a restart
+        for key, order in kept.items():
+            if order['orderId'] not in self.resting_orders:
+                self.resting_orders[order['orderId']] = dict(desired[key], qty=float(order['origQty']))
+        
+        if self.account is not None and (to_cancel or to_place):
+            self.account.invalidate()  # locked/unlocked funds change the free balance
+        
+        available = balance
+        for spec in to_place:
+            quantity = spec['qty']
+            if spec['side'] == 'BUY':
+                quantity = self.calculate_position_size(spec['price'], available)
+                if quantity == 0:
+                    continue
+            order = self.bot.place_limit_order(self.symbol, spec['side'], quantity, spec['price'],
+                                               client_order_id=grid_client_id())
+            if order:
+                self.resting_orders[order['orderId']] = dict(spec, qty=quantity)
+                if spec['side'] == 'BUY':
+                    available -= quantity * spec['price']
+    
+    def cancel_limit_grid(self, open_orders: Optional[List[Dict]] = None):
+        """Cancel every resting grid order (booking any partial fills)"""
+        if open_orders is None:
+            open_orders = self.bot.get_open_orders(self.symbol)
+        for order in open_orders:
+            if order['orderId'] not in self.resting_orders:
+                continue
+            cancelled = self.bot.cancel_order(self.symbol, order['orderId'])
+            if cancelled:
+                self._settle_limit_order(order['orderId'], cancelled)
+    
+    async def run_cycle_async(self):
+        """
+        Execute one trading cycle on ``self.client``
+        
+        The price is fetched while the position book reconciles (when due),
+        then the grid buy and one aggregated sell go out concurrently, so a
+        cycle costs about one round trip per stage instead of one per call.
+        """
+        price, _ = await asyncio.gather(
+            self.client.get_price(self.symbol),
+            self.executor.cash(),
+        )
+        price = self.record_price(price)
+        if price == 0:
+            print("⚠️ Failed to get price")
+            return
+        
+        self.update_indicators()
+        await self.evaluate_async(price)
+        
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] Price: ${price:,.2f} | Eq: ${self.equity:,.2f} | Pos: {len(self.grid_positions)}")
+    
+    async def evaluate_async(self, price: float):
+        """
+        Mark equity, check risk and send the grid orders due at ``price``
+        
+        Cash comes from the executor's position book, which is updated from
+        fill responses and re-read from the account only when stale.
+        
+        Args:
+            price: Latest price (poll or stream tick)
+        """
+        balance = await self.executor.cash()
+        self.update_equity(price, balance)
+        
+        if not self.check_risk_limits():
+            print("⛔ Risk limits exceeded - stopping bot")
+            self.is_running = False
+            return
+        
+        orders = []
+        if self.should_buy_grid(price):
+            orders.append(self._grid_buy_async(price, balance))
+        positions_to_close = self.should_sell_grid(price)
+        if positions_to_close:
+            orders.append(self._grid_sell_async(positions_to_close, price))
+        if not orders:
+            return
+        
+        notices = [n for batch in await asyncio.gather(*orders) for n in batch]
+        self.total_fees = self.executor.book.fees_quote
+        if notices and self.telegram:
+            for side, quantity, executed_price, *profit in notices:
+                await asyncio.to_thread(self.telegram.notify_trade, side, self.symbol, quantity,
+                                        executed_price, self.executor.book.cash, *profit)
+    
+    async def on_market_event(self, event: Dict):
+        """
+        Handle one ``MarketStream`` event: closed candles feed the history and
+        indicators, every kline/book update re-evaluates the grid at its price
+        """
+        if event['symbol'] != self.symbol:
+            return
+        
+        if event['type'] == 'kline':
+            if event['closed'] and self.record_candle(event):
+                self.update_indicators()
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] Candle: ${event['close']:,.2f} | Eq: ${self.equity:,.2f} | Pos: {len(self.grid_positions)}")
+            price = event['close']
+        else:
+            price = event['price']
+        
+        await self.evaluate_async(price)
+    
+    async def _grid_buy_async(self, price: float, balance: float) -> List[Tuple]:
+        """Async ``place_grid_buy``; returns notification tuples of the fill"""
+        quantity = self.calculate_position_size(price, balance)
+        if quantity == 0:
+            print(f"⚠️ Position size too small at ${price:,.2f}")
+            return []
+        
+        print(f"\n🟢 GRID BUY: {quantity} {self.symbol} @ ${price:,.2f}")
+        fill = await self.executor.submit('BUY', quantity)
+        if not fill or fill['qty'] <= 0:
+            return []
+        # Track what actually arrived (commission is taken in the base asset)
+        quantity = self.filters.round_qty(fill['net_qty'])
+        return [('BUY', quantity, self._after_buy(price, quantity, fill['order']))]
+    
+    async def _grid_sell_async(self, buy_prices: List[float], current_price: float) -> List[Tuple]:
+        """Async ``close_grid_positions``: one market sell for every lot due"""
+        lots = {p: self.grid_positions[p] for p in buy_prices}
+        print(f"\n🔴 GRID SELL: {sum(lots.values()):.5f} {self.symbol} @ ${current_price:,.2f} ({len(lots)} lots)")
+        
+        fill = await self.executor.sell_lots(lots)
+        if not fill:
+            return []
+        return self._close_lots(lots, current_price, fill['order'])
+    
     def start(self, check_interval: int = 60):
         """
         Start live trading bot
@@ -397,7 +858,15 @@ class LiveGridHedgeBot:
         try:
             cycle_count = 0
             while self.is_running:
-                self.run_cycle()
+                try:
+                    self.run_cycle()
+                except RateLimitExceeded as e:
+                    # Every request would be refused: sit out the block, then carry on
+                    print(f"⚠️ {e} - pausing")
+                    if self.telegram:
+                        self.telegram.notify_error(str(e))
+                    time.sleep(max(e.retry_after, check_interval))
+                    continue
                 cycle_count += 1
                 
                 # Send status update every 60 minutes (60 cycles if interval=60s)
@@ -423,6 +892,108 @@ class LiveGridHedgeBot:
         finally:
             self.stop()
     
+    async def start_async(self, check_interval: int = 60):
+        """
+        Start live trading on the async client (see ``run_cycle_async``)
+        
+        Args:
+            check_interval: Seconds between checks
+        """
+        if self.client is None:
+            raise ValueError("start_async needs an AsyncBinanceClient (client=...)")
+        
+        print(f"\n🚀 STARTING ASYNC LIVE TRADING BOT: {self.symbol} (every {check_interval}s)")
+        self.is_running = True
+        if self.telegram:
+            await asyncio.to_thread(self.telegram.notify_start, self.symbol,
+                                    self.start_equity, 'ADAPTIVE')
+        
+        try:
+            await self.client.start()
+            cycle_count = 0
+            while self.is_running:
+                started = time.monotonic()
+                try:
+                    await self.run_cycle_async()
+                except RateLimitExceeded as e:
+                    await self.rate_limit_pause(e, check_interval)
+                    continue
+                cycle_count += 1
+                
+                if cycle_count % 60 == 0 and self.telegram:
+                    roi = ((self.equity - self.start_equity) / self.start_equity) * 100
+                    await asyncio.to_thread(
+                        self.telegram.notify_status, self.symbol, self.equity, roi,
+                        len(self.grid_positions), self.total_trades, self.total_profit)
+                
+                # Keep a fixed cadence: subtract the time the cycle took
+                await asyncio.sleep(max(0.0, check_interval - (time.monotonic() - started)))
+        except asyncio.CancelledError:
+            print("\n\n⏸️ Bot cancelled")
+        except Exception as e:
+            print(f"\n\n❌ Bot error: {e}")
+            if self.telegram:
+                await asyncio.to_thread(self.telegram.notify_error, str(e))
+            import traceback
+            traceback.print_exc()
+        finally:
+            await self.client.close()
+            await self.stop_async()
+    
+    async def start_stream(self, stream=None):
+        """
+        Trade from a WebSocket feed instead of polling
+        
+        Args:
+            stream: ``MarketStream`` / ``StreamReplayer`` (default: kline 1h +
+                bookTicker for this symbol)
+        
+        The client is closed at the end only if this call opened it (a
+        started client may be shared with other bots).
+        """
+        if self.client is None:
+            raise ValueError("start_stream needs an AsyncBinanceClient (client=...)")
+        if stream is None:
+            from src.market_stream import MarketStream
+            stream = MarketStream([self.symbol], interval='1h', testnet=self.client.testnet)
+        
+        print(f"\n🚀 STARTING STREAMING LIVE TRADING BOT: {self.symbol}")
+        self.is_running = True
+        if self.telegram:
+            await asyncio.to_thread(self.telegram.notify_start, self.symbol,
+                                    self.start_equity, 'ADAPTIVE')
+        
+        opened = self.client.session is None or self.client.session.closed
+        try:
+            await self.client.start()
+            async for event in stream.events():
+                try:
+                    await self.on_market_event(event)
+                except RateLimitExceeded as e:
+                    await self.rate_limit_pause(e)
+                if not self.is_running:
+                    await stream.stop()
+                    break
+        except asyncio.CancelledError:
+            print("\n\n⏸️ Bot cancelled")
+        except Exception as e:
+            print(f"\n\n❌ Bot error: {e}")
+            if self.telegram:
+                await asyncio.to_thread(self.telegram.notify_error, str(e))
+            import traceback
+            traceback.print_exc()
+        finally:
+            if opened:
+                await self.client.close()
+            await self.stop_async()
+    
+    async def rate_limit_pause(self, e: RateLimitExceeded, minimum: float = 1.0):
+        """Alert and wait out an exchange rate limit (the grid state is kept)"""
+        print(f"⚠️ {self.symbol}: {e} - pausing")
+        if self.telegram:
+            await asyncio.to_thread(self.telegram.notify_error, f"{self.symbol}: {e}")
+        await asyncio.sleep(max(e.retry_after, minimum))
+    
     def stop(self):
         """Stop bot and show final stats"""
         self.is_running = False
@@ -444,6 +1015,9 @@ class LiveGridHedgeBot:
             print(f"\n⚠️ WARNING: {len(self.grid_positions)} positions still open!")
             print("Close manually or restart bot to manage them.")
         
+        if self.resting_orders:
+            print(f"⚠️ {len(self.resting_orders)} grid limit orders are still resting on the exchange.")
+        
         print(f"{'='*70}\n")
         
         if self.telegram:
@@ -452,6 +1026,11 @@ class LiveGridHedgeBot:
                 self.total_trades, self.total_profit
             )
 
+    async def stop_async(self):
+        """``stop`` for coroutines (the Telegram summary is sent off the event loop)"""
+        self.is_running = False
+        await asyncio.to_thread(self.stop)
+
     def get_chart_data(self) -> Dict:
         """Get data for frontend chart"""
         candles = self.bot.get_latest_candles(self.symbol, interval='1h', limit=100)
@@ -0,0 +1,246 @@
+"""
+Streaming market data (Binance kline + bookTicker WebSocket)
+
+``MarketStream`` keeps one combined-stream connection open, reconnects
+with jittered exponential backoff and yields normalized events; it can
+record the raw messages to JSONL. ``StreamReplayer`` plays such a
+recording back through the same ``events()`` interface for offline tests.
+``UserDataStream`` follows the account (balance/order events) the same way.
+
+Event dicts:
+    {'type': 'kline', 'symbol', 'interval', 'open_time', 'close_time',
+     'open', 'high', 'low', 'close', 'volume', 'closed', 'event_time'}
+    {'type': 'book', 'symbol', 'bid', 'bid_qty', 'ask', 'ask_qty',
+     'price' (mid), 'update_id'}
+"""
+import asyncio
+import json
+import random
+import time
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Union
+
+import aiohttp
+import websockets
+from websockets.exceptions import WebSocketException
+
+from src.async_binance_connector import BinanceAPIError
+from src.rate_limiter import RateLimitExceeded
+
+
+LIVE_STREAM_URL = 'wss://stream.binance.com:9443'
+TESTNET_STREAM_URL = 'wss://stream.testnet.binance.vision'
+
+
+def parse_message(message: Union[str, bytes, Dict]) -> Optional[Dict]:
+    """Normalize one raw stream message (combined or single stream); None if unknown"""
+    data = json.loads(message) if isinstance(message, (str, bytes)) else message
+    data = data.get('data', data)
+
+    if data.get('e') == 'kline':
+        k = data['k']
+        return {
+            'type': 'kline', 'symbol': data['s'], 'interval': k['i'],
+            'open_time': int(k['t']), 'close_time': int(k['T']),
+            'open': float(k['o']), 'high': float(k['h']),
+            'low': float(k['l']), 'close': float(k['c']),
+            'volume': float(k['v']), 'closed': bool(k['x']),
+            'event_time': int(data['E']),
+        }
+
+    if 'b' in data and 'a' in data and 'u' in data:   # bookTicker has no 'e'
+        bid, ask = float(data['b']), float(data['a'])
+        return {
+            'type': 'book', 'symbol': data['s'],
+            'bid': bid, 'bid_qty': float(data['B']),
+            'ask': ask, 'ask_qty': float(data['A']),
+            'price': (bid + ask) / 2, 'update_id': int(data['u']),
+        }
+
+    return None
+
+
+class MarketStream:
+    """Kline/bookTicker feed for a set of symbols with automatic reconnect"""
+
+    def __init__(self, symbols: Iterable[str], interval: str = '1h', book_ticker: bool = True,
+                 testnet: bool = True, url: Optional[str] = None,
+                 backoff: float = 1.0, max_backoff: float = 60.0,
+                 record_path: Optional[str] = None):
+        """
+        Args:
+            symbols: Trading pairs (e.g. ['BTCUSDT'])
+            interval: Kline interval feeding the price buffer
+            book_ticker: Also subscribe to best bid/ask updates
+            testnet: Testnet (True) or live (False) stream host
+            url: Override the host (e.g. a local test server)
+            backoff: First reconnect delay in seconds
+            max_backoff: Cap for the reconnect delay
+            record_path: Append every raw message to this JSONL file
+        """
+        self.symbols = [s.upper() for s in symbols]
+        self.interval = interval
+        self.book_ticker = book_ticker
+        self.base_url = url or (TESTNET_STREAM_URL if testnet else LIVE_STREAM_URL)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.record_path = record_path
+
+        self.running = False
+        self.connections = 0
+        self.reconnects = 0
+        self.messages = 0
+        self._ws = None
+
+    def stream_names(self) -> List[str]:
+        names = []
+        for symbol in self.symbols:
+            names.append(f"{symbol.lower()}@kline_{self.interval}")
+            if self.book_ticker:
+                names.append(f"{symbol.lower()}@bookTicker")
+        return names
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}/stream?streams={'/'.join(self.stream_names())}"
+
+    async def _connect_url(self) -> str:
+        """URL for the next connection attempt"""
+        return self.url
+
+    def _parse(self, message) -> Optional[Dict]:
+        return parse_message(message)
+
+    def _delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        return random.uniform(0.5, 1.0) * min(self.max_backoff, self.backoff * 2 ** attempt)
+
+    async def events(self) -> AsyncIterator[Dict]:
+        """Yield parsed events until ``stop()``; reconnects on any connection error"""
+        self.running = True
+        attempt = 0
+        record = open(self.record_path, 'a') if self.record_path else None
+        try:
+            while self.running:
+                try:
+                    async with websockets.connect(await self._connect_url(), ping_interval=20,
+                                                  ping_timeout=20) as ws:
+                        self._ws = ws
+                        self.connections += 1
+                        if self.connections > 1:
+                            print(f"🔌 Stream reconnected ({self.reconnects} reconnects)")
+                        async for message in ws:
+                            attempt = 0
+                            self.messages += 1
+                            if record is not None:
+                                record.write(json.dumps({'t': time.time(), 'msg': json.loads(message)}) + '\n')
+                            event = self._parse(message)
+                            if event is not None:
+                                yield event
+                            if not self.running:
+                                break
+                    reason = 'closed by server'
+                except (WebSocketException, OSError, asyncio.TimeoutError, BinanceAPIError,
+                        aiohttp.ClientError, RateLimitExceeded) as e:
+                    # (REST errors come from UserDataStream's listen-key request)
+                    reason = e
+                finally:
+                    self._ws = None
+                if not self.running:
+                    break
+                delay = self._delay(attempt)
+                if isinstance(reason, RateLimitExceeded):
+                    delay = max(delay, reason.retry_after)
+                attempt += 1
+                self.reconnects += 1
+                print(f"⚠️ Stream disconnected ({reason}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        finally:
+            if record is not None:
+                record.close()
+
+    async def stop(self):
+        """Stop ``events()`` and close the socket"""
+        self.running = False
+        if self._ws is not None:
+            await self._ws.close()
+
+
+class UserDataStream(MarketStream):
+    """
+    Account events (``outboundAccountPosition``, ``balanceUpdate``,
+    ``executionReport``) as raw dicts, e.g. for ``AccountState.on_user_event``
+    """
+
+    KEEPALIVE_SECONDS = 30 * 60
+
+    def __init__(self, client, testnet: bool = True, url: Optional[str] = None,
+                 backoff: float = 1.0, max_backoff: float = 60.0):
+        """
+        Args:
+            client: ``AsyncBinanceClient`` (creates and keeps alive the listen key)
+            testnet, url, backoff, max_backoff: As for ``MarketStream``
+        """
+        super().__init__([], book_ticker=False, testnet=testnet, url=url,
+                         backoff=backoff, max_backoff=max_backoff)
+        self.client = client
+        self.listen_key: Optional[str] = None
+        self._keepalive: Optional[asyncio.Task] = None
+
+    async def _connect_url(self) -> str:
+        # A fresh key per connection: an expired key is the usual reason to drop
+        self.listen_key = await self.client.create_listen_key()
+        if self._keepalive is None or self._keepalive.done():
+            self._keepalive = asyncio.ensure_future(self._keep_alive())
+        return f"{self.base_url}/ws/{self.listen_key}"
+
+    async def _keep_alive(self):
+        while self.running:
+            await asyncio.sleep(self.KEEPALIVE_SECONDS)
+            if self.listen_key:
+                await self.client.keepalive_listen_key(self.listen_key)
+
+    def _parse(self, message) -> Optional[Dict]:
+        data = json.loads(message)
+        return data if 'e' in data else None
+
+    async def stop(self):
+        await super().stop()
+        if self._keepalive is not None:
+            self._keepalive.cancel()
+
+
+class StreamReplayer:
+    """Replay a ``MarketStream`` recording (JSONL of ``{'t', 'msg'}``) as events"""
+
+    def __init__(self, source: Union[str, List[Dict]], speed: float = 0.0):
+        """
+        Args:
+            source: Recording path, or the already-loaded records
+            speed: 0 = as fast as possible, 1 = recorded pace, 10 = ten times faster
+        """
+        if isinstance(source, str):
+            with open(source) as f:
+                source = [json.loads(line) for line in f if line.strip()]
+        self.records = source
+        self.speed = speed
+        self.running = False
+        self.messages = 0
+
+    async def events(self) -> AsyncIterator[Dict]:
+        self.running = True
+        previous = None
+        for record in self.records:
+            if not self.running:
+                break
+            if self.speed > 0 and previous is not None:
+                await asyncio.sleep(max(0.0, record['t'] - previous) / self.speed)
+            previous = record['t']
+            self.messages += 1
+            event = parse_message(record['msg'])
+            if event is not None:
+                yield event
+            else:
+                await asyncio.sleep(0)
+
+    async def stop(self):
+        self.running = False
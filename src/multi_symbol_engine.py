@@ -0,0 +1,261 @@
+"""
+Multi-symbol live engine: one ``LiveGridHedgeBot`` per symbol on one event loop
+
+Every bot shares the same blocking connector and ``AsyncBinanceClient``
+(and so one ``RequestScheduler`` weight budget), one ``AccountState``
+(a single cached balance snapshot and one ``exchangeInfo`` request for all
+symbols, kept current by one ``UserDataStream``) and one combined
+``MarketStream`` connection. Each symbol trades
+its own share of ``initial_capital`` from the allocation weights, so a bot
+never sizes orders from the whole quote balance.
+"""
+import asyncio
+from typing import Dict, List, Optional
+
+from src.account_state import AccountState
+from src.configs.strategy_configs import SYMBOL_ALLOCATIONS
+from src.live_trading_bot import LiveGridHedgeBot
+from src.rate_limiter import RateLimitExceeded
+from src.telegram_notifier import TelegramNotifier
+
+
+def allocate_capital(total: float, weights: Dict[str, float]) -> Dict[str, float]:
+    """
+    Split ``total`` over symbols in proportion to their weights
+
+    Args:
+        total: Capital to allocate (quote asset)
+        weights: Symbol -> weight (need not sum to 1; <= 0 drops the symbol)
+
+    Returns:
+        Symbol -> allocated capital
+    """
+    weights = {s.upper(): w for s, w in weights.items() if w > 0}
+    weight_sum = sum(weights.values())
+    if weight_sum <= 0:
+        return {}
+    return {s: total * w / weight_sum for s, w in weights.items()}
+
+
+def parse_allocations(text: str) -> Dict[str, float]:
+    """
+    Parse ``"BTCUSDT:0.5,ETHUSDT:0.5"`` (a bare symbol weighs 1)
+
+    Raises:
+        ValueError: A weight is not a number
+    """
+    weights = {}
+    for item in text.split(','):
+        symbol, _, weight = item.strip().partition(':')
+        if symbol:
+            weights[symbol.upper()] = float(weight) if weight else 1.0
+    return weights
+
+
+class MultiSymbolEngine:
+    """Schedules several grid bots over shared connections, budget and stream"""
+
+    def __init__(self, bot, client, config: Dict, allocations: Optional[Dict[str, float]] = None,
+                 telegram: Optional[TelegramNotifier] = None,
+                 account: Optional[AccountState] = None, interval: str = '1h'):
+        """
+        Args:
+            bot: Blocking ``BinanceTradingBot`` (startup, state recovery, chart candles)
+            client: ``AsyncBinanceClient`` for orders; build it with the
+                connector's scheduler so both draw on one weight budget
+            config: Strategy config shared by every symbol
+            allocations: Symbol -> capital weight (default: ``config['symbols']``
+                or ``SYMBOL_ALLOCATIONS``)
+            telegram: Optional notifier
+            account: Shared balance/filters cache (default: one over ``bot`` and ``client``)
+            interval: Kline interval of the combined stream
+
+        Raises:
+            ValueError: ``order_mode='limit'`` (the resting grid only runs in
+                ``LiveGridHedgeBot.start``'s polling loop)
+        """
+        if config.get('order_mode', 'market') == 'limit':
+            raise ValueError("MultiSymbolEngine trades market orders from the stream; "
+                             "order_mode='limit' needs LiveGridHedgeBot.start (one symbol, polling)")
+        self.bot = bot
+        self.client = client
+        self.config = config
+        self.telegram = telegram
+        self.interval = interval
+        self.account = account or AccountState(bot, ttl=config.get('balance_ttl', 5.0), client=client)
+        self.capital = allocate_capital(config['initial_capital'],
+                                        allocations or config.get('symbols') or SYMBOL_ALLOCATIONS)
+
+        self.bots: Dict[str, LiveGridHedgeBot] = {}
+        for symbol, capital in self.capital.items():
+            symbol_config = dict(config, initial_capital=capital, allocated_capital=capital)
+            self.bots[symbol] = LiveGridHedgeBot(bot, symbol, symbol_config, telegram,
+                                                 client=client, account=self.account)
+
+        self.is_running = False
+        self.dropped = 0        # book updates skipped while their bot was still busy
+        self._queues: Dict[str, asyncio.Queue] = {}
+
+    def initialize(self) -> List[str]:
+        """
+        Load filters for every symbol in one request, then initialize each bot
+
+        Returns:
+            Symbols that are ready (failed ones are dropped)
+        """
+        try:
+            self.account.load_filters(self.bots)
+        except ValueError as e:
+            print(f"❌ {e}")     # those bots retry once in initialize(), then are dropped
+        for symbol, bot in list(self.bots.items()):
+            if not bot.initialize():
+                print(f"❌ {symbol}: initialization failed - not trading it")
+                del self.bots[symbol]
+                continue
+            # Recovered lots already use part of the allocation
+            held = sum(price * qty for price, qty in bot.grid_positions.items())
+            bot.executor.book.capital = max(0.0, self.capital[symbol] - held)
+        return list(self.bots)
+
+    # ------------------------------------------------------------- events
+
+    def dispatch(self, event: Dict):
+        """
+        Queue a stream event for its bot
+
+        Closed candles are always delivered; a book update is skipped when
+        its bot still has work queued, since the next one carries a newer price.
+        """
+        queue = self._queues.get(event['symbol'])
+        if queue is None:
+            return
+        if event['type'] == 'book' and not queue.empty():
+            self.dropped += 1
+            return
+        queue.put_nowait(event)
+
+    async def _worker(self, bot: LiveGridHedgeBot):
+        queue = self._queues[bot.symbol]
+        while True:
+            event = await queue.get()
+            try:
+                if bot.is_running:
+                    await bot.on_market_event(event)
+            except RateLimitExceeded as e:
+                # Shared budget: the other symbols are paused by the scheduler too
+                await bot.rate_limit_pause(e)
+            except Exception as e:
+                print(f"❌ {bot.symbol} error: {e}")
+                if self.telegram:
+                    await asyncio.to_thread(self.telegram.notify_error, f"{bot.symbol}: {e}")
+            finally:
+                queue.task_done()
+
+    async def _follow_account(self, user_stream):
+        """Apply user-data events to the shared balance cache"""
+        try:
+            async for event in user_stream.events():
+                self.account.on_user_event(event)
+        except Exception as e:
+            # Balances then fall back to the TTL refetch
+            print(f"⚠️ User data stream stopped: {e}")
+
+    async def start(self, stream=None, user_stream=None):
+        """
+        Trade every symbol from one combined stream until all bots stop
+
+        Args:
+            stream: ``MarketStream`` / ``StreamReplayer`` (default: kline +
+                bookTicker for every symbol on one connection)
+            user_stream: Account event feed for ``AccountState.on_user_event``
+                (default: a ``UserDataStream`` when ``stream`` is the live one)
+        """
+        if stream is None:
+            from src.market_stream import MarketStream, UserDataStream
+            stream = MarketStream(list(self.bots), interval=self.interval, testnet=self.client.testnet)
+            if user_stream is None:
+                user_stream = UserDataStream(self.client, testnet=self.client.testnet)
+
+        print(f"\n🚀 STARTING MULTI-SYMBOL ENGINE: {', '.join(self.bots)}")
+        self.is_running = True
+        for symbol, bot in self.bots.items():
+            bot.is_running = True
+            self._queues[symbol] = asyncio.Queue()
+            print(f"  {symbol}: ${self.capital[symbol]:,.2f} allocated")
+            if self.telegram:
+                await asyncio.to_thread(self.telegram.notify_start, symbol, bot.start_equity, 'ADAPTIVE')
+        workers = [asyncio.create_task(self._worker(bot)) for bot in self.bots.values()]
+        account_task = None
+
+        try:
+            await self.client.start()
+            if user_stream is not None:
+                account_task = asyncio.create_task(self._follow_account(user_stream))
+            async for event in stream.events():
+                self.dispatch(event)
+                if not self.is_running or not any(b.is_running for b in self.bots.values()):
+                    await stream.stop()
+                    break
+            await asyncio.gather(*(q.join() for q in self._queues.values()))
+        except asyncio.CancelledError:
+            print("\n\n⏸️ Engine cancelled")
+        except Exception as e:
+            print(f"\n\n❌ Engine error: {e}")
+            if self.telegram:
+                await asyncio.to_thread(self.telegram.notify_error, str(e))
+            import traceback
+            traceback.print_exc()
+        finally:
+            if account_task is not None:
+                await user_stream.stop()
+                workers.append(account_task)
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await self.client.close()
+            await self.stop_async()
+
+    def stop(self):
+        """Stop every bot (each prints its own summary)"""
+        self.is_running = False
+        for bot in self.bots.values():
+            bot.stop()
+
+    async def stop_async(self):
+        """``stop`` for coroutines (summaries and Telegram calls run off the event loop)"""
+        self.is_running = False
+        for bot in self.bots.values():
+            await bot.stop_async()
+
+    # ---------------------------------------------------------- dashboard
+
+    def summary(self) -> Dict:
+        """Per-symbol state plus portfolio totals (for ``/api/data``)"""
+        bots = []
+        for symbol, bot in self.bots.items():
+            price = bot.price_history.last()
+            positions = [{'price': buy_price, 'qty': qty,
+                          'pnl': (price - buy_price) * qty,
+                          'pnl_pct': (price - buy_price) / buy_price * 100}
+                         for buy_price, qty in bot.grid_positions.items()]
+            bots.append({
+                'symbol': symbol,
+                'status': 'RUNNING' if bot.is_running else 'STOPPED',
+                'price': price,
+                'capital': self.capital[symbol],
+                'equity': bot.equity,
+                'roi': (bot.equity - bot.start_equity) / bot.start_equity * 100 if bot.start_equity else 0,
+                'trades': bot.total_trades,
+                'profit': bot.total_profit,
+                'positions': positions,
+            })
+
+        equity = sum(b.equity for b in self.bots.values())
+        start_equity = sum(b.start_equity for b in self.bots.values())
+        return {
+            'equity': equity,
+            'roi': (equity - start_equity) / start_equity * 100 if start_equity else 0,
+            'bots': bots,
+            'dropped_updates': self.dropped,
+            'requests': self.client.scheduler.stats(),
+        }
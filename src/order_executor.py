@@ -0,0 +1,185 @@
+"""
+Order execution layer for the async live bot
+
+``PositionBook`` keeps free cash and inventory current from fill responses,
+so the bot does not fetch the balance after every order. ``OrderExecutor``
+sends the orders of one evaluation together (all take-profit sells become a
+single MARKET sell), applies their fills to the book and reconciles the
+book against the account every ``reconcile_interval`` seconds.
+
+When several symbols trade from one quote balance, a book can be given a
+``capital`` allocation: its cash then starts at that allocation and only
+moves with its own fills (capped by what is actually free).
+"""
+import asyncio
+import math
+import time
+from typing import Dict, Iterable, List, Optional
+
+
+def floor_qty(quantity: float, decimals: int) -> float:
+    """Round a quantity down to the lot precision (never above what is held)"""
+    scale = 10 ** decimals
+    return math.floor(quantity * scale + 1e-9) / scale
+
+
+def fill_summary(order: Dict, base_asset: str) -> Dict:
+    """
+    Executed quantity, quote amount, average price and fees of an order response
+
+    Returns:
+        Dict with side, qty (gross), net_qty (base received/given after base
+        commission), quote, price and commission ({asset: amount})
+    """
+    qty = float(order.get('executedQty', 0.0))
+    quote = float(order.get('cummulativeQuoteQty', 0.0))
+    commission: Dict[str, float] = {}
+    for fill in order.get('fills', []):
+        asset = fill.get('commissionAsset')
+        if asset:
+            commission[asset] = commission.get(asset, 0.0) + float(fill['commission'])
+    net_qty = qty - commission.get(base_asset, 0.0) if order['side'] == 'BUY' else qty
+    return {
+        'order': order, 'order_id': order.get('orderId'), 'side': order['side'],
+        'status': order.get('status'), 'qty': qty, 'net_qty': net_qty, 'quote': quote,
+        'price': quote / qty if qty > 0 else 0.0, 'commission': commission,
+    }
+
+
+class PositionBook:
+    """Local free cash / inventory for one symbol, updated from fills"""
+
+    __slots__ = ('base_asset', 'quote_asset', 'capital', 'cash', 'inventory', 'fees_quote',
+                 'fills', 'synced_at', 'last_drift')
+
+    def __init__(self, base_asset: str, quote_asset: str = 'USDT', capital: Optional[float] = None):
+        self.base_asset = base_asset
+        self.quote_asset = quote_asset
+        self.capital = capital     # quote allocation when the balance is shared
+        self.cash = 0.0
+        self.inventory = 0.0
+        self.fees_quote = 0.0      # commissions valued in the quote asset
+        self.fills = 0
+        self.synced_at: Optional[float] = None
+        self.last_drift = {'cash': 0.0, 'inventory': 0.0}
+
+    def sync(self, account: Dict) -> Dict[str, float]:
+        """Take free balances from a ``/api/v3/account`` response; returns the drift"""
+        return self.sync_balances({b['asset']: float(b['free']) for b in account.get('balances', [])})
+
+    def sync_balances(self, free: Dict[str, float]) -> Dict[str, float]:
+        """Take free balances (asset -> amount); returns the drift"""
+        cash = free.get(self.quote_asset, 0.0)
+        if self.capital is not None:
+            # Shared quote balance: keep our own share, shrunk only if the pool ran short
+            cash = min(cash, self.capital if self.synced_at is None else self.cash)
+        inventory = free.get(self.base_asset, 0.0)
+        if self.synced_at is not None:
+            self.last_drift = {'cash': cash - self.cash, 'inventory': inventory - self.inventory}
+        self.cash, self.inventory = cash, inventory
+        self.synced_at = time.monotonic()
+        return self.last_drift
+
+    def apply(self, order: Dict) -> Dict:
+        """Book an order response; returns its ``fill_summary``"""
+        fill = fill_summary(order, self.base_asset)
+        if fill['qty'] <= 0:
+            return fill
+        fee_quote = fill['commission'].get(self.quote_asset, 0.0)
+        fee_base = fill['commission'].get(self.base_asset, 0.0)
+        if fill['side'] == 'BUY':
+            self.cash -= fill['quote'] + fee_quote
+            self.inventory += fill['qty'] - fee_base
+        else:
+            self.cash += fill['quote'] - fee_quote
+            self.inventory -= fill['qty'] + fee_base
+        self.fees_quote += fee_quote + fee_base * fill['price']
+        self.fills += 1
+        return fill
+
+
+class OrderExecutor:
+    """Batched order submission for one symbol on an ``AsyncBinanceClient``"""
+
+    def __init__(self, client, symbol: str, quote_asset: str = 'USDT',
+                 reconcile_interval: float = 300.0, qty_decimals: int = 5,
+                 drift_tolerance: float = 1e-6, account=None, capital: Optional[float] = None):
+        """
+        Args:
+            client: ``AsyncBinanceClient``
+            symbol: Trading pair
+            quote_asset: Cash asset of the pair
+            reconcile_interval: Seconds before the book is re-read from the account
+            qty_decimals: Lot precision for aggregated quantities
+            drift_tolerance: Book/account difference reported as drift
+            account: Shared ``AccountState`` to reconcile from (one cached
+                request for every symbol) instead of a request of our own
+            capital: Quote allocation of this symbol (see ``PositionBook``)
+        """
+        self.client = client
+        self.symbol = symbol
+        self.account = account
+        self.book = PositionBook(symbol[:-len(quote_asset)] if symbol.endswith(quote_asset) else symbol,
+                                 quote_asset, capital)
+        self.reconcile_interval = reconcile_interval
+        self.qty_decimals = qty_decimals
+        self.drift_tolerance = drift_tolerance
+        self.orders_sent = 0
+        self.reconciles = 0
+
+    def is_stale(self) -> bool:
+        synced = self.book.synced_at
+        return synced is None or time.monotonic() - synced >= self.reconcile_interval
+
+    async def reconcile(self) -> Dict[str, float]:
+        """Re-read the account into the book (reports drift from missed fills)"""
+        if self.account is not None:
+            free = await self.account.balances_async()
+            if not self.account.is_fresh():
+                return {}
+            drift = self.book.sync_balances(free)
+        else:
+            account = await self.client.get_account_info()
+            if not account:
+                return {}
+            drift = self.book.sync(account)
+        self.reconciles += 1
+        if any(abs(v) > self.drift_tolerance for v in drift.values()):
+            print(f"⚠️ Position book drift: cash {drift['cash']:+.8f} {self.book.quote_asset}, "
+                  f"inventory {drift['inventory']:+.8f} {self.book.base_asset}")
+        return drift
+
+    async def cash(self) -> float:
+        """Free quote balance from the book (reconciled when stale)"""
+        if self.is_stale():
+            await self.reconcile()
+        return self.book.cash
+
+    async def submit(self, side: str, quantity: float, price: Optional[float] = None) -> Dict:
+        """
+        Send one MARKET order (or GTC LIMIT when ``price`` is given) and book it
+
+        Returns:
+            ``fill_summary`` of the response, or {} if the order was rejected
+        """
+        self.orders_sent += 1
+        if price is None:
+            order = await self.client.place_market_order(self.symbol, side, quantity)
+        else:
+            order = await self.client.place_limit_order(self.symbol, side, quantity, price)
+        if not order:
+            return {}
+        if self.account is not None:
+            self.account.on_fill(order)
+        return self.book.apply(order)
+
+    async def submit_batch(self, orders: Iterable[Dict]) -> List[Dict]:
+        """Send several ``submit`` kwargs dicts concurrently"""
+        return list(await asyncio.gather(*(self.submit(**o) for o in orders)))
+
+    async def sell_lots(self, lots: Dict[float, float]) -> Dict:
+        """Close several grid lots with one MARKET sell of their total quantity"""
+        total = floor_qty(sum(lots.values()), self.qty_decimals)
+        if total <= 0:
+            return {}
+        return await self.submit('SELL', total)
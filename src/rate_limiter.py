@@ -0,0 +1,310 @@
+"""
+Request-weight aware scheduler for Binance REST calls
+
+Tracks the used weight of the current window (from ``X-MBX-USED-WEIGHT-1M``
+response headers, estimated locally between responses) and throttles
+before the limit is hit instead of after a 429. Reads may only use
+``read_share`` of the budget; the remainder is kept for order placement,
+and waiting reads also give way to waiting orders. 429/418 answers are
+retried after ``Retry-After`` (``RateLimitExceeded`` once the retries are
+used up, so the caller can pause); transient failures are retried with jittered
+backoff only for idempotent requests (an order with an unknown outcome is
+never resent).
+
+The same scheduler drives the blocking ``BinanceTradingBot`` (``call``) and
+the ``AsyncBinanceClient`` (``call_async``), so several bots in one process
+can share one budget.
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Optional, Tuple
+
+PRIORITY_ORDER = 0
+PRIORITY_READ = 1
+
+# Request weights (spot API, per symbol where it applies)
+ENDPOINT_WEIGHTS = {
+    '/api/v3/ping': 1,
+    '/api/v3/time': 1,
+    '/api/v3/exchangeInfo': 20,
+    '/api/v3/ticker/price': 2,
+    '/api/v3/klines': 2,
+    '/api/v3/account': 20,
+    '/api/v3/myTrades': 20,
+    '/api/v3/order': 4,
+    '/api/v3/openOrders': 6,
+    '/api/v3/userDataStream': 2,
+}
+
+RATE_LIMIT_STATUSES = (429, 418)
+WEIGHT_HEADER = 'x-mbx-used-weight-1m'
+
+
+class RateLimitExceeded(Exception):
+    """Retries used up while the exchange kept answering 429/418"""
+
+    def __init__(self, status: int, retry_after: float):
+        """
+        Args:
+            status: 429 (rate limited) or 418 (IP banned)
+            retry_after: Seconds until the scheduler lets requests through again
+        """
+        kind = 'IP banned' if status == 418 else 'Rate limited'
+        super().__init__(f"{kind} by the exchange (HTTP {status}); retry in {retry_after:.0f}s")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def endpoint_weight(path: str, params: Optional[Dict] = None) -> int:
+    """Weight of one request (symbol-less ticker/openOrders cost more)"""
+    weight = ENDPOINT_WEIGHTS.get(path, 1)
+    if params is not None and 'symbol' not in params:
+        if path == '/api/v3/ticker/price':
+            return 4
+        if path == '/api/v3/openOrders':
+            return 80
+    if path == '/api/v3/myTrades' and params and 'orderId' in params:
+        return 5
+    return weight
+
+
+def _header(headers, name: str) -> Optional[str]:
+    if not headers:
+        return None
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def error_status(exc: BaseException) -> Tuple[Optional[int], Optional[Dict]]:
+    """HTTP status and response headers of a connector exception (python-binance or async)"""
+    status = getattr(exc, 'status_code', None) or getattr(exc, 'status', None)
+    headers = getattr(exc, 'headers', None)
+    if headers is None:
+        headers = getattr(getattr(exc, 'response', None), 'headers', None)
+    return status, headers
+
+
+class RequestScheduler:
+    """Shared weight budget, priority gate and retry policy"""
+
+    def __init__(self, weight_limit: int = 6000, read_share: float = 0.8, window: float = 60.0,
+                 max_retries: int = 4, backoff: float = 0.5, max_backoff: float = 30.0,
+                 clock: Callable[[], float] = time.time, sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            weight_limit: Request weight allowed per window (Binance: 6000 / minute)
+            read_share: Fraction of the budget reads may use (the rest is for orders)
+            window: Window length in seconds (windows start on multiples of it)
+            max_retries: Retries per request (rate limits and transient failures)
+            backoff: First retry delay in seconds (full jitter, doubling)
+            max_backoff: Cap for one retry delay
+            clock: Wall-clock seconds (window alignment)
+            sleep: Blocking sleep used by ``call``
+        """
+        self.weight_limit = weight_limit
+        self.read_share = read_share
+        self.window = window
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.sleep = sleep
+
+        self.used_weight = 0
+        self.window_start = self._window_of(clock())
+        self.blocked_until = 0.0
+        self.orders_waiting = 0
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------ accounting
+
+    def _window_of(self, now: float) -> float:
+        return now - now % self.window
+
+    def _roll(self, now: float):
+        start = self._window_of(now)
+        if start > self.window_start:
+            self.window_start = start
+            self.used_weight = 0
+
+    def _budget(self, priority: int) -> float:
+        return self.weight_limit * (1.0 if priority == PRIORITY_ORDER else self.read_share)
+
+    def wait_time(self, weight: int, priority: int = PRIORITY_READ) -> float:
+        """Seconds before a request of ``weight`` may be sent (0 = now)"""
+        with self._lock:
+            now = self.clock()
+            self._roll(now)
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            if priority == PRIORITY_READ and self.orders_waiting:
+                return min(0.05, self.window)
+            if self.used_weight + weight > self._budget(priority):
+                return self.window_start + self.window - now
+            self.used_weight += weight          # reserve until the header corrects it
+            return 0.0
+
+    def update_from_headers(self, headers):
+        """Take the exchange's used weight for the current window"""
+        used = _header(headers, WEIGHT_HEADER)
+        if used is None:
+            return
+        with self._lock:
+            self._roll(self.clock())
+            self.used_weight = int(used)
+
+    def _rate_limited(self, status: int, headers) -> float:
+        """Record a 429/418 and block everyone until Retry-After; returns the delay"""
+        retry_after = _header(headers, 'retry-after')
+        with self._lock:
+            self.counters['banned' if status == 418 else 'rate_limited'] += 1
+            delay = float(retry_after) if retry_after else self.window_start + self.window - self.clock()
+            self.blocked_until = max(self.blocked_until, self.clock() + max(delay, 0.0))
+            return max(delay, 0.0)
+
+    def _retry_delay(self, attempt: int) -> float:
+        return random.uniform(0.5, 1.0) * min(self.max_backoff, self.backoff * 2 ** attempt)
+
+    def _plan_retry(self, exc: BaseException, attempt: int, idempotent: bool,
+                    transient: Tuple) -> Optional[float]:
+        """Delay before retrying after ``exc``, or None to give up and re-raise"""
+        status, headers = error_status(exc)
+        if status in RATE_LIMIT_STATUSES:
+            # Blocks everyone until Retry-After, also when this request gives up
+            self._rate_limited(status, headers)
+            if attempt >= self.max_retries:
+                return None
+            # A rate-limited request was rejected, so even orders are safe to resend
+            return self._retry_delay(attempt) * 0.1
+        if attempt >= self.max_retries:
+            return None
+        if not idempotent:
+            return None
+        if (status is not None and status >= 500) or isinstance(exc, transient):
+            return self._retry_delay(attempt)
+        return None
+
+    def _count(self, name: str, amount: float = 1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def _give_up(self, exc: BaseException) -> Optional[RateLimitExceeded]:
+        """Count a failed request; a rate-limit answer becomes ``RateLimitExceeded``"""
+        status, _ = error_status(exc)
+        with self._lock:
+            self.counters['errors'] += 1
+            if status not in RATE_LIMIT_STATUSES:
+                return None
+            return RateLimitExceeded(status, max(0.0, self.blocked_until - self.clock()))
+
+    def stats(self) -> Dict:
+        """Counters plus the current budget"""
+        with self._lock:
+            return dict(self.counters, used_weight=self.used_weight, weight_limit=self.weight_limit)
+
+    # --------------------------------------------------------------- calling
+
+    def call(self, fn: Callable, weight: int = 1, priority: int = PRIORITY_READ,
+             idempotent: bool = True, transient: Tuple = (),
+             headers: Optional[Callable[[], Dict]] = None):
+        """
+        Run a blocking request under the budget, with retries
+
+        Args:
+            fn: Performs the request (no arguments)
+            weight: Request weight
+            priority: ``PRIORITY_ORDER`` or ``PRIORITY_READ``
+            idempotent: Safe to resend after a transient failure
+            transient: Exception types worth retrying (connection errors, timeouts)
+            headers: Returns the last response's headers (used-weight tracking)
+
+        Raises:
+            RateLimitExceeded: The exchange still answered 429/418 after the retries
+            Whatever else ``fn`` raised once retries are exhausted
+        """
+        attempt = 0
+        while True:
+            self._wait(weight, priority)
+            self._count('requests')
+            try:
+                result = fn()
+            except Exception as exc:
+                delay = self._plan_retry(exc, attempt, idempotent, transient)
+                if delay is None:
+                    limited = self._give_up(exc)
+                    if limited is not None:
+                        raise limited from exc
+                    raise
+                self._count('retries')
+                attempt += 1
+                self.sleep(delay)
+                continue
+            if headers is not None:
+                self.update_from_headers(headers())
+            return result
+
+    def _wait(self, weight: int, priority: int):
+        if priority == PRIORITY_ORDER:
+            with self._lock:
+                self.orders_waiting += 1
+        try:
+            while True:
+                delay = self.wait_time(weight, priority)
+                if delay <= 0:
+                    return
+                with self._lock:
+                    self.counters['throttled'] += 1
+                    self.counters['throttle_seconds'] += delay
+                self.sleep(delay)
+        finally:
+            if priority == PRIORITY_ORDER:
+                with self._lock:
+                    self.orders_waiting -= 1
+
+    async def call_async(self, fn: Callable, weight: int = 1, priority: int = PRIORITY_READ,
+                         idempotent: bool = True, transient: Tuple = ()):
+        """
+        ``call`` for coroutines: ``fn()`` returns an awaitable; response headers
+        are reported by the client through ``update_from_headers``
+        """
+        attempt = 0
+        while True:
+            await self._wait_async(weight, priority)
+            self._count('requests')
+            try:
+                return await fn()
+            except Exception as exc:
+                delay = self._plan_retry(exc, attempt, idempotent, transient)
+                if delay is None:
+                    limited = self._give_up(exc)
+                    if limited is not None:
+                        raise limited from exc
+                    raise
+                self._count('retries')
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def _wait_async(self, weight: int, priority: int):
+        # The lock is only held for counter updates (blocking callers may share it)
+        if priority == PRIORITY_ORDER:
+            with self._lock:
+                self.orders_waiting += 1
+        try:
+            while True:
+                delay = self.wait_time(weight, priority)
+                if delay <= 0:
+                    return
+                with self._lock:
+                    self.counters['throttled'] += 1
+                    self.counters['throttle_seconds'] += delay
+                await asyncio.sleep(delay)
+        finally:
+            if priority == PRIORITY_ORDER:
+                with self._lock:
+                    self.orders_waiting -= 1
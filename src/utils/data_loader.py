@@ -16,32 +16,52 @@ def load_csv_data(filepath):
         print(f"Error loading {filepath}: {e}")
         return None
 
-def download_btc_data(start_date, end_date):
-    """Download BTC data from Yahoo Finance"""
-    try:
+def yahoo_fetcher(symbol, interval='1h'):
+    """``OHLCStore`` fetcher downloading ``symbol`` bars from Yahoo Finance"""
+    def fetch(start, end):
         import yfinance as yf
         
-        print(f"Downloading BTC-USD from {start_date} to {end_date}...")
-        ticker = yf.Ticker("BTC-USD")
-        df = ticker.history(start=start_date, end=end_date, interval='1h')
-        
-        if df.empty:
-            print("No hourly data, trying daily...")
-            df = ticker.history(start=start_date, end=end_date, interval='1d')
-            if not df.empty:
-                df = df.resample('1H').interpolate(method='linear')
-        
-        df = df.rename(columns={
+        df = yf.Ticker(symbol).history(start=start, end=end, interval=interval)
+        return df.rename(columns={
             'Open': 'open', 'High': 'high',
             'Low': 'low', 'Close': 'close',
             'Volume': 'volume'
         })
+    return fetch
+
+
+def load_yahoo_data(symbol, start_date, end_date, interval='1h', store=None):
+    """
+    Yahoo Finance bars through the local OHLC store
+    
+    Only bars missing after the last stored one are downloaded; without
+    network the stored bars are returned.
+    
+    Returns:
+        OHLCV DataFrame indexed by timestamp (UTC), empty if nothing is available
+    """
+    from utils.ohlc_store import get_ohlc_store
+    
+    store = store or get_ohlc_store()
+    return store.load(symbol, interval, start_date, end_date, fetch=yahoo_fetcher(symbol, interval))
+
+
+def download_btc_data(start_date, end_date):
+    """Download BTC data from Yahoo Finance (cached in the local OHLC store)"""
+    try:
+        print(f"Loading BTC-USD from {start_date} to {end_date}...")
+        df = load_yahoo_data("BTC-USD", start_date, end_date, interval='1h')
+        
+        if df.empty:
+            print("No hourly data, trying daily...")
+            df = load_yahoo_data("BTC-USD", start_date, end_date, interval='1d')
+            if not df.empty:
+                df = df.resample('1h').interpolate(method='linear')
         
         df = df.reset_index()
-        df = df.rename(columns={'index': 'timestamp', 'Datetime': 'timestamp'})
         df = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
         
-        print(f"Downloaded {len(df)} bars")
+        print(f"Loaded {len(df)} bars")
         return df
         
     except Exception as e:
@@ -99,3 +119,100 @@ def generate_crash_data(start_price, end_price, days, scenario='gradual'):
         })
     
     return pd.DataFrame(data)
+
+PATH_SCENARIOS = ('gradual', 'steep', 'volatile', 'gbm', 'jump')
+
+
+def generate_price_paths(n_paths, start_price, end_price, days, scenario='gradual',
+                         seed=None, daily_vol=0.05, jumps_per_day=0.2,
+                         jump_mean=-0.05, jump_std=0.05):
+    """
+    Generate N simulated hourly OHLCV paths at once (vectorized)
+
+    'gradual', 'steep' and 'volatile' follow ``generate_crash_data``;
+    'gbm' is geometric Brownian motion and 'jump' adds Poisson log-normal
+    jumps (Merton). Both drift so the median path ends at ``end_price``.
+
+    Args:
+        n_paths: Number of paths (N)
+        start_price: Price of the first bar
+        end_price: Target price at the end of the period
+        days: Length of each path (T = days * 24 hourly bars)
+        scenario: One of PATH_SCENARIOS
+        seed: Seed or ``np.random.Generator``
+        daily_vol: Daily log-return volatility ('gbm' / 'jump')
+        jumps_per_day: Expected jumps per day ('jump')
+        jump_mean: Mean log jump size ('jump')
+        jump_std: Log jump size standard deviation ('jump')
+
+    Returns:
+        Dict with 'timestamp' (DatetimeIndex of T bars) and 'open', 'high',
+        'low', 'close', 'volume' arrays of shape (N, T)
+    """
+    if scenario not in PATH_SCENARIOS:
+        raise ValueError(f"Unknown scenario '{scenario}' (expected one of {PATH_SCENARIOS})")
+
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    hours = int(days * 24)
+    shape = (n_paths, hours)
+    i = np.arange(hours, dtype=np.float64)
+    progress = i / hours
+    total_change = (end_price - start_price) / start_price
+
+    if scenario == 'gradual':
+        base = start_price + total_change * start_price * progress
+        close = base + rng.standard_normal(shape) * (base * 0.01)
+    elif scenario == 'steep':
+        crash_hours = int(hours * 0.3)
+        crash = start_price + total_change * 0.7 * start_price * (i / max(crash_hours, 1))
+        recovery = (start_price + total_change * 0.7 * start_price
+                    + total_change * 0.3 * start_price
+                    * ((i - crash_hours) / max(hours - crash_hours, 1)))
+        in_crash = i < crash_hours
+        base = np.where(in_crash, crash, recovery)
+        scale = np.where(in_crash, 0.02, 0.01)
+        close = base + rng.standard_normal(shape) * (base * scale)
+    elif scenario == 'volatile':
+        base = start_price + total_change * start_price * progress
+        swing = np.sin(i / 72 * 2 * np.pi) * base * 0.05
+        close = base + swing + rng.standard_normal(shape) * (base * 0.02)
+    else:
+        steps = max(hours - 1, 1)
+        sigma = daily_vol / np.sqrt(24)
+        log_returns = rng.standard_normal(shape) * sigma
+        drift = np.log(end_price / start_price)
+        if scenario == 'jump':
+            lam = jumps_per_day / 24
+            counts = rng.poisson(lam, shape)
+            # Sum of k normal jumps ~ N(k * mean, k * std^2)
+            log_returns += counts * jump_mean + np.sqrt(counts) * jump_std * rng.standard_normal(shape)
+            drift -= lam * steps * jump_mean
+        log_returns += drift / steps
+        log_returns[:, 0] = 0.0
+        close = start_price * np.exp(np.cumsum(log_returns, axis=1))
+
+    if scenario in ('gradual', 'steep', 'volatile'):
+        close = np.maximum(close, end_price * 0.9)
+
+    volatility = close * 0.005
+    high = close + np.abs(rng.standard_normal(shape)) * volatility
+    low = close - np.abs(rng.standard_normal(shape)) * volatility
+    open_price = (high + low) / 2 + rng.standard_normal(shape) * (volatility / 2)
+    high = np.maximum(np.maximum(high, open_price), close)
+    low = np.minimum(np.minimum(low, open_price), close)
+    volume = rng.uniform(1000, 10000, shape)
+
+    return {
+        'timestamp': pd.date_range(datetime(2022, 1, 1), periods=hours, freq='h', name='timestamp'),
+        'open': open_price,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume,
+    }
+
+
+def path_frame(paths, i):
+    """OHLCV DataFrame (indexed by timestamp) for path ``i`` of ``generate_price_paths``"""
+    return pd.DataFrame({name: paths[name][i] for name in ('open', 'high', 'low', 'close', 'volume')},
+                        index=paths['timestamp'], copy=False)
@@ -0,0 +1,430 @@
+"""
+Local mock of the Binance spot REST API (aiohttp) for offline tests
+
+Implements the endpoints the bot uses with Binance's paths, parameters,
+HMAC signatures and error format. Prices are set by the test; MARKET
+orders fill at the current price and LIMIT (GTC) orders rest until
+``set_price`` crosses them. ``latency`` delays every response, so
+concurrency shows up as wall-clock time. Responses carry the
+``X-MBX-USED-WEIGHT-1M`` header and ``fail_next`` injects 429/5xx answers;
+``start_in_thread`` serves blocking clients (python-binance).
+"""
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from src.rate_limiter import endpoint_weight
+
+
+SIGNED_PATHS = {'/api/v3/account', '/api/v3/order', '/api/v3/openOrders', '/api/v3/myTrades',
+                '/api/v3/allOrders'}
+
+
+class MockExchange:
+    """In-process fake exchange; use as ``async with MockExchange() as ex: ex.base_url``"""
+
+    def __init__(self, api_key: str = 'test-key', api_secret: str = 'test-secret',
+                 prices: Optional[Dict[str, float]] = None,
+                 balances: Optional[Dict[str, float]] = None,
+                 latency: float = 0.0, fee_rate: float = 0.001):
+        """
+        Args:
+            api_key, api_secret: Credentials signed requests must use
+            prices: Symbol -> last price
+            balances: Asset -> free balance
+            latency: Seconds added to every response (simulated RTT)
+            fee_rate: Commission charged on fills (in the received asset)
+
+        ``clock_skew_ms`` shifts the server clock; signed requests outside
+        ``recvWindow`` of it are rejected with -1021 like on Binance.
+        """
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.prices = dict(prices or {'BTCUSDT': 50_000.0})
+        self.balances = dict(balances or {'USDT': 10_000.0, 'BTC': 0.0})
+        self.locked: Dict[str, float] = {}
+        self.latency = latency
+        self.fee_rate = fee_rate
+        self.clock_skew_ms = 0
+
+        self.orders: Dict[int, Dict] = {}
+        self.trades: List[Dict] = []
+        self.requests: List[Dict] = []       # {'method', 'path', 'start', 'end'}
+        self.klines: Dict[str, List[list]] = {}
+        self.filters: Dict[str, Dict[str, str]] = {}   # symbol -> exchangeInfo filter overrides
+        self.failures: Dict[str, List[Dict]] = {}       # path -> queued error answers
+        self.used_weight = 0
+        self._weight_minute = 0
+        self._ids = itertools.count(1)
+        self._trade_ids = itertools.count(1)
+        self._runner = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self.base_url = ''
+
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.router.add_get('/api/v3/ping', self._ping)
+        self.app.router.add_get('/api/v3/time', self._time)
+        self.app.router.add_get('/api/v3/ticker/price', self._ticker_price)
+        self.app.router.add_get('/api/v3/klines', self._klines)
+        self.app.router.add_get('/api/v3/exchangeInfo', self._exchange_info)
+        self.app.router.add_get('/api/v3/account', self._account)
+        self.app.router.add_post('/api/v3/order', self._new_order)
+        self.app.router.add_get('/api/v3/order', self._get_order)
+        self.app.router.add_delete('/api/v3/order', self._cancel_order)
+        self.app.router.add_get('/api/v3/openOrders', self._open_orders)
+        self.app.router.add_get('/api/v3/myTrades', self._my_trades)
+        self.app.router.add_post('/api/v3/userDataStream', self._listen_key)
+        self.app.router.add_put('/api/v3/userDataStream', self._listen_key)
+
+    # ------------------------------------------------------------- lifecycle
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Serve on a free port; returns the base URL"""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+        return self.base_url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def start_in_thread(self) -> str:
+        """Serve from a background event loop (for blocking clients); returns the base URL"""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        return asyncio.run_coroutine_threadsafe(self.start(), self._loop).result(10)
+
+    def stop_thread(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(10)
+        self._loop.close()
+        self._loop = self._thread = None
+
+    async def __aenter__(self) -> 'MockExchange':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    # ------------------------------------------------------------ test hooks
+
+    def set_price(self, symbol: str, price: float):
+        """Move the market; resting LIMIT orders crossed by the move fill"""
+        self.prices[symbol] = price
+        for order in list(self.orders.values()):
+            if order['symbol'] != symbol or order['status'] != 'NEW':
+                continue
+            limit = float(order['price'])
+            if (order['side'] == 'BUY' and price <= limit) or (order['side'] == 'SELL' and price >= limit):
+                self._fill(order, limit, maker=True)
+
+    def requests_to(self, path: str) -> List[Dict]:
+        return [r for r in self.requests if r['path'] == path]
+
+    def fail_next(self, path: str, count: int = 1, status: int = 429,
+                  retry_after: Optional[int] = None):
+        """
+        Answer the next ``count`` requests to ``path`` with an error
+
+        Args:
+            status: 429/418 (rate limit, code -1003) or a 5xx
+            retry_after: ``Retry-After`` header value in seconds
+        """
+        code, msg = (-1003, 'Too much request weight used; current limit is 6000 request weight per 1 MINUTE.') \
+            if status in (429, 418) else (-1001, 'Internal error; unable to process your request. Please try again.')
+        failure = {'status': status, 'code': code, 'msg': msg, 'retry_after': retry_after}
+        self.failures.setdefault(path, []).extend(dict(failure) for _ in range(count))
+
+    # ------------------------------------------------------------- plumbing
+
+    @staticmethod
+    def error(status: int, code: int, msg: str) -> web.Response:
+        return web.json_response({'code': code, 'msg': msg}, status=status)
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        entry = {'method': request.method, 'path': request.path, 'start': time.perf_counter()}
+        self.requests.append(entry)
+        self._count_weight(request)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        response = self._injected_failure(request.path)
+        if response is None and request.path in SIGNED_PATHS:
+            response = self._check_signature(request)
+        if response is None:
+            response = await handler(request)
+        response.headers['X-MBX-USED-WEIGHT-1M'] = str(self.used_weight)
+        entry['end'] = time.perf_counter()
+        entry['status'] = response.status
+        return response
+
+    def _count_weight(self, request: web.Request):
+        minute = int(time.time() // 60)
+        if minute != self._weight_minute:
+            self._weight_minute, self.used_weight = minute, 0
+        self.used_weight += endpoint_weight(request.path, dict(request.query))
+
+    def _injected_failure(self, path: str) -> Optional[web.Response]:
+        queue = self.failures.get(path)
+        if not queue:
+            return None
+        failure = queue.pop(0)
+        response = self.error(failure['status'], failure['code'], failure['msg'])
+        if failure['retry_after'] is not None:
+            response.headers['Retry-After'] = str(failure['retry_after'])
+        return response
+
+    def _check_signature(self, request: web.Request) -> Optional[web.Response]:
+        if request.headers.get('X-MBX-APIKEY') != self.api_key:
+            return self.error(401, -2015, 'Invalid API-key, IP, or permissions for action.')
+        query = request.query_string
+        payload, sep, signature = query.rpartition('&signature=')
+        expected = hmac.new(self.api_secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
+        if not sep or not hmac.compare_digest(signature, expected):
+            return self.error(400, -1022, 'Signature for this request is not valid.')
+        if 'timestamp' not in request.query:
+            return self.error(400, -1102, "Mandatory parameter 'timestamp' was not sent.")
+        drift = int(request.query['timestamp']) - self._now_ms()
+        if drift > 1000 or -drift > int(request.query.get('recvWindow', 5000)):
+            return self.error(400, -1021, "Timestamp for this request is outside of the recvWindow.")
+        return None
+
+    def _now_ms(self) -> int:
+        return int(time.time() * 1000) + self.clock_skew_ms
+
+    def _symbol(self, request: web.Request):
+        symbol = request.query.get('symbol')
+        if symbol not in self.prices:
+            return None, self.error(400, -1121, 'Invalid symbol.')
+        return symbol, None
+
+    @staticmethod
+    def _split(symbol: str):
+        for quote in ('USDT', 'BUSD', 'USDC', 'BTC'):
+            if symbol.endswith(quote) and symbol != quote:
+                return symbol[:-len(quote)], quote
+        return symbol[:-4], symbol[-4:]
+
+    # -------------------------------------------------------------- market
+
+    async def _ping(self, request):
+        return web.json_response({})
+
+    async def _time(self, request):
+        return web.json_response({'serverTime': self._now_ms()})
+
+    async def _ticker_price(self, request):
+        if 'symbol' not in request.query:
+            return web.json_response([{'symbol': s, 'price': f"{p:.8f}"} for s, p in self.prices.items()])
+        symbol, problem = self._symbol(request)
+        if problem:
+            return problem
+        return web.json_response({'symbol': symbol, 'price': f"{self.prices[symbol]:.8f}"})
+
+    async def _klines(self, request):
+        symbol, problem = self._symbol(request)
+        if problem:
+            return problem
+        limit = int(request.query.get('limit', 500))
+        rows = self.klines.get(symbol, [])
+        start = request.query.get('startTime')
+        if start is not None:
+            rows = [k for k in rows if k[0] >= int(start)]
+        return web.json_response(rows[-limit:] if start is None else rows[:limit])
+
+    # ------------------------------------------------------------- account
+
+    async def _listen_key(self, request):
+        if request.headers.get('X-MBX-APIKEY') != self.api_key:
+            return self.error(401, -2015, 'Invalid API-key, IP, or permissions for action.')
+        if request.method == 'PUT':
+            return web.json_response({})
+        return web.json_response({'listenKey': f"mock-listen-key-{len(self.requests)}"})
+
+    async def _exchange_info(self, request):
+        symbols = sorted(self.prices)
+        if 'symbols' in request.query:
+            wanted = json.loads(request.query['symbols'])
+            symbols = [s for s in symbols if s in wanted]
+        return web.json_response({'timezone': 'UTC', 'serverTime': int(time.time() * 1000),
+                                  'symbols': [self._symbol_info(s) for s in symbols]})
+
+    def _symbol_info(self, symbol: str) -> Dict:
+        base, quote = self._split(symbol)
+        filters = self.filters.get(symbol, {})
+        return {
+            'symbol': symbol, 'status': 'TRADING', 'baseAsset': base, 'quoteAsset': quote,
+            'filters': [
+                {'filterType': 'PRICE_FILTER', 'minPrice': '0.01000000', 'maxPrice': '1000000.00000000',
+                 'tickSize': filters.get('tickSize', '0.01000000')},
+                {'filterType': 'LOT_SIZE', 'minQty': filters.get('minQty', '0.00001000'),
+                 'maxQty': '9000.00000000', 'stepSize': filters.get('stepSize', '0.00001000')},
+                {'filterType': 'NOTIONAL', 'minNotional': filters.get('minNotional', '5.00000000'),
+                 'applyMinToMarket': True, 'maxNotional': '9000000.00000000'},
+            ],
+        }
+
+    async def _account(self, request):
+        assets = sorted(set(self.balances) | set(self.locked))
+        return web.json_response({
+            'canTrade': True, 'canWithdraw': False, 'canDeposit': False,
+            'updateTime': int(time.time() * 1000),
+            'balances': [{'asset': a, 'free': f"{self.balances.get(a, 0.0):.8f}",
+                          'locked': f"{self.locked.get(a, 0.0):.8f}"} for a in assets],
+        })
+
+    async def _my_trades(self, request):
+        symbol, problem = self._symbol(request)
+        if problem:
+            return problem
+        limit = int(request.query.get('limit', 500))
+        order_id = request.query.get('orderId')
+        return web.json_response([t for t in self.trades if t['symbol'] == symbol and
+                                  (order_id is None or str(t['orderId']) == order_id)][-limit:])
+
+    # -------------------------------------------------------------- orders
+
+    def _public(self, order: Dict) -> Dict:
+        return {k: v for k, v in order.items() if not k.startswith('_')}
+
+    def _fill(self, order: Dict, price: float, maker: bool = False):
+        base, quote = self._split(order['symbol'])
+        qty = float(order['origQty'])
+        notional = qty * price
+        if order['side'] == 'BUY':
+            if order['type'] == 'LIMIT':
+                self.locked[quote] = self.locked.get(quote, 0.0) - qty * float(order['price'])
+                # Refund the difference between the limit and the fill price
+                self.balances[quote] = self.balances.get(quote, 0.0) + qty * float(order['price']) - notional
+            else:
+                self.balances[quote] = self.balances.get(quote, 0.0) - notional
+            fee, fee_asset = qty * self.fee_rate, base
+            self.balances[base] = self.balances.get(base, 0.0) + qty - fee
+        else:
+            if order['type'] == 'LIMIT':
+                self.locked[base] = self.locked.get(base, 0.0) - qty
+            else:
+                self.balances[base] = self.balances.get(base, 0.0) - qty
+            fee, fee_asset = notional * self.fee_rate, quote
+            self.balances[quote] = self.balances.get(quote, 0.0) + notional - fee
+
+        order.update(status='FILLED', executedQty=f"{qty:.8f}",
+                     cummulativeQuoteQty=f"{notional:.8f}", updateTime=int(time.time() * 1000))
+        trade = {
+            'symbol': order['symbol'], 'id': next(self._trade_ids), 'orderId': order['orderId'],
+            'price': f"{price:.8f}", 'qty': f"{qty:.8f}", 'quoteQty': f"{notional:.8f}",
+            'commission': f"{fee:.8f}", 'commissionAsset': fee_asset,
+            'time': order['updateTime'], 'isBuyer': order['side'] == 'BUY', 'isMaker': maker,
+        }
+        self.trades.append(trade)
+        order['fills'] = [{'price': trade['price'], 'qty': trade['qty'], 'commission': trade['commission'],
+                           'commissionAsset': fee_asset, 'tradeId': trade['id']}]
+
+    async def _new_order(self, request):
+        symbol, problem = self._symbol(request)
+        if problem:
+            return problem
+        q = request.query
+        side, order_type = q.get('side'), q.get('type')
+        try:
+            qty = float(q['quantity'])
+        except (KeyError, ValueError):
+            return self.error(400, -1102, "Mandatory parameter 'quantity' was not sent.")
+        if side not in ('BUY', 'SELL') or order_type not in ('MARKET', 'LIMIT') or qty <= 0:
+            return self.error(400, -1100, 'Illegal characters found in parameter.')
+
+        base, quote = self._split(symbol)
+        market = self.prices[symbol]
+        price = float(q['price']) if order_type == 'LIMIT' else market
+        if order_type == 'LIMIT' and 'price' not in q:
+            return self.error(400, -1102, "Mandatory parameter 'price' was not sent.")
+        client_id = q.get('newClientOrderId')
+        if client_id and any(o['clientOrderId'] == client_id and o['status'] == 'NEW'
+                             for o in self.orders.values()):
+            return self.error(400, -2010, 'Duplicate order sent.')
+
+        # Balance checks (and locking for resting orders)
+        if side == 'BUY' and self.balances.get(quote, 0.0) < qty * price:
+            return self.error(400, -2010, 'Account has insufficient balance for requested action.')
+        if side == 'SELL' and self.balances.get(base, 0.0) < qty - 1e-12:
+            return self.error(400, -2010, 'Account has insufficient balance for requested action.')
+
+        order_id = next(self._ids)
+        now = int(time.time() * 1000)
+        order = {
+            'symbol': symbol, 'orderId': order_id,
+            'clientOrderId': client_id or f"mock{order_id}",
+            'price': f"{price if order_type == 'LIMIT' else 0.0:.8f}",
+            'origQty': f"{qty:.8f}", 'executedQty': '0.00000000', 'cummulativeQuoteQty': '0.00000000',
+            'status': 'NEW', 'timeInForce': q.get('timeInForce', 'GTC'), 'type': order_type,
+            'side': side, 'transactTime': now, 'updateTime': now, 'fills': [],
+        }
+        self.orders[order_id] = order
+
+        if order_type == 'MARKET':
+            self._fill(order, market)
+        elif (side == 'BUY' and market <= price) or (side == 'SELL' and market >= price):
+            self._lock(order)
+            self._fill(order, price)        # marketable limit: fills immediately
+        else:
+            self._lock(order)
+        return web.json_response(self._public(order))
+
+    def _lock(self, order: Dict):
+        base, quote = self._split(order['symbol'])
+        qty = float(order['origQty'])
+        asset, amount = (quote, qty * float(order['price'])) if order['side'] == 'BUY' else (base, qty)
+        self.balances[asset] = self.balances.get(asset, 0.0) - amount
+        self.locked[asset] = self.locked.get(asset, 0.0) + amount
+
+    def _unlock(self, order: Dict):
+        base, quote = self._split(order['symbol'])
+        qty = float(order['origQty'])
+        asset, amount = (quote, qty * float(order['price'])) if order['side'] == 'BUY' else (base, qty)
+        self.balances[asset] = self.balances.get(asset, 0.0) + amount
+        self.locked[asset] = self.locked.get(asset, 0.0) - amount
+
+    def _find(self, request):
+        q = request.query
+        if 'orderId' in q:
+            return self.orders.get(int(q['orderId']))
+        client_id = q.get('origClientOrderId')
+        return next((o for o in self.orders.values() if o['clientOrderId'] == client_id), None)
+
+    async def _get_order(self, request):
+        order = self._find(request)
+        if order is None:
+            return self.error(400, -2013, 'Order does not exist.')
+        return web.json_response(self._public(order))
+
+    async def _cancel_order(self, request):
+        order = self._find(request)
+        if order is None or order['status'] != 'NEW':
+            return self.error(400, -2011, 'Unknown order sent.')
+        self._unlock(order)
+        order['status'] = 'CANCELED'
+        return web.json_response(self._public(order))
+
+    async def _open_orders(self, request):
+        symbol = request.query.get('symbol')
+        return web.json_response([self._public(o) for o in self.orders.values()
+                                  if o['status'] == 'NEW' and (symbol is None or o['symbol'] == symbol)])
+
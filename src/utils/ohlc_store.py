@@ -0,0 +1,216 @@
+"""
+Local columnar OHLC store (Feather/Parquet), partitioned by symbol/interval/month
+
+Layout: ``<root>/<symbol>/<interval>/<YYYY-MM>.feather``. Each partition
+holds one month of bars sorted by timestamp (UTC, tz-naive). Feather files
+are written uncompressed so reads can memory-map them instead of parsing.
+"""
+import os
+import re
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    PYARROW_AVAILABLE = False
+
+
+OHLC_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+DEFAULT_ROOT = os.environ.get('OHLC_STORE_DIR', os.path.join('data', 'ohlc'))
+
+# fetch(start, end) -> OHLCV DataFrame indexed by timestamp (end=None means "until now")
+Fetcher = Callable[[pd.Timestamp, Optional[pd.Timestamp]], pd.DataFrame]
+
+
+def _utc_naive(ts) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return ts
+
+
+def normalize_ohlc(df: pd.DataFrame) -> pd.DataFrame:
+    """OHLCV float columns on a sorted, de-duplicated UTC tz-naive timestamp index"""
+    if 'timestamp' in df.columns:
+        df = df.set_index('timestamp')
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+
+    out = pd.DataFrame({c: df[c].to_numpy(dtype=np.float64) if c in df.columns
+                        else np.zeros(len(df)) for c in OHLC_COLUMNS},
+                       index=index.as_unit('ns').rename('timestamp'))
+    out = out[~out.index.duplicated(keep='last')]
+    return out.sort_index()
+
+
+class OHLCStore:
+    """On-disk OHLC bars with month partitions and incremental updates"""
+
+    def __init__(self, root: str = DEFAULT_ROOT, fmt: str = 'feather'):
+        """
+        Args:
+            root: Store directory
+            fmt: 'feather' (memory-mappable, default) or 'parquet' (smaller)
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError("OHLCStore requires pyarrow (pip install pyarrow)")
+        if fmt not in ('feather', 'parquet'):
+            raise ValueError(f"Unknown store format '{fmt}'")
+        self.root = root
+        self.fmt = fmt
+
+    # ------------------------------------------------------------------ layout
+
+    def _dir(self, symbol: str, interval: str) -> str:
+        safe = re.sub(r'[^A-Za-z0-9._-]', '_', symbol)
+        return os.path.join(self.root, safe, interval)
+
+    def _path(self, symbol: str, interval: str, month: str) -> str:
+        return os.path.join(self._dir(symbol, interval), f"{month}.{self.fmt}")
+
+    def partitions(self, symbol: str, interval: str) -> List[Tuple[str, str]]:
+        """Sorted (month 'YYYY-MM', path) pairs stored for a symbol/interval"""
+        directory = self._dir(symbol, interval)
+        if not os.path.isdir(directory):
+            return []
+        suffix = f".{self.fmt}"
+        return sorted((name[:-len(suffix)], os.path.join(directory, name))
+                      for name in os.listdir(directory) if name.endswith(suffix))
+
+    # ------------------------------------------------------------------- I/O
+
+    def _read_partition(self, path: str, memory_map: bool = True) -> pd.DataFrame:
+        if self.fmt == 'feather':
+            table = feather.read_table(path, memory_map=memory_map)
+        else:
+            table = pq.read_table(path, memory_map=memory_map)
+        df = table.to_pandas()
+        return df.set_index('timestamp')
+
+    def _write_partition(self, path: str, df: pd.DataFrame):
+        table = pa.Table.from_pandas(df.reset_index(), preserve_index=False)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        if self.fmt == 'feather':
+            feather.write_feather(table, tmp, compression='uncompressed')
+        else:
+            pq.write_table(table, tmp)
+        os.replace(tmp, path)
+
+    def write(self, symbol: str, interval: str, df: pd.DataFrame) -> int:
+        """
+        Merge bars into the store (new rows win on duplicate timestamps)
+
+        Only the month partitions touched by ``df`` are rewritten.
+
+        Returns:
+            Number of bars written
+        """
+        df = normalize_ohlc(df)
+        if df.empty:
+            return 0
+        os.makedirs(self._dir(symbol, interval), exist_ok=True)
+
+        months = df.index.strftime('%Y-%m')
+        for month in pd.unique(months):
+            chunk = df[months == month]
+            path = self._path(symbol, interval, month)
+            if os.path.exists(path):
+                existing = self._read_partition(path, memory_map=False)
+                chunk = pd.concat([existing[~existing.index.isin(chunk.index)], chunk]).sort_index()
+            self._write_partition(path, chunk)
+        return len(df)
+
+    def read(self, symbol: str, interval: str, start=None, end=None,
+             memory_map: bool = True) -> pd.DataFrame:
+        """
+        Bars in ``[start, end]`` (whole history by default)
+
+        Only partitions overlapping the range are opened.
+        """
+        start = _utc_naive(start) if start is not None else None
+        end = _utc_naive(end) if end is not None else None
+        first_month = start.strftime('%Y-%m') if start is not None else ''
+        last_month = end.strftime('%Y-%m') if end is not None else '9999-12'
+
+        frames = [self._read_partition(path, memory_map)
+                  for month, path in self.partitions(symbol, interval)
+                  if first_month <= month <= last_month]
+        if not frames:
+            return normalize_ohlc(pd.DataFrame(columns=['timestamp'] + OHLC_COLUMNS))
+
+        df = frames[0] if len(frames) == 1 else pd.concat(frames)
+        return df.loc[start:end]
+
+    def bounds(self, symbol: str, interval: str) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """(first, last) stored timestamp, reading only the edge partitions"""
+        parts = self.partitions(symbol, interval)
+        if not parts:
+            return None
+        first = self._read_partition(parts[0][1])
+        last = first if len(parts) == 1 else self._read_partition(parts[-1][1])
+        if first.empty or last.empty:
+            return None
+        return first.index[0], last.index[-1]
+
+    # ------------------------------------------------------------ incremental
+
+    def update(self, symbol: str, interval: str, fetch: Fetcher, start, end=None) -> int:
+        """
+        Fetch only what the store is missing and append it
+
+        If the store already covers ``start``, the fetch begins at the last
+        stored bar (which is refreshed in case it was still forming);
+        otherwise the whole range is fetched. Fetch errors are reported and
+        leave the store as it was, so offline runs keep working.
+
+        Returns:
+            Number of bars written
+        """
+        start = _utc_naive(start)
+        end = _utc_naive(end) if end is not None else None
+        bounds = self.bounds(symbol, interval)
+
+        if bounds is not None and bounds[0] <= start:
+            if end is not None and bounds[1] >= end:
+                return 0
+            fetch_start = bounds[1]
+        else:
+            fetch_start = start
+
+        try:
+            fresh = fetch(fetch_start, end)
+        except Exception as e:
+            print(f"⚠️ Fetch failed for {symbol} {interval}, using local data: {e}")
+            return 0
+        if fresh is None or len(fresh) == 0:
+            return 0
+
+        fresh = normalize_ohlc(fresh)
+        return self.write(symbol, interval, fresh.loc[fetch_start:])
+
+    def load(self, symbol: str, interval: str, start, end=None,
+             fetch: Optional[Fetcher] = None) -> pd.DataFrame:
+        """``update`` (when a fetcher is given) then ``read``"""
+        if fetch is not None:
+            written = self.update(symbol, interval, fetch, start, end)
+            if written:
+                print(f"💾 Stored {written} new {symbol} {interval} bars")
+        return self.read(symbol, interval, start, end)
+
+
+_default_store = None
+
+
+def get_ohlc_store() -> OHLCStore:
+    """Process-wide store at ``OHLC_STORE_DIR`` (default ``data/ohlc``)"""
+    global _default_store
+    if _default_store is None:
+        _default_store = OHLCStore()
+    return _default_store
@@ -0,0 +1,156 @@
+"""
+Fixed-capacity NumPy ring buffer for live price history
+"""
+import time
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+
+class PriceRingBuffer:
+    """
+    Fixed-capacity price (and optional OHLC) history
+
+    Every sample is written twice, at ``i`` and ``i + capacity`` of arrays
+    sized ``2 * capacity``, so the last ``n`` samples are always one
+    contiguous slice: ``view()`` returns them oldest-first without copying
+    and appends are O(1) with no shifting.
+
+    The trading loop is the only writer. Other threads (e.g. the Flask
+    ``/api/data`` handler) read through ``snapshot()`` / ``last()``, which
+    use a sequence counter to retry instead of taking a lock, so the
+    writer never blocks.
+    """
+
+    def __init__(self, capacity: int, ohlc: bool = False):
+        """
+        Args:
+            capacity: Samples kept (older ones are overwritten)
+            ohlc: Also store open/high/low/close per sample (closed candles)
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+
+        self.capacity = capacity
+        self.ohlc = ohlc
+        self.fields = ('timestamp', 'price') + (('open', 'high', 'low', 'close') if ohlc else ())
+
+        self._arrays = {
+            name: np.zeros(2 * capacity, dtype=np.int64 if name == 'timestamp' else np.float64)
+            for name in self.fields
+        }
+        self._head = 0      # next write slot in [0, capacity)
+        self._count = 0
+        self._seq = 0       # odd while a write is in progress
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def __iter__(self):
+        return iter(self.snapshot()['price'].tolist())
+
+    def __getitem__(self, index: int) -> float:
+        """Price at ``index`` (oldest-first, negative indexes allowed)"""
+        while True:
+            seq = self._seq
+            count = self._count
+            position = index + count if index < 0 else index
+            if not 0 <= position < count:
+                raise IndexError("price history index out of range")
+            value = float(self._arrays['price'][self._start(count) + position])
+            if seq == self._seq and not seq & 1:
+                return value
+
+    def _start(self, count: int) -> int:
+        """Offset of the oldest of the last ``count`` samples"""
+        return self._head + self.capacity - count
+
+    def append(self, price: float, timestamp: Optional[int] = None,
+               open: Optional[float] = None, high: Optional[float] = None,
+               low: Optional[float] = None, close: Optional[float] = None):
+        """
+        Add one sample
+
+        Args:
+            price: Price (or candle close)
+            timestamp: Epoch milliseconds (default: now)
+            open, high, low, close: Candle fields when ``ohlc=True``
+                (default to ``price``)
+        """
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+
+        values = {'timestamp': timestamp, 'price': price}
+        if self.ohlc:
+            values['open'] = price if open is None else open
+            values['high'] = price if high is None else high
+            values['low'] = price if low is None else low
+            values['close'] = price if close is None else close
+
+        i = self._head
+        j = i + self.capacity
+        self._seq += 1
+        for name, value in values.items():
+            array = self._arrays[name]
+            array[i] = value
+            array[j] = value
+        self._head = (i + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        self._seq += 1
+
+    def extend(self, prices: Iterable[float], timestamps: Optional[Iterable[int]] = None,
+               **ohlc: Iterable[float]):
+        """Append many samples (e.g. the historical download)"""
+        prices = np.asarray(prices, dtype=np.float64).tolist()
+        stamps = ([None] * len(prices) if timestamps is None
+                  else np.asarray(timestamps, dtype=np.int64).tolist())
+        columns = {name: np.asarray(values, dtype=np.float64).tolist()
+                   for name, values in ohlc.items()}
+        for k, price in enumerate(prices):
+            self.append(price, stamps[k], **{name: col[k] for name, col in columns.items()})
+
+    def clear(self):
+        """Drop all samples"""
+        self._seq += 1
+        self._head = 0
+        self._count = 0
+        self._seq += 1
+
+    def view(self, field: str = 'price') -> np.ndarray:
+        """
+        Zero-copy oldest-first view of one field
+
+        Only valid for the writer thread until its next ``append``; other
+        threads should use ``snapshot()``.
+        """
+        count = self._count
+        start = self._start(count)
+        return self._arrays[field][start:start + count]
+
+    def last(self, default: float = 0.0) -> float:
+        """Most recent price (thread-safe)"""
+        try:
+            return self[-1]
+        except IndexError:
+            return default
+
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """Consistent copy of every field (safe from any thread, never blocks the writer)"""
+        while True:
+            seq = self._seq
+            if seq & 1:
+                time.sleep(0)
+                continue
+            count = self._count
+            start = self._start(count)
+            copy = {name: array[start:start + count].copy() for name, array in self._arrays.items()}
+            if seq == self._seq:
+                return copy
+
+    def tolist(self) -> list:
+        """Prices oldest-first as a Python list"""
+        return self.snapshot()['price'].tolist()
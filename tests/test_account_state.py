@@ -0,0 +1,181 @@
+"""
+Account-state service: TTL balance cache, invalidation and exchange filters
+"""
+import asyncio
+import json
+import pytest
+from websockets.asyncio.server import serve
+from src.account_state import AccountState, SymbolFilters
+from src.async_binance_connector import AsyncBinanceClient
+from src.configs.strategy_configs import CONFIG_ADAPTIVE
+from src.live_trading_bot import LiveGridHedgeBot
+from src.market_stream import UserDataStream
+from src.rate_limiter import RequestScheduler
+from src.utils.mock_exchange import MockExchange
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeConnector:
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+        self.usdt = 1_000.0
+
+    def get_account_info(self):
+        self.calls += 1
+        if self.fail:
+            return {}
+        return {'balances': [{'asset': 'USDT', 'free': str(self.usdt)}, {'asset': 'BTC', 'free': '0.5'}]}
+
+
+def test_ttl_and_invalidation():
+    clock, connector = Clock(), FakeConnector()
+    account = AccountState(connector, ttl=5.0, clock=clock)
+
+    assert account.balance('USDT') == 1_000.0
+    assert account.balance('BTC') == 0.5          # same snapshot
+    assert connector.calls == 1 and account.hits == 1
+
+    connector.usdt = 900.0
+    clock.now = 4.9
+    assert account.balance() == 1_000.0
+    clock.now = 5.0
+    assert account.balance() == 900.0
+
+    account.on_fill({'orderId': 1})
+    connector.usdt = 800.0
+    assert account.balance() == 800.0
+    assert connector.calls == 3
+
+    # A failed refresh keeps the last snapshot and retries on the next read
+    account.invalidate()
+    connector.fail = True
+    assert account.balance() == 800.0
+    assert account.balance() == 800.0
+    assert connector.calls == 5
+
+
+def test_user_events():
+    clock, connector = Clock(), FakeConnector()
+    account = AccountState(connector, ttl=5.0, clock=clock)
+    account.balance()
+
+    clock.now = 4.0
+    account.on_user_event({'e': 'outboundAccountPosition', 'B': [{'a': 'USDT', 'f': '750.0', 'l': '0'}]})
+    clock.now = 8.0                                # fresh again from the event
+    assert account.balance() == 750.0 and connector.calls == 1
+
+    account.on_user_event({'e': 'balanceUpdate', 'a': 'USDT', 'd': '100.0'})
+    assert account.balance() == 1_000.0 and connector.calls == 2
+
+
+def test_filters_round_for_any_symbol():
+    async def scenario():
+        async with MockExchange(prices={'BTCUSDT': 50_000.0, 'DOGEUSDT': 0.123456}) as ex:
+            ex.filters['DOGEUSDT'] = {'stepSize': '1.00000000', 'tickSize': '0.00001000',
+                                      'minNotional': '1.00000000'}
+            async with AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url) as client:
+                return await AccountState(client).load_filters_async(['BTCUSDT', 'DOGEUSDT'])
+
+    filters = asyncio.run(scenario())
+    btc, doge = filters['BTCUSDT'], filters['DOGEUSDT']
+
+    assert (btc.qty_decimals, btc.price_decimals, doge.qty_decimals, doge.price_decimals) == (5, 2, 0, 5)
+    assert btc.round_qty(0.0123456) == 0.01234
+    assert doge.round_qty(81.9) == 81.0
+    assert doge.round_price(0.1234567) == 0.12346
+    assert not doge.is_tradable(7.0, 0.12) and doge.is_tradable(9.0, 0.12)
+
+    bot = LiveGridHedgeBot(None, 'DOGEUSDT', CONFIG_ADAPTIVE.copy())
+    bot.filters = doge
+    assert bot.calculate_position_size(0.12, balance=1_000.0) == 400.0     # 48 USDT / 0.12
+
+
+def test_missing_filters_are_an_error():
+    async def scenario():
+        async with MockExchange(prices={'BTCUSDT': 50_000.0}) as ex:
+            async with AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url) as client:
+                account = AccountState(client)
+                with pytest.raises(ValueError, match='NOPEUSDT'):
+                    await account.load_filters_async(['BTCUSDT', 'NOPEUSDT'])
+                return account
+
+    account = asyncio.run(scenario())
+    assert list(account.filters) == ['BTCUSDT']
+
+
+def test_default_filters_match_old_rounding():
+    default = SymbolFilters.default('BTCUSDT')
+    assert default.round_qty(0.009999) == 0.00999
+    assert not default.is_tradable(0.0001, 50_000.0)     # $5 < $10
+
+
+def test_concurrent_reads_share_one_request():
+    async def scenario():
+        async with MockExchange(latency=0.05) as ex:
+            async with AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url) as client:
+                account = AccountState(client)
+                values = await asyncio.gather(*(account.balance_async() for _ in range(5)))
+                return values, len(ex.requests_to('/api/v3/account'))
+
+    values, requests = asyncio.run(scenario())
+    assert values == [10_000.0] * 5 and requests == 1
+
+
+def test_user_data_stream_updates_cache():
+    event = {'e': 'outboundAccountPosition', 'E': 1, 'u': 1,
+             'B': [{'a': 'USDT', 'f': '4321.0', 'l': '0.0'}]}
+    paths = []
+
+    async def handler(ws):
+        paths.append(ws.request.path)
+        await ws.send(json.dumps(event))
+        await ws.wait_closed()
+
+    async def scenario():
+        async with MockExchange() as ex, serve(handler, '127.0.0.1', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            async with AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url) as client:
+                account = AccountState(client)
+                await account.balance_async()
+                stream = UserDataStream(client, url=f"ws://127.0.0.1:{port}")
+                async for message in stream.events():
+                    account.on_user_event(message)
+                    await stream.stop()
+                return await account.balance_async(), len(ex.requests_to('/api/v3/account'))
+
+    balance, requests = asyncio.run(asyncio.wait_for(scenario(), 10))
+    assert balance == 4321.0 and requests == 1
+    assert paths[0].startswith('/ws/mock-listen-key')
+
+
+def test_user_data_stream_retries_a_rate_limited_listen_key():
+    async def handler(ws):
+        await ws.send(json.dumps({'e': 'balanceUpdate', 'a': 'USDT', 'd': '1.0'}))
+        await ws.wait_closed()
+
+    async def scenario():
+        scheduler = RequestScheduler(max_retries=0)
+        async with MockExchange() as ex, serve(handler, '127.0.0.1', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            async with AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url,
+                                          scheduler=scheduler) as client:
+                ex.fail_next('/api/v3/userDataStream', count=2, status=429, retry_after=0)
+                stream = UserDataStream(client, url=f"ws://127.0.0.1:{port}", backoff=0.01)
+                async for event in stream.events():
+                    await stream.stop()
+                return event, stream.reconnects
+
+    event, reconnects = asyncio.run(asyncio.wait_for(scenario(), 10))
+    assert event['e'] == 'balanceUpdate' and reconnects == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
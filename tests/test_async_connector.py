@@ -0,0 +1,170 @@
+"""
+Async Binance connector against the local mock exchange
+"""
+import asyncio
+import threading
+import time
+import pytest
+from src.async_binance_connector import AsyncBinanceClient, BinanceAPIError, _param
+from src.configs.strategy_configs import CONFIG_ADAPTIVE
+from src.live_trading_bot import LiveGridHedgeBot
+from src.utils.mock_exchange import MockExchange
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class ThreadRecorder:
+    """Telegram stand-in noting each call and whether it ran on the event loop's thread"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, threading.current_thread() is threading.main_thread()))
+
+
+def test_signed_requests_and_bad_secret():
+    async def scenario():
+        async with MockExchange() as ex:
+            async with AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url) as client:
+                assert await client.get_price('BTCUSDT') == 50_000.0
+                assert await client.get_account_balance('USDT') == 10_000.0
+            async with AsyncBinanceClient('test-key', 'wrong', base_url=ex.base_url) as client:
+                with pytest.raises(BinanceAPIError) as err:
+                    await client.request('GET', '/api/v3/account', signed=True)
+                assert err.value.code == -1022
+                assert await client.get_account_balance('USDT') == 0.0
+
+    _run(scenario())
+
+
+def test_clock_skew_is_synced_and_resynced():
+    async def scenario():
+        async with MockExchange() as ex:
+            ex.clock_skew_ms = 30_000                   # host clock 30s behind the exchange
+            async with AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url) as client:
+                assert abs(client.timestamp_offset - 30_000) < 1_000
+                assert await client.get_account_balance('USDT') == 10_000.0
+
+                ex.clock_skew_ms = -60_000              # drift: rejected once, resynced, retried
+                assert await client.get_account_balance('USDT') == 10_000.0
+                assert [r['status'] for r in ex.requests_to('/api/v3/account')] == [200, 400, 200]
+                assert len(ex.requests_to('/api/v3/time')) == 2
+
+                client.time_sync_interval = 0           # periodic resync before signed requests
+                await client.get_account_balance('USDT')
+                return len(ex.requests_to('/api/v3/time'))
+
+    assert _run(scenario()) == 3
+
+
+def test_market_limit_and_cancel():
+    async def scenario():
+        async with MockExchange(fee_rate=0.0) as ex:
+            async with AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url) as client:
+                order = await client.place_market_order('BTCUSDT', 'BUY', 0.01)
+                assert order['status'] == 'FILLED'
+                assert float(order['cummulativeQuoteQty']) == pytest.approx(500.0)
+                assert await client.get_account_balance('BTC') == pytest.approx(0.01)
+
+                resting = await client.place_limit_order('BTCUSDT', 'BUY', 0.01, 49_000.0)
+                filled_later = await client.place_limit_order('BTCUSDT', 'SELL', 0.01, 51_000.0)
+                assert len(await client.get_open_orders('BTCUSDT')) == 2
+
+                assert await client.cancel_order('BTCUSDT', resting['orderId'])
+                ex.set_price('BTCUSDT', 51_500.0)
+                status = await client.get_order_status('BTCUSDT', filled_later['orderId'])
+                assert status['status'] == 'FILLED'
+                assert await client.get_open_orders('BTCUSDT') == []
+                assert await client.get_account_balance('USDT') == pytest.approx(10_000 - 500 + 510)
+
+    _run(scenario())
+
+
+def test_float_params_never_use_exponent():
+    assert _param(0.00001) == '0.00001'
+    assert _param(50_000.0) == '50000'
+    assert _param(3) == '3'
+
+
+def _grid_bot(client, price):
+    config = CONFIG_ADAPTIVE.copy()
+    bot = LiveGridHedgeBot(None, 'BTCUSDT', config, client=client)
+    # Price sits 2.05 grid steps under the center -> on a grid level
+    bot.grid_center = price / (1 - 2.05 * config['grid_step'])
+    bot.open_position(45_000.0, 0.01)
+    bot.open_position(46_000.0, 0.01)
+    return bot
+
+
+def test_cycle_overlaps_requests():
+    latency = 0.1
+
+    async def scenario():
+        async with MockExchange(latency=latency, balances={'USDT': 10_000.0, 'BTC': 0.02}) as ex:
+            async with AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url) as client:
+                await client.get_price('BTCUSDT')             # warm the pool
+                ex.requests.clear()
+                bot = _grid_bot(client, 50_000.0)
+
+                started = time.perf_counter()
+                await bot.run_cycle_async()
+                elapsed = time.perf_counter() - started
+            return bot, ex, elapsed
+
+    bot, ex, elapsed = _run(scenario())
+
+    # price + book sync, then buy + one aggregated sell: 4 calls in two round trips
+    assert len(ex.requests) == 4
+    assert elapsed < 3.5 * latency
+
+    price_req, = ex.requests_to('/api/v3/ticker/price')
+    account_req, = ex.requests_to('/api/v3/account')
+    assert price_req['start'] < account_req['end'] and account_req['start'] < price_req['end']
+
+    assert list(bot.grid_positions) == [50_000.0]
+    assert len(ex.requests_to('/api/v3/order')) == 2
+    assert bot.total_trades == 3
+    assert bot.total_profit == pytest.approx((50_000 - 45_000) * 0.01 + (50_000 - 46_000) * 0.01)
+    assert bot.equity == pytest.approx(10_000.0 + 50_000 * 0.02)   # marked before the orders
+
+
+def test_rejected_order_leaves_state_untouched():
+    async def scenario():
+        async with MockExchange(balances={'USDT': 10_000.0, 'BTC': 0.0}) as ex:
+            async with AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url) as client:
+                bot = _grid_bot(client, 50_000.0)
+                await bot.run_cycle_async()
+            return bot
+
+    bot = _run(scenario())
+    # Sells fail (no BTC on the account), the buy goes through
+    assert sorted(bot.grid_positions) == [45_000.0, 46_000.0, 50_000.0]
+    assert bot.total_trades == 1
+
+
+
+def test_async_loop_keeps_telegram_off_the_event_loop():
+    telegram = ThreadRecorder()
+
+    async def broken_cycle():
+        raise RuntimeError('boom')
+
+    async def scenario():
+        async with MockExchange() as ex:
+            client = AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url)
+            bot = LiveGridHedgeBot(None, 'BTCUSDT', CONFIG_ADAPTIVE.copy(), telegram, client=client)
+            bot.run_cycle_async = broken_cycle
+            await bot.start_async(check_interval=0)
+            return bot
+
+    bot = _run(scenario())
+    assert not bot.is_running
+    assert [name for name, _ in telegram.calls] == ['notify_start', 'notify_error', 'notify_stop']
+    assert not any(on_loop for _, on_loop in telegram.calls)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,59 @@
+"""
+Vectorized candlestick rendering and downsampling
+"""
+import numpy as np
+import pandas as pd
+import pytest
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection, PolyCollection
+from core.performance import downsample_ohlc, draw_candlesticks
+
+
+def _bars(n):
+    rng = np.random.default_rng(17)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = np.r_[100.0, close[:-1]]
+    high = np.maximum(open_, close) + rng.uniform(0, 1, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 1, n)
+    return pd.date_range('2024-01-01', periods=n, freq='h'), open_, high, low, close
+
+
+def test_downsample_keeps_extremes_and_edges():
+    ts, o, h, l, c = _bars(10)
+    x = np.arange(10.0)
+    xs, o2, h2, l2, c2, step = downsample_ohlc(x, o, h, l, c, max_candles=4)
+
+    assert step == 3 and len(xs) == 4
+    np.testing.assert_array_equal(xs, [0, 3, 6, 9])
+    assert o2[1] == o[3] and c2[1] == c[5]
+    assert h2[1] == h[3:6].max() and l2[1] == l[3:6].min()
+    assert c2[-1] == c[-1] and h2[-1] == h[9]
+
+
+def test_two_collections_instead_of_artist_per_bar():
+    ts, o, h, l, c = _bars(8700)
+    fig, ax = plt.subplots()
+    draw_candlesticks(ax, ts, o, h, l, c, max_candles=500)
+
+    assert len(ax.lines) == 0 and len(ax.patches) == 0
+    wicks = [a for a in ax.collections if isinstance(a, LineCollection)]
+    bodies = [a for a in ax.collections if isinstance(a, PolyCollection)]
+    assert len(wicks) == 1 and len(bodies) == 1
+    assert 400 < len(bodies[0].get_paths()) <= 500
+    # Autoscaled to the whole range
+    assert ax.get_ylim()[0] <= l.min() and ax.get_ylim()[1] >= h.max()
+    plt.close(fig)
+
+
+def test_all_bars_drawn_when_they_fit():
+    ts, o, h, l, c = _bars(50)
+    fig, ax = plt.subplots()
+    draw_candlesticks(ax, ts.tz_localize('UTC'), o, h, l, c, max_candles=1000)
+    assert len(ax.collections[1].get_paths()) == 50
+    plt.close(fig)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
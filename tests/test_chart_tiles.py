@@ -0,0 +1,61 @@
+"""
+Windowed chart export: window splitting and parallel rendering
+"""
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from configs.strategy_configs import CONFIGS
+from core.strategy import DynamicGridHedgeStrategy
+from core.backtest import BacktestEngine
+from core.performance import PerformanceAnalyzer
+from core.chart_tiles import make_windows
+from utils.data_loader import generate_crash_data
+
+
+def _results(days=21):
+    np.random.seed(18)
+    data = generate_crash_data(100000, 60000, days, 'volatile').set_index('timestamp')
+    config = CONFIGS['adaptive'].copy()
+    return BacktestEngine(DynamicGridHedgeStrategy(config), data, config, verbose=False).run(), config
+
+
+def test_weekly_windows_cover_every_bar_once():
+    stamps = pd.Series(pd.date_range('2024-01-03 05:00', periods=24 * 20, freq='h'))  # a Wednesday
+    windows = make_windows(stamps, pd.DataFrame(), by='week')
+
+    assert windows[0][0] == stamps.iloc[0]
+    assert all(start.dayofweek == 0 and start.hour == 0 for start, _ in windows[1:])
+    counts = [((stamps >= a) & (stamps < b)).sum() for a, b in windows]
+    assert sum(counts) == len(stamps)
+    assert len(windows) == 4
+
+
+def test_trade_windows_hold_n_trades():
+    results, _ = _results()
+    trades = results['trades']
+    windows = make_windows(results['equity_curve']['timestamp'], trades, by='trades', trades_per_window=20)
+    per_window = [((trades['timestamp'] >= a) & (trades['timestamp'] < b)).sum() for a, b in windows]
+    assert sum(per_window) == len(trades)
+    assert max(per_window[1:-1], default=20) <= 20 + 5   # ties on one bar stay together
+
+
+def test_export_renders_each_window_and_index(tmp_path):
+    results, config = _results()
+    out = PerformanceAnalyzer(results, config).export_window_charts(str(tmp_path), by='week', workers=2)
+
+    windows = out['windows']
+    assert os.path.getsize(out['index']) > 0
+    assert len(windows) >= 3
+    assert all(os.path.getsize(path) > 0 for path in windows['path'])
+    assert windows['bars'].sum() == len(results['equity_curve'])
+    assert windows['trades'].sum() == len(results['trades'])
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        make_windows(pd.Series(pd.date_range('2024-01-01', periods=3, freq='h')), pd.DataFrame(), by='month')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,138 @@
+"""
+Checkpoint/resume of the chunked backtest and live-bot warm start
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from configs.strategy_configs import CONFIGS
+from core.strategy import DynamicGridHedgeStrategy
+from core.chunked_backtest import ChunkedBacktestEngine
+from core.checkpoint import load_checkpoint, curve_path, trades_path
+from core.datasource import FrameSource
+from utils.data_loader import generate_crash_data
+
+
+def _data():
+    np.random.seed(14)
+    return generate_crash_data(100000, 70000, 60, 'volatile').set_index('timestamp')
+
+
+def _engine(data, config, **kwargs):
+    return ChunkedBacktestEngine(DynamicGridHedgeStrategy(config), FrameSource(data), config,
+                                 chunk_size=100, record_every=3, verbose=False, **kwargs)
+
+
+def _assert_same(a, b):
+    pd.testing.assert_frame_equal(a['equity_curve'], b['equity_curve'], check_exact=True)
+    pd.testing.assert_frame_equal(a['trades'], b['trades'], check_exact=True)
+    assert a['final_equity'] == b['final_equity']
+
+
+def test_resume_after_interrupt_matches_uninterrupted_run(tmp_path):
+    data = _data()
+    config = CONFIGS['adaptive'].copy()
+    path = str(tmp_path / 'run.ckpt.npz')
+    reference = _engine(data, config).run()
+
+    engine = _engine(data, config, checkpoint_path=path, checkpoint_every=300)
+    run_chunk = engine.run_chunk
+
+    def crash_at_bar_700(offset, columns):
+        if offset >= 700:
+            raise KeyboardInterrupt
+        return run_chunk(offset, columns)
+
+    engine.run_chunk = crash_at_bar_700
+    with pytest.raises(KeyboardInterrupt):
+        engine.run()
+    snapshot = load_checkpoint(path)
+    assert snapshot['meta']['engine']['position'] == 600
+    # The snapshot holds no equity rows or trades; a torn append past it is ignored
+    assert not any(name.startswith(('recorder', 'trades')) for name in snapshot['arrays'])
+    assert snapshot['meta']['trades']['rows'] > 0
+    for side_file in (curve_path(path), trades_path(path)):
+        with open(side_file, 'ab') as f:
+            f.write(b'\x00' * 50)
+
+    resumed = ChunkedBacktestEngine.resume(path, DynamicGridHedgeStrategy(config),
+                                           FrameSource(data), config,
+                                           chunk_size=100, verbose=False)
+    assert resumed.position == 600
+    _assert_same(reference, resumed.run())
+
+
+def test_snapshot_round_trips_strategy_state(tmp_path):
+    data = _data()
+    config = CONFIGS['aggressive'].copy()
+    path = str(tmp_path / 'state.npz')
+    engine = _engine(data.iloc[:900], config, checkpoint_path=path)
+    engine.run()
+
+    resumed = ChunkedBacktestEngine.resume(path, DynamicGridHedgeStrategy(config),
+                                           FrameSource(data.iloc[:900]), config, verbose=False)
+    a, b = engine.strategy.state, resumed.strategy.state
+    for name in ('balance', 'spot_qty', 'futures_short_qty', 'futures_entry_price',
+                 'futures_margin', 'center_price', 'last_funding_time', 'next_entry_id'):
+        assert getattr(a, name) == getattr(b, name)
+    assert a.spot_entries == b.spot_entries
+    assert list(a.spot_entries) == list(b.spot_entries)
+    assert a.grid_levels_bought == b.grid_levels_bought
+    assert a.hedge_layers == b.hedge_layers
+    assert a.grid_index.prices == b.grid_index.prices
+    assert a.take_profit_index._entries == b.take_profit_index._entries
+    assert engine.ema_stream.get_state() == resumed.ema_stream.get_state()
+    assert engine.atr_stream.get_state()['mean'] == resumed.atr_stream.get_state()['mean']
+
+
+def test_resume_rejects_changed_config(tmp_path):
+    data = _data().iloc[:300]
+    config = CONFIGS['adaptive'].copy()
+    path = str(tmp_path / 'run.npz')
+    _engine(data, config, checkpoint_path=path).run()
+
+    changed = dict(config, grid_step=config['grid_step'] * 2)
+    with pytest.raises(ValueError, match='grid_step'):
+        ChunkedBacktestEngine.resume(path, DynamicGridHedgeStrategy(changed),
+                                     FrameSource(data), changed, verbose=False)
+
+
+def test_live_bot_warm_start(tmp_path):
+    from src.live_trading_bot import LiveGridHedgeBot
+
+    data = _data().iloc[:1200]
+    config = CONFIGS['aggressive'].copy()       # ends with open lots
+    path = str(tmp_path / 'end.npz')
+    engine = _engine(data, config, checkpoint_path=path)
+    engine.run()
+
+    entries = engine.strategy.state.spot_entries.values()
+    held = sum(q for _, q in entries)
+    assert held > 0
+
+    # Synthetic bars are old: lots are adopted, the EMA is not
+    live = LiveGridHedgeBot(None, 'BTCUSDT', config)
+    assert live.warm_start(path, base_balance=held)
+    assert live.grid_center == 0.0 and live.ema_stream.count == 0
+    assert sorted(live.grid_positions) == sorted({p for p, _ in entries})
+    assert sum(live.grid_positions.values()) == pytest.approx(held)
+
+    # A recent checkpoint also brings its EMA
+    live = LiveGridHedgeBot(None, 'BTCUSDT', dict(config, warm_start_max_age=float('inf')))
+    assert live.warm_start(path, base_balance=held)
+    assert live.grid_center == engine.ema_stream.value
+
+    # Never more lots than the account holds
+    live = LiveGridHedgeBot(None, 'BTCUSDT', config)
+    assert live.warm_start(path, base_balance=held / 2)
+    assert sum(live.grid_positions.values()) <= held / 2
+    assert live.warm_start(path, base_balance=0.0) and sum(live.grid_positions.values()) <= held / 2
+
+
+if __name__ == '__main__':
+    import tempfile, pathlib
+    for test in (test_resume_after_interrupt_matches_uninterrupted_run,
+                 test_snapshot_round_trips_strategy_state,
+                 test_resume_rejects_changed_config, test_live_bot_warm_start):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(pathlib.Path(tmp))
+    print('Checkpoint OK')
@@ -1,13 +1,13 @@
 """
 Test Grid + Hedge strategy with 6 months recent Dow Jones (^DJI) data
 """
-import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 from configs.strategy_configs import CONFIG_ADAPTIVE
 from core.strategy import DynamicGridHedgeStrategy
 from core.backtest import BacktestEngine
 from core.performance import PerformanceAnalyzer
+from utils.data_loader import load_yahoo_data
 
 def download_dji_data(months=6):
     """Download recent Dow Jones data from Yahoo Finance"""
@@ -17,12 +17,11 @@ def download_dji_data(months=6):
     print(f"\n📥 Downloading Dow Jones (^DJI) data...")
     print(f"Period: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
     
-    ticker = yf.Ticker("^DJI")
-    df = ticker.history(start=start_date, end=end_date, interval="1h")
+    df = load_yahoo_data("^DJI", start_date, end_date, interval="1h")
     
     if df.empty:
         print("⚠️ No hourly data, trying daily interval...")
-        df = ticker.history(start=start_date, end=end_date, interval="1d")
+        df = load_yahoo_data("^DJI", start_date, end_date, interval="1d")
     
     if df.empty:
         raise ValueError("Cannot download Dow Jones data from Yahoo Finance")
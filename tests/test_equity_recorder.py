@@ -0,0 +1,50 @@
+"""
+Columnar equity recorder: decimation, truncation and zero-copy hand-off
+"""
+import numpy as np
+import pandas as pd
+from configs.strategy_configs import CONFIGS
+from core.strategy import DynamicGridHedgeStrategy
+from core.backtest import BacktestEngine
+from utils.data_loader import generate_crash_data
+
+
+def _data(seed=5, days=40):
+    np.random.seed(seed)
+    return generate_crash_data(100000, 80000, days, 'volatile').set_index('timestamp')
+
+
+def test_decimated_curve_is_subset_of_full_curve():
+    data = _data()
+    config = CONFIGS['adaptive'].copy()
+    
+    full = BacktestEngine(DynamicGridHedgeStrategy(config), data, config, fast=True).run()
+    engine = BacktestEngine(DynamicGridHedgeStrategy(config), data, config,
+                            fast=True, record_every=24)
+    sparse = engine.run()
+    
+    curve = sparse['equity_curve']
+    assert len(curve) == len(data) // 24 + 1
+    assert curve['timestamp'].iloc[-1] == data.index[-1]
+    
+    expected = full['equity_curve'].iloc[engine.recorder.rows[:len(curve)]].reset_index(drop=True)
+    pd.testing.assert_frame_equal(curve, expected, check_exact=True)
+    assert sparse['final_equity'] == full['final_equity']
+
+
+def test_curve_truncated_on_early_stop_and_not_copied():
+    data = _data(seed=11, days=30)
+    config = CONFIGS['aggressive'].copy()
+    config['max_drawdown'] = 0.02
+    
+    engine = BacktestEngine(DynamicGridHedgeStrategy(config), data, config, fast=True)
+    curve = engine.run()['equity_curve']
+    
+    assert len(curve) == len(engine.recorder) < len(data)
+    assert np.shares_memory(curve['equity'].to_numpy(), engine.recorder.columns['equity'])
+
+
+if __name__ == '__main__':
+    test_decimated_curve_is_subset_of_full_curve()
+    test_curve_truncated_on_early_stop_and_not_copied()
+    print('Equity recorder OK')
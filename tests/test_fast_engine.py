@@ -0,0 +1,53 @@
+"""
+Parity test: fast array engine vs reference iterrows engine
+"""
+import numpy as np
+import pandas as pd
+from configs.strategy_configs import CONFIGS
+from core.strategy import DynamicGridHedgeStrategy
+from core.backtest import BacktestEngine
+from utils.data_loader import generate_crash_data
+
+
+def _run(data, config, fast):
+    strategy = DynamicGridHedgeStrategy(config)
+    engine = BacktestEngine(strategy, data, config, fast=fast)
+    return engine.run()
+
+
+def _assert_parity(data, config):
+    reference = _run(data, config, fast=False)
+    fast = _run(data, config, fast=True)
+    
+    pd.testing.assert_frame_equal(reference['equity_curve'], fast['equity_curve'],
+                                  check_exact=True)
+    pd.testing.assert_frame_equal(reference['trades'], fast['trades'],
+                                  check_exact=True)
+    assert reference['final_equity'] == fast['final_equity']
+    assert reference['final_price'] == fast['final_price']
+    return reference
+
+
+def test_fast_engine_matches_reference():
+    np.random.seed(7)
+    for scenario in ['gradual', 'steep', 'volatile']:
+        data = generate_crash_data(100000, 70000, 60, scenario).set_index('timestamp')
+        for name in ['adaptive', 'aggressive']:
+            config = CONFIGS[name].copy()
+            results = _assert_parity(data, config)
+            assert len(results['trades']) > 0
+
+
+def test_fast_engine_matches_reference_on_early_stop():
+    np.random.seed(11)
+    data = generate_crash_data(100000, 40000, 30, 'steep').set_index('timestamp')
+    config = CONFIGS['aggressive'].copy()
+    config['max_drawdown'] = 0.05
+    results = _assert_parity(data, config)
+    assert len(results['equity_curve']) < len(data)
+
+
+if __name__ == '__main__':
+    test_fast_engine_matches_reference()
+    test_fast_engine_matches_reference_on_early_stop()
+    print('Fast engine parity OK')
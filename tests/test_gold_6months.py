@@ -1,13 +1,13 @@
 """
 Test Grid + Hedge strategy with 6 months recent GOLD (XAUUSD) data
 """
-import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 from configs.strategy_configs import CONFIG_ADAPTIVE
 from core.strategy import DynamicGridHedgeStrategy
 from core.backtest import BacktestEngine
 from core.performance import PerformanceAnalyzer
+from utils.data_loader import load_yahoo_data
 
 def download_gold_data(months=6):
     """Download recent gold price data from Yahoo Finance"""
@@ -18,14 +18,12 @@ def download_gold_data(months=6):
     print(f"Period: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
     
     # GC=F is Gold Futures on Yahoo Finance
-    ticker = yf.Ticker("GC=F")
-    df = ticker.history(start=start_date, end=end_date, interval="1h")
+    df = load_yahoo_data("GC=F", start_date, end_date, interval="1h")
     
     if df.empty:
         print("⚠️ No data from GC=F, trying alternative source...")
         # Try XAUUSD=X (Gold Spot)
-        ticker = yf.Ticker("XAUUSD=X")
-        df = ticker.history(start=start_date, end=end_date, interval="1h")
+        df = load_yahoo_data("XAUUSD=X", start_date, end_date, interval="1h")
     
     if df.empty:
         raise ValueError("Cannot download gold data from Yahoo Finance")
@@ -0,0 +1,60 @@
+"""
+Sorted grid/position indexes agree with the linear scans they replace
+"""
+import random
+from core.grid_index import GridLevelIndex, TakeProfitIndex, PositionPriceIndex
+
+
+def test_crossed_levels_match_linear_scan():
+    rng = random.Random(1)
+    index = GridLevelIndex()
+    for _ in range(200):
+        center, step, levels = rng.uniform(1e3, 1e5), rng.uniform(0.005, 0.03), rng.randint(1, 25)
+        index.build(center, step, levels)
+        for _ in range(20):
+            price = center * rng.uniform(0.5, 1.1)
+            expected = [i for i in range(1, levels + 1) if price <= center * (1 - i * step)]
+            assert list(index.crossed(price)) == expected
+        # Exactly on a level price counts as crossed
+        i = rng.randint(1, levels)
+        assert i in index.crossed(center * (1 - i * step))
+
+
+def test_take_profit_index_pops_every_hit():
+    rng = random.Random(2)
+    index = TakeProfitIndex()
+    open_entries = {}
+    for key in range(500):
+        trigger = rng.uniform(90, 110)
+        index.add(key, trigger)
+        open_entries[key] = trigger
+        if key % 10 == 9:
+            price = rng.uniform(90, 110)
+            expected = sorted(k for k, t in open_entries.items() if price >= t)
+            assert sorted(index.pop_hits(price)) == expected
+            for k in expected:
+                del open_entries[k]
+    assert len(index) == len(open_entries)
+
+
+def test_position_index_matches_live_bot_scans():
+    rng = random.Random(3)
+    positions = {}
+    index = PositionPriceIndex()
+    step, take_profit = 0.016, 0.024
+    for _ in range(300):
+        price = rng.uniform(80000, 100000)
+        if rng.random() < 0.6:
+            positions[price] = 0.001
+            index.add(price)
+        elif positions:
+            gone = rng.choice(list(positions))
+            del positions[gone]
+            index.discard(gone)
+        
+        query = rng.uniform(78000, 105000)
+        expected_hits = sorted(p for p in positions if (query - p) / p >= take_profit)
+        assert index.take_profit_hits(query, take_profit) == expected_hits
+        
+        expected_near = any(abs(p - query) / query < step * 0.5 for p in positions)
+        assert any(abs(p - query) / query < step * 0.5 for p in index.nearest(query)) == expected_near
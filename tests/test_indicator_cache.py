@@ -0,0 +1,55 @@
+"""
+Indicator cache: hits, LRU eviction and disk tier
+"""
+import numpy as np
+from core.indicators import ema, atr
+from core.indicator_cache import IndicatorCache, fingerprint
+from utils.data_loader import generate_crash_data
+
+
+def _data():
+    np.random.seed(2)
+    return generate_crash_data(100000, 90000, 20, 'volatile').set_index('timestamp')
+
+
+def test_cached_values_match_and_are_reused():
+    data = _data()
+    cache = IndicatorCache(max_entries=8)
+    
+    first = cache.ema(data['close'], 50)
+    np.testing.assert_array_equal(first, ema(data['close'], 50).to_numpy())
+    assert cache.ema(data['close'].copy(), 50) is first
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+    assert not first.flags.writeable
+    
+    values = cache.atr(data['high'], data['low'], data['close'], 14)
+    np.testing.assert_array_equal(values, atr(data['high'], data['low'], data['close'], 14).to_numpy())
+    assert cache.ema(data['close'], 24) is not first
+
+
+def test_lru_eviction_and_fingerprint():
+    data = _data()
+    cache = IndicatorCache(max_entries=2)
+    a = cache.ema(data['close'], 10)
+    cache.ema(data['close'], 20)
+    cache.ema(data['close'], 10)
+    cache.ema(data['close'], 30)          # evicts period 20
+    assert len(cache) == 2
+    assert cache.ema(data['close'], 10) is a
+    cache.ema(data['close'], 20)
+    assert cache.stats()['misses'] == 4
+    
+    shifted = data['close'].to_numpy().copy()
+    shifted[-1] += 1
+    assert fingerprint(shifted) != fingerprint(data['close'].to_numpy())
+
+
+def test_disk_tier_shared_between_caches(tmp_path):
+    data = _data()
+    writer = IndicatorCache(cache_dir=str(tmp_path))
+    expected = writer.atr(data['high'], data['low'], data['close'], 14)
+    
+    reader = IndicatorCache(cache_dir=str(tmp_path))
+    values = reader.atr(data['high'], data['low'], data['close'], 14)
+    assert reader.stats()['disk_hits'] == 1 and reader.stats()['misses'] == 0
+    np.testing.assert_array_equal(values, expected)
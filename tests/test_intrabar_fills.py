@@ -0,0 +1,88 @@
+"""
+Intrabar (open/high/low/close path) fill mode
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from configs.strategy_configs import CONFIGS
+from core.strategy import DynamicGridHedgeStrategy
+from core.backtest import BacktestEngine
+from core.kernel import run_kernel_backtest
+from utils.data_loader import generate_crash_data
+
+
+def _config(**overrides):
+    config = CONFIGS['adaptive'].copy()
+    config.update(grid_step=0.01, grid_levels=5, grid_take_profit=0.01,
+                  hedge_atr_threshold=[50.0], hedge_sizes=[0.05])
+    config.update(overrides)
+    return config
+
+
+def _bar_trades(config, bar):
+    strategy = DynamicGridHedgeStrategy(config)
+    strategy.execute(pd.Series(bar), 100.0, 1.0, pd.Timestamp('2024-01-01'))
+    return list(strategy.state.trades)
+
+
+def test_wick_fills_grid_level_and_take_profit():
+    # Closes flat at 100: the close-only mode never sees level 1 (99)
+    bar = {'open': 100.0, 'high': 100.5, 'low': 98.5, 'close': 100.0}
+    assert _bar_trades(_config(), bar) == []
+
+    trades = _bar_trades(_config(fill_mode='ohlc'), bar)
+    assert [t['type'] for t in trades] == ['GRID_BUY', 'GRID_SELL']
+    assert trades[0]['level'] == 1
+    assert trades[0]['price'] == 99.0
+    # Sold at the take-profit trigger on the way back up, not at the high
+    assert trades[1]['exit_price'] == 99.0 * (1 + 0.01)
+
+
+def test_down_bar_visits_high_before_low():
+    # O->H->L->C: the buy at 99 happens after the high, so nothing is sold
+    bar = {'open': 100.0, 'high': 100.5, 'low': 98.5, 'close': 99.5}
+    trades = _bar_trades(_config(fill_mode='ohlc'), bar)
+    assert [t['type'] for t in trades] == ['GRID_BUY']
+
+
+def test_every_crossed_level_fills_in_order():
+    bar = {'open': 100.0, 'high': 100.0, 'low': 96.5, 'close': 96.5}
+    trades = _bar_trades(_config(fill_mode='ohlc'), bar)
+    assert [t['level'] for t in trades] == [1, 2, 3]
+    assert [t['price'] for t in trades] == [100.0 * (1 - i * 0.01) for i in (1, 2, 3)]
+
+
+def test_engines_agree_in_ohlc_mode():
+    np.random.seed(11)
+    data = generate_crash_data(100000, 70000, 30, 'volatile').set_index('timestamp')
+    config = CONFIGS['adaptive'].copy()
+    config['fill_mode'] = 'ohlc'
+
+    results = []
+    for fast in (False, True):
+        strategy = DynamicGridHedgeStrategy(config)
+        results.append(BacktestEngine(strategy, data, config, fast=fast, verbose=False).run())
+
+    pd.testing.assert_frame_equal(results[0]['equity_curve'], results[1]['equity_curve'],
+                                  check_exact=True)
+    pd.testing.assert_frame_equal(results[0]['trades'], results[1]['trades'], check_exact=True)
+
+    close_config = CONFIGS['adaptive'].copy()
+    close_results = BacktestEngine(DynamicGridHedgeStrategy(close_config), data, close_config,
+                                   fast=True, verbose=False).run()
+    assert len(results[1]['trades']) >= len(close_results['trades'])
+
+
+def test_kernel_rejects_intrabar_mode():
+    data = generate_crash_data(100000, 90000, 2, 'gradual').set_index('timestamp')
+    with pytest.raises(ValueError):
+        run_kernel_backtest(data, _config(fill_mode='ohlc'), verbose=False)
+
+
+if __name__ == '__main__':
+    test_wick_fills_grid_level_and_take_profit()
+    test_down_bar_visits_high_before_low()
+    test_every_crossed_level_fills_in_order()
+    test_engines_agree_in_ohlc_mode()
+    test_kernel_rejects_intrabar_mode()
+    print("✅ Intrabar fill tests passed")
@@ -0,0 +1,58 @@
+"""
+Reference test: compiled strategy kernel vs Python strategy path
+"""
+import numpy as np
+import pandas as pd
+from configs.strategy_configs import CONFIGS
+from core.strategy import DynamicGridHedgeStrategy
+from core.backtest import BacktestEngine
+from core.kernel import run_kernel_backtest
+from utils.data_loader import generate_crash_data
+
+
+def _assert_same_results(expected, actual):
+    pd.testing.assert_frame_equal(expected['equity_curve'], actual['equity_curve'],
+                                  check_exact=True)
+    pd.testing.assert_frame_equal(expected['trades'], actual['trades'], check_exact=True)
+    assert expected['final_equity'] == actual['final_equity']
+    assert expected['final_price'] == actual['final_price']
+    
+    expected_state = dict(expected['final_state'])
+    actual_state = dict(actual['final_state'])
+    assert len(expected_state.pop('trades')) == len(actual_state.pop('trades'))
+    assert expected_state == actual_state
+
+
+def _compare(data, config, record_every=1):
+    strategy = DynamicGridHedgeStrategy(config)
+    expected = BacktestEngine(strategy, data, config, record_every=record_every).run()
+    actual = run_kernel_backtest(data, config, record_every=record_every)
+    _assert_same_results(expected, actual)
+    return actual
+
+
+def test_kernel_reproduces_python_path():
+    np.random.seed(21)
+    for scenario in ['gradual', 'steep', 'volatile']:
+        data = generate_crash_data(100000, 65000, 90, scenario).set_index('timestamp')
+        for name in CONFIGS:
+            results = _compare(data, CONFIGS[name].copy())
+            assert len(results['trades']) > 0
+
+
+def test_kernel_reproduces_hedges_stops_and_decimation():
+    np.random.seed(4)
+    data = generate_crash_data(100000, 45000, 60, 'steep').set_index('timestamp')
+    config = CONFIGS['aggressive'].copy()
+    results = _compare(data, config, record_every=7)
+    assert (results['trades']['type'] == 'HEDGE_OPEN').any()
+    
+    config['max_drawdown'] = 0.03
+    results = _compare(data, config)
+    assert len(results['equity_curve']) < len(data)
+
+
+if __name__ == '__main__':
+    test_kernel_reproduces_python_path()
+    test_kernel_reproduces_hedges_stops_and_decimation()
+    print('Kernel parity OK')
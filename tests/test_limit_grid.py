@@ -0,0 +1,224 @@
+"""
+Resting limit-order grid mode: only changed levels are cancelled/placed
+"""
+import itertools
+from collections import Counter
+import pytest
+from src.configs.strategy_configs import CONFIG_ADAPTIVE
+from src.limit_grid import desired_orders, diff_orders, grid_level_prices
+from src.live_trading_bot import LiveGridHedgeBot
+
+
+class FakeLimitExchange:
+    """Blocking connector stand-in with resting GTC orders and maker fills"""
+
+    def __init__(self, price=50_000.0, usdt=10_000.0, fee=0.001, fee_asset=None):
+        self.price = price
+        self.fee = fee
+        self.fee_asset = fee_asset      # None = taken from the received asset
+        self.balances = {'USDT': usdt, 'BTC': 0.0, 'BNB': 0.0}
+        self.orders = {}
+        self.trades = []
+        self.calls = Counter()
+        self._ids = itertools.count(1)
+
+    def get_price(self, symbol):
+        return self.price
+
+    def get_account_info(self):
+        self.calls['account'] += 1
+        return {'balances': [{'asset': a, 'free': str(v)} for a, v in self.balances.items()]}
+
+    def get_open_orders(self, symbol=None):
+        self.calls['open_orders'] += 1
+        return [dict(o) for o in self.orders.values() if o['status'] == 'NEW']
+
+    def place_limit_order(self, symbol, side, quantity, price, client_order_id=None):
+        self.calls['place'] += 1
+        asset, amount = ('USDT', quantity * price) if side == 'BUY' else ('BTC', quantity)
+        if self.balances[asset] < amount - 1e-9:
+            return {}
+        self.balances[asset] -= amount
+        order_id = next(self._ids)
+        self.orders[order_id] = {'orderId': order_id, 'side': side, 'price': f"{price:.2f}",
+                                 'origQty': f"{quantity:.8f}", 'executedQty': '0.0', 'status': 'NEW',
+                                 'clientOrderId': client_order_id or f"manual{order_id}"}
+        return dict(self.orders[order_id])
+
+    def cancel_order(self, symbol, order_id):
+        self.calls['cancel'] += 1
+        order = self.orders[order_id]
+        if order['status'] != 'NEW':
+            return {}
+        order['status'] = 'CANCELED'
+        qty = float(order['origQty']) - float(order['executedQty'])
+        if order['side'] == 'BUY':
+            self.balances['USDT'] += qty * float(order['price'])
+        else:
+            self.balances['BTC'] += qty
+        return dict(self.orders[order_id])
+
+    def get_order_status(self, symbol, order_id):
+        self.calls['status'] += 1
+        return dict(self.orders[order_id])
+
+    def get_order_trades(self, symbol, order_id):
+        self.calls['trades'] += 1
+        return [dict(t) for t in self.trades if t['orderId'] == order_id]
+
+    def fill(self, order_id, qty):
+        """Maker fill of ``qty`` of a resting order (the order stays open if partial)"""
+        order = self.orders[order_id]
+        limit = float(order['price'])
+        if self.fee_asset:
+            fee, asset, kept = qty * limit * self.fee, self.fee_asset, 1.0
+        elif order['side'] == 'BUY':
+            fee, asset, kept = qty * self.fee, 'BTC', 1 - self.fee
+        else:
+            fee, asset, kept = qty * limit * self.fee, 'USDT', 1 - self.fee
+        if order['side'] == 'BUY':
+            self.balances['BTC'] += qty * kept
+        else:
+            self.balances['USDT'] += qty * limit * kept
+        self.trades.append({'orderId': order_id, 'price': order['price'], 'qty': f"{qty:.8f}",
+                            'commission': f"{fee:.8f}", 'commissionAsset': asset})
+        executed = float(order['executedQty']) + qty
+        order['executedQty'] = f"{executed:.8f}"
+        if executed >= float(order['origQty']) - 1e-12:
+            order['status'] = 'FILLED'
+
+    def set_price(self, price):
+        self.price = price
+        for order_id, order in self.orders.items():
+            limit = float(order['price'])
+            if order['status'] != 'NEW':
+                continue
+            if (order['side'] == 'BUY' and price <= limit) or (order['side'] == 'SELL' and price >= limit):
+                self.fill(order_id, float(order['origQty']) - float(order['executedQty']))
+
+
+def _bot(exchange):
+    config = dict(CONFIG_ADAPTIVE, order_mode='limit', limit_grid_levels=5)
+    bot = LiveGridHedgeBot(exchange, 'BTCUSDT', config)
+    bot.grid_center = 50_000.0
+    return bot
+
+
+def _calls(exchange, bot):
+    exchange.calls.clear()
+    bot.run_cycle()
+    return exchange.calls['place'], exchange.calls['cancel']
+
+
+def test_unchanged_grid_costs_no_order_calls():
+    exchange = FakeLimitExchange()
+    bot = _bot(exchange)
+
+    assert _calls(exchange, bot) == (5, 0)
+    assert sorted(o['price'] for o in bot.resting_orders.values()) == \
+        sorted(grid_level_prices(50_000.0, 0.016, 5))
+    assert _calls(exchange, bot) == (0, 0)
+    assert exchange.calls['open_orders'] == 1
+    # Locked USDT still counts towards equity
+    assert bot.equity == pytest.approx(10_000.0)
+
+
+def test_fills_place_take_profits_and_rebuy_level():
+    exchange = FakeLimitExchange()
+    bot = _bot(exchange)
+    bot.run_cycle()
+
+    exchange.set_price(48_300.0)               # through levels 1 and 2
+    assert _calls(exchange, bot) == (2, 0)     # two take-profit sells, nothing else
+    assert sorted(bot.grid_positions) == [48_400.0, 49_200.0]
+    assert bot.total_trades == 2
+
+    lot = bot.grid_positions[48_400.0]
+    exchange.set_price(49_600.0)               # level-2 lot reaches its take profit
+    assert _calls(exchange, bot) == (1, 0)     # level 2 buy goes back on
+    assert list(bot.grid_positions) == [49_200.0]
+    assert bot.total_profit == pytest.approx((49_561.6 - 48_400.0) * lot)
+
+
+def test_rebalance_replaces_only_buys():
+    exchange = FakeLimitExchange()
+    bot = _bot(exchange)
+    bot.run_cycle()
+    exchange.set_price(49_100.0)
+    bot.run_cycle()
+
+    bot.grid_center = 56_000.0
+    exchange.set_price(55_000.0)               # > 9.5% above the grid center
+    placed, cancelled = _calls(exchange, bot)
+
+    assert bot.limit_center == 56_000.0
+    assert cancelled == 4 and placed == 4      # 55,104 is above the market
+    # The take-profit sell was not cancelled: it filled on the way up
+    assert bot.grid_positions == {} and bot.total_profit > 0
+    assert all(o['side'] == 'BUY' for o in bot.resting_orders.values())
+
+
+def test_cancel_books_fills_after_the_open_orders_snapshot():
+    exchange = FakeLimitExchange(fee_asset='BNB')
+    bot = _bot(exchange)
+    bot.run_cycle()
+
+    # Level 1 buy half-fills after the snapshot the rebalance diff is based on
+    level, order_id = next((s['price'], i) for i, s in bot.resting_orders.items() if s['price'] == 49_200.0)
+    snapshot = exchange.get_open_orders()
+    exchange.fill(order_id, float(exchange.orders[order_id]['origQty']) / 2)
+    bot.grid_center = bot.limit_center = 56_000.0
+    bot.update_limit_grid(55_000.0, exchange.balances['USDT'], snapshot)
+
+    half = float(exchange.orders[order_id]['executedQty'])
+    # Booked from the cancel response; the BNB commission does not shrink the lot
+    assert bot.grid_positions == {level: bot.filters.round_qty(half)} and half > 0
+    assert bot.total_fees == pytest.approx(0.0)
+    assert order_id not in bot.resting_orders
+
+
+def test_limit_fees_come_from_the_trades():
+    exchange = FakeLimitExchange()
+    bot = _bot(exchange)
+    bot.run_cycle()
+    exchange.set_price(49_100.0)
+    bot.run_cycle()
+
+    (level, lot), = bot.grid_positions.items()
+    qty = float(exchange.trades[0]['qty'])
+    assert lot == pytest.approx(qty * (1 - exchange.fee), abs=1e-5)
+    assert bot.total_fees == pytest.approx(qty * exchange.fee * level)
+
+
+def test_orders_not_placed_by_the_grid_are_left_alone():
+    exchange = FakeLimitExchange()
+    manual = exchange.place_limit_order('BTCUSDT', 'BUY', 0.001, 45_000.0)['orderId']
+    bot = _bot(exchange)
+    bot.run_cycle()
+    bot.grid_center = 56_000.0
+    exchange.set_price(55_000.0)               # re-centres: every grid buy is replaced
+    bot.run_cycle()
+
+    assert exchange.orders[manual]['status'] == 'NEW'
+    assert manual not in bot.resting_orders
+    assert all(o['clientOrderId'].startswith('ntdgrid-')
+               for o in exchange.orders.values() if o['orderId'] != manual)
+
+
+def test_diff_orders():
+    desired = desired_orders([100.0, 99.0], {95.0: 0.5}, 0.02, 101.0)
+    open_orders = [
+        {'orderId': 1, 'side': 'BUY', 'price': '100.00', 'origQty': '1'},
+        {'orderId': 2, 'side': 'BUY', 'price': '100.00', 'origQty': '1'},    # duplicate
+        {'orderId': 3, 'side': 'SELL', 'price': '96.90', 'origQty': '0.4'},  # wrong size
+        {'orderId': 4, 'side': 'BUY', 'price': '90.00', 'origQty': '1'},     # not on the grid
+    ]
+    to_cancel, to_place, kept = diff_orders(desired, open_orders)
+
+    assert [o['orderId'] for o in to_cancel] == [2, 3, 4]
+    assert sorted((s['side'], s['price']) for s in to_place) == [('BUY', 99.0), ('SELL', 96.9)]
+    assert list(kept) == [('BUY', 100.0)]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,154 @@
+"""
+WebSocket market-data feed: parsing, reconnect, record/replay and bot evaluation
+"""
+import asyncio
+import json
+import threading
+import pytest
+from websockets.asyncio.server import serve
+from src.async_binance_connector import AsyncBinanceClient
+from src.configs.strategy_configs import CONFIG_ADAPTIVE
+from src.live_trading_bot import LiveGridHedgeBot
+from src.market_stream import MarketStream, StreamReplayer, parse_message
+from src.utils.mock_exchange import MockExchange
+
+HOUR = 3_600_000
+T0 = 1_700_000_000_000 // HOUR * HOUR
+
+
+def kline(symbol, open_time, close, closed=True):
+    return {'stream': f"{symbol.lower()}@kline_1h", 'data': {
+        'e': 'kline', 'E': open_time + HOUR, 's': symbol,
+        'k': {'t': open_time, 'T': open_time + HOUR - 1, 's': symbol, 'i': '1h',
+              'o': str(close), 'h': str(close), 'l': str(close), 'c': str(close),
+              'v': '1.0', 'x': closed}}}
+
+
+def book(symbol, price, update_id):
+    return {'stream': f"{symbol.lower()}@bookTicker", 'data': {
+        'u': update_id, 's': symbol, 'b': str(price - 0.5), 'B': '1.0',
+        'a': str(price + 0.5), 'A': '1.0'}}
+
+
+def test_parse_kline_and_book_ticker():
+    k = parse_message(json.dumps(kline('BTCUSDT', 0, 50_000.0)))
+    assert k['type'] == 'kline' and k['closed'] and k['close'] == 50_000.0
+    b = parse_message(book('BTCUSDT', 50_000.0, 7))
+    assert b['type'] == 'book' and b['price'] == 50_000.0 and b['bid'] == 49_999.5
+    assert parse_message({'result': None, 'id': 1}) is None
+
+
+def test_stream_reconnects_and_records(tmp_path):
+    sent = [kline('BTCUSDT', i * HOUR, 50_000.0 + i) for i in range(6)]
+    paths = []
+
+    async def handler(ws):
+        paths.append(ws.request.path)
+        # Each connection sends the next 3 messages, then drops
+        start = 3 * (len(paths) - 1)
+        for message in sent[start:start + 3]:
+            await ws.send(json.dumps(message))
+        await ws.close()
+
+    async def scenario():
+        async with serve(handler, '127.0.0.1', 0) as server:
+            port = server.sockets[0].getsockname()[1]
+            stream = MarketStream(['BTCUSDT'], url=f"ws://127.0.0.1:{port}", backoff=0.01,
+                                  record_path=str(tmp_path / 'rec.jsonl'))
+            events = []
+            async for event in stream.events():
+                events.append(event)
+                if len(events) == len(sent):
+                    await stream.stop()
+            return stream, events
+
+    stream, events = asyncio.run(asyncio.wait_for(scenario(), 10))
+    assert [e['close'] for e in events] == [50_000.0 + i for i in range(6)]
+    assert stream.reconnects >= 1
+    assert paths[0] == '/stream?streams=btcusdt@kline_1h/btcusdt@bookTicker'
+
+    async def replay():
+        return [e async for e in StreamReplayer(str(tmp_path / 'rec.jsonl')).events()]
+
+    assert asyncio.run(replay()) == events
+
+
+def _replay_bot(records):
+    async def scenario():
+        async with MockExchange(balances={'USDT': 10_000.0, 'BTC': 0.0}, fee_rate=0.0) as ex:
+            async with AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url) as client:
+                bot = LiveGridHedgeBot(None, 'BTCUSDT', CONFIG_ADAPTIVE.copy(), client=client)
+                bot.grid_center = 50_000.0
+                for record in records:
+                    msg = record['msg']
+                    if 'u' in msg['data']:
+                        ex.set_price('BTCUSDT', float(msg['data']['b']) + 0.5)
+                    await bot.on_market_event(parse_message(msg))
+            return bot, ex
+
+    return asyncio.run(scenario())
+
+
+def test_replay_drives_candles_and_grid_trades():
+    config = CONFIG_ADAPTIVE
+    level = 50_000.0 * (1 - 2.05 * config['grid_step'])     # on a grid level below center
+    exit_price = level * (1 + config['grid_take_profit'] + 0.001)
+    messages = [
+        kline('BTCUSDT', T0, 50_000.0),
+        kline('BTCUSDT', T0 + HOUR, 49_800.0, closed=False),
+        kline('BTCUSDT', T0, 50_000.0),                      # duplicate close, ignored
+        book('BTCUSDT', 49_500.0, 1),
+        book('BTCUSDT', level, 2),                           # buy
+        book('BTCUSDT', level, 3),                           # already bought here
+        kline('BTCUSDT', T0 + HOUR, level),
+        book('BTCUSDT', exit_price, 4),                      # take profit
+    ]
+    bot, ex = _replay_bot([{'t': i, 'msg': m} for i, m in enumerate(messages)])
+
+    assert bot.price_history.tolist() == [50_000.0, level]
+    assert bot.last_candle_time == T0 + HOUR
+    assert [t['isBuyer'] for t in ex.trades] == [True, False]
+    assert bot.grid_positions == {}
+    assert bot.total_trades == 2 and bot.total_profit > 0
+
+
+def test_other_symbols_are_ignored():
+    bot, ex = _replay_bot([{'t': 0, 'msg': book('ETHUSDT', 10.0, 1)}])
+    assert len(bot.price_history) == 0
+    assert [r['path'] for r in ex.requests] == ['/api/v3/time']     # clock sync on connect only
+
+
+
+class ThreadRecorder:
+    """Telegram stand-in noting whether each call ran on the event loop's thread"""
+
+    def __init__(self):
+        self.on_loop = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.on_loop.append(threading.current_thread() is threading.main_thread())
+
+
+def test_start_stream_leaves_a_shared_client_open():
+    telegram = ThreadRecorder()
+    records = [{'t': 0, 'msg': book('ETHUSDT', 10.0, 1)}]
+
+    async def scenario():
+        async with MockExchange() as ex:
+            async with AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url) as shared:
+                bot = LiveGridHedgeBot(None, 'BTCUSDT', CONFIG_ADAPTIVE.copy(), telegram, client=shared)
+                await bot.start_stream(StreamReplayer(records))
+                still_open = await shared.get_price('BTCUSDT')
+
+            own = AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url)
+            bot = LiveGridHedgeBot(None, 'BTCUSDT', CONFIG_ADAPTIVE.copy(), client=own)
+            await bot.start_stream(StreamReplayer(records))
+            return still_open, own.session
+
+    price, own_session = asyncio.run(asyncio.wait_for(scenario(), 10))
+    assert price == 50_000.0 and own_session is None
+    assert telegram.on_loop == [False, False]         # notify_start / notify_stop ran in worker threads
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
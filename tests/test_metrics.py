@@ -0,0 +1,74 @@
+"""
+Vectorized metrics: parity with the old pandas formulas and batch scoring
+"""
+import numpy as np
+import pytest
+from configs.strategy_configs import CONFIGS
+from core.strategy import DynamicGridHedgeStrategy
+from core.backtest import BacktestEngine
+from core.performance import PerformanceAnalyzer
+from core.metrics import equity_metrics, exposure
+from utils.data_loader import generate_crash_data
+
+
+def _results():
+    np.random.seed(16)
+    data = generate_crash_data(100000, 60000, 30, 'volatile').set_index('timestamp')
+    config = CONFIGS['adaptive'].copy()
+    return BacktestEngine(DynamicGridHedgeStrategy(config), data, config, verbose=False).run(), config
+
+
+def test_matches_pandas_drawdown_and_sharpe():
+    results, config = _results()
+    metrics = PerformanceAnalyzer(results, config).calculate_metrics()
+
+    equity = results['equity_curve']['equity']
+    running_max = equity.expanding().max()
+    assert metrics['max_drawdown'] == ((equity - running_max) / running_max * 100).min()
+    returns = equity.pct_change().dropna()
+    assert metrics['sharpe_ratio'] == pytest.approx(np.sqrt(24 * 365) * returns.mean() / returns.std(),
+                                                    rel=1e-12)
+
+    trades = results['trades']
+    assert metrics['hedge_opens'] == (trades['type'] == 'HEDGE_OPEN').sum()
+    assert metrics['win_rate'] == pytest.approx(
+        (trades.loc[trades['type'] == 'GRID_SELL', 'profit'] > 0).mean() * 100)
+
+
+def test_fallback_index_from_dataframe_matches_log():
+    results, config = _results()
+    expected = PerformanceAnalyzer(results, config).calculate_metrics()
+    # Results without a trade log (e.g. loaded from CSV) group the DataFrame instead
+    results = dict(results, final_state=dict(results['final_state'], trades=None))
+    assert PerformanceAnalyzer(results, config).calculate_metrics() == expected
+
+
+def test_underwater_stats_and_ratios():
+    equity = np.array([100.0, 110.0, 99.0, 104.5, 110.0, 121.0, 118.8])
+    m = equity_metrics(equity, periods_per_year=6)
+
+    assert m['max_drawdown'] == pytest.approx(-10.0)
+    assert m['time_under_water'] == pytest.approx(3 / 7 * 100)
+    assert m['max_underwater_bars'] == 2
+    assert m['ulcer_index'] == pytest.approx(np.sqrt((10.0 ** 2 + 5.0 ** 2 + (2.2 / 1.21) ** 2) / 7))
+    assert m['annual_return'] == pytest.approx(18.8)
+    assert m['calmar_ratio'] == pytest.approx(1.88)
+    assert m['sortino_ratio'] > m['sharpe_ratio'] > 0
+
+
+def test_batch_matches_single_runs():
+    rng = np.random.default_rng(0)
+    curves = 1000 * np.cumprod(1 + rng.normal(0, 0.01, (50, 500)), axis=1)
+    batch = equity_metrics(curves)
+    for i in (0, 17, 49):
+        single = equity_metrics(curves[i])
+        for key, value in single.items():
+            assert batch[key][i] == pytest.approx(value, rel=1e-12)
+
+
+def test_exposure_counts_bars_with_any_position():
+    assert exposure(np.array([0.0, 1.0, 0.0, 0.0]), np.array([0.0, 0.0, 2.0, 0.0])) == 50.0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
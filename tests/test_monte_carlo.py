@@ -0,0 +1,66 @@
+"""
+Vectorized path generator and parallel Monte Carlo runner
+"""
+import numpy as np
+from configs.strategy_configs import CONFIGS
+from core.monte_carlo import run_paths, run_monte_carlo, summarize
+from core.sweep import run_config
+from utils.data_loader import generate_price_paths, path_frame, PATH_SCENARIOS
+
+
+def test_paths_shape_and_ohlc_consistency():
+    for scenario in PATH_SCENARIOS:
+        paths = generate_price_paths(8, 100000, 70000, 10, scenario, seed=1)
+        assert paths['close'].shape == (8, 240)
+        assert len(paths['timestamp']) == 240
+        assert np.all(paths['high'] >= np.maximum(paths['open'], paths['close']))
+        assert np.all(paths['low'] <= np.minimum(paths['open'], paths['close']))
+        assert np.all(paths['close'] > 0)
+
+
+def test_paths_are_reproducible_per_seed():
+    a = generate_price_paths(4, 100000, 80000, 5, 'jump', seed=42)
+    b = generate_price_paths(4, 100000, 80000, 5, 'jump', seed=np.random.default_rng(42))
+    c = generate_price_paths(4, 100000, 80000, 5, 'jump', seed=43)
+    assert np.array_equal(a['close'], b['close'])
+    assert not np.array_equal(a['close'], c['close'])
+
+
+def test_gbm_median_ends_near_target():
+    paths = generate_price_paths(4000, 100000, 80000, 30, 'gbm', seed=3, daily_vol=0.03)
+    assert paths['close'][0, 0] == 100000
+    assert abs(np.median(paths['close'][:, -1]) / 80000 - 1) < 0.01
+
+
+def test_parallel_runner_matches_direct_runs():
+    config = CONFIGS['adaptive'].copy()
+    paths = generate_price_paths(6, 100000, 75000, 20, 'volatile', seed=5)
+
+    results = run_paths(paths, config, workers=2)
+    assert list(results.index) == list(range(6))
+    for i in range(6):
+        expected = run_config(path_frame(paths, i), dict(config, backtest_days=20))
+        assert results.loc[i, 'roi'] == expected['roi']
+        assert results.loc[i, 'max_drawdown'] == expected['max_drawdown']
+
+    assert results.equals(run_paths(paths, config, workers=1))
+
+
+def test_run_monte_carlo_distributions():
+    out = run_monte_carlo(CONFIGS['adaptive'].copy(), 5, 100000, 80000, 10,
+                          scenario='steep', seed=8, workers=1)
+    assert out['roi'].shape == (5,) and out['max_drawdown'].shape == (5,)
+    assert np.all(out['max_drawdown'] <= 0)
+    summary = out['summary']
+    assert list(summary.index) == ['roi', 'max_drawdown']
+    assert summary.loc['roi', 'p50'] == np.median(out['roi'])
+    assert summarize(out['results']).equals(summary)
+
+
+if __name__ == '__main__':
+    test_paths_shape_and_ohlc_consistency()
+    test_paths_are_reproducible_per_seed()
+    test_gbm_median_ends_near_target()
+    test_parallel_runner_matches_direct_runs()
+    test_run_monte_carlo_distributions()
+    print('Monte Carlo OK')
@@ -0,0 +1,167 @@
+"""
+Multi-symbol engine: capital allocation, shared account cache and one combined stream
+"""
+import asyncio
+import threading
+import pytest
+from src.async_binance_connector import AsyncBinanceClient
+from src.configs.strategy_configs import CONFIG_ADAPTIVE
+from src.multi_symbol_engine import MultiSymbolEngine, allocate_capital, parse_allocations
+from src.order_executor import PositionBook
+from src.utils.mock_exchange import MockExchange
+
+STEP = CONFIG_ADAPTIVE['grid_step']
+RISK = CONFIG_ADAPTIVE['grid_risk_per_order']
+
+
+class ScriptedStream:
+    """Moves the mock market, then yields the matching book update"""
+
+    def __init__(self, exchange, ticks):
+        self.exchange = exchange
+        self.ticks = ticks
+
+    async def events(self):
+        for update_id, (symbol, price) in enumerate(self.ticks):
+            self.exchange.set_price(symbol, price)
+            yield {'type': 'book', 'symbol': symbol, 'bid': price, 'ask': price,
+                   'price': price, 'update_id': update_id}
+
+    async def stop(self):
+        pass
+
+
+class ScriptedUserStream:
+    """Yields account events, then idles until stopped"""
+
+    def __init__(self, events):
+        self.queued = events
+        self.stopped = asyncio.Event()
+
+    async def events(self):
+        for event in self.queued:
+            yield event
+        await self.stopped.wait()
+
+    async def stop(self):
+        self.stopped.set()
+
+
+class ThreadRecorder:
+    """Telegram stand-in noting each call and whether it ran on the event loop's thread"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, threading.current_thread() is threading.main_thread()))
+
+
+def test_allocate_capital():
+    assert allocate_capital(10_000, {'btcusdt': 3, 'ETHUSDT': 1, 'SOLUSDT': 0}) == \
+        {'BTCUSDT': 7_500.0, 'ETHUSDT': 2_500.0}
+    assert allocate_capital(10_000, {}) == {}
+
+
+def test_only_btc_unless_symbols_are_opted_in():
+    engine = MultiSymbolEngine(None, None, CONFIG_ADAPTIVE.copy())
+    assert list(engine.bots) == ['BTCUSDT']
+    engine = MultiSymbolEngine(None, None, dict(CONFIG_ADAPTIVE, symbols={'BTCUSDT': 1, 'ETHUSDT': 1}))
+    assert list(engine.bots) == ['BTCUSDT', 'ETHUSDT']
+    assert parse_allocations(' btcusdt:0.5, ETHUSDT:0.3,SOLUSDT') == \
+        {'BTCUSDT': 0.5, 'ETHUSDT': 0.3, 'SOLUSDT': 1.0}
+
+
+def test_limit_order_mode_is_rejected():
+    with pytest.raises(ValueError, match="order_mode='limit'"):
+        MultiSymbolEngine(None, None, dict(CONFIG_ADAPTIVE, order_mode='limit'))
+
+
+def test_shared_balance_is_split_by_allocation():
+    book = PositionBook('ETH', capital=2_500.0)
+    book.sync_balances({'USDT': 10_000.0, 'ETH': 0.0})
+    assert book.cash == 2_500.0
+    book.cash = 2_400.0                                    # after our own buy
+    book.sync_balances({'USDT': 9_000.0})                  # other symbols traded too
+    assert book.cash == 2_400.0
+    book.sync_balances({'USDT': 1_000.0})                  # pool ran short
+    assert book.cash == 1_000.0
+
+
+def test_engine_runs_every_symbol_on_one_loop():
+    btc_level = 50_000.0 * (1 - 2.05 * STEP)
+    eth_level = 3_000.0 * (1 - 2.05 * STEP)
+
+    async def scenario():
+        prices = {'BTCUSDT': 50_000.0, 'ETHUSDT': 3_000.0}
+        async with MockExchange(prices=prices, fee_rate=0.0, latency=0.01) as ex:
+            client = AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url)
+            engine = MultiSymbolEngine(None, client, CONFIG_ADAPTIVE.copy(),
+                                       {'BTCUSDT': 3, 'ETHUSDT': 1})
+            engine.bots['BTCUSDT'].grid_center = 50_000.0
+            engine.bots['ETHUSDT'].grid_center = 3_000.0
+            stream = ScriptedStream(ex, [('BTCUSDT', btc_level), ('BTCUSDT', btc_level),
+                                         ('ETHUSDT', eth_level), ('XRPUSDT', 1.0)])
+            user = ScriptedUserStream([{'e': 'balanceUpdate', 'a': 'USDT', 'd': '5.0'}])
+            engine.account.on_user_event = account_events.append
+            await engine.start(stream, user)
+            assert user.stopped.is_set()
+            return engine, ex
+
+    account_events = []
+    engine, ex = asyncio.run(asyncio.wait_for(scenario(), 10))
+    assert [e['e'] for e in account_events] == ['balanceUpdate']       # user stream feeds the cache
+    btc, eth = engine.bots['BTCUSDT'], engine.bots['ETHUSDT']
+
+    # One combined feed: the repeated BTC tick was coalesced, XRP ignored
+    assert engine.dropped == 1
+    assert sorted(t['symbol'] for t in ex.trades) == ['BTCUSDT', 'ETHUSDT']
+    # Both bots reconciled from one shared account request
+    assert len(ex.requests_to('/api/v3/account')) == 1
+
+    # Orders are sized from each symbol's own allocation, not the whole balance
+    assert btc.start_equity == 7_500.0 and eth.start_equity == 2_500.0
+    btc_cost = sum(p * q for p, q in btc.grid_positions.items())
+    eth_cost = sum(p * q for p, q in eth.grid_positions.items())
+    assert btc_cost == pytest.approx(7_500.0 * RISK, rel=1e-3)
+    assert eth_cost == pytest.approx(2_500.0 * RISK, rel=1e-3)
+    assert eth.executor.book.cash == pytest.approx(2_500.0 - eth_cost, rel=1e-6)
+
+    summary = engine.summary()
+    assert [b['symbol'] for b in summary['bots']] == ['BTCUSDT', 'ETHUSDT']
+    assert summary['equity'] == pytest.approx(btc.equity + eth.equity)
+    assert summary['requests']['requests'] == len(ex.requests)
+    assert not btc.is_running and not eth.is_running        # stopped with the stream
+
+
+class BrokenStream:
+    """Fails on the first read, sending the engine down its error path"""
+
+    async def events(self):
+        raise RuntimeError('feed lost')
+        yield
+
+    async def stop(self):
+        pass
+
+
+def test_engine_keeps_telegram_off_the_event_loop():
+    async def scenario():
+        async with MockExchange(prices={'BTCUSDT': 50_000.0, 'ETHUSDT': 3_000.0}) as ex:
+            client = AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url)
+            engine = MultiSymbolEngine(None, client, CONFIG_ADAPTIVE.copy(),
+                                       {'BTCUSDT': 1, 'ETHUSDT': 1}, telegram=telegram)
+            await engine.start(BrokenStream())
+            return engine
+
+    telegram = ThreadRecorder()
+    engine = asyncio.run(asyncio.wait_for(scenario(), 10))
+    names = [name for name, _ in telegram.calls]
+    assert names.count('notify_start') == 2 and 'notify_error' in names
+    assert names.count('notify_stop') == 2                  # both bots stopped after the error
+    assert not any(on_loop for _, on_loop in telegram.calls)
+    assert not engine.is_running
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
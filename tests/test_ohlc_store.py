@@ -0,0 +1,79 @@
+"""
+Local OHLC store: month partitions, round trips and tail-only updates
+"""
+import numpy as np
+import pandas as pd
+from utils.ohlc_store import OHLCStore
+from utils.data_loader import generate_crash_data
+
+
+def _bars(days=75):
+    np.random.seed(4)
+    return generate_crash_data(100000, 90000, days, 'volatile').set_index('timestamp')
+
+
+def test_round_trip_and_month_partitions(tmp_path):
+    data = _bars()
+    for fmt in ('feather', 'parquet'):
+        store = OHLCStore(str(tmp_path / fmt), fmt=fmt)
+        assert store.write('BTCUSDT', '1h', data) == len(data)
+        assert [m for m, _ in store.partitions('BTCUSDT', '1h')] == ['2022-01', '2022-02', '2022-03']
+
+        out = store.read('BTCUSDT', '1h')
+        pd.testing.assert_frame_equal(out, data[['open', 'high', 'low', 'close', 'volume']],
+                                      check_freq=False, check_index_type=False)
+        window = store.read('BTCUSDT', '1h', '2022-02-10', '2022-02-20 23:00')
+        assert window.index[0] == pd.Timestamp('2022-02-10')
+        assert window.index[-1] == pd.Timestamp('2022-02-20 23:00')
+
+
+def test_update_fetches_only_missing_tail(tmp_path):
+    data = _bars()
+    store = OHLCStore(str(tmp_path))
+    calls = []
+
+    def fetch(start, end):
+        calls.append(start)
+        return data.loc[start:end]
+
+    store.write('BTCUSDT', '1h', data.iloc[:1000])
+    written = store.update('BTCUSDT', '1h', fetch, data.index[0])
+    # Refetches from the last stored bar (it may still have been forming)
+    assert calls == [data.index[999]]
+    assert written == len(data) - 999
+    assert store.read('BTCUSDT', '1h').index.equals(data.index)
+    assert store.bounds('BTCUSDT', '1h') == (data.index[0], data.index[-1])
+
+    # Fully covered range: no fetch at all
+    assert store.update('BTCUSDT', '1h', fetch, data.index[0], data.index[-1]) == 0
+    assert len(calls) == 1
+
+
+def test_fetch_failure_falls_back_to_local_data(tmp_path):
+    data = _bars(10)
+    store = OHLCStore(str(tmp_path))
+    store.write('GC=F', '1h', data)
+
+    def offline(start, end):
+        raise ConnectionError("no network")
+
+    out = store.load('GC=F', '1h', data.index[0], fetch=offline)
+    assert len(out) == len(data)
+
+
+def test_timezone_aware_input_is_stored_as_utc(tmp_path):
+    data = _bars(3)
+    aware = data.tz_localize('UTC').tz_convert('America/New_York')
+    store = OHLCStore(str(tmp_path))
+    store.write('SPY', '1d', aware)
+    assert store.read('SPY', '1d').index.equals(data.index)
+
+
+if __name__ == '__main__':
+    import tempfile, pathlib
+    for test in (test_round_trip_and_month_partitions, test_update_fetches_only_missing_tail,
+                 test_fetch_failure_falls_back_to_local_data,
+                 test_timezone_aware_input_is_stored_as_utc):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(pathlib.Path(tmp))
+    print('OHLC store OK')
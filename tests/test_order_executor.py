@@ -0,0 +1,127 @@
+"""
+Order execution layer: aggregated sells, fill-driven position book, reconciliation
+"""
+import asyncio
+import pytest
+from src.async_binance_connector import AsyncBinanceClient
+from src.configs.strategy_configs import CONFIG_ADAPTIVE
+from src.live_trading_bot import LiveGridHedgeBot
+from src.order_executor import OrderExecutor, PositionBook, floor_qty
+from src.utils.mock_exchange import MockExchange
+
+ENTRIES = [44_000.0, 45_000.0, 46_000.0]
+
+
+def _bot(client, config=None):
+    bot = LiveGridHedgeBot(None, 'BTCUSDT', config or CONFIG_ADAPTIVE.copy(), client=client)
+    bot.grid_center = 40_000.0      # below price: no grid buys
+    for entry in ENTRIES:
+        bot.open_position(entry, 0.01)
+    return bot
+
+
+def test_gap_up_closes_all_lots_with_one_order():
+    async def scenario():
+        async with MockExchange(balances={'USDT': 8_500.0, 'BTC': 0.03}) as ex:
+            async with AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url) as client:
+                bot = _bot(client)
+                await bot.evaluate_async(50_000.0)
+                await bot.evaluate_async(50_100.0)
+            return bot, ex
+
+    bot, ex = asyncio.run(scenario())
+
+    orders = ex.requests_to('/api/v3/order')
+    assert len(orders) == 1 and orders[0]['method'] == 'POST'
+    assert len(ex.requests_to('/api/v3/account')) == 1      # only the initial sync
+    assert bot.grid_positions == {}
+    assert bot.total_trades == 3
+    assert bot.total_profit == pytest.approx(sum((50_000 - e) * 0.01 for e in ENTRIES))
+
+    book = bot.executor.book
+    assert book.cash == pytest.approx(ex.balances['USDT'])
+    assert book.inventory == pytest.approx(ex.balances['BTC'])
+    assert bot.total_fees == pytest.approx(1_500.0 * 0.001)
+
+
+def test_buy_tracks_quantity_net_of_commission():
+    async def scenario():
+        async with MockExchange(balances={'USDT': 10_000.0, 'BTC': 0.0}) as ex:
+            async with AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url) as client:
+                executor = OrderExecutor(client, 'BTCUSDT')
+                await executor.reconcile()
+                fill = await executor.submit('BUY', 0.01)
+            return executor, fill, ex
+
+    executor, fill, ex = asyncio.run(scenario())
+    assert fill['qty'] == pytest.approx(0.01)
+    assert fill['net_qty'] == pytest.approx(0.01 * 0.999)
+    assert executor.book.inventory == pytest.approx(ex.balances['BTC'])
+    assert executor.book.cash == pytest.approx(10_000.0 - 500.0)
+
+
+def test_reconcile_on_interval_reports_drift():
+    async def scenario():
+        async with MockExchange(balances={'USDT': 1_000.0, 'BTC': 0.0}) as ex:
+            async with AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url) as client:
+                executor = OrderExecutor(client, 'BTCUSDT', reconcile_interval=3600)
+                await executor.cash()
+                ex.balances['USDT'] += 250.0          # deposit the book never saw
+                cached = await executor.cash()
+                executor.reconcile_interval = 0
+                fresh = await executor.cash()
+            return executor, cached, fresh
+
+    executor, cached, fresh = asyncio.run(scenario())
+    assert cached == 1_000.0 and fresh == 1_250.0
+    assert executor.reconciles == 2
+    assert executor.book.last_drift['cash'] == pytest.approx(250.0)
+
+
+def test_partial_fill_keeps_remainder_open():
+    bot = _bot(None)
+    order = {'executedQty': '0.02500000', 'cummulativeQuoteQty': '1250.0', 'side': 'SELL'}
+    notices = bot._close_lots({p: 0.01 for p in ENTRIES}, 50_000.0, order)
+
+    assert [n[1] for n in notices] == pytest.approx([0.01, 0.01, 0.005])
+    assert bot.grid_positions == {46_000.0: pytest.approx(0.005)}
+
+
+class FakeSyncExchange:
+    """Blocking connector stand-in that records orders"""
+
+    def __init__(self):
+        self.orders = []
+        self.balance_calls = 0
+
+    def place_market_order(self, symbol, side, quantity):
+        self.orders.append((side, quantity))
+        return {'executedQty': str(quantity), 'cummulativeQuoteQty': str(quantity * 50_000.0)}
+
+    def get_account_info(self):
+        self.balance_calls += 1
+        return {'balances': [{'asset': 'USDT', 'free': '1000.0'}]}
+
+
+def test_sync_cycle_sells_once():
+    exchange = FakeSyncExchange()
+    bot = LiveGridHedgeBot(exchange, 'BTCUSDT', CONFIG_ADAPTIVE.copy())
+    for entry in ENTRIES:
+        bot.open_position(entry, 0.01)
+    bot.close_grid_positions(bot.should_sell_grid(50_000.0), 50_000.0)
+
+    assert exchange.orders == [('SELL', 0.03)]
+    assert exchange.balance_calls == 0      # no telegram: nothing reads the balance
+    assert bot.grid_positions == {}
+
+
+def test_helpers():
+    assert floor_qty(0.0095904, 5) == 0.00959
+    assert floor_qty(0.03, 5) == 0.03
+    book = PositionBook('BTC')
+    book.sync({'balances': [{'asset': 'USDT', 'free': '10.0'}, {'asset': 'BTC', 'free': '0.5'}]})
+    assert (book.cash, book.inventory) == (10.0, 0.5)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
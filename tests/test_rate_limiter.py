@@ -0,0 +1,184 @@
+"""
+Request scheduler: weight budget, 429 handling, retries and order priority
+"""
+import asyncio
+import threading
+from types import SimpleNamespace
+import pytest
+from src.async_binance_connector import AsyncBinanceClient
+from src.binance_connector import BinanceTradingBot
+from src.configs.strategy_configs import CONFIG_ADAPTIVE
+from src.live_trading_bot import LiveGridHedgeBot
+from src.rate_limiter import PRIORITY_ORDER, RateLimitExceeded, RequestScheduler, endpoint_weight
+from src.utils.mock_exchange import MockExchange
+
+
+class Clock:
+    """Fake wall clock whose sleep advances time"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class ServerError(Exception):
+    status_code = 503
+
+
+@pytest.fixture
+def exchange():
+    ex = MockExchange()
+    ex.start_in_thread()
+    yield ex
+    ex.stop_thread()
+
+
+def test_sync_connector_waits_out_429(exchange):
+    clock = Clock()
+    scheduler = RequestScheduler(clock=clock, sleep=clock.sleep)
+    bot = BinanceTradingBot('test-key', 'test-secret', base_url=exchange.base_url, scheduler=scheduler)
+
+    exchange.fail_next('/api/v3/ticker/price', count=2, retry_after=3)
+    assert bot.get_price('BTCUSDT') == 50_000.0
+
+    assert len(exchange.requests_to('/api/v3/ticker/price')) == 3
+    stats = scheduler.stats()
+    assert stats['rate_limited'] == 2 and stats['retries'] == 2
+    assert clock.now >= 6.0                         # honoured Retry-After both times
+    # The budget follows the exchange's own count
+    assert stats['used_weight'] == exchange.used_weight
+
+
+def test_persistent_429_raises_rate_limit_exceeded(exchange):
+    clock = Clock()
+    scheduler = RequestScheduler(max_retries=2, clock=clock, sleep=clock.sleep)
+    bot = BinanceTradingBot('test-key', 'test-secret', base_url=exchange.base_url, scheduler=scheduler)
+
+    exchange.fail_next('/api/v3/ticker/price', count=5, status=418, retry_after=120)
+    with pytest.raises(RateLimitExceeded) as error:
+        bot.get_price('BTCUSDT')             # not swallowed into a 0.0 price
+
+    assert error.value.status == 418 and error.value.retry_after == pytest.approx(120.0)
+    assert len(exchange.requests_to('/api/v3/ticker/price')) == 3
+    assert scheduler.stats()['banned'] == 3 and scheduler.stats()['errors'] == 1
+
+
+def test_live_loop_pauses_on_rate_limit():
+    bot = LiveGridHedgeBot(None, 'BTCUSDT', CONFIG_ADAPTIVE.copy())
+    alerts, cycles = [], []
+    bot.telegram = SimpleNamespace(notify_start=lambda *args: None,
+                                   notify_error=alerts.append, notify_stop=lambda *args: None)
+
+    def run_cycle():
+        cycles.append(1)
+        if len(cycles) == 1:
+            raise RateLimitExceeded(429, 0.0)
+        bot.is_running = False
+
+    bot.run_cycle = run_cycle
+    bot.start(check_interval=0)
+    assert len(cycles) == 2                  # kept trading after the pause
+    assert len(alerts) == 1 and 'HTTP 429' in alerts[0]
+
+
+def test_counters_are_exact_across_threads():
+    scheduler = RequestScheduler(weight_limit=10**9)
+
+    def hammer():
+        for _ in range(500):
+            scheduler.call(lambda: None)
+
+    threads = [threading.Thread(target=hammer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert scheduler.stats()['requests'] == 4_000
+
+
+def test_sync_reads_retry_server_errors(exchange):
+    clock = Clock()
+    scheduler = RequestScheduler(clock=clock, sleep=clock.sleep)
+    bot = BinanceTradingBot('test-key', 'test-secret', base_url=exchange.base_url, scheduler=scheduler)
+
+    exchange.fail_next('/api/v3/account', count=1, status=503)
+    assert bot.get_account_balance('USDT') == 10_000.0
+    assert len(exchange.requests_to('/api/v3/account')) == 2
+
+
+def test_throttles_before_the_limit():
+    clock = Clock()
+    scheduler = RequestScheduler(weight_limit=100, read_share=0.5, clock=clock, sleep=clock.sleep)
+
+    for _ in range(2):
+        scheduler.call(lambda: None, weight=20)
+    assert clock.now == 0.0
+    # An order may still use the reserve the reads cannot touch
+    scheduler.call(lambda: None, weight=40, priority=PRIORITY_ORDER)
+    assert clock.now == 0.0
+
+    scheduler.call(lambda: None, weight=20)          # would pass 50: waits for the next window
+    assert clock.now == 60.0
+    assert scheduler.stats()['throttled'] == 1 and scheduler.used_weight == 20
+
+
+def test_orders_are_not_resent_after_server_errors():
+    clock = Clock()
+    scheduler = RequestScheduler(clock=clock, sleep=clock.sleep)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ServerError()
+        return 'ok'
+
+    with pytest.raises(ServerError):
+        scheduler.call(flaky, priority=PRIORITY_ORDER, idempotent=False)
+    assert len(attempts) == 1                        # the order may have been placed
+
+    attempts.clear()
+    assert scheduler.call(flaky) == 'ok' and len(attempts) == 2
+    assert 0 < clock.slept[-1] <= scheduler.backoff
+
+
+def test_async_client_retries_and_prioritises_orders():
+    async def scenario():
+        scheduler = RequestScheduler(weight_limit=200, read_share=1.0, window=0.3, backoff=0.01)
+        async with MockExchange(latency=0.01) as ex:
+            async with AsyncBinanceClient('test-key', 'test-secret', base_url=ex.base_url,
+                                          scheduler=scheduler) as client:
+                ex.fail_next('/api/v3/account', count=1, status=429, retry_after=0)
+                assert await client.get_account_balance('USDT') == 10_000.0
+
+                # Start from an exhausted window so everything queues
+                await asyncio.sleep(scheduler.window_start + scheduler.window - scheduler.clock() + 0.01)
+                scheduler.update_from_headers({'X-MBX-USED-WEIGHT-1M': str(scheduler.weight_limit)})
+                reads = [asyncio.create_task(client.get_price('BTCUSDT')) for _ in range(3)]
+                await asyncio.sleep(0)
+                order = asyncio.create_task(client.place_market_order('BTCUSDT', 'BUY', 0.01))
+                await asyncio.gather(order, *reads)
+                return ex, scheduler
+
+    ex, scheduler = asyncio.run(asyncio.wait_for(scenario(), 10))
+    assert [r['status'] for r in ex.requests_to('/api/v3/account')] == [429, 200]
+    queued = [r['path'] for r in ex.requests if r['path'] in ('/api/v3/order', '/api/v3/ticker/price')]
+    assert queued[0] == '/api/v3/order'
+    assert scheduler.stats()['rate_limited'] == 1
+
+
+def test_endpoint_weight():
+    assert endpoint_weight('/api/v3/openOrders', {'symbol': 'BTCUSDT'}) == 6
+    assert endpoint_weight('/api/v3/openOrders', {}) == 80
+    assert endpoint_weight('/api/v3/unknown') == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,53 @@
+"""
+Ring-buffer price history: ordering, zero-copy views and concurrent reads
+"""
+import threading
+import numpy as np
+from utils.ring_buffer import PriceRingBuffer
+
+
+def test_ordered_view_after_wraparound():
+    buf = PriceRingBuffer(5)
+    buf.extend(np.arange(12, dtype=float), timestamps=np.arange(12) * 1000)
+    
+    assert len(buf) == 5
+    np.testing.assert_array_equal(buf.view(), [7, 8, 9, 10, 11])
+    np.testing.assert_array_equal(buf.view('timestamp'), [7000, 8000, 9000, 10000, 11000])
+    assert buf[0] == 7 and buf[-1] == 11 and buf.last() == 11
+    assert buf.view().base is not None          # a view, not a copy
+    
+    buf.clear()
+    assert not buf and buf.last(-1.0) == -1.0
+
+
+def test_ohlc_fields():
+    buf = PriceRingBuffer(3, ohlc=True)
+    buf.append(101.0, 1, open=100.0, high=102.0, low=99.0)
+    buf.append(103.0, 2)
+    snap = buf.snapshot()
+    np.testing.assert_array_equal(snap['open'], [100.0, 103.0])
+    np.testing.assert_array_equal(snap['close'], [101.0, 103.0])
+
+
+def test_snapshot_is_consistent_under_concurrent_writes():
+    buf = PriceRingBuffer(10_000)
+    stop = threading.Event()
+    
+    def writer():
+        i = 0
+        while not stop.is_set():
+            buf.append(float(i), i)
+            i += 1
+    
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(200):
+            snap = buf.snapshot()
+            prices = snap['price']
+            # Every snapshot is a run of consecutive samples with matching timestamps
+            assert np.all(np.diff(prices) == 1)
+            np.testing.assert_array_equal(prices, snap['timestamp'])
+    finally:
+        stop.set()
+        thread.join()
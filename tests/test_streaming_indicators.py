@@ -0,0 +1,56 @@
+"""
+Streaming indicators reproduce the batch functions in core.indicators
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from core.indicators import ema, sma, atr, rsi, macd
+from core.streaming import (StreamingIndicator, StreamingEMA, StreamingSMA, StreamingATR,
+                            StreamingRSI, StreamingMACD)
+from utils.data_loader import generate_crash_data
+
+
+def _data():
+    np.random.seed(13)
+    data = generate_crash_data(100000, 85000, 30, 'volatile')
+    # Flat stretch exercises pandas' constant-window handling
+    data.loc[100:140, ['open', 'high', 'low', 'close']] = 90000.0
+    return data
+
+
+def test_streaming_ema_sma_match_batch():
+    close = _data()['close']
+    for period in [1, 2, 14, 50]:
+        np.testing.assert_array_equal(StreamingEMA(period).update_many(close),
+                                      ema(close, period).to_numpy())
+        np.testing.assert_array_equal(StreamingSMA(period).update_many(close),
+                                      sma(close, period).to_numpy())
+
+
+def test_streaming_atr_rsi_macd_match_batch():
+    data = _data()
+    close = data['close']
+    np.testing.assert_array_equal(
+        StreamingATR(14).update_many(data['high'], data['low'], close),
+        atr(data['high'], data['low'], close, 14).to_numpy())
+    np.testing.assert_array_equal(StreamingRSI(14).update_many(close),
+                                  rsi(close, 14).to_numpy())
+    for expected, actual in zip(macd(close), StreamingMACD().update_many(close)):
+        np.testing.assert_array_equal(actual, expected.to_numpy())
+
+
+def test_seeded_stream_continues_batch_series():
+    close = _data()['close']
+    stream = StreamingEMA(50)
+    stream.update_many(close.iloc[:500])
+    for price in close.iloc[500:]:
+        stream.update(price)
+    assert stream.value == ema(close, 50).iloc[-1]
+
+
+def test_indicator_without_update_fails_at_construction():
+    class NoUpdate(StreamingIndicator):
+        pass
+
+    with pytest.raises(TypeError, match='update'):
+        NoUpdate()
@@ -0,0 +1,56 @@
+"""
+Parallel sweep: pool results match direct in-process runs
+"""
+import numpy as np
+from configs.strategy_configs import CONFIGS
+from core.sweep import run_sweep, run_config, expand_grid, SharedOHLC, attach_ohlc
+from utils.data_loader import generate_crash_data
+
+
+RANGES = {
+    'grid_step': [0.012, 0.016, 0.02],
+    'grid_take_profit': [0.018, 0.024],
+    'hedge_sizes': [[0.06, 0.09, 0.14], [0.1, 0.15, 0.2]],
+}
+
+
+def _data():
+    np.random.seed(9)
+    return generate_crash_data(100000, 75000, 45, 'volatile').set_index('timestamp')
+
+
+def test_shared_ohlc_round_trip():
+    data = _data()
+    with SharedOHLC(data) as shared:
+        attached, shm = attach_ohlc(shared.handle)
+        assert attached.index.equals(data.index)
+        for column in ['open', 'high', 'low', 'close', 'volume']:
+            assert np.array_equal(attached[column].to_numpy(), data[column].to_numpy())
+        del attached
+        shm.close()
+
+
+def test_parallel_sweep_matches_serial_runs():
+    data = _data()
+    base = CONFIGS['adaptive'].copy()
+    base['backtest_days'] = 45
+    
+    table = run_sweep(data, base, RANGES, workers=2)
+    assert len(table) == 12
+    assert list(table['rank']) == list(range(1, 13))
+    assert table['roi'].is_monotonic_decreasing
+    
+    for config in expand_grid(base, RANGES):
+        expected = run_config(data, config)
+        row = table[(table['grid_step'] == config['grid_step'])
+                    & (table['grid_take_profit'] == config['grid_take_profit'])
+                    & (table['hedge_sizes'] == tuple(config['hedge_sizes']))]
+        assert len(row) == 1
+        assert row['roi'].iloc[0] == expected['roi']
+        assert row['max_drawdown'].iloc[0] == expected['max_drawdown']
+
+
+if __name__ == '__main__':
+    test_shared_ohlc_round_trip()
+    test_parallel_sweep_matches_serial_runs()
+    print('Sweep OK')
@@ -0,0 +1,105 @@
+"""
+Columnar trade log: per-type indexing and DataFrame parity with the old list of dicts
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from configs.strategy_configs import CONFIGS
+from core.strategy import DynamicGridHedgeStrategy, StrategyState
+from core.backtest import BacktestEngine
+from core.performance import PerformanceAnalyzer
+from core.trade_log import TradeLog, TradeType
+from utils.data_loader import generate_crash_data
+
+
+def _records():
+    ts = pd.date_range('2024-01-01', periods=6, freq='h')
+    return [
+        {'timestamp': ts[0], 'type': 'GRID_BUY', 'level': 1, 'price': 100.0, 'qty': 0.5,
+         'cost': 50.0, 'fee': 0.05, 'balance': 949.95},
+        {'timestamp': ts[1], 'type': 'HEDGE_OPEN', 'layer': 2, 'price': 95.0, 'qty': 1.0,
+         'leverage': 3, 'margin': 31.7, 'fee': 0.04, 'distance_atr': 2.5},
+        {'timestamp': ts[2], 'type': 'GRID_SELL', 'entry_price': 100.0, 'exit_price': 101.2,
+         'qty': 0.5, 'revenue': 50.6, 'fee': 0.05, 'profit': 0.5, 'balance': 1000.5},
+        {'timestamp': ts[3], 'type': 'GRID_REBALANCE', 'old_center': 100.0, 'new_center': 90.0,
+         'spot_qty': 0.0, 'note': 'Grid rebalanced without closing positions'},
+        {'timestamp': ts[4], 'type': 'HEDGE_CLOSE_ALL', 'exit_price': 90.0, 'qty': 1.0,
+         'entry_price': 95.0, 'pnl': 5.0, 'fee': 0.04, 'net_pnl': 4.96},
+        {'timestamp': ts[5], 'type': 'GRID_BUY', 'level': 2, 'price': 89.0, 'qty': 0.1,
+         'cost': 8.9, 'fee': 0.01, 'balance': 990.0},
+    ]
+
+
+def _log(records):
+    log = TradeLog(capacity=2)      # force growth
+    for trade in records:
+        trade = dict(trade)
+        log.add(TradeType[trade.pop('type')], trade.pop('timestamp'), **trade)
+    return log
+
+
+@pytest.mark.parametrize('rows', [slice(0, 0), slice(0, 1), slice(0, 3), slice(None)])
+def test_to_frame_matches_list_of_dicts(rows):
+    records = _records()[rows]
+    pd.testing.assert_frame_equal(_log(records).to_frame(), pd.DataFrame(records), check_exact=True)
+
+
+def test_per_type_counts_columns_and_rows():
+    records = _records()
+    log = _log(records)
+
+    assert len(log) == 6
+    assert log.count(TradeType.GRID_BUY) == 2
+    assert log.count(TradeType.HEDGE_OPEN) == 1
+    np.testing.assert_array_equal(log.positions(TradeType.GRID_BUY), [0, 5])
+    np.testing.assert_array_equal(log.column('price', TradeType.GRID_BUY), [100.0, 89.0])
+    assert log[-1] == records[-1]
+    assert list(log) == records
+
+
+def test_array_round_trip():
+    log = _log(_records())
+    parts = log.to_arrays()
+    restored = TradeLog.from_arrays(parts['meta'], parts['arrays'])
+    pd.testing.assert_frame_equal(restored.to_frame(), log.to_frame(), check_exact=True)
+
+
+def test_records_append_across_saves():
+    log = _log(_records())
+    head = log.to_records()
+    later = [dict(r, note='Manual rebalance') if 'note' in r else r for r in _records()]
+    more = _log(_records() + later)
+    tail = more.to_records(len(log))
+    records = np.concatenate([head['records'], tail['records']])
+    restored = TradeLog.from_records(tail['meta'], records)
+    pd.testing.assert_frame_equal(restored.to_frame(), more.to_frame(), check_exact=True)
+
+
+def test_state_has_fixed_slots_and_get_state_shares_log():
+    state = StrategyState(1000.0)
+    with pytest.raises(AttributeError):
+        state.unknown_field = 1
+
+    strategy = DynamicGridHedgeStrategy(CONFIGS['adaptive'].copy())
+    assert strategy.get_state()['trades'] is strategy.state.trades
+
+
+def test_backtest_trades_and_analyzer_use_log():
+    np.random.seed(15)
+    data = generate_crash_data(100000, 60000, 30, 'volatile').set_index('timestamp')
+    config = CONFIGS['adaptive'].copy()
+    results = BacktestEngine(DynamicGridHedgeStrategy(config), data, config, verbose=False).run()
+
+    log = results['final_state']['trades']
+    pd.testing.assert_frame_equal(results['trades'], pd.DataFrame(list(log)), check_exact=True)
+
+    trades = results['trades']
+    metrics = PerformanceAnalyzer(results, config).calculate_metrics()
+    sells = trades[trades['type'] == 'GRID_SELL']
+    assert metrics['grid_buys'] == (trades['type'] == 'GRID_BUY').sum()
+    assert metrics['grid_sells'] == len(sells)
+    assert metrics['grid_profit'] == sells['profit'].sum()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -1,13 +1,13 @@
 """
 Test Grid + Hedge strategy with 6 months recent VNIndex data
 """
-import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 from configs.strategy_configs import CONFIG_ADAPTIVE
 from core.strategy import DynamicGridHedgeStrategy
 from core.backtest import BacktestEngine
 from core.performance import PerformanceAnalyzer
+from utils.data_loader import load_yahoo_data
 
 def download_vnindex_data(months=6):
     """Download recent VNIndex data from Yahoo Finance"""
@@ -30,8 +30,7 @@ def download_vnindex_data(months=6):
     for ticker_symbol in tickers_to_try:
         print(f"Trying {ticker_symbol}...")
         try:
-            ticker = yf.Ticker(ticker_symbol)
-            df = ticker.history(start=start_date, end=end_date, interval="1d")
+            df = load_yahoo_data(ticker_symbol, start_date, end_date, interval="1d")
             if not df.empty:
                 print(f"✅ Found data from {ticker_symbol}")
                 break
@@ -42,8 +41,7 @@ def download_vnindex_data(months=6):
     if df.empty:
         print("\n⚠️ Cannot download VNIndex from Yahoo Finance")
         print("Using SPY (S&P 500 ETF) as alternative for demonstration...")
-        ticker = yf.Ticker("SPY")
-        df = ticker.history(start=start_date, end=end_date, interval="1h")
+        df = load_yahoo_data("SPY", start_date, end_date, interval="1h")
     
     if df.empty:
         raise ValueError("Cannot download any market data")
@@ -0,0 +1,92 @@
+"""
+Walk-forward: fold layout, sliced indicators and parallel/serial agreement
+"""
+import numpy as np
+import pytest
+from configs.strategy_configs import CONFIGS
+from core.indicators import ema, atr
+from core.walkforward import WalkForward, make_folds, FullSeriesIndicators
+from utils.data_loader import generate_crash_data
+
+
+RANGES = {
+    'grid_step': [0.012, 0.02],
+    'grid_take_profit': [0.018, 0.03],
+}
+
+
+def _data():
+    np.random.seed(21)
+    return generate_crash_data(100000, 80000, 40, 'volatile').set_index('timestamp')
+
+
+def test_folds_are_contiguous_and_out_of_sample():
+    data = _data()
+    folds = make_folds(data.index, train_days=10, test_days=5)
+    assert len(folds) >= 5
+    for fold in folds:
+        train_start, train_stop = fold['train']
+        test_start, test_stop = fold['test']
+        assert train_start < train_stop == test_start < test_stop
+    # Test windows tile the series after the first train window
+    for prev, nxt in zip(folds, folds[1:]):
+        assert prev['test'][1] == nxt['test'][0]
+
+
+def test_overlapping_test_windows_are_rejected():
+    data = _data()
+    with pytest.raises(ValueError, match='step_days'):
+        make_folds(data.index, train_days=10, test_days=5, step_days=2)
+    assert make_folds(data.index, train_days=10, test_days=5, step_days=7)
+
+
+def test_indicators_are_slices_of_full_series():
+    data = _data()
+    indicators = FullSeriesIndicators(data)
+    config = CONFIGS['adaptive']
+    ema_values, atr_values = indicators.window(config, 300, 500)
+    full_ema = ema(data['close'], config['ema_period']).to_numpy()
+    full_atr = atr(data['high'], data['low'], data['close'], config['atr_period']).to_numpy()
+    assert np.array_equal(ema_values, full_ema[300:500])
+    assert np.array_equal(atr_values, full_atr[300:500], equal_nan=True)
+
+
+def test_parallel_matches_serial_and_stitches():
+    data = _data()
+    base = CONFIGS['adaptive'].copy()
+
+    serial = WalkForward(data, base, RANGES, train_days=10, test_days=5).run(workers=1)
+    parallel = WalkForward(data, base, RANGES, train_days=10, test_days=5).run(workers=2)
+
+    assert serial['final_equity'] == parallel['final_equity']
+    assert list(serial['folds']['test_roi']) == list(parallel['folds']['test_roi'])
+
+    folds = serial['folds']
+    # Each test window starts with the previous window's ending equity
+    assert folds['start_equity'].iloc[0] == base['initial_capital']
+    assert np.array_equal(folds['start_equity'].iloc[1:].to_numpy(),
+                          folds['end_equity'].iloc[:-1].to_numpy())
+    curve = serial['equity_curve']
+    assert curve['timestamp'].is_monotonic_increasing
+    assert set(curve['fold']) == set(folds['fold'])
+    assert serial['final_equity'] == folds['end_equity'].iloc[-1]
+
+
+def test_train_results_are_cached():
+    data = _data()
+    walk = WalkForward(data, CONFIGS['adaptive'].copy(), RANGES, train_days=10, test_days=5)
+    first = walk.optimise(workers=1)
+    cached = len(walk._train_cache)
+    second = walk.optimise(workers=1)
+    assert len(walk._train_cache) == cached == len(walk.folds) * 4
+    for a, b in zip(first, second):
+        assert a.equals(b)
+
+
+if __name__ == '__main__':
+    test_folds_are_contiguous_and_out_of_sample()
+    test_overlapping_test_windows_are_rejected()
+    test_indicators_are_slices_of_full_series()
+    test_parallel_matches_serial_and_stitches()
+    test_train_results_are_cached()
+    print('Walk-forward OK')